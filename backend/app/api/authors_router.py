@@ -0,0 +1,108 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+
+from backend.app.database import SessionLocal
+from backend.app.models.models import Author, Entity
+from backend.app.repositories import analytics_repo
+from backend.app.repositories.entity_repo import EntityRepository
+from backend.app.schemas.schemas import Paper as PaperSchema
+
+router = APIRouter(prefix="/authors", tags=["Authors"])
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def _last_monday(week_start: Optional[datetime]):
+    week_start = week_start or datetime.utcnow()
+    return week_start.date() - timedelta(days=week_start.weekday())
+
+def _entity_filter(db: Session, entity_id: Optional[int]):
+    """(entity summary, ids of the entity and its canonical aliases), or (None, None) without an entity"""
+    if entity_id is None:
+        return None, None
+    roots, groups = EntityRepository(db).canonical_groups([entity_id])
+    if entity_id not in roots:
+        raise HTTPException(status_code=404, detail="Entity not found")
+    root = roots[entity_id]
+    entity = db.get(Entity, root)
+    summary = {
+        "id": entity_id,
+        "canonical_id": root,
+        "name": entity.name,
+        "type": entity.type.value if entity.type else None,
+        "aliases": sorted(member for member in groups[root] if member != root),
+    }
+    return summary, groups[root]
+
+@router.get("/top")
+def get_top_authors(
+    week_start: Optional[datetime] = None,
+    weeks: int = Query(1, ge=1, le=52),
+    entity_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """
+    Authors with the most papers in the `weeks` weeks ending with week_start's,
+    optionally only papers mentioning entity_id or one of its aliases
+    """
+    last_week = _last_monday(week_start)
+    first_week = last_week - timedelta(weeks=weeks - 1)
+    entity, entity_ids = _entity_filter(db, entity_id)
+    top = analytics_repo.get_top_authors(db, first_week, last_week, entity_ids, limit)
+
+    return {
+        "first_week": first_week,
+        "last_week": last_week,
+        "entity": entity,
+        "authors": [{"id": r[0], "name": r[1], "papers": r[2]} for r in top]
+    }
+
+@router.get("/rising")
+def get_rising_authors(
+    week_start: Optional[datetime] = None,
+    weeks: int = Query(4, ge=1, le=26),
+    entity_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """
+    Authors whose papers in the `weeks` weeks ending with week_start's grew
+    the most over the `weeks` weeks before, optionally only papers
+    mentioning entity_id or one of its aliases
+    """
+    last_week = _last_monday(week_start)
+    split_week = last_week - timedelta(weeks=weeks - 1)
+    first_week = split_week - timedelta(weeks=weeks)
+    entity, entity_ids = _entity_filter(db, entity_id)
+    rising = analytics_repo.get_rising_authors(db, first_week, split_week, last_week, entity_ids, limit)
+
+    return {
+        "current_weeks": [split_week, last_week],
+        "previous_weeks": [first_week, split_week - timedelta(weeks=1)],
+        "entity": entity,
+        "authors": [
+            {"id": r[0], "name": r[1], "papers": r[2], "previous": r[3], "growth": r[2] - r[3]}
+            for r in rising
+        ]
+    }
+
+@router.get("/{author_id}/papers", response_model=List[PaperSchema])
+def get_papers_for_author(
+    author_id: int,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """Papers of an author, newest first; X-Total-Count holds the number of papers"""
+    if db.get(Author, author_id) is None:
+        raise HTTPException(status_code=404, detail="Author not found")
+    response.headers["X-Total-Count"] = str(analytics_repo.count_papers_for_an_author(db, author_id))
+    return analytics_repo.get_papers_for_an_author(db, author_id, skip=skip, limit=limit)
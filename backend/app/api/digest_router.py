@@ -1,12 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from datetime import date, datetime, timedelta
+import json
+import logging
 import os
 
 from backend.app.database import SessionLocal
 from backend.app.models.models import Digest
 from backend.app.repositories import analytics_repo
 from backend.app.llm.digest_generator import DigestService
+from backend.app.llm.providers import requires_api_key
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/digest", tags=["Digest"])
 
@@ -17,41 +23,23 @@ def get_db():
     finally:
         db.close()
 
-@router.post("/generate")
-async def generate_digest(
-    week_start: date,
-    db: Session = Depends(get_db)
-):
-    """Generate weekly digest using LLM"""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise HTTPException(status_code=500, detail="OPENAI_API_KEY not configured")
-    
-    # Get analytics data
+def _collect_digest_inputs(db: Session, week_start: date) -> dict:
+    """Run the analytics queries a digest is built from and format them for the LLM"""
     week_start_dt = datetime.combine(week_start, datetime.min.time())
-    
+
     top_entities = analytics_repo.get_top_entities_by_week(db, week_start_dt, "method", limit=10)
     fastest_growing = analytics_repo.get_fastest_growing_entities(db, "method")
     cooccurrence = analytics_repo.get_entity_cooccurence_edges(db, "method", days=7)
     categories = analytics_repo.category_distribution_over_time(db)
-    
-    # Format for LLM
-    top_list = [{"name": r[0], "count": r[1]} for r in top_entities]
-    growth_list = [{"name": r[0], "growth": r[1]} for r in fastest_growing]
-    cooc_list = [{"entity_a": r[0], "entity_b": r[1], "count": r[2]} for r in cooccurrence[:10]]
-    cat_list = [{"category": r[1], "count": r[2]} for r in categories[:10]]
-    
-    # Generate digest
-    service = DigestService(api_key=api_key)
-    content = await service.generate_digest(
-        week_start=week_start,
-        top_entities=top_list,
-        fastest_growing=growth_list,
-        cooccurrence=cooc_list,
-        categories=cat_list
-    )
-    
-    # Save to database
+
+    return {
+        "top_entities": [{"name": r[0], "count": r[1]} for r in top_entities],
+        "fastest_growing": [{"name": r[0], "growth": r[1]} for r in fastest_growing],
+        "cooccurrence": [{"entity_a": r[0], "entity_b": r[1], "count": r[2]} for r in cooccurrence[:10]],
+        "categories": [{"category": r[1], "count": r[2]} for r in categories[:10]],
+    }
+
+def _save_digest(db: Session, week_start: date, content: str):
     week_end = week_start + timedelta(days=7)
     digest = Digest(
         week_start=week_start,
@@ -60,12 +48,87 @@ async def generate_digest(
     )
     db.add(digest)
     db.commit()
-    
+
+def _sse(data: dict, event: str = None) -> str:
+    """Encode one Server-Sent Events frame"""
+    frame = f"event: {event}\n" if event else ""
+    return frame + f"data: {json.dumps(data)}\n\n"
+
+@router.post("/generate")
+async def generate_digest(
+    week_start: date,
+    db: Session = Depends(get_db)
+):
+    """Generate weekly digest using LLM"""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key and requires_api_key():
+        raise HTTPException(status_code=500, detail="OPENAI_API_KEY not configured")
+
+    inputs = _collect_digest_inputs(db, week_start)
+
+    # Generate digest
+    service = DigestService(api_key=api_key)
+    content = await service.generate_digest(week_start=week_start, **inputs)
+
+    _save_digest(db, week_start, content)
+
     return {
         "week_start": week_start.isoformat() if hasattr(week_start, "isoformat") else str(week_start),
         "content": content or "",
     }
 
+@router.post("/generate/stream")
+async def generate_digest_stream(
+    week_start: date,
+    db: Session = Depends(get_db)
+):
+    """
+    Generate weekly digest and stream it as Server-Sent Events.
+
+    Emits `data: {"token": ...}` frames while the LLM is writing, then a single
+    `event: done` frame with the full markdown once it has been saved, or an
+    `event: error` frame if generation fails.
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key and requires_api_key():
+        raise HTTPException(status_code=500, detail="OPENAI_API_KEY not configured")
+
+    # Analytics run up front so query errors still surface as a normal HTTP error
+    inputs = _collect_digest_inputs(db, week_start)
+    service = DigestService(api_key=api_key)
+
+    async def event_stream():
+        parts = []
+        try:
+            async for token in service.stream_digest(week_start=week_start, **inputs):
+                parts.append(token)
+                yield _sse({"token": token})
+        except Exception:
+            logger.exception("Digest streaming failed")
+            yield _sse({"detail": "Digest generation failed. Check server logs for details."}, event="error")
+            return
+
+        content = "".join(parts)
+        # The request-scoped session is not guaranteed to outlive the response body
+        save_db = SessionLocal()
+        try:
+            _save_digest(save_db, week_start, content)
+        except Exception:
+            save_db.rollback()
+            logger.exception("Saving streamed digest failed")
+            yield _sse({"detail": "Digest was generated but could not be saved."}, event="error")
+            return
+        finally:
+            save_db.close()
+
+        yield _sse({"week_start": week_start.isoformat(), "content": content}, event="done")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/latest")
 def get_latest_digest(db: Session = Depends(get_db)):
     """Get the most recent digest. Returns JSON-serializable dates (ISO strings)."""
@@ -76,4 +139,4 @@ def get_latest_digest(db: Session = Depends(get_db)):
         "week_start": digest.week_start.isoformat() if digest.week_start and hasattr(digest.week_start, "isoformat") else str(digest.week_start or ""),
         "week_end": digest.week_end.isoformat() if digest.week_end and hasattr(digest.week_end, "isoformat") else str(digest.week_end or ""),
         "content": digest.content_md or "",
-    }
\ No newline at end of file
+    }
@@ -1,14 +1,22 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import datetime, timedelta
 from backend.app.database import SessionLocal
 
 from backend.app.models.models import Entity
-from backend.app.schemas.schemas import Entity as EntitySchema, PaperWithEvidenceResponse
+from backend.app.schemas.schemas import (
+    Entity as EntitySchema, PaperWithEvidenceResponse,
+    EntityTimelineWeeksResponse, EntityTimelinesResponse,
+)
 from backend.app.repositories import analytics_repo
+from backend.app.repositories.entity_repo import EntityRepository
 
 router = APIRouter(prefix="/entities", tags=["Entities"])
 
+# Entities per /entities/timelines request
+MAX_TIMELINE_IDS = 100
+
 def get_db():
     db = SessionLocal()
     try:
@@ -32,13 +40,77 @@ def get_entities(
 
     return query.all()
 
+def _timelines(db: Session, entity_ids: List[int], week_start: Optional[datetime], weeks: int):
+    """Week list and one timeline per existing id, in request order, with canonical aliases merged"""
+    week_start = week_start or datetime.utcnow()
+    last_monday = week_start.date() - timedelta(days=week_start.weekday())
+    week_list = [last_monday - timedelta(weeks=i) for i in reversed(range(weeks))]
+
+    roots, groups = EntityRepository(db).canonical_groups(entity_ids)
+    counts = {root: dict.fromkeys(week_list, 0) for root in groups}
+    for root, week, count in analytics_repo.get_entity_weekly_counts(db, groups, week_list[0], last_monday):
+        counts[root][week] = count
+    entities = {entity.id: entity for entity in db.query(Entity).filter(Entity.id.in_(list(groups)))}
+
+    timelines = []
+    for entity_id in dict.fromkeys(entity_ids):
+        if entity_id not in roots:
+            continue
+        root = roots[entity_id]
+        series = list(counts[root].values())
+        timelines.append({
+            "id": entity_id,
+            "canonical_id": root,
+            "name": entities[root].name,
+            "type": entities[root].type.value if entities[root].type else None,
+            "aliases": sorted(member for member in groups[root] if member != root),
+            "counts": series,
+            "total": sum(series),
+        })
+    return week_list, timelines
+
+@router.get("/timelines", response_model=EntityTimelinesResponse)
+def get_entity_timelines(
+    ids: str = Query(..., description="Comma-separated entity ids"),
+    week_start: Optional[datetime] = None,
+    weeks: int = Query(26, ge=1, le=156),
+    db: Session = Depends(get_db)
+):
+    """Papers per week for several entities in one query; unknown ids are left out"""
+    try:
+        entity_ids = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be comma-separated integers")
+    if not entity_ids or len(entity_ids) > MAX_TIMELINE_IDS:
+        raise HTTPException(status_code=422, detail=f"Pass between 1 and {MAX_TIMELINE_IDS} ids")
+
+    week_list, timelines = _timelines(db, entity_ids, week_start, weeks)
+    return {"weeks": week_list, "timelines": timelines}
+
+@router.get("/{entity_id}/timeline", response_model=EntityTimelineWeeksResponse)
+def get_entity_timeline(
+    entity_id: int,
+    week_start: Optional[datetime] = None,
+    weeks: int = Query(26, ge=1, le=156),
+    db: Session = Depends(get_db)
+):
+    """Papers per week mentioning the entity or any of its canonical aliases, over the `weeks` weeks ending with week_start's"""
+    week_list, timelines = _timelines(db, [entity_id], week_start, weeks)
+    if not timelines:
+        raise HTTPException(status_code=404, detail="Entity not found")
+    return {"weeks": week_list, **timelines[0]}
+
 @router.get("/{entity_id}/papers", response_model=List[PaperWithEvidenceResponse])
 def get_papers_for_entity(
     entity_id: int,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
     db: Session = Depends(get_db)
 ):
-    """Get papers related to an entity"""
-    results = analytics_repo.get_papers_for_an_entity(db, entity_id)
+    """Get papers related to an entity, newest first; X-Total-Count holds the number of papers"""
+    response.headers["X-Total-Count"] = str(analytics_repo.count_papers_for_an_entity(db, entity_id))
+    results = analytics_repo.get_papers_for_an_entity(db, entity_id, skip=skip, limit=limit)
     return [
         {
             "id": r[0],
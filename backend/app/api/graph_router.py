@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, Header, Query, Response
+from sqlalchemy.orm import Session
+from typing import Optional
+import gzip
+
+from backend.app.database import SessionLocal
+from backend.app.repositories.entity_repo import EntityRepository
+from backend.app.services.graph_snapshot import GraphSnapshotService
+
+router = APIRouter(prefix="/graph", tags=["Graph"])
+
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@router.get("/snapshot", response_class=Response)
+def get_graph_snapshot(
+    days: int = Query(30, ge=1, le=365),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Entities and co-occurrence edges as one msgpack document, see
+    services/graph_snapshot.py for the layout. The ETag is the data version;
+    send it back in If-None-Match to get a 304 while it is unchanged.
+    """
+    service = GraphSnapshotService(EntityRepository(db))
+    etag = f'"{service.version(days)}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    version, body = service.get(days)
+    # The version can move between the check and the build
+    headers["ETag"] = f'"{version}"'
+    if "gzip" in (accept_encoding or ""):
+        headers["Content-Encoding"] = "gzip"
+    else:
+        body = gzip.decompress(body)
+    return Response(content=body, media_type=MSGPACK_MEDIA_TYPE, headers=headers)
@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import exists, func
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 
-from backend.app.database import SessionLocal
+from backend.app.database import SessionLocal, is_sqlite
 from backend.app.models.models import Paper
-from backend.app.schemas.schemas import Paper as PaperSchema
+from backend.app.repositories.embedding_repo import EmbeddingRepository
+from backend.app.services.embedding_service import EmbeddingService
+from backend.app.schemas.schemas import Paper as PaperSchema, SimilarPaperResponse
 
 router = APIRouter(prefix="/papers", tags=["Papers"])
 
@@ -27,14 +30,62 @@ def get_papers(
     query = db.query(Paper)
 
     if category:
-        query = query.filter(Paper.categories.contains([category]))
+        if is_sqlite(db):
+            categories = func.json_each(Paper.categories).table_valued("value")
+            query = query.filter(exists().select_from(categories).where(categories.c.value == category))
+        else:
+            query = query.filter(Paper.categories.contains([category]))
     
     return query.order_by(Paper.created_at.desc()).offset(skip).limit(limit).all()
 
+def _require_vector_search(db: Session):
+    """Embeddings live in pgvector columns, so similarity search is not available on SQLite"""
+    if is_sqlite(db):
+        raise HTTPException(status_code=501, detail="Semantic search needs the PostgreSQL backend")
+
+def _similar_response(rows) -> List[SimilarPaperResponse]:
+    return [
+        SimilarPaperResponse(
+            id=paper.id,
+            arxiv_id=paper.arxiv_id,
+            title=paper.title,
+            authors=paper.authors or [],
+            published_at=paper.published_at,
+            url=paper.url,
+            score=round(score, 4),
+        )
+        for paper, score in rows
+    ]
+
+@router.get("/semantic-search", response_model=List[SimilarPaperResponse])
+def semantic_search(
+    q: str = Query(..., min_length=2, description="Free-text query, embedded with the paper embedding model"),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Papers whose title and abstract are closest to the query"""
+    _require_vector_search(db)
+    service = EmbeddingService(EmbeddingRepository(db))
+    return _similar_response(service.search(q, limit=limit))
+
 @router.get("/{paper_id}", response_model=PaperSchema)
 def get_paper(paper_id: int, db: Session = Depends(get_db)):
     """Get single paper by ID"""
     paper = db.query(Paper).filter(Paper.id == paper_id).first()
     if not paper:
         raise HTTPException(status_code=404, detail="Paper not found")
-    return paper
\ No newline at end of file
+    return paper
+
+@router.get("/{paper_id}/similar", response_model=List[SimilarPaperResponse])
+def get_similar_papers(
+    paper_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Nearest papers by embedding of title and abstract"""
+    _require_vector_search(db)
+    service = EmbeddingService(EmbeddingRepository(db))
+    rows = service.similar_papers(paper_id, limit=limit)
+    if rows is None:
+        raise HTTPException(status_code=404, detail="Paper not found or not embedded yet")
+    return _similar_response(rows)
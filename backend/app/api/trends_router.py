@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 
@@ -18,30 +19,140 @@ def get_db():
 def get_weekly_trends(
     week_start: datetime,
     entity_type: str,
+    tag: Optional[str] = None,
+    min_confidence: Optional[float] = Query(None, ge=0.0, le=1.0),
+    weighted: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Get weekly trend analytics"""
-    top = analytics_repo.get_top_entities_by_week(db, week_start, entity_type)
-    growing = analytics_repo.get_fastest_growing_entities(db, entity_type)
+    """
+    Get weekly trend analytics, optionally only of papers tagged `tag` and of
+    entity links with at least min_confidence. With weighted=true, counts
+    and growth are sums of link confidences.
+    """
+    top = analytics_repo.get_top_entities_by_week(db, week_start, entity_type, tag=tag, min_confidence=min_confidence, weighted=weighted)
+    growing = analytics_repo.get_fastest_growing_entities(db, entity_type, tag=tag, min_confidence=min_confidence, weighted=weighted)
+    score = (lambda value: round(value, 3)) if weighted else int
 
     return {
-        "top_entities": [{"name": r[0], "count": r[1]} for r in top],
-        "fastest_growing": [{"name": r[0], "growth": r[1]} for r in growing]
+        "top_entities": [{"name": r[0], "count": score(r[1])} for r in top],
+        "fastest_growing": [{"name": r[0], "growth": score(r[1])} for r in growing]
     }
 
 @router.get("/cooccurrence")
 def get_cooccurrence(
     entity_type: str = "method",
     days: int = 30,
+    tag: Optional[str] = None,
+    min_confidence: Optional[float] = Query(None, ge=0.0, le=1.0),
+    weighted: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Get entity co-occurrence edges"""
-    results = analytics_repo.get_entity_cooccurence_edges(db, entity_type, days)
+    """
+    Get entity co-occurrence edges, optionally only in papers tagged `tag`
+    and between links with at least min_confidence. With weighted=true, a
+    shared paper adds the product of both link confidences.
+    """
+    results = analytics_repo.get_entity_cooccurence_edges(db, entity_type, days, tag=tag, min_confidence=min_confidence, weighted=weighted)
+    score = (lambda value: round(value, 3)) if weighted else int
     return [
         {
             "entity_a": r[0], 
             "entity_b": r[1], 
-            "cooccurrence_count": r[2]
+            "cooccurrence_count": score(r[2])
         } 
         for r in results
-    ]
\ No newline at end of file
+    ]
+
+@router.get("/topics")
+def get_topic_trends(
+    week_start: Optional[datetime] = None,
+    weeks: int = Query(8, ge=2, le=52),
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """Papers per clustered topic and week, busiest topics first"""
+    week_start = week_start or datetime.utcnow()
+    last_monday = week_start.date() - timedelta(days=week_start.weekday())
+    week_list = [last_monday - timedelta(weeks=i) for i in reversed(range(weeks))]
+
+    topics = {}
+    for topic_id, label, terms, size, week, count in analytics_repo.get_topic_weekly_counts(db, week_start, weeks):
+        topic = topics.setdefault(topic_id, {
+            "id": topic_id,
+            "label": label,
+            "terms": terms or [],
+            "size": size,
+            "counts": dict.fromkeys(week_list, 0)
+        })
+        topic["counts"][week] = count
+
+    results = []
+    for topic in topics.values():
+        counts = list(topic["counts"].values())
+        topic["counts"] = counts
+        topic["total"] = sum(counts)
+        topic["growth"] = counts[-1] - counts[-2]
+        results.append(topic)
+    results.sort(key=lambda t: (-t["total"], t["id"]))
+
+    return {
+        "weeks": week_list,
+        "topics": results[:limit]
+    }
+
+@router.get("/tags")
+def get_tag_trends(
+    week_start: Optional[datetime] = None,
+    weeks: int = Query(8, ge=2, le=52),
+    min_confidence: Optional[float] = Query(None, ge=0.0, le=1.0),
+    db: Session = Depends(get_db)
+):
+    """
+    Tagged papers per week, also weighted by tag confidence, and per tag the
+    entity types its papers mention over those weeks; busiest tags first.
+    min_confidence (a multiple of 0.1) only counts tags at least that
+    confident. Read from the rollups kept by `cli.py rollups`.
+    """
+    min_bucket = analytics_repo.confidence_bucket_of(min_confidence)
+    if min_bucket is None:
+        raise HTTPException(status_code=422, detail="min_confidence must be a multiple of 0.1")
+    week_start = week_start or datetime.utcnow()
+    last_monday = week_start.date() - timedelta(days=week_start.weekday())
+    first_monday = last_monday - timedelta(weeks=weeks - 1)
+    week_list = [last_monday - timedelta(weeks=i) for i in reversed(range(weeks))]
+
+    tags = {}
+    def tag_entry(tag):
+        return tags.setdefault(tag, {
+            "tag": tag,
+            "counts": dict.fromkeys(week_list, 0),
+            "weighted": dict.fromkeys(week_list, 0.0),
+            "entity_types": {}
+        })
+
+    for tag, week, count, confidence in analytics_repo.get_tag_weekly_counts(db, first_monday, last_monday, min_bucket):
+        entry = tag_entry(tag)
+        entry["counts"][week] = count
+        entry["weighted"][week] = round(confidence, 3)
+    for tag, entity_type, papers, mentions, confidence in analytics_repo.get_tag_entity_type_counts(db, first_monday, last_monday, min_bucket):
+        tag_entry(tag)["entity_types"][entity_type.value] = {
+            "papers": papers,
+            "mentions": mentions,
+            "weighted": round(confidence, 3)
+        }
+
+    results = []
+    for entry in tags.values():
+        counts = list(entry["counts"].values())
+        entry["counts"] = counts
+        entry["weighted"] = list(entry["weighted"].values())
+        entry["total"] = sum(counts)
+        entry["weighted_total"] = round(sum(entry["weighted"]), 3)
+        entry["growth"] = counts[-1] - counts[-2]
+        results.append(entry)
+    results.sort(key=lambda t: (-t["total"], t["tag"]))
+
+    return {
+        "weeks": week_list,
+        "tags": results
+    }
@@ -3,11 +3,15 @@ from .entity_extraction import LLMService
 from .paper_classification import ClassificationService
 from .canonicalization import CanonicalizationService
 from .digest_generator import DigestService
+from .providers import get_chat_model
+from .stub import StubChatModel
 
 __all__ = [
     "LLMService",
     "ClassificationService", 
     "CanonicalizationService",
-    "DigestService"
+    "DigestService",
+    "get_chat_model",
+    "StubChatModel"
 ]
 
@@ -1,7 +1,9 @@
-from langchain_openai import ChatOpenAI
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
+from backend.app import metrics
+from backend.app.llm.providers import get_chat_model, TokenUsageCallback
 from backend.app.schemas.schemas import CanonicalizationSchema
-from typing import List
+from typing import List, Optional
 
 CANONICALIZATION_PROMPT = """You are an entity deduplication expert. Given a list of entity names, 
 identify which ones refer to the same concept and group them.
@@ -21,18 +23,15 @@ Entity names:
 """
 
 class CanonicalizationService:
-    def __init__(self, api_key: str):
-        self.llm = ChatOpenAI(
-            api_key=api_key,
-            base_url="https://openrouter.ai/api/v1",
-            model="openai/gpt-5.2",
-            temperature=0,
-            max_tokens=2000
-        )
+    def __init__(self, api_key: str, llm: Optional[BaseChatModel] = None):
+        self.llm = llm or get_chat_model(api_key, temperature=0, max_tokens=2000)
         self.structured_llm = self.llm.with_structured_output(CanonicalizationSchema)
+        self.usage_callback = TokenUsageCallback("find_canonical_groups")
         self.prompt = ChatPromptTemplate.from_template(CANONICALIZATION_PROMPT)
 
     async def find_canonical_groups(self, entity_names: List[str]) -> CanonicalizationSchema:
         chain = self.prompt | self.structured_llm
-        result = await chain.ainvoke({"entity_names": entity_names})
+        with metrics.LLM_CALL_SECONDS.time(operation="find_canonical_groups"):
+            result = await chain.ainvoke({"entity_names": entity_names}, config={"callbacks": [self.usage_callback]})
+        metrics.LLM_CALLS.inc(operation="find_canonical_groups", outcome="success")
         return result
\ No newline at end of file
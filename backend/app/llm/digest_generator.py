@@ -1,6 +1,9 @@
 import asyncio
-from langchain_openai import ChatOpenAI
+from typing import AsyncIterator, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
+from backend.app import metrics
+from backend.app.llm.providers import get_chat_model, TokenUsageCallback
 from datetime import date
 
 DIGEST_PROMPT = """You are a research trends analyst. Generate a weekly digest based on the following data.
@@ -29,16 +32,32 @@ Keep it concise and actionable for ML researchers.
 """
 
 class DigestService:
-    def __init__(self, api_key: str):
-        self.llm = ChatOpenAI(
-            api_key=api_key,
-            base_url="https://openrouter.ai/api/v1",
-            model="openai/gpt-5.2",
-            temperature=0.3,
-            max_tokens=500
-        )
+    def __init__(self, api_key: str, llm: Optional[BaseChatModel] = None):
+        self.llm = llm or get_chat_model(api_key, temperature=0.3, max_tokens=500)
+        self.usage_callback = TokenUsageCallback("generate_digest")
         self.prompt = ChatPromptTemplate.from_template(DIGEST_PROMPT)
     
+    def _build_inputs(
+        self,
+        week_start: date,
+        top_entities: list,
+        fastest_growing: list,
+        cooccurrence: list,
+        categories: list
+    ) -> dict:
+        """Format analytics rows into prompt variables"""
+        top_str = "\n".join([f"- {e['name']}: {e['count']} papers" for e in top_entities]) or "No data"
+        growth_str = "\n".join([f"- {e['name']}: +{e['growth']}" for e in fastest_growing]) or "No data"
+        cooc_str = "\n".join([f"- {e['entity_a']} + {e['entity_b']}: {e['count']} papers" for e in cooccurrence]) or "No data"
+        cat_str = "\n".join([f"- {c['category']}: {c['count']}" for c in categories[:10]]) or "No data"
+        return {
+            "week_start": week_start.isoformat(),
+            "top_entities": top_str,
+            "fastest_growing": growth_str,
+            "cooccurrence": cooc_str,
+            "categories": cat_str
+        }
+
     async def generate_digest(
         self,
         week_start: date,
@@ -50,41 +69,78 @@ class DigestService:
     ) -> str:
         """Generate weekly digest markdown"""
         chain = self.prompt | self.llm
-        
-        # Format data for prompt
-        top_str = "\n".join([f"- {e['name']}: {e['count']} papers" for e in top_entities]) or "No data"
-        growth_str = "\n".join([f"- {e['name']}: +{e['growth']}" for e in fastest_growing]) or "No data"
-        cooc_str = "\n".join([f"- {e['entity_a']} + {e['entity_b']}: {e['count']} papers" for e in cooccurrence]) or "No data"
-        cat_str = "\n".join([f"- {c['category']}: {c['count']}" for c in categories[:10]]) or "No data"
+        inputs = self._build_inputs(week_start, top_entities, fastest_growing, cooccurrence, categories)
         
         for attempt in range(max_retries):
             try:
-                result = await chain.ainvoke({
-                    "week_start": week_start.isoformat(),
-                    "top_entities": top_str,
-                    "fastest_growing": growth_str,
-                    "cooccurrence": cooc_str,
-                    "categories": cat_str
-                })
-                # Handle both string and list content formats from LLM
-                content = result.content
-                if isinstance(content, list):
-                    # Extract text from list format: [{'type': 'text', 'text': '...'}]
-                    text_parts = []
-                    for item in content:
-                        if isinstance(item, dict) and 'text' in item:
-                            text_parts.append(item['text'])
-                        elif isinstance(item, str):
-                            text_parts.append(item)
-                    content = ''.join(text_parts)
-                return content
+                with metrics.LLM_CALL_SECONDS.time(operation="generate_digest"):
+                    result = await chain.ainvoke(inputs, config={"callbacks": [self.usage_callback]})
+                metrics.LLM_CALLS.inc(operation="generate_digest", outcome="success")
+                return _content_to_text(result.content)
             except Exception as e:
                 error_str = str(e)
                 if "429" in error_str or "RESOURCE_EXHAUSTED" in error_str:
+                    metrics.LLM_CALLS.inc(operation="generate_digest", outcome="rate_limited")
                     wait_time = (attempt + 1) * 10
                     print(f"⏳ Rate limited, waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
                     await asyncio.sleep(wait_time)
                 else:
+                    metrics.LLM_CALLS.inc(operation="generate_digest", outcome="error")
                     raise e
         
-        raise Exception(f"Failed after {max_retries} retries due to rate limiting")
\ No newline at end of file
+        raise Exception(f"Failed after {max_retries} retries due to rate limiting")
+
+    async def stream_digest(
+        self,
+        week_start: date,
+        top_entities: list,
+        fastest_growing: list,
+        cooccurrence: list,
+        categories: list,
+        max_retries: int = 3
+    ) -> AsyncIterator[str]:
+        """
+        Stream weekly digest markdown as text chunks arrive from the LLM.
+        Rate-limit retries only happen before the first chunk; once text has
+        been yielded a failure is raised to the caller.
+        """
+        chain = self.prompt | self.llm
+        inputs = self._build_inputs(week_start, top_entities, fastest_growing, cooccurrence, categories)
+
+        for attempt in range(max_retries):
+            started = False
+            try:
+                with metrics.LLM_CALL_SECONDS.time(operation="stream_digest"):
+                    async for chunk in chain.astream(inputs, config={"callbacks": [self.usage_callback]}):
+                        text = _content_to_text(chunk.content)
+                        if text:
+                            started = True
+                            yield text
+                metrics.LLM_CALLS.inc(operation="stream_digest", outcome="success")
+                return
+            except Exception as e:
+                error_str = str(e)
+                if not started and ("429" in error_str or "RESOURCE_EXHAUSTED" in error_str):
+                    metrics.LLM_CALLS.inc(operation="stream_digest", outcome="rate_limited")
+                    wait_time = (attempt + 1) * 10
+                    print(f"⏳ Rate limited, waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
+                    await asyncio.sleep(wait_time)
+                else:
+                    metrics.LLM_CALLS.inc(operation="stream_digest", outcome="error")
+                    raise e
+
+        raise Exception(f"Failed after {max_retries} retries due to rate limiting")
+
+
+def _content_to_text(content) -> str:
+    """Handle both string and list content formats from LLM"""
+    if isinstance(content, list):
+        # Extract text from list format: [{'type': 'text', 'text': '...'}]
+        text_parts = []
+        for item in content:
+            if isinstance(item, dict) and 'text' in item:
+                text_parts.append(item['text'])
+            elif isinstance(item, str):
+                text_parts.append(item)
+        return ''.join(text_parts)
+    return content or ""
@@ -0,0 +1,125 @@
+"""
+Embedding model selection for semantic search.
+
+Paper embeddings are computed from title + abstract and stored in
+paper_embeddings (pgvector, EMBEDDING_DIM dimensions). The backend is picked
+with environment variables, like the chat models in providers.py:
+
+    EMBEDDING_PROVIDER=openrouter   # OpenAI-compatible /embeddings at LLM_BASE_URL
+    EMBEDDING_MODEL=openai/text-embedding-3-small
+
+    EMBEDDING_PROVIDER=local        # sentence-transformers on CPU (pip install sentence-transformers)
+    EMBEDDING_MODEL=sentence-transformers/all-MiniLM-L6-v2
+
+    EMBEDDING_PROVIDER=stub         # deterministic feature hashing, no network
+
+EMBEDDING_PROVIDER defaults to LLM_PROVIDER. Every backend must produce
+EMBEDDING_DIM-dimensional vectors; changing the dimension needs a migration.
+"""
+import math
+import os
+import re
+from functools import lru_cache
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from backend.app.llm.providers import LLM_BASE_URL, LLM_PROVIDER
+from backend.app.llm.stub import _stable_hash
+from backend.app.models.models import EMBEDDING_DIM
+
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", LLM_PROVIDER).lower()
+DEFAULT_MODELS = {
+    "openrouter": "openai/text-embedding-3-small",
+    "local": "sentence-transformers/all-MiniLM-L6-v2",
+    "stub": "stub-hashing-v1",
+}
+EMBEDDING_PROVIDERS = tuple(DEFAULT_MODELS)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Signed feature hashing of word unigrams and bigrams, L2-normalised.
+    Texts that share vocabulary end up close, which is enough for tests,
+    benchmarks and offline runs; it knows nothing about synonyms.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    @staticmethod
+    @lru_cache(maxsize=200_000)
+    def _bucket(token: str):
+        h = _stable_hash(token)
+        return h >> 1, 1.0 if h & 1 else -1.0
+
+    def _embed(self, text: str) -> List[float]:
+        words = TOKEN_RE.findall(text.lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        vector = [0.0] * self.dim
+        for feature in features:
+            index, sign = self._bucket(feature)
+            vector[index % self.dim] += sign
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+class LocalEmbeddings(Embeddings):
+    """sentence-transformers model running in-process; imported on first use"""
+
+    def __init__(self, model_name: str, batch_size: int = 64):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "EMBEDDING_PROVIDER=local needs sentence-transformers: pip install sentence-transformers"
+            ) from e
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.batch_size = batch_size
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.model.encode(texts, batch_size=self.batch_size, normalize_embeddings=True)
+        return [vector.tolist() for vector in vectors]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def embedding_model_name() -> str:
+    return os.getenv("EMBEDDING_MODEL", DEFAULT_MODELS.get(EMBEDDING_PROVIDER, ""))
+
+
+@lru_cache(maxsize=None)
+def get_embedding_model(api_key: Optional[str] = None) -> Embeddings:
+    """Return the shared embedding model for the configured provider"""
+    if EMBEDDING_PROVIDER == "stub":
+        return HashingEmbeddings()
+    if EMBEDDING_PROVIDER == "local":
+        return LocalEmbeddings(embedding_model_name())
+    if EMBEDDING_PROVIDER == "openrouter":
+        from langchain_openai import OpenAIEmbeddings
+
+        return OpenAIEmbeddings(
+            api_key=api_key or os.getenv("OPENAI_API_KEY"),
+            base_url=LLM_BASE_URL,
+            model=embedding_model_name(),
+            dimensions=EMBEDDING_DIM,
+            # Token-length checks need tiktoken's OpenAI vocabularies, which other models lack
+            check_embedding_ctx_length=False,
+        )
+    raise ValueError(
+        f"Unknown EMBEDDING_PROVIDER '{EMBEDDING_PROVIDER}'. Expected one of: {', '.join(EMBEDDING_PROVIDERS)}"
+    )
+
+
+def paper_text(title: Optional[str], abstract: Optional[str]) -> str:
+    """The text a paper is embedded from"""
+    return f"{title or ''}\n\n{abstract or ''}".strip()
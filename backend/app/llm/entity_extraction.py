@@ -1,6 +1,9 @@
 import asyncio
-from langchain_openai import ChatOpenAI
+from typing import Optional
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
+from backend.app import metrics
+from backend.app.llm.providers import get_chat_model, llm_slot, TokenUsageCallback
 from backend.app.schemas.schemas import PaperExtractionSchema
 
 SYSTEM_PROMPT = """You are an academic entity extraction assistant specializing in AI/ML research papers.
@@ -39,17 +42,12 @@ Remember: Extract specific technical terms in Title Case, not long phrases."""
 
 
 class LLMService:
-    def __init__(self, api_key: str):
-        self.llm = ChatOpenAI(
-            api_key=api_key,
-            base_url="https://openrouter.ai/api/v1",
-            model="openai/gpt-5.2",
-            temperature=0,
-            max_tokens=700
-        )
+    def __init__(self, api_key: str, llm: Optional[BaseChatModel] = None):
+        self.llm = llm or get_chat_model(api_key, temperature=0, max_tokens=700)
 
         self.structured_llm = self.llm.with_structured_output(PaperExtractionSchema)
 
+        self.usage_callback = TokenUsageCallback("extract_entities")
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", SYSTEM_PROMPT),
             ("user", USER_PROMPT)
@@ -60,15 +58,20 @@ class LLMService:
         
         for attempt in range(max_retries):
             try:
-                result = await chain.ainvoke({"abstract": abstract})
+                async with llm_slot("extract_entities"):
+                    with metrics.LLM_CALL_SECONDS.time(operation="extract_entities"):
+                        result = await chain.ainvoke({"abstract": abstract}, config={"callbacks": [self.usage_callback]})
+                metrics.LLM_CALLS.inc(operation="extract_entities", outcome="success")
                 return result
             except Exception as e:
                 error_str = str(e)
                 if "429" in error_str or "RESOURCE_EXHAUSTED" in error_str:
+                    metrics.LLM_CALLS.inc(operation="extract_entities", outcome="rate_limited")
                     wait_time = (attempt + 1) * 10  # 10s, 20s, 30s
                     print(f"⏳ Rate limited, waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
                     await asyncio.sleep(wait_time)
                 else:
+                    metrics.LLM_CALLS.inc(operation="extract_entities", outcome="error")
                     raise e
         
         raise Exception(f"Failed after {max_retries} retries due to rate limiting")
\ No newline at end of file
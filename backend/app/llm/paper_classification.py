@@ -1,6 +1,9 @@
 import asyncio
-from langchain_openai import ChatOpenAI
+from typing import Optional
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
+from backend.app import metrics
+from backend.app.llm.providers import get_chat_model, llm_slot, TokenUsageCallback
 from backend.app.schemas.schemas import PaperClassificationSchema
 
 TAXONOMY_PROMPT = """You are a research paper classifier. Classify the paper into one or more of these categories:
@@ -21,15 +24,10 @@ Abstract:
 """
 
 class ClassificationService:
-    def __init__(self, api_key: str):
-        self.llm = ChatOpenAI(
-            api_key=api_key,
-            base_url="https://openrouter.ai/api/v1",
-            model="openai/gpt-5.2",
-            temperature=0,
-            max_tokens=300
-        )
+    def __init__(self, api_key: str, llm: Optional[BaseChatModel] = None):
+        self.llm = llm or get_chat_model(api_key, temperature=0, max_tokens=300)
         self.structured_llm = self.llm.with_structured_output(PaperClassificationSchema)
+        self.usage_callback = TokenUsageCallback("classify_paper")
         self.prompt = ChatPromptTemplate.from_template(TAXONOMY_PROMPT)
 
     async def classify_paper(self, abstract: str, max_retries: int = 3) -> PaperClassificationSchema:
@@ -37,15 +35,20 @@ class ClassificationService:
         
         for attempt in range(max_retries):
             try:
-                result = await chain.ainvoke({"abstract": abstract})
+                async with llm_slot("classify_paper"):
+                    with metrics.LLM_CALL_SECONDS.time(operation="classify_paper"):
+                        result = await chain.ainvoke({"abstract": abstract}, config={"callbacks": [self.usage_callback]})
+                metrics.LLM_CALLS.inc(operation="classify_paper", outcome="success")
                 return result
             except Exception as e:
                 error_str = str(e)
                 if "429" in error_str or "RESOURCE_EXHAUSTED" in error_str:
+                    metrics.LLM_CALLS.inc(operation="classify_paper", outcome="rate_limited")
                     wait_time = (attempt + 1) * 10
                     print(f"⏳ Rate limited, waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
                     await asyncio.sleep(wait_time)
                 else:
+                    metrics.LLM_CALLS.inc(operation="classify_paper", outcome="error")
                     raise e
         
         raise Exception(f"Failed after {max_retries} retries due to rate limiting")
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+LLM provider selection.
+
+Every service in this package gets its chat model from `get_chat_model`, so the
+backend can be switched with environment variables:
+
+    LLM_PROVIDER=openrouter   # default: any OpenAI-compatible endpoint
+    LLM_BASE_URL=https://openrouter.ai/api/v1
+    LLM_MODEL=openai/gpt-5.2
+
+    LLM_PROVIDER=stub         # deterministic local backend, no network
+    LLM_STUB_LATENCY_MS=200
+    LLM_STUB_ERROR_RATE=0.01
+    LLM_STUB_RATE_LIMIT_RATE=0.05
+    LLM_STUB_SEED=0
+
+Models are cached per process, so repeated `/ingest` calls reuse one client
+(and its HTTP connection pool) instead of building a new one per request.
+
+Processes that share one provider quota (`cli.py ingest-many`) install a
+common semaphore with `set_llm_budget`; every call then holds one of its
+slots through `llm_slot`, so the number of requests in flight stays within
+the budget across all of them.
+"""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Optional
+
+from dotenv import load_dotenv
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import LLMResult
+from langchain_openai import ChatOpenAI
+
+from backend.app import metrics
+from backend.app.llm.stub import StubChatModel
+
+load_dotenv()
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openrouter").lower()
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://openrouter.ai/api/v1")
+LLM_MODEL = os.getenv("LLM_MODEL", "openai/gpt-5.2")
+
+PROVIDERS = ("openrouter", "stub")
+
+# Shared by all processes of one run; None means no limit beyond each caller's own
+_llm_budget = None
+BUDGET_POLL_SECONDS = (0.005, 0.1)
+
+
+def requires_api_key() -> bool:
+    """Whether the configured provider needs OPENAI_API_KEY"""
+    return LLM_PROVIDER != "stub"
+
+
+def stub_model_from_env() -> StubChatModel:
+    """Build a stub model from the LLM_STUB_* environment variables"""
+    return StubChatModel(
+        latency_ms=float(os.getenv("LLM_STUB_LATENCY_MS", "0")),
+        error_rate=float(os.getenv("LLM_STUB_ERROR_RATE", "0")),
+        rate_limit_rate=float(os.getenv("LLM_STUB_RATE_LIMIT_RATE", "0")),
+        seed=int(os.getenv("LLM_STUB_SEED", "0")),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_chat_model(api_key: Optional[str], temperature: float, max_tokens: int) -> BaseChatModel:
+    """Return the shared chat model for this provider and generation config"""
+    if LLM_PROVIDER == "stub":
+        return stub_model_from_env()
+    if LLM_PROVIDER == "openrouter":
+        return ChatOpenAI(
+            api_key=api_key,
+            base_url=LLM_BASE_URL,
+            model=LLM_MODEL,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream_usage=True
+        )
+    raise ValueError(
+        f"Unknown LLM_PROVIDER '{LLM_PROVIDER}'. Expected one of: {', '.join(PROVIDERS)}"
+    )
+
+
+def set_llm_budget(semaphore):
+    """Install a multiprocessing semaphore that bounds in-flight LLM calls (None removes it)"""
+    global _llm_budget
+    _llm_budget = semaphore
+
+
+@asynccontextmanager
+async def llm_slot(operation: str):
+    """
+    Holds one slot of the shared LLM budget around a call. The semaphore is
+    polled without blocking, so waiting never stalls the event loop.
+    """
+    budget = _llm_budget
+    if budget is None:
+        yield
+        return
+    started = time.perf_counter()
+    delay, max_delay = BUDGET_POLL_SECONDS
+    while not budget.acquire(block=False):
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_delay)
+    metrics.LLM_BUDGET_WAIT_SECONDS.observe(time.perf_counter() - started, operation=operation)
+    try:
+        yield
+    finally:
+        budget.release()
+
+
+class TokenUsageCallback(BaseCallbackHandler):
+    """Counts prompt/completion tokens reported by the provider for one operation"""
+
+    run_inline = True
+
+    def __init__(self, operation: str):
+        self.operation = operation
+
+    def on_llm_end(self, response: LLMResult, **kwargs):
+        prompt_tokens = completion_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    prompt_tokens += usage.get("input_tokens", 0)
+                    completion_tokens += usage.get("output_tokens", 0)
+        if not (prompt_tokens or completion_tokens):
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            prompt_tokens = usage.get("prompt_tokens", 0)
+            completion_tokens = usage.get("completion_tokens", 0)
+
+        metrics.LLM_TOKENS.inc(prompt_tokens, operation=self.operation, kind="prompt")
+        metrics.LLM_TOKENS.inc(completion_tokens, operation=self.operation, kind="completion")
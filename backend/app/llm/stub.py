@@ -0,0 +1,230 @@
+"""
+Deterministic local chat model for load tests, benchmarks and offline runs.
+
+`StubChatModel` answers the same prompts as the real provider without any
+network access. Structured calls return valid `PaperExtractionSchema`,
+`PaperClassificationSchema` or `CanonicalizationSchema` payloads derived from
+the prompt text, any other pydantic schema gets a minimal valid payload of
+empty values, and plain calls (the digest) return markdown that can be
+streamed. The same input always yields the same output for a given seed.
+"""
+import asyncio
+import enum
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import types
+from collections import Counter
+from typing import Any, AsyncIterator, Iterator, List, Literal, Optional, Union, get_args, get_origin
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+from pydantic import BaseModel
+
+from backend.app.schemas.schemas import (
+    PaperExtractionSchema,
+    PaperClassificationSchema,
+    CanonicalizationSchema,
+    TAXONOMY_TAGS,
+)
+
+# Acronyms (BERT, GPT-4), CamelCase (ImageNet, PyTorch) and names with digits (ResNet-50, T5)
+TECH_TERM_RE = re.compile(
+    r"\b(?:[A-Z]{2,}[A-Za-z0-9]*|[A-Z][a-z]+[A-Z][A-Za-z0-9]*|[A-Za-z]+\d+[A-Za-z0-9]*)(?:-[A-Za-z0-9]+)*\b"
+)
+
+EXTRACTION_FIELDS = ["tasks", "datasets", "methods", "libraries"]
+MAX_ENTITIES = 12
+
+# Calls per prompt, so a retried prompt draws new error rolls while runs stay reproducible
+_call_counts: Counter = Counter()
+_call_counts_lock = threading.Lock()
+
+
+def _stable_hash(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _prompt_text(messages: List[BaseMessage]) -> str:
+    """Text of the last message, which carries the abstract for every prompt in this package"""
+    if not messages:
+        return ""
+    content = messages[-1].content
+    if isinstance(content, list):
+        return "".join(item.get("text", "") if isinstance(item, dict) else str(item) for item in content)
+    return content
+
+
+def _evidence(text: str, start: int, end: int) -> str:
+    """A few words around the match, without crossing into other prompt lines"""
+    line_start = text.rfind("\n", 0, start) + 1
+    line_end = text.find("\n", end)
+    line_end = len(text) if line_end == -1 else line_end
+    words = text[max(line_start, start - 40):min(line_end, end + 40)].split()
+    return " ".join(words[1:-1] if len(words) > 3 else words)
+
+
+def _extraction_payload(text: str) -> dict:
+    payload = {field: [] for field in EXTRACTION_FIELDS}
+    seen = set()
+    for match in TECH_TERM_RE.finditer(text):
+        name = match.group(0)
+        if name in seen:
+            continue
+        seen.add(name)
+        h = _stable_hash(name)
+        payload[EXTRACTION_FIELDS[h % len(EXTRACTION_FIELDS)]].append({
+            "name": name,
+            "evidence": _evidence(text, match.start(), match.end()),
+            "confidence": round(0.5 + (h % 50) / 100, 2),
+        })
+        if len(seen) >= MAX_ENTITIES:
+            break
+    return payload
+
+
+def _classification_payload(text: str) -> dict:
+    h = _stable_hash(text)
+    n_tags = 1 + h % 3
+    start = (h >> 8) % len(TAXONOMY_TAGS)
+    return {
+        "tags": [
+            {
+                "tag": TAXONOMY_TAGS[(start + i) % len(TAXONOMY_TAGS)],
+                "confidence": round(0.9 - 0.2 * i, 2),
+            }
+            for i in range(n_tags)
+        ]
+    }
+
+
+def _digest_text(text: str) -> str:
+    # Only the data section, not the instructions after the "---" separator
+    data = text.split("\n---\n", 1)[0]
+    lines = [line.strip() for line in data.splitlines() if line.strip().startswith("- ")]
+    bullets = "\n".join(lines[:5]) or "- No data"
+    return (
+        "# Weekly ArXiv Trends Digest\n\n"
+        "## 🔥 Key Trends\n"
+        f"{bullets}\n\n"
+        "## 📈 Rising Topics\n"
+        "- Generated by the local stub backend.\n"
+    )
+
+
+def _empty_value(annotation) -> Any:
+    """"", 0, False, [], {}, None, the first enum member or literal, or a nested default payload"""
+    origin = get_origin(annotation)
+    if origin in (Union, types.UnionType):
+        args = get_args(annotation)
+        return None if type(None) in args else _empty_value(args[0])
+    if origin is Literal:
+        return get_args(annotation)[0]
+    if origin in (list, set, frozenset, tuple):
+        return []
+    if origin is dict:
+        return {}
+    if isinstance(annotation, type):
+        if issubclass(annotation, BaseModel):
+            return _default_payload(annotation)
+        if issubclass(annotation, enum.Enum):
+            return next(iter(annotation)).value
+        for base, value in ((bool, False), (int, 0), (float, 0.0), (str, "")):
+            if issubclass(annotation, base):
+                return value
+    return None
+
+
+def _default_payload(schema) -> dict:
+    """Payload for a schema without a fixture: required fields get empty values, the others their defaults"""
+    return {name: _empty_value(field.annotation) for name, field in schema.model_fields.items() if field.is_required()}
+
+
+class StubChatModel(BaseChatModel):
+    """Chat model with configurable latency, error rate and 429 injection"""
+
+    latency_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    seed: int = 0
+    payload_schema: Optional[Any] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def with_structured_output(self, schema, **kwargs):
+        structured = self.model_copy(update={"payload_schema": schema})
+        return structured | RunnableLambda(lambda message: schema.model_validate_json(message.content))
+
+    def _roll_failure(self, text: str):
+        key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        with _call_counts_lock:
+            _call_counts[key] += 1
+            call_no = _call_counts[key]
+        rng = random.Random(f"{self.seed}:{key}:{call_no}")
+        roll = rng.random()
+        if roll < self.rate_limit_rate:
+            raise RuntimeError("Error code: 429 - {'error': {'message': 'Rate limit exceeded (stub)'}}")
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise RuntimeError("Stub LLM injected failure")
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        text = _prompt_text(messages)
+        self._roll_failure(text)
+
+        if self.payload_schema is PaperExtractionSchema:
+            content = json.dumps(_extraction_payload(text))
+        elif self.payload_schema is PaperClassificationSchema:
+            content = json.dumps(_classification_payload(text))
+        elif self.payload_schema is CanonicalizationSchema:
+            content = json.dumps({"groups": []})
+        elif self.payload_schema is None:
+            content = _digest_text(text)
+        elif isinstance(self.payload_schema, type) and issubclass(self.payload_schema, BaseModel):
+            content = json.dumps(_default_payload(self.payload_schema))
+        else:
+            raise ValueError(
+                f"Stub backend supports pydantic schemas only, got {self.payload_schema!r} "
+                "(PaperExtractionSchema, PaperClassificationSchema and CanonicalizationSchema get prompt-derived payloads)"
+            )
+
+        input_tokens = sum(len(str(m.content)) for m in messages) // 4
+        output_tokens = len(content) // 4
+        return AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency_ms / 1000)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency_ms / 1000)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    def _chunks(self, messages) -> Iterator[ChatGenerationChunk]:
+        message = self._respond(messages)
+        for token in re.split(r"(?<=\s)", message.content):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        # Usage arrives on a final empty chunk, as with OpenAI's stream_usage
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=message.usage_metadata))
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency_ms / 1000)
+        yield from self._chunks(messages)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency_ms / 1000)
+        for chunk in self._chunks(messages):
+            yield chunk
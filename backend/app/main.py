@@ -4,18 +4,27 @@ ArXiv Trend Radar - FastAPI Application
 import logging
 import os
 
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, BackgroundTasks, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from backend.app.database import SessionLocal, engine
+from backend.app import metrics
+from backend.app.database import IS_SQLITE, SessionLocal, engine
 from backend.app.models import models
 from backend.app.repositories.paper_repo import PaperRepository
 from backend.app.repositories.entity_repo import EntityRepository
+from backend.app.repositories.embedding_repo import EmbeddingRepository
+from backend.app.repositories.rollup_repo import RollupRepository
 from backend.app.services.ingestion_services import IngestionService
+from backend.app.services.rollup_service import RollupService
+from backend.app.services.embedding_service import EmbeddingService
 from backend.app.llm.entity_extraction import LLMService
 from backend.app.llm.paper_classification import ClassificationService
-from backend.app.api import papers_router, trends_router, entities_router, digest_router
+from backend.app.llm.providers import requires_api_key
+from backend.app.llm.embeddings import get_embedding_model
+from backend.app.api import papers_router, trends_router, entities_router, digest_router, graph_router, authors_router
 
 logger = logging.getLogger(__name__)
 
@@ -50,17 +59,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count"],
 )
 
 app.include_router(papers_router.router)
 app.include_router(trends_router.router)
 app.include_router(entities_router.router)
 app.include_router(digest_router.router)
+app.include_router(graph_router.router)
+app.include_router(authors_router.router)
 
 # ============== Ingest Endpoint ==============
 
+def refresh_rollups():
+    """Trend rollup refresh after an ingest; on failure the papers stay stored and the next refresh catches up"""
+    db = SessionLocal()
+    try:
+        RollupService(RollupRepository(db)).refresh()
+    except Exception:
+        db.rollback()
+        logger.exception("Trend rollup refresh failed")
+    finally:
+        db.close()
+
+
 @app.post("/ingest")
 async def ingest_papers(
+    background_tasks: BackgroundTasks,
     query: str,
     days: int = 7,
     limit: int = 50,
@@ -75,7 +100,7 @@ async def ingest_papers(
     """
     try:
         api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
+        if not api_key and requires_api_key():
             raise HTTPException(status_code=500, detail="OPENAI_API_KEY not configured")
         
         # Initialize all services
@@ -88,11 +113,14 @@ async def ingest_papers(
             paper_repo=paper_repo,
             entity_repo=entity_repo,
             llm_service=llm_service,
-            classification_service=classification_service
+            classification_service=classification_service,
+            embedding_service=None if IS_SQLITE else EmbeddingService(EmbeddingRepository(db), model=get_embedding_model(api_key))
         )
         
         count, saved_papers = await service.fetch_and_save(query=query, max_results=limit)
         db.commit()
+        # After the response, so a failed refresh cannot turn a stored ingest into an error
+        background_tasks.add_task(refresh_rollups)
         
         return {
             "message": f"Successfully ingested {count} papers",
@@ -111,6 +139,31 @@ async def ingest_papers(
             detail="Ingestion failed. Check server logs for details."
         )
 
+# ============== Stats ==============
+
+@app.get("/stats")
+def get_stats(db: Session = Depends(get_db)):
+    """Paper and entity counts for the dashboard, without listing the rows"""
+    entity_types = {
+        (entity_type.value if entity_type else "unknown"): count
+        for entity_type, count in db.query(models.Entity.type, func.count(models.Entity.id)).group_by(models.Entity.type)
+    }
+    return {
+        "papers": db.query(func.count(models.Paper.id)).scalar(),
+        "entities": sum(entity_types.values()),
+        "entity_types": entity_types,
+    }
+
+# ============== Metrics ==============
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus-style counters and histograms for ingestion, LLM calls and analytics"""
+    return PlainTextResponse(
+        metrics.REGISTRY.render(),
+        media_type="text/plain; version=0.0.4"
+    )
+
 # ============== Health Check ==============
 
 @app.get("/health")
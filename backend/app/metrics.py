@@ -0,0 +1,241 @@
+"""
+In-process metrics for ingestion, LLM calls and analytics queries.
+
+Counters and histograms are rendered in the Prometheus text exposition format
+by the `/metrics` endpoint, and summarized as a table at the end of
+`cli.py ingest`. Histograms keep a uniform reservoir sample of observations
+next to their buckets so the summary can report exact-ish p50/p95.
+"""
+import functools
+import math
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+RESERVOIR_SIZE = 10000
+
+
+def _label_key(labelnames: Sequence[str], labels: dict) -> Tuple[str, ...]:
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {list(labelnames)}, got {sorted(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _format_labels(labelnames: Sequence[str], key: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in zip(labelnames, key)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def percentile(values: List[float], pct: float):
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class _HistogramSeries:
+    def __init__(self, n_buckets: int):
+        self.bucket_counts = [0] * n_buckets
+        self.count = 0
+        self.sum = 0.0
+        self.reservoir: List[float] = []
+        self.rng = random.Random(0)
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], _HistogramSeries] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series.bucket_counts[i] += 1
+            series.count += 1
+            series.sum += value
+            # Reservoir sampling keeps a uniform sample of all observations
+            if len(series.reservoir) < RESERVOIR_SIZE:
+                series.reservoir.append(value)
+            else:
+                slot = series.rng.randrange(series.count)
+                if slot < RESERVOIR_SIZE:
+                    series.reservoir[slot] = value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def summary(self) -> List[dict]:
+        rows = []
+        with self._lock:
+            items = sorted(self._series.items())
+        for key, series in items:
+            rows.append({
+                "metric": self.name,
+                "labels": dict(zip(self.labelnames, key)),
+                "count": series.count,
+                "total_s": series.sum,
+                "mean_s": series.sum / series.count if series.count else 0.0,
+                "p50_s": percentile(series.reservoir, 50),
+                "p95_s": percentile(series.reservoir, 95),
+            })
+        return rows
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self._series.items()):
+            labels = _format_labels(self.labelnames, key)
+            for bound, count in zip(self.buckets, series.bucket_counts):
+                bucket_labels = _format_labels(self.labelnames, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{bucket_labels} {count}")
+            inf_labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf_labels} {series.count}")
+            lines.append(f"{self.name}_sum{labels} {series.sum}")
+            lines.append(f"{self.name}_count{labels} {series.count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> List[dict]:
+        rows = []
+        for metric in self._metrics:
+            if isinstance(metric, Histogram):
+                rows.extend(metric.summary())
+        return rows
+
+    def reset(self):
+        for metric in self._metrics:
+            metric.reset()
+
+
+REGISTRY = MetricsRegistry()
+
+INGEST_STAGE_SECONDS = REGISTRY.histogram(
+    "ingest_stage_seconds", "Wall-clock time per ingestion stage", ["stage"]
+)
+PAPERS_INGESTED = REGISTRY.counter(
+    "papers_ingested_total", "Papers fetched from arXiv and saved"
+)
+INGEST_ERRORS = REGISTRY.counter(
+    "ingest_errors_total", "Per-paper ingestion failures", ["stage"]
+)
+ENRICHMENT_REUSED = REGISTRY.counter(
+    "ingest_enrichment_reused_total", "Papers that got entities and tags copied from a near-duplicate instead of LLM calls"
+)
+DICTIONARY_EXTRACTIONS = REGISTRY.counter(
+    "ingest_dictionary_extractions_total", "Papers with entity dictionary matches, by whether the LLM extraction call was skipped", ["outcome"]
+)
+LLM_CALL_SECONDS = REGISTRY.histogram(
+    "llm_call_seconds", "Latency of a single LLM call attempt", ["operation"]
+)
+LLM_CALLS = REGISTRY.counter(
+    "llm_calls_total", "LLM call attempts by outcome", ["operation", "outcome"]
+)
+LLM_BUDGET_WAIT_SECONDS = REGISTRY.histogram(
+    "llm_budget_wait_seconds", "Time an LLM call waited for a slot of the shared concurrency budget", ["operation"]
+)
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total", "Tokens reported by the LLM provider", ["operation", "kind"]
+)
+ANALYTICS_QUERY_SECONDS = REGISTRY.histogram(
+    "analytics_query_seconds", "Latency of analytics_repo queries", ["query"]
+)
+
+
+def timed_query(func):
+    """Record the latency of an analytics query under its function name"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with ANALYTICS_QUERY_SECONDS.time(query=func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def format_summary_table(rows: List[dict] = None) -> str:
+    """Render histogram summaries as a fixed-width table, slowest first"""
+    rows = REGISTRY.summary() if rows is None else rows
+    if not rows:
+        return "No timings recorded."
+
+    def ms(value):
+        return f"{value * 1000:.1f}" if value is not None else "-"
+
+    header = f"{'metric':<24} {'label':<30} {'count':>7} {'total s':>9} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}"
+    lines = [header, "-" * len(header)]
+    for row in sorted(rows, key=lambda r: r["total_s"], reverse=True):
+        label = ",".join(str(v) for v in row["labels"].values())
+        lines.append(
+            f"{row['metric']:<24} {label:<30} {row['count']:>7} {row['total_s']:>9.2f} "
+            f"{ms(row['mean_s']):>9} {ms(row['p50_s']):>9} {ms(row['p95_s']):>9}"
+        )
+    return "\n".join(lines)
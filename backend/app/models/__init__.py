@@ -1,5 +1,5 @@
 # Database Models
-from .models import Paper, Entity, PaperEntity, PaperTag, Digest, EntityType
+from .models import Paper, Entity, PaperEntity, PaperTag, Digest, EntityType, PaperIngestState, IngestStatus, PaperEmbedding, PaperFingerprint, PaperLshBucket, Topic, PaperTopic, TopicWeeklyCount, EntityRetagRun, WatchQuery
 
 __all__ = [
     "Paper",
@@ -7,6 +7,16 @@ __all__ = [
     "PaperEntity",
     "PaperTag",
     "Digest",
-    "EntityType"
+    "EntityType",
+    "PaperIngestState",
+    "IngestStatus",
+    "PaperEmbedding",
+    "PaperFingerprint",
+    "PaperLshBucket",
+    "Topic",
+    "PaperTopic",
+    "TopicWeeklyCount",
+    "EntityRetagRun",
+    "WatchQuery"
 ]
 
@@ -1,8 +1,125 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Float, Text, ARRAY, Integer, UniqueConstraint, Index, Enum
+from sqlalchemy import Column, String, Date, DateTime, ForeignKey, Float, Text, JSON, Integer, BigInteger, SmallInteger, UniqueConstraint, Index, Enum, Computed, DDL, event, cast
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement, FunctionElement
+from sqlalchemy.types import UserDefinedType
 from sqlalchemy.orm import relationship
 from backend.app.database import Base
 from datetime import datetime
+from typing import Tuple
 import enum
+import re
+
+EMBEDDING_DIM = 384
+
+# Generated papers.base_id / papers.version; split_arxiv_id is the Python equivalent
+ARXIV_BASE_ID_SQL = r"regexp_replace(regexp_replace(arxiv_id, '^https?://(www\.)?arxiv\.org/abs/', ''), 'v[0-9]+$', '')"
+ARXIV_VERSION_SQL = r"coalesce((substring(arxiv_id from 'v([0-9]+)$'))::integer, 1)"
+PUBLISHED_WEEK_SQL = "(date_trunc('week', published_at))::date"
+
+# SQLite has no regular expressions: the id after "arxiv.org/abs/", and that id with trailing digits trimmed
+_SQLITE_SHORT_ID = "(CASE WHEN instr(arxiv_id, 'arxiv.org/abs/') > 0 THEN substr(arxiv_id, instr(arxiv_id, 'arxiv.org/abs/') + 14) ELSE arxiv_id END)"
+_SQLITE_TRIMMED_ID = f"rtrim({_SQLITE_SHORT_ID}, '0123456789')"
+_SQLITE_HAS_VERSION = f"({_SQLITE_TRIMMED_ID} <> {_SQLITE_SHORT_ID} AND substr({_SQLITE_TRIMMED_ID}, -1) = 'v')"
+SQLITE_ARXIV_BASE_ID_SQL = f"CASE WHEN {_SQLITE_HAS_VERSION} THEN substr({_SQLITE_TRIMMED_ID}, 1, length({_SQLITE_TRIMMED_ID}) - 1) ELSE {_SQLITE_SHORT_ID} END"
+SQLITE_ARXIV_VERSION_SQL = f"CASE WHEN {_SQLITE_HAS_VERSION} THEN CAST(substr({_SQLITE_SHORT_ID}, length({_SQLITE_TRIMMED_ID}) + 1) AS INTEGER) ELSE 1 END"
+SQLITE_PUBLISHED_WEEK_SQL = "date(published_at, '-' || ((CAST(strftime('%w', published_at) AS INTEGER) + 6) % 7) || ' days')"
+
+
+class DialectSQL(ColumnElement):
+    """Raw SQL for a generated column, with a SQLite spelling of the PostgreSQL expression"""
+    inherit_cache = False
+
+    def __init__(self, postgresql: str, sqlite: str):
+        self.postgresql = postgresql
+        self.sqlite = sqlite
+
+
+@compiles(DialectSQL)
+def _compile_dialect_sql(element, compiler, **kw):
+    return element.postgresql
+
+
+@compiles(DialectSQL, "sqlite")
+def _compile_dialect_sql_sqlite(element, compiler, **kw):
+    return element.sqlite
+
+
+# Trend rollups count confidences in tenths: bucket 7 holds 0.7 <= confidence < 0.8, bucket 10 holds 1.0
+CONFIDENCE_BUCKETS = 10
+
+
+class confidence_bucket(FunctionElement):
+    """floor(confidence * CONFIDENCE_BUCKETS) as SQL; a missing confidence counts as 1.0"""
+    type = SmallInteger()
+    inherit_cache = True
+
+
+@compiles(confidence_bucket)
+def _compile_confidence_bucket(element, compiler, **kw):
+    return f"CAST(floor(least(coalesce({compiler.process(element.clauses, **kw)}, 1.0), 1.0) * {CONFIDENCE_BUCKETS}) AS smallint)"
+
+
+@compiles(confidence_bucket, "sqlite")
+def _compile_confidence_bucket_sqlite(element, compiler, **kw):
+    # CAST truncates towards zero on SQLite (it rounds on PostgreSQL)
+    return f"CAST(min(coalesce({compiler.process(element.clauses, **kw)}, 1.0), 1.0) * {CONFIDENCE_BUCKETS} AS INTEGER)"
+
+
+def string_array():
+    """text[] on PostgreSQL (with its array operators), a JSON list on SQLite"""
+    return postgresql.ARRAY(String).with_variant(JSON(), "sqlite")
+
+
+ABS_PREFIX_RE = re.compile(r"^https?://(www\.)?arxiv\.org/abs/")
+VERSION_RE = re.compile(r"v([0-9]+)$")
+
+def split_arxiv_id(arxiv_id: str) -> Tuple[str, int]:
+    """'http://arxiv.org/abs/2401.12345v2' -> ('2401.12345', 2); no suffix means version 1"""
+    short = ABS_PREFIX_RE.sub("", arxiv_id)
+    match = VERSION_RE.search(short)
+    if not match:
+        return short, 1
+    return short[:match.start()], int(match.group(1))
+
+class Vector(UserDefinedType):
+    """pgvector `vector(dim)` column, exchanged with Python as a list of floats"""
+    cache_ok = True
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def get_col_spec(self, **kw):
+        return f"vector({self.dim})"
+
+    def bind_expression(self, bindvalue):
+        return cast(bindvalue, self)
+
+    def bind_processor(self, dialect):
+        def process(value):
+            if value is None:
+                return None
+            return "[" + ",".join(repr(float(v)) for v in value) + "]"
+        return process
+
+    def result_processor(self, dialect, coltype):
+        def process(value):
+            if value is None:
+                return None
+            return [float(v) for v in value[1:-1].split(",")]
+        return process
+
+    class comparator_factory(UserDefinedType.Comparator):
+        def cosine_distance(self, other):
+            return self.op("<=>", return_type=Float)(other)
+
+# Several tables have vector columns (paper_embeddings, topics), so create_all
+# installs pgvector before any of them
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS vector").execute_if(dialect="postgresql"),
+)
 
 class EntityType(str, enum.Enum):
     dataset = "dataset"
@@ -10,38 +127,59 @@ class EntityType(str, enum.Enum):
     task = "task"
     library = "library"
 
+class IngestStatus(str, enum.Enum):
+    fetched = "fetched"
+    done = "done"
+    failed = "failed"
+
 class Paper(Base):
     __tablename__ = "papers"
 
     id = Column(Integer, primary_key=True)
     arxiv_id = Column(String, unique=True, nullable=False, index=True)
+    # arxiv_id without URL prefix and version suffix; one row per paper across versions
+    base_id = Column(String, Computed(DialectSQL(ARXIV_BASE_ID_SQL, SQLITE_ARXIV_BASE_ID_SQL), persisted=True), unique=True, index=True)
+    version = Column(Integer, Computed(DialectSQL(ARXIV_VERSION_SQL, SQLITE_ARXIV_VERSION_SQL), persisted=True))
     title = Column(String, nullable=False)
     abstract = Column(Text)
-    authors = Column(ARRAY(String))
-    published_at = Column(DateTime, index=True)
-    categories = Column(ARRAY(String))
+    authors = Column(string_array())
+    published_at = Column(DateTime)
+    categories = Column(string_array())
     url = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     entities = relationship("PaperEntity", back_populates="paper")
     tags = relationship("PaperTag", back_populates="paper")
 
+    __table_args__ = (
+        Index('ix_papers_published_at_id', 'published_at', 'id'),
+    )
+
 class Entity(Base):
     __tablename__ = "entities"
     
     id = Column(Integer, primary_key=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     type = Column(Enum(EntityType), index=True)
     canonical_id = Column(Integer, ForeignKey("entities.id"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     aliases = relationship("Entity", backref="canonical", remote_side=[id])
 
+    __table_args__ = (
+        UniqueConstraint('type', 'name', name='uq_entity_type_name'),
+    )
+
 class PaperEntity(Base):
+    """Range-partitioned by month of published_at, see repositories/partition_repo.py"""
     __tablename__ = "paper_entities"
     
     paper_id = Column(Integer, ForeignKey("papers.id"), primary_key=True)
     entity_id = Column(Integer, ForeignKey("entities.id"), primary_key=True)
+    # Copy of the paper's published_at; the partition key, so it must be part of the primary key
+    published_at = Column(DateTime, primary_key=True)
+    # Monday of the publication week, for index-only weekly aggregations
+    published_week = Column(Date, Computed(DialectSQL(PUBLISHED_WEEK_SQL, SQLITE_PUBLISHED_WEEK_SQL), persisted=True))
     evidence = Column(Text)
     confidence = Column(Float)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -50,11 +188,23 @@ class PaperEntity(Base):
     entity = relationship("Entity")
 
     __table_args__ = (
-        UniqueConstraint('paper_id', 'entity_id', name='uq_paper_entity'),
-        Index('ix_paper_entities_paper_id', 'paper_id'),
-        Index('ix_paper_entities_entity_id', 'entity_id'),
+        # paper_id lookups use the primary key (paper_id, entity_id, published_at)
+        Index('ix_paper_entities_entity_paper', 'entity_id', 'paper_id', postgresql_include=['published_week']),
+        # confidence keeps trend queries with a confidence threshold or weights index-only
+        Index('ix_paper_entities_week_entity', 'published_week', 'entity_id', postgresql_include=['paper_id', 'published_at', 'confidence']),
+        Index('ix_paper_entities_published_entity', 'published_at', 'entity_id', postgresql_include=['paper_id', 'confidence']),
+        # Weeks with links added since the last rollup refresh
+        Index('ix_paper_entities_created_at', 'created_at', postgresql_include=['published_week']),
+        {"postgresql_partition_by": "RANGE (published_at)"},
     )
 
+# create_all only builds the parent; rows outside the monthly partitions land here
+event.listen(
+    PaperEntity.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS paper_entities_default PARTITION OF paper_entities DEFAULT").execute_if(dialect="postgresql"),
+)
+
 class PaperTag(Base):
     __tablename__ = "paper_tags"
     
@@ -67,8 +217,97 @@ class PaperTag(Base):
 
     __table_args__ = (
         UniqueConstraint('paper_id', 'tag', name='uq_paper_tag'),
+        # Tags added since the last rollup refresh
+        Index('ix_paper_tags_created_at', 'created_at'),
+    )
+
+class Author(Base):
+    """One row per distinct author name, see repositories/author_repo.py"""
+    __tablename__ = "authors"
+
+    id = Column(Integer, primary_key=True)
+    # Spelling of the first paper seen with this author
+    name = Column(String, nullable=False)
+    # normalize_author_name(name): case, accents' composition, dots and spacing folded
+    name_key = Column(String, nullable=False, unique=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class PaperAuthor(Base):
+    """Papers.authors as rows, so per-author queries go through indexes instead of array scans"""
+    __tablename__ = "paper_authors"
+
+    paper_id = Column(Integer, ForeignKey("papers.id"), primary_key=True)
+    author_id = Column(Integer, ForeignKey("authors.id"), primary_key=True)
+    # 0 for the first author
+    position = Column(SmallInteger, nullable=False)
+    # Copy of the paper's published_at, as on paper_entities
+    published_at = Column(DateTime, nullable=False)
+    published_week = Column(Date, Computed(DialectSQL(PUBLISHED_WEEK_SQL, SQLITE_PUBLISHED_WEEK_SQL), persisted=True))
+
+    author = relationship("Author")
+
+    __table_args__ = (
+        # paper_id lookups use the primary key (paper_id, author_id)
+        Index('ix_paper_authors_author_published', 'author_id', 'published_at', postgresql_include=['paper_id']),
+        Index('ix_paper_authors_week_author', 'published_week', 'author_id', postgresql_include=['paper_id']),
+    )
+
+class AuthorWeeklyCount(Base):
+    """Papers per author and calendar week, kept up to date as paper_authors rows are added"""
+    __tablename__ = "author_weekly_counts"
+
+    author_id = Column(Integer, ForeignKey("authors.id"), primary_key=True)
+    week = Column(Date, primary_key=True)
+    paper_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('ix_author_weekly_counts_week_author', 'week', 'author_id', postgresql_include=['paper_count']),
     )
 
+class EntityWeeklyCount(Base):
+    """Papers per entity, calendar week and link confidence bucket, see services/rollup_service.py"""
+    __tablename__ = "entity_weekly_counts"
+
+    week = Column(Date, primary_key=True)
+    entity_id = Column(Integer, ForeignKey("entities.id"), primary_key=True)
+    confidence_bucket = Column(SmallInteger, primary_key=True)
+    paper_count = Column(Integer, nullable=False, default=0)
+    # Sum of the links' confidences; a link without one counts as 1
+    confidence_sum = Column(Float, nullable=False, default=0.0)
+
+class TagWeeklyCount(Base):
+    """Tagged papers per calendar week and tag confidence bucket, see services/rollup_service.py"""
+    __tablename__ = "tag_weekly_counts"
+
+    week = Column(Date, primary_key=True)
+    tag = Column(String, primary_key=True)
+    confidence_bucket = Column(SmallInteger, primary_key=True)
+    paper_count = Column(Integer, nullable=False, default=0)
+    # Sum of the tags' confidences; a tag without one counts as 1
+    confidence_sum = Column(Float, nullable=False, default=0.0)
+
+class TagEntityTypeWeeklyCount(Base):
+    """Per week, tag, tag confidence bucket and entity type: tagged papers mentioning an entity of that type, and their mentions"""
+    __tablename__ = "tag_entity_type_weekly_counts"
+
+    week = Column(Date, primary_key=True)
+    tag = Column(String, primary_key=True)
+    confidence_bucket = Column(SmallInteger, primary_key=True)
+    entity_type = Column(Enum(EntityType), primary_key=True)
+    paper_count = Column(Integer, nullable=False, default=0)
+    mention_count = Column(Integer, nullable=False, default=0)
+    # Sum of the tag confidences of those papers
+    confidence_sum = Column(Float, nullable=False, default=0.0)
+
+class RollupState(Base):
+    """How far each rollup of services/rollup_service.py has been refreshed"""
+    __tablename__ = "rollup_states"
+
+    name = Column(String, primary_key=True)
+    # Rows created before this are counted; the next refresh looks for newer ones
+    watermark = Column(DateTime, nullable=True)
+    refreshed_at = Column(DateTime, nullable=True)
+
 class Digest(Base):
     __tablename__ = "digests"
     
@@ -76,4 +315,124 @@ class Digest(Base):
     week_start = Column(DateTime, nullable=False)
     week_end = Column(DateTime, nullable=False)
     content_md = Column(Text, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class PaperIngestState(Base):
+    """Per-paper LLM enrichment progress, so interrupted ingestion runs can resume"""
+    __tablename__ = "paper_ingest_state"
+
+    paper_id = Column(Integer, ForeignKey("papers.id"), primary_key=True)
+    status = Column(Enum(IngestStatus), nullable=False, default=IngestStatus.fetched, index=True)
+    extracted_at = Column(DateTime, nullable=True)
+    classified_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    paper = relationship("Paper")
+
+class PaperEmbedding(Base):
+    """Title + abstract embedding of a paper, searched through an HNSW index"""
+    __tablename__ = "paper_embeddings"
+
+    paper_id = Column(Integer, ForeignKey("papers.id"), primary_key=True)
+    embedding = Column(Vector(EMBEDDING_DIM), nullable=False)
+    model = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    paper = relationship("Paper")
+
+    __table_args__ = (
+        Index(
+            'ix_paper_embeddings_hnsw', 'embedding',
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'embedding': 'vector_cosine_ops'},
+        ),
+    )
+
+class PaperFingerprint(Base):
+    """MinHash signature of a paper's title + abstract, see services/dedup.py"""
+    __tablename__ = "paper_fingerprints"
+
+    paper_id = Column(Integer, ForeignKey("papers.id"), primary_key=True)
+    signature = Column(postgresql.ARRAY(BigInteger).with_variant(JSON(), "sqlite"), nullable=False)
+    # Earlier paper this one was found to duplicate, and their estimated Jaccard similarity
+    duplicate_of_id = Column(Integer, ForeignKey("papers.id"), nullable=True)
+    similarity = Column(Float, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class PaperLshBucket(Base):
+    """LSH index: one row per (band, bucket) of every fingerprinted paper"""
+    __tablename__ = "paper_lsh_buckets"
+
+    band = Column(SmallInteger, primary_key=True)
+    bucket = Column(BigInteger, primary_key=True)
+    paper_id = Column(Integer, ForeignKey("papers.id"), primary_key=True)
+
+class Topic(Base):
+    """Cluster of paper embeddings, see services/topic_service.py"""
+    __tablename__ = "topics"
+
+    id = Column(Integer, primary_key=True)
+    centroid = Column(Vector(EMBEDDING_DIM), nullable=False)
+    # Embedding model the centroid belongs to; only its embeddings are assigned
+    model = Column(String, nullable=False)
+    # Papers assigned so far, the weight of the centroid in mini-batch updates
+    size = Column(Integer, nullable=False, default=0)
+    label = Column(String, nullable=True)
+    terms = Column(string_array(), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class PaperTopic(Base):
+    __tablename__ = "paper_topics"
+
+    paper_id = Column(Integer, ForeignKey("papers.id"), primary_key=True)
+    topic_id = Column(Integer, ForeignKey("topics.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Cosine distance to the centroid at assignment time
+    distance = Column(Float, nullable=True)
+    assigned_at = Column(DateTime, default=datetime.utcnow)
+
+    paper = relationship("Paper")
+    topic = relationship("Topic")
+
+class TopicWeeklyCount(Base):
+    """Papers per topic and calendar week, kept up to date as papers are assigned"""
+    __tablename__ = "topic_weekly_counts"
+
+    topic_id = Column(Integer, ForeignKey("topics.id", ondelete="CASCADE"), primary_key=True)
+    week = Column(Date, primary_key=True)
+    paper_count = Column(Integer, nullable=False, default=0)
+
+class EntityRetagRun(Base):
+    """One run of the retroactive re-tagging job, see services/retag_service.py"""
+    __tablename__ = "entity_retag_runs"
+
+    id = Column(Integer, primary_key=True)
+    # Entities with ids in (after_entity_id, last_entity_id] were matched against every stored abstract
+    after_entity_id = Column(Integer, nullable=False)
+    last_entity_id = Column(Integer, nullable=False)
+    entities = Column(Integer, nullable=False, default=0)
+    papers_scanned = Column(Integer, nullable=False, default=0)
+    links_added = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class WatchQuery(Base):
+    """Saved arXiv query polled by `cli.py watch`, see services/watch_service.py"""
+    __tablename__ = "watch_queries"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+    query = Column(String, nullable=False)
+    # Most papers fetched per run; a longer backlog is worked off over the next runs
+    max_results = Column(Integer, nullable=False, default=200)
+    interval_minutes = Column(Integer, nullable=False, default=60)
+    # Latest first-version date seen; the next run only asks arXiv for papers submitted since
+    watermark = Column(DateTime, nullable=True)
+    last_run_at = Column(DateTime, nullable=True)
+    last_fetched = Column(Integer, nullable=False, default=0)
+    last_new = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,144 @@
+"""
+Opt-in SQL profiling through SQLAlchemy engine events.
+
+`QueryProfiler` records the latency of every statement, groups statements by
+their normalized text (literals and bind parameters replaced with `?`) and
+logs anything slower than a threshold together with its Postgres plan.
+SELECTs are explained with `EXPLAIN (ANALYZE, BUFFERS)`; writes only get a
+plain `EXPLAIN` so profiling never executes them twice.
+
+Enable it for the app with SQL_PROFILE=1 (threshold from SQL_SLOW_MS), or
+attach it explicitly as `cli.py profile-queries` does.
+"""
+import logging
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_PARAM_RE = re.compile(r"%\([^)]+\)s|%s|\?|(?<!:):\w+")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_VALUES_GROUP_RE = re.compile(r"(\(\?(?:, \?)*\))(?:, \1)+")
+_IN_LIST_RE = re.compile(r"\bIN \((?:\?, )+\?\)", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """Collapse a statement to its shape so identical queries group together"""
+    normalized = _WHITESPACE_RE.sub(" ", statement).strip()
+    normalized = _STRING_RE.sub("?", normalized)
+    normalized = _PARAM_RE.sub("?", normalized)
+    normalized = _NUMBER_RE.sub("?", normalized)
+    normalized = _IN_LIST_RE.sub("IN (?, ...)", normalized)
+    normalized = _VALUES_GROUP_RE.sub(r"\1, ...", normalized)
+    return normalized
+
+
+@dataclass
+class StatementStats:
+    statement: str
+    calls: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+    rows: int = 0
+
+    @property
+    def mean_s(self) -> float:
+        return self.total_s / self.calls if self.calls else 0.0
+
+
+@dataclass
+class SlowQuery:
+    statement: str
+    elapsed_ms: float
+    plan: Optional[str]
+
+
+class QueryProfiler:
+    def __init__(self, slow_ms: float = 100.0, explain: bool = True, max_slow_queries: int = 50):
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self.stats: Dict[str, StatementStats] = {}
+        self.slow_queries: Deque[SlowQuery] = deque(maxlen=max_slow_queries)
+        self._lock = threading.Lock()
+
+    def attach(self, engine: Engine) -> "QueryProfiler":
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        return self
+
+    def detach(self, engine: Engine):
+        event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+            self.slow_queries.clear()
+
+    def report(self) -> List[StatementStats]:
+        """Statement groups, most total time first"""
+        with self._lock:
+            return sorted(self.stats.values(), key=lambda s: s.total_s, reverse=True)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_profiler_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_profiler_start"].pop()
+
+        normalized = normalize_statement(statement)
+        with self._lock:
+            stats = self.stats.get(normalized)
+            if stats is None:
+                stats = self.stats[normalized] = StatementStats(statement=normalized)
+            stats.calls += 1
+            stats.total_s += elapsed
+            stats.max_s = max(stats.max_s, elapsed)
+            stats.rows += max(cursor.rowcount or 0, 0)
+
+        elapsed_ms = elapsed * 1000
+        if elapsed_ms < self.slow_ms:
+            return
+
+        plan = None
+        if self.explain and not executemany and conn.dialect.name == "postgresql":
+            plan = self._explain(cursor, statement, parameters)
+        self.slow_queries.append(SlowQuery(statement=statement, elapsed_ms=elapsed_ms, plan=plan))
+        logger.warning(
+            "Slow query (%.1f ms): %s%s",
+            elapsed_ms,
+            normalized,
+            f"\n{plan}" if plan else "",
+        )
+
+    def _explain(self, cursor, statement: str, parameters) -> Optional[str]:
+        first_word = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+        if first_word == "EXPLAIN":
+            return None
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) " if first_word == "SELECT" else "EXPLAIN "
+
+        # Runs on a raw DBAPI cursor, so it does not re-enter these event hooks, and
+        # inside a savepoint so a failing EXPLAIN cannot abort the caller's transaction
+        explain_cursor = cursor.connection.cursor()
+        try:
+            explain_cursor.execute("SAVEPOINT query_profiler_explain")
+            try:
+                explain_cursor.execute(prefix + statement, parameters)
+                plan = "\n".join(row[0] for row in explain_cursor.fetchall())
+                explain_cursor.execute("RELEASE SAVEPOINT query_profiler_explain")
+                return plan
+            except Exception as e:
+                explain_cursor.execute("ROLLBACK TO SAVEPOINT query_profiler_explain")
+                logger.debug("EXPLAIN failed: %s", e)
+                return None
+        finally:
+            explain_cursor.close()
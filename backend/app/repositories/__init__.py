@@ -1,7 +1,7 @@
 # Repository Layer
-from .paper_repo import PaperRepository
-from .entity_repo import EntityRepository
-from . import analytics_repo
+# Re-exports load on first use, so parquet_analytics_repo (DuckDB over a Parquet
+# export) imports without the database settings
+import importlib
 
 __all__ = [
     "PaperRepository",
@@ -9,3 +9,15 @@ __all__ = [
     "analytics_repo"
 ]
 
+_MODULES = {
+    "PaperRepository": ".paper_repo",
+    "EntityRepository": ".entity_repo",
+    "analytics_repo": ".analytics_repo",
+}
+
+
+def __getattr__(name):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(_MODULES[name], __name__)
+    return module if name == "analytics_repo" else getattr(module, name)
@@ -1,51 +1,134 @@
 from sqlalchemy.orm import Session, aliased
-from sqlalchemy import func, desc
-from datetime import datetime, timedelta, timezone
+from sqlalchemy import JSON, DateTime, Integer, case, cast, exists, func, desc, true
+from datetime import datetime, timedelta
+from typing import List, Optional
+from backend.app.database import is_sqlite
 from backend.app.models import models
+from backend.app.metrics import timed_query
 
-def get_top_entities_by_week(db: Session, week_start: datetime, entity_type: str, limit: int = 10):
-    week_end = week_start + timedelta(days=8)
+def _tagged(paper_id, tag: str):
+    """Papers carrying `tag`, as a probe of the paper_tags primary key per paper"""
+    return exists().where(models.PaperTag.paper_id == paper_id, models.PaperTag.tag == tag)
 
-    return db.query(
+def _confidence(column):
+    """A link's or tag's confidence; one without a confidence counts as certain"""
+    return func.coalesce(column, 1.0)
+
+def _confident(column, min_confidence: Optional[float]) -> list:
+    """Filter clauses keeping rows whose confidence is at least min_confidence"""
+    return [] if min_confidence is None else [_confidence(column) >= min_confidence]
+
+def confidence_bucket_of(min_confidence: Optional[float]) -> Optional[int]:
+    """The first rollup bucket counted for a threshold, None if the threshold falls inside a bucket"""
+    if min_confidence is None:
+        return 0
+    scaled = min_confidence * models.CONFIDENCE_BUCKETS
+    bucket = round(scaled)
+    return bucket if abs(scaled - bucket) < 1e-9 else None
+
+@timed_query
+def get_top_entities_by_week(
+    db: Session,
+    week_start: datetime,
+    entity_type: str,
+    limit: int = 10,
+    tag: Optional[str] = None,
+    min_confidence: Optional[float] = None,
+    weighted: bool = False
+):
+    """
+    Top entities of the calendar week (Monday to Sunday) containing
+    week_start, optionally only links with at least min_confidence and in
+    papers tagged `tag`. With weighted=True an entity scores the sum of its
+    link confidences instead of its number of papers.
+    """
+    monday = week_start.date() - timedelta(days=week_start.weekday())
+    week_begin = datetime.combine(monday, datetime.min.time())
+
+    bucket = confidence_bucket_of(min_confidence)
+    if tag is None and bucket is not None and (weighted or min_confidence is not None):
+        # Thresholds on a bucket boundary are summed from entity_weekly_counts
+        counts = models.EntityWeeklyCount
+        return db.query(
+            models.Entity.name,
+            func.sum(counts.confidence_sum if weighted else counts.paper_count).label("count")
+        ).join(
+            counts, models.Entity.id == counts.entity_id
+        ).filter(
+            counts.week == monday,
+            counts.confidence_bucket >= bucket,
+            models.Entity.type == entity_type
+        ).group_by(
+            models.Entity.name
+        ).order_by(
+            desc("count"),
+            models.Entity.name
+        ).limit(limit).all()
+
+    # published_week makes this an index-only scan on ix_paper_entities_week_entity,
+    # and the published_at range prunes the monthly partitions
+    score = func.sum(_confidence(models.PaperEntity.confidence)) if weighted else func.count(models.PaperEntity.paper_id)
+    query = db.query(
         models.Entity.name,
-        func.count(models.PaperEntity.paper_id).label("count")
+        score.label("count")
     ).join(
         models.PaperEntity, models.Entity.id == models.PaperEntity.entity_id
-    ).join(
-        models.Paper, models.PaperEntity.paper_id == models.Paper.id
     ).filter(
-        models.Paper.published_at >= week_start,
-        models.Paper.published_at < week_end,
-        models.Entity.type == entity_type
-    ).group_by(
+        models.PaperEntity.published_week == monday,
+        models.PaperEntity.published_at >= week_begin,
+        models.PaperEntity.published_at < week_begin + timedelta(days=7),
+        models.Entity.type == entity_type,
+        *_confident(models.PaperEntity.confidence, min_confidence)
+    )
+    if tag is not None:
+        query = query.filter(_tagged(models.PaperEntity.paper_id, tag))
+    return query.group_by(
         models.Entity.name
     ).order_by(
-        desc("count")
+        desc("count"),
+        models.Entity.name
     ).limit(limit).all()
 
-def get_fastest_growing_entities(db: Session, entity_type: str):
-    this_week_start = datetime.utcnow() - timedelta(days=7)
-    last_week_start = datetime.utcnow() - timedelta(days=14)
+@timed_query
+def get_fastest_growing_entities(
+    db: Session,
+    entity_type: str,
+    tag: Optional[str] = None,
+    min_confidence: Optional[float] = None,
+    weighted: bool = False
+):
+    """
+    Entities gaining the most papers in the last 7 days over the 7 before,
+    with the same filters and weighting as get_top_entities_by_week
+    """
+    now = datetime.utcnow()
+    this_week_start = now - timedelta(days=7)
+    last_week_start = now - timedelta(days=14)
 
+    # Bounded on both sides: for an open range SQLite's planner walks the whole
+    # (entity_id, paper_id) index to avoid sorting, instead of the published_at range
+    filters = _confident(models.PaperEntity.confidence, min_confidence)
+    if tag is not None:
+        filters.append(_tagged(models.PaperEntity.paper_id, tag))
+    score = func.sum(_confidence(models.PaperEntity.confidence)) if weighted else func.count(models.PaperEntity.paper_id)
     current_counts = db.query(
         models.PaperEntity.entity_id,
-        func.count(models.PaperEntity.paper_id).label("curr_count")
-    ).join(
-        models.Paper
+        score.label("curr_count")
     ).filter(
-        models.Paper.published_at >= this_week_start
+        models.PaperEntity.published_at >= this_week_start,
+        models.PaperEntity.published_at <= now,
+        *filters
     ).group_by(
         models.PaperEntity.entity_id
     ).subquery()
 
     prev_counts = db.query(
         models.PaperEntity.entity_id,
-        func.count(models.PaperEntity.paper_id).label("prev_count")
-    ).join(
-        models.Paper
+        score.label("prev_count")
     ).filter(
-        models.Paper.published_at >= last_week_start,
-        models.Paper.published_at < this_week_start
+        models.PaperEntity.published_at >= last_week_start,
+        models.PaperEntity.published_at < this_week_start,
+        *filters
     ).group_by(
         models.PaperEntity.entity_id
     ).subquery()
@@ -65,31 +148,53 @@ def get_fastest_growing_entities(db: Session, entity_type: str):
         10
     ).all()
 
-def get_entity_cooccurence_edges(db: Session, entity_type: str, days: int = 30):
-    start_date = datetime.now(timezone.utc) - timedelta(days=days)
+@timed_query
+def get_entity_cooccurence_edges(
+    db: Session,
+    entity_type: str,
+    days: int = 30,
+    tag: Optional[str] = None,
+    min_confidence: Optional[float] = None,
+    weighted: bool = False
+):
+    """
+    Pairs of entities sharing papers published in the last `days` days,
+    optionally only links with at least min_confidence and papers tagged
+    `tag`. With weighted=True a shared paper adds the product of both link
+    confidences instead of 1.
+    """
+    start_date = datetime.utcnow() - timedelta(days=days)
 
     pe1 = aliased(models.PaperEntity, name='pe1')
     pe2 = aliased(models.PaperEntity, name='pe2')
     ent1 = aliased(models.Entity, name='ent1')
     ent2 = aliased(models.Entity, name='ent2')
-    
+    filters = _confident(pe1.confidence, min_confidence) + _confident(pe2.confidence, min_confidence)
+    # Both sides are links of the same paper, so filtering one side is enough
+    if tag is not None:
+        filters.append(_tagged(pe1.paper_id, tag))
+    if weighted:
+        score = func.sum(_confidence(pe1.confidence) * _confidence(pe2.confidence))
+    else:
+        score = func.count(pe1.paper_id)
+
     return db.query(
         ent1.name.label("entity_a"),
         ent2.name.label("entity_b"),
-        func.count(pe1.paper_id).label("cooccurrence_count")
+        score.label("cooccurrence_count")
     ).select_from(pe1).join(
         ent1, ent1.id == pe1.entity_id
     ).join(
-        pe2, pe1.paper_id == pe2.paper_id
+        pe2, (pe1.paper_id == pe2.paper_id) & (pe1.published_at == pe2.published_at)
     ).join(
         ent2, pe2.entity_id == ent2.id
-    ).join(
-        models.Paper, pe1.paper_id == models.Paper.id
     ).filter(
-        models.Paper.published_at >= start_date,
+        pe1.published_at >= start_date,
+        pe2.published_at >= start_date,
         ent1.type == entity_type,
         ent2.type == entity_type,
-        ent1.id < ent2.id
+        ent1.id < ent2.id,
+        *filters
     ).group_by(
         ent1.name,
         ent2.name
@@ -97,31 +202,259 @@ def get_entity_cooccurence_edges(db: Session, entity_type: str, days: int = 30):
         desc("cooccurrence_count")
     ).all()
 
-def get_papers_for_an_entity(db: Session, entity_id: int):
+@timed_query
+def get_cooccurrence_id_edges(db: Session, since: datetime):
+    """(entity_id_a, entity_id_b, count) of same-type entities sharing papers published since `since`, a < b"""
+    pe1 = aliased(models.PaperEntity, name='pe1')
+    pe2 = aliased(models.PaperEntity, name='pe2')
+    ent1 = aliased(models.Entity, name='ent1')
+    ent2 = aliased(models.Entity, name='ent2')
+
+    return db.query(
+        pe1.entity_id,
+        pe2.entity_id,
+        func.count(pe1.paper_id).label("cooccurrence_count")
+    ).join(
+        pe2, (pe1.paper_id == pe2.paper_id) & (pe1.published_at == pe2.published_at)
+    ).join(
+        ent1, ent1.id == pe1.entity_id
+    ).join(
+        ent2, ent2.id == pe2.entity_id
+    ).filter(
+        pe1.published_at >= since,
+        pe2.published_at >= since,
+        pe1.entity_id < pe2.entity_id,
+        ent1.type == ent2.type
+    ).group_by(
+        pe1.entity_id,
+        pe2.entity_id
+    ).order_by(
+        desc("cooccurrence_count")
+    ).all()
+
+def paper_entities_version(db: Session, since: datetime) -> tuple:
+    """Changes whenever a paper_entities row published since `since` is added or removed; an index-only scan"""
+    return tuple(db.query(
+        func.count(models.PaperEntity.entity_id),
+        func.coalesce(func.sum(models.PaperEntity.entity_id), 0),
+    ).filter(
+        models.PaperEntity.published_at >= since
+    ).one())
+
+@timed_query
+def get_entity_weekly_counts(db: Session, groups: dict, first_week, last_week):
+    """
+    (root id, week, papers) for each group {root id: [member entity ids]} of
+    EntityRepository.canonical_groups, in the weeks first_week..last_week
+    (Mondays). A paper linked to several members of a group counts once.
+    """
+    pe = models.PaperEntity
+    in_weeks = (pe.published_week >= first_week, pe.published_week <= last_week)
+    rows = []
+
+    # Without aliases the primary key makes every link a distinct paper, so an
+    # index-only scan of (entity_id, paper_id) INCLUDE (published_week) is enough
+    singles = [root for root, members in groups.items() if len(members) == 1]
+    if singles:
+        rows += db.query(
+            pe.entity_id, pe.published_week, func.count(pe.paper_id)
+        ).filter(
+            pe.entity_id.in_(singles), *in_weeks
+        ).group_by(
+            pe.entity_id, pe.published_week
+        ).all()
+
+    root_of = {member: root for root, members in groups.items() if len(members) > 1 for member in members}
+    if root_of:
+        root = case(root_of, value=pe.entity_id).label("root")
+        distinct_papers = db.query(
+            root, pe.published_week.label("week"), pe.paper_id
+        ).filter(
+            pe.entity_id.in_(list(root_of)), *in_weeks
+        ).group_by(
+            root, pe.published_week, pe.paper_id
+        ).subquery()
+        rows += db.query(
+            distinct_papers.c.root, distinct_papers.c.week, func.count()
+        ).group_by(
+            distinct_papers.c.root, distinct_papers.c.week
+        ).all()
+    return rows
+
+def _author_weekly_papers(db: Session, first_week, last_week, entity_ids: Optional[List[int]] = None):
+    """
+    Subquery (author_id, week, papers) over the weeks first_week..last_week
+    (Mondays). Without entity_ids it reads the author_weekly_counts rollup;
+    with them, the papers linked to any of the entities, each paper once.
+    """
+    if not entity_ids:
+        awc = models.AuthorWeeklyCount
+        return db.query(
+            awc.author_id, awc.week, awc.paper_count.label("papers")
+        ).filter(
+            awc.week >= first_week,
+            awc.week <= last_week
+        ).subquery()
+
+    pe = models.PaperEntity
+    pa = models.PaperAuthor
+    # The week range is an index range on ix_paper_entities_week_entity, the
+    # published_at range prunes the monthly partitions
+    linked = db.query(
+        pe.paper_id, pe.published_week
+    ).filter(
+        pe.entity_id.in_(entity_ids),
+        pe.published_week >= first_week,
+        pe.published_week <= last_week,
+        pe.published_at >= datetime.combine(first_week, datetime.min.time()),
+        pe.published_at < datetime.combine(last_week + timedelta(days=7), datetime.min.time())
+    ).distinct().subquery()
+    # paper_authors is probed by its primary key (paper_id, author_id)
+    return db.query(
+        pa.author_id, linked.c.published_week.label("week"), func.count().label("papers")
+    ).join(
+        linked, pa.paper_id == linked.c.paper_id
+    ).group_by(
+        pa.author_id, linked.c.published_week
+    ).subquery()
+
+@timed_query
+def get_top_authors(db: Session, first_week, last_week, entity_ids: Optional[List[int]] = None, limit: int = 20):
+    """(author_id, name, papers) of the authors with the most papers in the weeks first_week..last_week"""
+    weekly = _author_weekly_papers(db, first_week, last_week, entity_ids)
+    papers = cast(func.sum(weekly.c.papers), Integer).label("papers")
+    top = db.query(
+        weekly.c.author_id, papers
+    ).group_by(
+        weekly.c.author_id
+    ).order_by(
+        desc(papers), weekly.c.author_id
+    ).limit(limit).subquery()
+
+    return db.query(
+        models.Author.id,
+        models.Author.name,
+        top.c.papers
+    ).join(
+        top, models.Author.id == top.c.author_id
+    ).order_by(
+        desc(top.c.papers), models.Author.id
+    ).all()
+
+@timed_query
+def get_rising_authors(db: Session, first_week, split_week, last_week, entity_ids: Optional[List[int]] = None, limit: int = 20):
+    """
+    (author_id, name, current, previous) of the authors whose papers in the
+    weeks split_week..last_week outnumber those in first_week..split_week
+    (exclusive) by the most
+    """
+    weekly = _author_weekly_papers(db, first_week, last_week, entity_ids)
+    current = cast(func.sum(case((weekly.c.week >= split_week, weekly.c.papers), else_=0)), Integer)
+    previous = cast(func.sum(case((weekly.c.week < split_week, weekly.c.papers), else_=0)), Integer)
+    rising = db.query(
+        weekly.c.author_id,
+        current.label("current"),
+        previous.label("previous")
+    ).group_by(
+        weekly.c.author_id
+    ).having(
+        current > previous
+    ).order_by(
+        desc(current - previous), desc(current), weekly.c.author_id
+    ).limit(limit).subquery()
+
+    return db.query(
+        models.Author.id,
+        models.Author.name,
+        rising.c.current,
+        rising.c.previous
+    ).join(
+        rising, models.Author.id == rising.c.author_id
+    ).order_by(
+        desc(rising.c.current - rising.c.previous), desc(rising.c.current), models.Author.id
+    ).all()
+
+@timed_query
+def count_papers_for_an_entity(db: Session, entity_id: int) -> int:
+    return db.query(func.count(models.PaperEntity.paper_id)).filter(models.PaperEntity.entity_id == entity_id).scalar()
+
+@timed_query
+def get_papers_for_an_entity(db: Session, entity_id: int, skip: int = 0, limit: Optional[int] = None):
+    """Newest first; with a limit only that page of links is joined to papers"""
+    links = db.query(
+        models.PaperEntity.paper_id,
+        models.PaperEntity.published_at,
+        models.PaperEntity.evidence,
+        models.PaperEntity.confidence
+    ).filter(
+        models.PaperEntity.entity_id == entity_id
+    ).order_by(
+        desc(models.PaperEntity.published_at),
+        desc(models.PaperEntity.paper_id)
+    ).offset(skip).limit(limit).subquery()
+
     return db.query(
         models.Paper.id,
         models.Paper.title,
         models.Paper.authors,
         models.Paper.published_at,
-        models.PaperEntity.evidence,
-        models.PaperEntity.confidence
+        links.c.evidence,
+        links.c.confidence
     ).join(
-        models.PaperEntity, models.Paper.id == models.PaperEntity.paper_id
+        links, models.Paper.id == links.c.paper_id
+    ).order_by(
+        desc(links.c.published_at),
+        desc(links.c.paper_id)
+    ).all()
+
+@timed_query
+def count_papers_for_an_author(db: Session, author_id: int) -> int:
+    return db.query(func.count(models.PaperAuthor.paper_id)).filter(models.PaperAuthor.author_id == author_id).scalar()
+
+@timed_query
+def get_papers_for_an_author(db: Session, author_id: int, skip: int = 0, limit: Optional[int] = None):
+    """Newest first, a backward scan of ix_paper_authors_author_published; only the page is joined to papers"""
+    links = db.query(
+        models.PaperAuthor.paper_id,
+        models.PaperAuthor.published_at
     ).filter(
-        models.PaperEntity.entity_id == entity_id
+        models.PaperAuthor.author_id == author_id
     ).order_by(
-        desc(models.Paper.published_at)
+        desc(models.PaperAuthor.published_at),
+        desc(models.PaperAuthor.paper_id)
+    ).offset(skip).limit(limit).subquery()
+
+    return db.query(
+        models.Paper
+    ).join(
+        links, models.Paper.id == links.c.paper_id
+    ).order_by(
+        desc(links.c.published_at),
+        desc(links.c.paper_id)
     ).all()
 
+@timed_query
 def category_distribution_over_time(db: Session):
-    category_label = func.unnest(models.Paper.categories).column_valued("category")
-    week_trunc = func.date_trunc("week", models.Paper.published_at)
+    if is_sqlite(db):
+        # categories is a JSON list, and weeks start on Monday as with date_trunc
+        categories = func.json_each(models.Paper.categories).table_valued("value")
+        category_label = categories.c.value
+        days_since_monday = (cast(func.strftime("%w", models.Paper.published_at), Integer) + 6) % 7
+        week_trunc = func.datetime(models.Paper.published_at, "start of day", func.printf("-%d days", days_since_monday), type_=DateTime)
+    else:
+        categories = None
+        category_label = func.unnest(models.Paper.categories).column_valued("category")
+        week_trunc = func.date_trunc("week", models.Paper.published_at)
 
-    return db.query(
+    query = db.query(
         week_trunc.label("week"),
         category_label.label("category"),
         func.count(models.Paper.id).label("count")
-    ).group_by(
+    )
+    if categories is not None:
+        query = query.select_from(models.Paper).join(categories, true())
+
+    return query.group_by(
         "week",
         "category"
     ).order_by(
@@ -129,17 +462,90 @@ def category_distribution_over_time(db: Session):
         desc("count")
     ).all()
 
+@timed_query
 def get_canonical_merges_report(db: Session):
     alias_ent = aliased(models.Entity, name='alias_ent')
     canon_ent = aliased(models.Entity, name='canon_ent')
 
+    aliases = func.json_group_array(alias_ent.name, type_=JSON) if is_sqlite(db) else func.array_agg(alias_ent.name)
+
     return db.query(
         canon_ent.name.label("canonical_name"),
-        func.array_agg(alias_ent.name).label("aliases")
+        aliases.label("aliases")
     ).select_from(
         alias_ent
     ).join(
         canon_ent, alias_ent.canonical_id == canon_ent.id
     ).group_by(
         canon_ent.name
-    ).all()
\ No newline at end of file
+    ).all()
+
+
+@timed_query
+def get_topic_weekly_counts(db: Session, week_start: datetime, weeks: int = 8):
+    """(topic_id, label, terms, size, week, count) for the `weeks` calendar weeks ending with the one containing week_start"""
+    last_monday = week_start.date() - timedelta(days=week_start.weekday())
+    first_monday = last_monday - timedelta(weeks=weeks - 1)
+
+    return db.query(
+        models.Topic.id,
+        models.Topic.label,
+        models.Topic.terms,
+        models.Topic.size,
+        models.TopicWeeklyCount.week,
+        models.TopicWeeklyCount.paper_count
+    ).join(
+        models.TopicWeeklyCount, models.Topic.id == models.TopicWeeklyCount.topic_id
+    ).filter(
+        models.TopicWeeklyCount.week >= first_monday,
+        models.TopicWeeklyCount.week <= last_monday
+    ).order_by(
+        models.Topic.id,
+        models.TopicWeeklyCount.week
+    ).all()
+
+@timed_query
+def get_tag_weekly_counts(db: Session, first_week, last_week, min_bucket: int = 0):
+    """
+    (tag, week, paper_count, confidence_sum) from tag_weekly_counts for the
+    weeks first_week..last_week (Mondays), counting tags in confidence
+    buckets from min_bucket up
+    """
+    return db.query(
+        models.TagWeeklyCount.tag,
+        models.TagWeeklyCount.week,
+        func.sum(models.TagWeeklyCount.paper_count),
+        func.sum(models.TagWeeklyCount.confidence_sum)
+    ).filter(
+        models.TagWeeklyCount.week >= first_week,
+        models.TagWeeklyCount.week <= last_week,
+        models.TagWeeklyCount.confidence_bucket >= min_bucket
+    ).group_by(
+        models.TagWeeklyCount.tag,
+        models.TagWeeklyCount.week
+    ).order_by(
+        models.TagWeeklyCount.tag,
+        models.TagWeeklyCount.week
+    ).all()
+
+@timed_query
+def get_tag_entity_type_counts(db: Session, first_week, last_week, min_bucket: int = 0):
+    """(tag, entity_type, papers, mentions, confidence_sum) over the weeks first_week..last_week (Mondays) and tag confidence buckets from min_bucket up"""
+    counts = models.TagEntityTypeWeeklyCount
+    return db.query(
+        counts.tag,
+        counts.entity_type,
+        func.sum(counts.paper_count),
+        func.sum(counts.mention_count),
+        func.sum(counts.confidence_sum)
+    ).filter(
+        counts.week >= first_week,
+        counts.week <= last_week,
+        counts.confidence_bucket >= min_bucket
+    ).group_by(
+        counts.tag,
+        counts.entity_type
+    ).order_by(
+        counts.tag,
+        counts.entity_type
+    ).all()
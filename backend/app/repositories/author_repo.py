@@ -0,0 +1,184 @@
+import unicodedata
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session, load_only
+from backend.app.database import insert, is_sqlite
+from backend.app.models.models import Author, AuthorWeeklyCount, Paper, PaperAuthor
+
+# Rows or keys per statement on SQLite, which has no arrays and caps bound parameters
+BATCH_SIZE = 1000
+
+
+def normalize_author_name(name: str) -> str:
+    """'  José A.  García ' -> 'josé a garcía': NFKC, casefolded, dots dropped, spacing collapsed"""
+    name = unicodedata.normalize("NFKC", name).casefold().replace(".", " ")
+    return " ".join(name.split())
+
+
+def week_of(moment: datetime) -> date:
+    """Monday of the calendar week, like date_trunc('week', ...)"""
+    day = moment.date()
+    return day - timedelta(days=day.weekday())
+
+
+def _chunks(items: Sequence, size: int = BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class AuthorRepository:
+    """authors, paper_authors and the author_weekly_counts rollup"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_author_ids(self, names: Iterable[str]) -> Dict[str, int]:
+        """{name_key: author id} of the names, creating the authors that are not stored yet"""
+        spellings = {}
+        for name in names:
+            key = normalize_author_name(name)
+            if key:
+                spellings.setdefault(key, " ".join(name.split()))
+        # Sorted, so concurrent ingests insert overlapping names in the same order
+        keys = sorted(spellings)
+        if not keys:
+            return {}
+        now = datetime.utcnow()
+        if is_sqlite(self.db):
+            ids = {}
+            for chunk in _chunks(keys):
+                stmt = insert(Author).values([{"name": spellings[key], "name_key": key, "created_at": now} for key in chunk])
+                self.db.execute(stmt.on_conflict_do_nothing(index_elements=["name_key"]))
+                ids.update(self.db.query(Author.name_key, Author.id).filter(Author.name_key.in_(chunk)).all())
+            return ids
+        # Array parameters instead of a VALUES row per name keep large batches cheap to compile
+        self.db.execute(text("""
+            INSERT INTO authors (name, name_key, created_at)
+            SELECT name, name_key, :now
+            FROM unnest(CAST(:names AS text[]), CAST(:keys AS text[])) AS s(name, name_key)
+            ON CONFLICT (name_key) DO NOTHING
+        """), {"names": [spellings[key] for key in keys], "keys": keys, "now": now})
+        return dict(self.db.execute(text(
+            "SELECT name_key, id FROM authors WHERE name_key = ANY(CAST(:keys AS text[]))"
+        ), {"keys": keys}).all())
+
+    def link_papers(self, papers: Iterable[Paper]) -> int:
+        """
+        Links papers to their authors and adds the new links to
+        author_weekly_counts. Existing links are skipped, so papers can be
+        linked again safely. Returns the number of links added.
+        """
+        papers = [paper for paper in papers if paper.authors]
+        ids = self.get_author_ids(name for paper in papers for name in paper.authors)
+        rows = {}
+        for paper in papers:
+            published_at = paper.published_at or paper.created_at
+            for position, name in enumerate(paper.authors):
+                author_id = ids.get(normalize_author_name(name))
+                if author_id is not None:
+                    rows.setdefault((paper.id, author_id), (paper.id, author_id, position, published_at))
+        rows = [rows[key] for key in sorted(rows)]
+        if not rows:
+            return 0
+        if not is_sqlite(self.db):
+            return self._link_rows(rows)
+
+        weeks = Counter()
+        for chunk in _chunks(rows):
+            stmt = insert(PaperAuthor).values([
+                {"paper_id": paper_id, "author_id": author_id, "position": position, "published_at": published_at}
+                for paper_id, author_id, position, published_at in chunk
+            ]).on_conflict_do_nothing()
+            for author_id, published_at in self.db.execute(stmt.returning(PaperAuthor.author_id, PaperAuthor.published_at)):
+                weeks[(author_id, week_of(published_at))] += 1
+        self.add_weekly_counts(weeks)
+        return sum(weeks.values())
+
+    def _link_rows(self, rows: List[tuple]) -> int:
+        """PostgreSQL: inserts (paper_id, author_id, position, published_at) rows and rolls the new ones up in one statement"""
+        paper_ids, author_ids, positions, published = zip(*rows)
+        return self.db.execute(text("""
+            WITH added AS (
+                INSERT INTO paper_authors (paper_id, author_id, position, published_at)
+                SELECT * FROM unnest(
+                    CAST(:paper_ids AS integer[]), CAST(:author_ids AS integer[]),
+                    CAST(:positions AS smallint[]), CAST(:published AS timestamp[])
+                )
+                ON CONFLICT (paper_id, author_id) DO NOTHING
+                RETURNING author_id, published_week
+            ), weekly AS (
+                INSERT INTO author_weekly_counts (author_id, week, paper_count)
+                SELECT author_id, published_week, count(*)
+                FROM added
+                GROUP BY 1, 2
+                ORDER BY 1, 2
+                ON CONFLICT (author_id, week)
+                DO UPDATE SET paper_count = author_weekly_counts.paper_count + EXCLUDED.paper_count
+            )
+            SELECT count(*) FROM added
+        """), {
+            "paper_ids": list(paper_ids),
+            "author_ids": list(author_ids),
+            "positions": list(positions),
+            "published": list(published),
+        }).scalar()
+
+    def add_weekly_counts(self, counts: Dict[tuple, int]):
+        """Adds {(author_id, week): papers} to author_weekly_counts"""
+        # In key order, so concurrent ingests lock the rows they share in the same order
+        rows = [{"author_id": author_id, "week": week, "paper_count": count} for (author_id, week), count in sorted(counts.items())]
+        for chunk in _chunks(rows):
+            stmt = insert(AuthorWeeklyCount).values(chunk)
+            self.db.execute(stmt.on_conflict_do_update(
+                index_elements=["author_id", "week"],
+                set_={"paper_count": AuthorWeeklyCount.paper_count + stmt.excluded.paper_count},
+            ))
+
+    def rebuild_weekly_counts(self) -> int:
+        """Recomputes author_weekly_counts from paper_authors; returns the rows written"""
+        self.db.query(AuthorWeeklyCount).delete(synchronize_session=False)
+        source = select(
+            PaperAuthor.author_id, PaperAuthor.published_week, func.count()
+        ).group_by(PaperAuthor.author_id, PaperAuthor.published_week)
+        return self.db.execute(
+            insert(AuthorWeeklyCount).from_select(["author_id", "week", "paper_count"], source)
+        ).rowcount
+
+    def get_papers_without_authors(self, limit: int, after_id: int = 0) -> List[Paper]:
+        """Papers with an author list but no paper_authors rows, oldest id first"""
+        linked = select(PaperAuthor.paper_id).where(PaperAuthor.paper_id == Paper.id)
+        return (
+            self.db.query(Paper)
+            .options(load_only(Paper.id, Paper.authors, Paper.published_at, Paper.created_at))
+            .filter(Paper.id > after_id, Paper.authors.isnot(None), ~linked.exists())
+            .order_by(Paper.id)
+            .limit(limit)
+            .all()
+        )
+
+    def backfill(self, batch_size: int = 1000, limit: Optional[int] = None, progress: Optional[Callable[[dict], None]] = None) -> dict:
+        """Links every paper stored before the author index, committing per batch"""
+        stats = {"papers": 0, "links": 0}
+        after_id = 0
+        while limit is None or stats["papers"] < limit:
+            size = batch_size if limit is None else min(batch_size, limit - stats["papers"])
+            papers = self.get_papers_without_authors(size, after_id=after_id)
+            if not papers:
+                break
+            stats["links"] += self.link_papers(papers)
+            stats["papers"] += len(papers)
+            self.db.commit()
+            after_id = papers[-1].id
+            if progress:
+                progress(stats)
+        return stats
+
+    def count_authors(self) -> int:
+        return self.db.query(func.count(Author.id)).scalar()
+
+    def analyze(self):
+        """Refreshes planner statistics after a backfill"""
+        for table in ("authors", "paper_authors", "author_weekly_counts"):
+            self.db.execute(text(f"ANALYZE {table}"))
@@ -0,0 +1,94 @@
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from backend.app.database import insert
+from backend.app.models.models import Paper, PaperEmbedding
+
+# HNSW candidate list size; recall rises with it, and it must cover `limit`
+DEFAULT_EF_SEARCH = 40
+HNSW_INDEX = "ix_paper_embeddings_hnsw"
+
+
+class EmbeddingRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def save_embeddings(self, rows: Sequence[Tuple[int, List[float]]], model: str):
+        """Inserts or replaces (paper_id, vector) rows; the HNSW index is updated in place"""
+        if not rows:
+            return
+        now = datetime.utcnow()
+        stmt = insert(PaperEmbedding).values([
+            {"paper_id": paper_id, "embedding": vector, "model": model, "created_at": now}
+            for paper_id, vector in rows
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["paper_id"],
+            set_={"embedding": stmt.excluded.embedding, "model": stmt.excluded.model, "created_at": stmt.excluded.created_at},
+        )
+        self.db.execute(stmt)
+
+    def embedded_ids(self, paper_ids: List[int], model: str) -> set:
+        if not paper_ids:
+            return set()
+        rows = self.db.query(PaperEmbedding.paper_id).filter(
+            PaperEmbedding.paper_id.in_(paper_ids),
+            PaperEmbedding.model == model,
+        ).all()
+        return {row.paper_id for row in rows}
+
+    def get_papers_without_embedding(self, model: str, limit: int, after_id: int = 0) -> List[Paper]:
+        """Papers with no embedding from `model`, in id order for keyset paging"""
+        embedded = select(PaperEmbedding.paper_id).where(
+            PaperEmbedding.paper_id == Paper.id,
+            PaperEmbedding.model == model,
+        )
+        return (
+            self.db.query(Paper)
+            .filter(Paper.id > after_id, ~embedded.exists())
+            .order_by(Paper.id)
+            .limit(limit)
+            .all()
+        )
+
+    def get_embedding(self, paper_id: int) -> Optional[List[float]]:
+        return self.db.query(PaperEmbedding.embedding).filter(PaperEmbedding.paper_id == paper_id).scalar()
+
+    def count(self) -> int:
+        return self.db.query(func.count(PaperEmbedding.paper_id)).scalar()
+
+    def _hnsw_index(self):
+        return next(index for index in PaperEmbedding.__table__.indexes if index.name == HNSW_INDEX)
+
+    def drop_index(self):
+        """Drops the HNSW index so a large backfill does not pay per-row graph inserts"""
+        self._hnsw_index().drop(self.db.connection(), checkfirst=True)
+
+    def create_index(self, maintenance_work_mem: str = "512MB"):
+        """(Re)builds the HNSW index in one pass; far faster than inserting row by row"""
+        self.db.execute(select(func.set_config("maintenance_work_mem", maintenance_work_mem, True)))
+        self._hnsw_index().create(self.db.connection(), checkfirst=True)
+
+    def nearest(self, vector: List[float], limit: int = 10, exclude_paper_id: Optional[int] = None, ef_search: Optional[int] = None):
+        """
+        Papers closest to `vector` by cosine distance, nearest first, as rows of
+        (Paper, score) with score = 1 - distance. ORDER BY distance LIMIT k is
+        the shape pgvector answers from the HNSW index.
+        """
+        ef = max(ef_search or DEFAULT_EF_SEARCH, limit + 1)
+        self.db.execute(select(func.set_config("hnsw.ef_search", str(ef), True)))
+
+        distance = PaperEmbedding.embedding.cosine_distance(vector)
+        nearest = select(PaperEmbedding.paper_id, distance.label("distance"))
+        if exclude_paper_id is not None:
+            nearest = nearest.where(PaperEmbedding.paper_id != exclude_paper_id)
+        nearest = nearest.order_by(distance).limit(limit).subquery()
+
+        rows = (
+            self.db.query(Paper, (1 - nearest.c.distance).label("score"))
+            .join(nearest, nearest.c.paper_id == Paper.id)
+            .order_by(nearest.c.distance)
+            .all()
+        )
+        return rows
@@ -1,5 +1,9 @@
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import func, literal, select
 from sqlalchemy.orm import Session
-from backend.app.models.models import Entity, PaperEntity, EntityType
+from backend.app.database import insert
+from backend.app.models.models import Entity, Paper, PaperEntity, EntityType
 
 class EntityRepository:
     def __init__(self, db: Session):
@@ -12,15 +16,39 @@ class EntityRepository:
         ).first()
         
         if not entity:
-            entity = Entity(name=name, type=entity_type)
-            self.db.add(entity)
-            self.db.flush()
+            self.ensure_entities([(name, entity_type)])
+            entity = self.db.query(Entity).filter(
+                Entity.name == name,
+                Entity.type == entity_type
+            ).one()
         return entity
 
-    def upsert_paper_entity(self, paper_id: int, entity_id: int, evidence: str, confidence: float) -> PaperEntity:
+    def ensure_entities(self, names: Iterable[Tuple[str, EntityType]]):
+        """
+        Creates the (name, type) entities that do not exist yet in one
+        INSERT ... ON CONFLICT DO NOTHING. Rows are inserted in sorted order, so
+        concurrent workers creating overlapping sets wait on each other
+        instead of deadlocking.
+        """
+        rows = sorted({(entity_type.value, name) for name, entity_type in names})
+        if not rows:
+            return
+        stmt = insert(Entity).values([{"type": EntityType(entity_type), "name": name} for entity_type, name in rows])
+        self.db.execute(stmt.on_conflict_do_nothing(index_elements=["type", "name"]))
+
+    def upsert_paper_entity(self, paper_id: int, entity_id: int, evidence: str, confidence: float, published_at: Optional[datetime] = None) -> PaperEntity:
+        """
+        published_at is the paper's publication date (the partition key of
+        paper_entities); it is looked up from papers when not given.
+        """
+        if published_at is None:
+            paper = self.db.query(Paper.published_at, Paper.created_at).filter(Paper.id == paper_id).one()
+            published_at = paper.published_at or paper.created_at
+
         existing = self.db.query(PaperEntity).filter(
             PaperEntity.paper_id == paper_id,
-            PaperEntity.entity_id == entity_id
+            PaperEntity.entity_id == entity_id,
+            PaperEntity.published_at == published_at
         ).first()
 
         if existing:
@@ -29,6 +57,7 @@ class EntityRepository:
         paper_entity = PaperEntity(
             paper_id=paper_id,
             entity_id=entity_id,
+            published_at=published_at,
             evidence=evidence,
             confidence=confidence
         )
@@ -36,6 +65,85 @@ class EntityRepository:
         self.db.flush()
         return paper_entity
 
+    def copy_paper_entities(self, source_paper_id: int, target_paper_id: int, published_at: datetime) -> int:
+        """Copies another paper's entity links, e.g. from a near-duplicate. Returns the rows added."""
+        source = select(
+            literal(target_paper_id),
+            PaperEntity.entity_id,
+            literal(published_at),
+            PaperEntity.evidence,
+            PaperEntity.confidence,
+            literal(datetime.utcnow()),
+        ).where(PaperEntity.paper_id == source_paper_id)
+        stmt = insert(PaperEntity).from_select(
+            ["paper_id", "entity_id", "published_at", "evidence", "confidence", "created_at"], source
+        )
+        return self.db.execute(stmt.on_conflict_do_nothing()).rowcount
+
+    def add_paper_entities(self, rows: Sequence[Tuple[int, int, datetime, str, float]]) -> int:
+        """Inserts (paper_id, entity_id, published_at, evidence, confidence) links in one statement, skipping existing ones"""
+        if not rows:
+            return 0
+        now = datetime.utcnow()
+        stmt = insert(PaperEntity).values([
+            {
+                "paper_id": paper_id,
+                "entity_id": entity_id,
+                "published_at": published_at,
+                "evidence": evidence,
+                "confidence": confidence,
+                "created_at": now,
+            }
+            for paper_id, entity_id, published_at, evidence, confidence in rows
+        ])
+        return self.db.execute(stmt.on_conflict_do_nothing()).rowcount
+
+    def get_dictionary_rows(self) -> List[Tuple[int, str, str, Optional[int]]]:
+        """(id, name, type, canonical_id) of every entity, for services/entity_dictionary.py"""
+        rows = self.db.query(Entity.id, Entity.name, Entity.type, Entity.canonical_id).all()
+        return [(row.id, row.name, row.type.value if row.type else None, row.canonical_id) for row in rows]
+
+    def dictionary_version(self) -> tuple:
+        """Changes whenever an entity is added or its canonical_id is set, so a cached dictionary can be reused until then"""
+        return tuple(self.db.query(
+            func.count(Entity.id),
+            func.max(Entity.id),
+            func.coalesce(func.sum(Entity.canonical_id), 0),
+        ).one())
+
+    def canonical_groups(self, entity_ids: Iterable[int]) -> Tuple[dict, dict]:
+        """
+        For the given ids, ({entity_id: canonical root id}, {root id: [root and
+        all its aliases]}). canonical_id chains are followed in both
+        directions, one query per link; ids that do not exist are left out.
+        """
+        parents = dict(self.db.query(Entity.id, Entity.canonical_id).filter(Entity.id.in_(set(entity_ids))).all())
+        roots = {}
+        for entity_id in list(parents):
+            root, seen = entity_id, {entity_id}
+            while True:
+                if root not in parents:
+                    parents.update(self.db.query(Entity.id, Entity.canonical_id).filter(Entity.id == root).all())
+                parent = parents.get(root)
+                if parent is None or parent in seen:
+                    break
+                seen.add(parent)
+                root = parent
+            roots[entity_id] = root
+
+        groups = {root: [root] for root in roots.values()}
+        group_of = {root: root for root in groups}
+        frontier = set(groups)
+        while frontier:
+            aliases = self.db.query(Entity.id, Entity.canonical_id).filter(Entity.canonical_id.in_(frontier)).all()
+            frontier = set()
+            for alias_id, canonical_id in aliases:
+                if alias_id not in group_of:
+                    group_of[alias_id] = group_of[canonical_id]
+                    groups[group_of[alias_id]].append(alias_id)
+                    frontier.add(alias_id)
+        return roots, groups
+
     def get_entities_without_canonical(self):
         """Get all entities that don't have a canonical_id set"""
         return self.db.query(Entity).filter(Entity.canonical_id.is_(None)).all()
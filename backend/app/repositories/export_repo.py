@@ -0,0 +1,43 @@
+from typing import Iterator, List, Sequence
+from sqlalchemy import Column, func, null, select
+from sqlalchemy.orm import Session
+from backend.app.models.models import Entity, Paper, PaperEntity, PaperTag
+
+_MODELS = {"papers": Paper, "entities": Entity, "paper_entities": PaperEntity, "paper_tags": PaperTag}
+
+
+class ExportRepository:
+    """Whole tables streamed in batches through a server-side cursor, for services/parquet_export.py"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def columns(table: str) -> List[Column]:
+        return list(_MODELS[table].__table__.columns)
+
+    def iter_batches(self, table: str, batch_size: int) -> Iterator[Sequence]:
+        """
+        Batches of rows with the table's columns plus `month_at`, the time
+        that decides the row's month (None for entities), in month order.
+        A paper's month is its published_at, or created_at without one; its
+        entity links and tags fall in the same month.
+        """
+        columns = self.columns(table)
+        if table == "papers":
+            month_at = func.coalesce(Paper.published_at, Paper.created_at)
+            stmt = select(*columns, month_at.label("month_at")).order_by(Paper.published_at, Paper.id)
+        elif table == "paper_entities":
+            stmt = select(*columns, PaperEntity.published_at.label("month_at")).order_by(PaperEntity.published_at)
+        elif table == "paper_tags":
+            month_at = func.coalesce(Paper.published_at, Paper.created_at)
+            stmt = (
+                select(*columns, month_at.label("month_at"))
+                .join(Paper, Paper.id == PaperTag.paper_id)
+                .order_by(Paper.published_at, Paper.id)
+            )
+        else:
+            stmt = select(*columns, null().label("month_at")).order_by(Entity.id)
+
+        result = self.db.execute(stmt.execution_options(yield_per=batch_size))
+        yield from result.partitions()
@@ -0,0 +1,105 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import select, text, tuple_
+from sqlalchemy.orm import Session
+from backend.app.database import insert, is_sqlite
+from backend.app.models.models import Paper, PaperFingerprint, PaperLshBucket
+
+# Keys or rows per statement on SQLite, which has no arrays and caps bound parameters
+SQLITE_BATCH_SIZE = 5000
+
+
+class FingerprintRepository:
+    """MinHash signatures and LSH band buckets of papers, see services/dedup.py"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def fingerprinted_ids(self, paper_ids: List[int]) -> set:
+        if not paper_ids:
+            return set()
+        rows = self.db.query(PaperFingerprint.paper_id).filter(PaperFingerprint.paper_id.in_(paper_ids)).all()
+        return {row.paper_id for row in rows}
+
+    def bucket_members(self, keys: Iterable[Tuple[int, int]]) -> Tuple[Dict[Tuple[int, int], List[int]], Dict[int, List[int]]]:
+        """
+        Papers filed under any of the (band, bucket) keys: the members per key
+        and the signature of every member. One index probe per key.
+        """
+        keys = list(keys)
+        if not keys:
+            return {}, {}
+        if is_sqlite(self.db):
+            rows = []
+            for start in range(0, len(keys), SQLITE_BATCH_SIZE):
+                rows += self.db.execute(
+                    select(PaperLshBucket.band, PaperLshBucket.bucket, PaperLshBucket.paper_id, PaperFingerprint.signature)
+                    .join(PaperFingerprint, PaperFingerprint.paper_id == PaperLshBucket.paper_id)
+                    .where(tuple_(PaperLshBucket.band, PaperLshBucket.bucket).in_(keys[start:start + SQLITE_BATCH_SIZE]))
+                ).all()
+        else:
+            rows = self._bucket_rows(keys)
+
+        members, signatures = {}, {}
+        for band, bucket, paper_id, signature in rows:
+            members.setdefault((band, bucket), []).append(paper_id)
+            signatures[paper_id] = signature
+        return members, signatures
+
+    def _bucket_rows(self, keys: List[Tuple[int, int]]):
+        return self.db.execute(text("""
+            SELECT b.band, b.bucket, b.paper_id, f.signature
+            FROM unnest(CAST(:bands AS smallint[]), CAST(:buckets AS bigint[])) AS k(band, bucket)
+            JOIN paper_lsh_buckets b ON b.band = k.band AND b.bucket = k.bucket
+            JOIN paper_fingerprints f ON f.paper_id = b.paper_id
+        """), {"bands": [band for band, _ in keys], "buckets": [bucket for _, bucket in keys]}).all()
+
+    def save_fingerprints(self, rows: Sequence[Tuple[int, List[int], List[Tuple[int, int]], Optional[Tuple[int, float]]]]):
+        """rows: (paper_id, signature, band buckets, (duplicate_of_id, similarity) or None)"""
+        if not rows:
+            return
+        now = datetime.utcnow()
+        stmt = insert(PaperFingerprint).values([
+            {
+                "paper_id": paper_id,
+                "signature": signature,
+                "duplicate_of_id": match[0] if match else None,
+                "similarity": match[1] if match else None,
+                "created_at": now,
+            }
+            for paper_id, signature, _, match in rows
+        ])
+        self.db.execute(stmt.on_conflict_do_nothing(index_elements=["paper_id"]))
+
+        bands, buckets, paper_ids = [], [], []
+        for paper_id, _, keys, _ in rows:
+            for band, bucket in keys:
+                bands.append(band)
+                buckets.append(bucket)
+                paper_ids.append(paper_id)
+        if is_sqlite(self.db):
+            for start in range(0, len(bands), SQLITE_BATCH_SIZE):
+                stmt = insert(PaperLshBucket).values([
+                    {"band": band, "bucket": bucket, "paper_id": paper_id}
+                    for band, bucket, paper_id in zip(*(column[start:start + SQLITE_BATCH_SIZE] for column in (bands, buckets, paper_ids)))
+                ])
+                self.db.execute(stmt.on_conflict_do_nothing())
+            return
+        self.db.execute(text("""
+            INSERT INTO paper_lsh_buckets (band, bucket, paper_id)
+            SELECT * FROM unnest(CAST(:bands AS smallint[]), CAST(:buckets AS bigint[]), CAST(:paper_ids AS integer[]))
+            ON CONFLICT DO NOTHING
+        """), {"bands": bands, "buckets": buckets, "paper_ids": paper_ids})
+
+    def get_papers_without_fingerprint(self, limit: int, after_id: int = 0) -> List[Paper]:
+        fingerprinted = select(PaperFingerprint.paper_id).where(PaperFingerprint.paper_id == Paper.id)
+        return (
+            self.db.query(Paper)
+            .filter(Paper.id > after_id, ~fingerprinted.exists())
+            .order_by(Paper.id)
+            .limit(limit)
+            .all()
+        )
+
+    def count_duplicates(self) -> int:
+        return self.db.query(PaperFingerprint).filter(PaperFingerprint.duplicate_of_id.isnot(None)).count()
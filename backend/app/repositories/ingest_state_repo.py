@@ -0,0 +1,113 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import ARRAY, DateTime, Integer, bindparam, func, literal, select
+from sqlalchemy.orm import Session
+from backend.app.database import insert, is_sqlite
+from backend.app.models.models import Paper, PaperIngestState, IngestStatus
+
+MAX_ERROR_LENGTH = 1000
+# Rows per multi-row INSERT on SQLite, which has no arrays and caps bound parameters
+SQLITE_BATCH_SIZE = 1000
+
+
+class IngestStateRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def mark_fetched(self, paper_ids: List[int]):
+        """
+        Creates a 'fetched' state row for each paper that does not have one yet.
+        Existing rows are left alone so finished LLM work is not forgotten.
+        """
+        if not paper_ids:
+            return
+        if is_sqlite(self.db):
+            now = datetime.utcnow()
+            for start in range(0, len(paper_ids), SQLITE_BATCH_SIZE):
+                stmt = insert(PaperIngestState).values([
+                    {"paper_id": paper_id, "status": IngestStatus.fetched, "attempts": 0, "updated_at": now}
+                    for paper_id in paper_ids[start:start + SQLITE_BATCH_SIZE]
+                ])
+                self.db.execute(stmt.on_conflict_do_nothing(index_elements=["paper_id"]))
+            return
+        # One array parameter instead of a VALUES row per paper keeps large batches cheap to compile
+        paper_id = func.unnest(bindparam("paper_ids", list(paper_ids), type_=ARRAY(Integer))).column_valued("paper_id")
+        source = select(
+            paper_id,
+            literal(IngestStatus.fetched, PaperIngestState.status.type),
+            literal(0),
+            literal(datetime.utcnow(), DateTime()),
+        )
+        stmt = insert(PaperIngestState).from_select(["paper_id", "status", "attempts", "updated_at"], source)
+        self.db.execute(stmt.on_conflict_do_nothing(index_elements=["paper_id"]))
+
+    def get_states(self, paper_ids: List[int]) -> Dict[int, PaperIngestState]:
+        if not paper_ids:
+            return {}
+        rows = self.db.query(PaperIngestState).filter(PaperIngestState.paper_id.in_(paper_ids)).all()
+        return {row.paper_id: row for row in rows}
+
+    def claim(self, paper_ids: List[int]) -> Dict[int, PaperIngestState]:
+        """
+        Locks and reloads the state rows of the papers that are not done yet,
+        skipping rows another session holds. The locks last until the next
+        commit, so concurrent workers never enrich the same paper twice.
+        SQLite has no row locks; it only ever has one writer.
+        """
+        if not paper_ids:
+            return {}
+        rows = (
+            self.db.query(PaperIngestState)
+            .filter(PaperIngestState.paper_id.in_(paper_ids), PaperIngestState.status != IngestStatus.done)
+            .with_for_update(skip_locked=True)
+            .populate_existing()
+            .all()
+        )
+        return {row.paper_id: row for row in rows}
+
+    def get_unfinished_papers(self, statuses: List[IngestStatus], max_attempts: Optional[int] = None, limit: Optional[int] = None) -> List[Paper]:
+        """Papers whose enrichment is still pending, oldest state first"""
+        query = (
+            self.db.query(Paper)
+            .join(PaperIngestState, PaperIngestState.paper_id == Paper.id)
+            .filter(PaperIngestState.status.in_(statuses))
+        )
+        if max_attempts is not None:
+            query = query.filter(PaperIngestState.attempts < max_attempts)
+        query = query.order_by(PaperIngestState.updated_at, Paper.id)
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+    def start_attempt(self, state: PaperIngestState):
+        state.attempts += 1
+        state.updated_at = datetime.utcnow()
+
+    def mark_extracted(self, state: PaperIngestState):
+        state.extracted_at = datetime.utcnow()
+
+    def mark_classified(self, state: PaperIngestState):
+        state.classified_at = datetime.utcnow()
+
+    def finish_attempt(self, state: PaperIngestState, errors: List[str]):
+        """Sets the final status for this attempt: done once both LLM steps are saved"""
+        if state.extracted_at and state.classified_at:
+            state.status = IngestStatus.done
+            state.last_error = None
+        else:
+            state.status = IngestStatus.failed
+            state.last_error = ("; ".join(errors) or "incomplete")[:MAX_ERROR_LENGTH]
+        state.updated_at = datetime.utcnow()
+        self.db.flush()
+
+    def count_by_status(self) -> Dict[str, int]:
+        rows = (
+            self.db.query(PaperIngestState.status, func.count(PaperIngestState.paper_id))
+            .group_by(PaperIngestState.status)
+            .all()
+        )
+        return {status.value: count for status, count in rows}
+
+    def checkpoint(self):
+        """Commits the work done so far, so a crash only loses the current chunk"""
+        self.db.commit()
@@ -1,7 +1,9 @@
+from datetime import datetime
+from sqlalchemy import literal, select
 from sqlalchemy.orm import Session
-from typing import List
-from sqlalchemy.dialects.postgresql import insert
-from backend.app.models.models import Paper, PaperTag
+from typing import Dict, Iterable, List
+from backend.app.database import insert
+from backend.app.models.models import IngestStatus, Paper, PaperIngestState, PaperTag, split_arxiv_id
 
 class PaperRepository:
     def __init__(self, db: Session):
@@ -9,22 +11,27 @@ class PaperRepository:
 
     def upsert_papers(self, papers_data: List):
         """
-        Inserts papers in bulk. If arxiv_id already exists, it does not 
-        raise an error (idempotent) and updates the record if necessary.
+        Inserts papers in bulk with a single multi-row INSERT. If the paper
+        already exists in any version, it does not raise an error (idempotent).
+        For large backfills use BulkLoader, which goes through COPY.
         """
-        for data in papers_data:
-            stmt = insert(Paper).values(
-                arxiv_id=data["arxiv_id"],
-                title=data["title"],
-                abstract=data["abstract"],
-                authors=data["authors"],
-                published_at=data["published_at"],
-                categories=data["categories"],
-                url=data["url"],
-            )
-
-            stmt = stmt.on_conflict_do_nothing(index_elements=['arxiv_id'])
-            self.db.execute(stmt)
+        if not papers_data:
+            return
+        stmt = insert(Paper).values([
+            {
+                "arxiv_id": data["arxiv_id"],
+                "title": data["title"],
+                "abstract": data["abstract"],
+                "authors": data["authors"],
+                "published_at": data["published_at"],
+                "categories": data["categories"],
+                "url": data["url"],
+                "created_at": datetime.utcnow(),
+            }
+            for data in papers_data
+        ])
+        stmt = stmt.on_conflict_do_nothing(index_elements=['base_id'])
+        self.db.execute(stmt)
 
         self.db.commit()
 
@@ -32,13 +39,23 @@ class PaperRepository:
         """
         Upserts a single paper and returns the Paper object.
         Needed for entity extraction which requires paper ID.
+        Any version of a paper maps onto the same row; a newer version only
+        moves arxiv_id and url forward, so earlier enrichment is kept.
+        The insert is ON CONFLICT (base_id) DO NOTHING, so a paper saved by a
+        concurrent worker in the meantime is picked up instead of failing.
         """
-        existing = self.db.query(Paper).filter(Paper.arxiv_id == data["arxiv_id"]).first()
+        base_id, version = split_arxiv_id(data["arxiv_id"])
+        existing = self.db.query(Paper).filter(Paper.base_id == base_id).first()
         
         if existing:
+            if version > (existing.version or 1):
+                existing.arxiv_id = data["arxiv_id"]
+                existing.url = data["url"]
+                self.db.flush()
+                self.db.refresh(existing, ["version"])
             return existing
         
-        paper = Paper(
+        stmt = insert(Paper).values(
             arxiv_id=data["arxiv_id"],
             title=data["title"],
             abstract=data["abstract"],
@@ -46,10 +63,24 @@ class PaperRepository:
             published_at=data["published_at"],
             categories=data["categories"],
             url=data["url"],
+        ).on_conflict_do_nothing(index_elements=["base_id"]).returning(Paper.id)
+        paper_id = self.db.execute(stmt).scalar()
+        if paper_id is None:
+            return self.upsert_paper(data)
+        return self.db.get(Paper, paper_id)
+
+    def get_finished_versions(self, base_ids: Iterable[str]) -> Dict[str, int]:
+        """{base_id: stored version} of the given papers whose enrichment is done"""
+        base_ids = list(base_ids)
+        if not base_ids:
+            return {}
+        rows = (
+            self.db.query(Paper.base_id, Paper.version)
+            .join(PaperIngestState, PaperIngestState.paper_id == Paper.id)
+            .filter(Paper.base_id.in_(base_ids), PaperIngestState.status == IngestStatus.done)
+            .all()
         )
-        self.db.add(paper)
-        self.db.flush()
-        return paper
+        return {row.base_id: row.version for row in rows}
 
     def add_paper_tag(self, paper_id: int, tag: str, confidence: float):
         """Add a taxonomy tag to a paper"""
@@ -68,4 +99,12 @@ class PaperRepository:
         )
         self.db.add(paper_tag)
         self.db.flush()
-        return paper_tag
\ No newline at end of file
+        return paper_tag
+
+    def copy_paper_tags(self, source_paper_id: int, target_paper_id: int) -> int:
+        """Copies another paper's tags, e.g. from a near-duplicate. Returns the rows added."""
+        source = select(
+            literal(target_paper_id), PaperTag.tag, PaperTag.confidence, literal(datetime.utcnow())
+        ).where(PaperTag.paper_id == source_paper_id)
+        stmt = insert(PaperTag).from_select(["paper_id", "tag", "confidence", "created_at"], source)
+        return self.db.execute(stmt.on_conflict_do_nothing()).rowcount
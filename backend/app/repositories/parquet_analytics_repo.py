@@ -0,0 +1,154 @@
+"""
+The analytics_repo queries over a Parquet export (`cli.py export`), run by
+DuckDB in-process, for offline analysis without the production database.
+
+connect() opens an in-memory DuckDB with one view per exported table. The
+month=YYYY-MM directories become a `month` column, so the time-window
+queries filter on it and DuckDB skips the other months' files. The Parquet
+row-group statistics then narrow the scan further. The functions take the
+connection where analytics_repo takes a session, and return the same
+columns. "Now" defaults to the time the export was taken.
+"""
+import glob
+import json
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+# Tables written by `cli.py export`, parents first. The export layout lives here,
+# away from the database modules, so `cli.py offline` runs without database settings
+EXPORT_TABLES = ("papers", "entities", "paper_entities", "paper_tags")
+# Rows and export time per table, next to the table directories
+EXPORT_MANIFEST = "_export.json"
+
+
+def connect(data_dir: str):
+    """In-memory DuckDB connection with views over the export in data_dir"""
+    try:
+        import duckdb
+    except ImportError as e:
+        raise ImportError("Offline analytics need DuckDB: pip install duckdb") from e
+
+    con = duckdb.connect()
+    for table in EXPORT_TABLES:
+        # entities has no month directories
+        pattern = os.path.join(data_dir, table, "*.parquet" if table == "entities" else "*/*.parquet")
+        if not glob.glob(pattern):
+            continue
+        options = "" if table == "entities" else ", hive_partitioning = true, hive_types = {'month': VARCHAR}"
+        con.execute(f"CREATE VIEW {table} AS SELECT * FROM read_parquet('{pattern}'{options})")
+    return con
+
+
+def exported_at(data_dir: str) -> Optional[datetime]:
+    """When the export's paper_entities were taken, the reference time of the weekly queries"""
+    path = os.path.join(data_dir, EXPORT_MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        tables = json.load(f).get("tables", {})
+    table = tables.get("paper_entities") or tables.get("papers")
+    return datetime.fromisoformat(table["exported_at"]) if table else None
+
+
+def _month(value: datetime) -> str:
+    return value.strftime("%Y-%m")
+
+
+def query(con, sql: str, params: Optional[list] = None) -> Tuple[List[str], List[tuple]]:
+    """Column names and rows of an ad-hoc query"""
+    cursor = con.execute(sql, params or [])
+    return [column[0] for column in cursor.description], cursor.fetchall()
+
+
+def get_top_entities_by_week(con, week_start: datetime, entity_type: str, limit: int = 10):
+    """Top entities of the calendar week (Monday to Sunday) containing week_start"""
+    monday = week_start.date() - timedelta(days=week_start.weekday())
+    week_begin = datetime.combine(monday, datetime.min.time())
+    week_end = week_begin + timedelta(days=7)
+    return con.execute("""
+        SELECT e.name, count(pe.paper_id) AS count
+        FROM entities e
+        JOIN paper_entities pe ON e.id = pe.entity_id
+        WHERE pe.month BETWEEN ? AND ?
+          AND pe.published_week = ?
+          AND pe.published_at >= ? AND pe.published_at < ?
+          AND e.type = ?
+        GROUP BY e.name
+        ORDER BY count DESC, e.name
+        LIMIT ?
+    """, [_month(week_begin), _month(week_end), monday, week_begin, week_end, entity_type, limit]).fetchall()
+
+
+def get_fastest_growing_entities(con, entity_type: str, now: Optional[datetime] = None):
+    now = now or datetime.utcnow()
+    this_week_start = now - timedelta(days=7)
+    last_week_start = now - timedelta(days=14)
+    return con.execute("""
+        WITH recent AS (
+            SELECT entity_id, published_at FROM paper_entities
+            WHERE month BETWEEN ? AND ? AND published_at >= ? AND published_at <= ?
+        ),
+        current_counts AS (
+            SELECT entity_id, count(*) AS curr_count FROM recent WHERE published_at >= ? GROUP BY entity_id
+        ),
+        prev_counts AS (
+            SELECT entity_id, count(*) AS prev_count FROM recent WHERE published_at < ? GROUP BY entity_id
+        )
+        SELECT e.name, c.curr_count - coalesce(p.prev_count, 0) AS growth
+        FROM entities e
+        JOIN current_counts c ON e.id = c.entity_id
+        LEFT JOIN prev_counts p ON e.id = p.entity_id
+        WHERE e.type = ?
+        ORDER BY growth DESC
+        LIMIT 10
+    """, [_month(last_week_start), _month(now), last_week_start, now, this_week_start, this_week_start, entity_type]).fetchall()
+
+
+def get_entity_cooccurence_edges(con, entity_type: str, days: int = 30, now: Optional[datetime] = None):
+    now = now or datetime.utcnow()
+    start_date = now - timedelta(days=days)
+    return con.execute("""
+        WITH pe AS (
+            SELECT pe.paper_id, pe.published_at, e.id, e.name
+            FROM paper_entities pe
+            JOIN entities e ON e.id = pe.entity_id
+            WHERE pe.month >= ? AND pe.published_at >= ? AND e.type = ?
+        )
+        SELECT a.name AS entity_a, b.name AS entity_b, count(a.paper_id) AS cooccurrence_count
+        FROM pe a
+        JOIN pe b ON a.paper_id = b.paper_id AND a.published_at = b.published_at AND a.id < b.id
+        GROUP BY a.name, b.name
+        ORDER BY cooccurrence_count DESC
+    """, [_month(start_date), start_date, entity_type]).fetchall()
+
+
+def get_papers_for_an_entity(con, entity_id: int):
+    return con.execute("""
+        SELECT p.id, p.title, p.authors, p.published_at, pe.evidence, pe.confidence
+        FROM papers p
+        JOIN paper_entities pe ON p.id = pe.paper_id
+        WHERE pe.entity_id = ?
+        ORDER BY p.published_at DESC
+    """, [entity_id]).fetchall()
+
+
+def category_distribution_over_time(con):
+    return con.execute("""
+        SELECT week, category, count(*) AS count
+        FROM (
+            SELECT date_trunc('week', published_at) AS week, unnest(categories) AS category
+            FROM papers
+        )
+        GROUP BY week, category
+        ORDER BY week DESC, count DESC
+    """).fetchall()
+
+
+def get_canonical_merges_report(con):
+    return con.execute("""
+        SELECT canon_ent.name AS canonical_name, list(alias_ent.name) AS aliases
+        FROM entities alias_ent
+        JOIN entities canon_ent ON alias_ent.canonical_id = canon_ent.id
+        GROUP BY canon_ent.name
+    """).fetchall()
@@ -0,0 +1,102 @@
+from datetime import date, datetime
+from typing import List
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+PARTITIONED_TABLE = "paper_entities"
+DEFAULT_PARTITION = "paper_entities_default"
+# Stored columns; the generated published_week is recomputed on insert
+MOVED_COLUMNS = "paper_id, entity_id, published_at, evidence, confidence, created_at"
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARTITIONED_TABLE}_y{month:%Y}m{month:%m}"
+
+
+class PartitionRepository:
+    """
+    Monthly range partitions of paper_entities on published_at.
+    Partitions are created ahead of time by `cli.py partitions`; rows for a
+    month without a partition go to the default partition until one exists.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def list_partitions(self) -> List[dict]:
+        """Partitions with their bounds and the planner's row estimate"""
+        rows = self.db.execute(text("""
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), greatest(c.reltuples, 0)::bigint
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = CAST(:parent AS regclass)
+            ORDER BY c.relname
+        """), {"parent": PARTITIONED_TABLE}).all()
+        return [{"name": name, "bounds": bounds, "rows": estimate} for name, bounds, estimate in rows]
+
+    def exists(self, name: str) -> bool:
+        return self.db.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+
+    def months_in_default(self) -> List[date]:
+        """Months that have rows in the default partition and should get their own"""
+        rows = self.db.execute(text(
+            f"SELECT DISTINCT date_trunc('month', published_at) FROM {DEFAULT_PARTITION} ORDER BY 1"
+        )).all()
+        return [month_start(row[0]) for row in rows]
+
+    def create_partition(self, month: date) -> bool:
+        """
+        Creates the partition for `month`. Matching rows already in the
+        default partition are moved into it. Returns False if it exists.
+        """
+        name = partition_name(month)
+        if self.exists(name):
+            return False
+        bounds = {"start": datetime.combine(month, datetime.min.time()), "end": datetime.combine(add_months(month, 1), datetime.min.time())}
+
+        # Postgres refuses to create a partition while the default one holds rows for
+        # its range, so park those rows in a temp table and re-insert them afterwards
+        self.db.execute(text(
+            f"CREATE TEMP TABLE partition_move AS SELECT {MOVED_COLUMNS} FROM {PARTITIONED_TABLE} WITH NO DATA"
+        ))
+        moved = self.db.execute(text(f"""
+            WITH moved AS (
+                DELETE FROM {DEFAULT_PARTITION}
+                WHERE published_at >= :start AND published_at < :end
+                RETURNING {MOVED_COLUMNS}
+            )
+            INSERT INTO partition_move SELECT * FROM moved
+        """), bounds).rowcount
+        self.db.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {PARTITIONED_TABLE} "
+            f"FOR VALUES FROM ('{bounds['start']:%Y-%m-%d}') TO ('{bounds['end']:%Y-%m-%d}')"
+        ))
+        if moved:
+            self.db.execute(text(f"INSERT INTO {PARTITIONED_TABLE} ({MOVED_COLUMNS}) SELECT * FROM partition_move"))
+            self.db.execute(text(f"ANALYZE {name}"))
+        self.db.execute(text("DROP TABLE partition_move"))
+        return True
+
+    def ensure_partitions(self, months_ahead: int = 3) -> List[str]:
+        """
+        Creates partitions for every month with rows in the default partition
+        and for the current month plus `months_ahead` months. Returns the new names.
+        """
+        current = month_start(datetime.utcnow())
+        months = set(self.months_in_default())
+        months.update(add_months(current, i) for i in range(months_ahead + 1))
+
+        created = []
+        for month in sorted(months):
+            if self.create_partition(month):
+                created.append(partition_name(month))
+        return created
@@ -0,0 +1,88 @@
+from datetime import datetime
+from typing import Iterator, List, Sequence, Tuple
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from backend.app.models.models import Entity, EntityRetagRun, Paper
+from backend.app.repositories.bulk_loader import CopyBuffer
+
+STAGING_DDL = """
+    CREATE TEMP TABLE IF NOT EXISTS paper_entities_retag (
+        paper_id integer, entity_id integer, published_at timestamp,
+        evidence text, confidence double precision
+    ) ON COMMIT DELETE ROWS
+"""
+
+MERGE_SQL = """
+    INSERT INTO paper_entities (paper_id, entity_id, published_at, evidence, confidence, created_at)
+    SELECT DISTINCT ON (paper_id, entity_id)
+           paper_id, entity_id, published_at, evidence, confidence, now() AT TIME ZONE 'utc'
+    FROM paper_entities_retag
+    ORDER BY paper_id, entity_id, confidence DESC
+    ON CONFLICT (paper_id, entity_id, published_at) DO NOTHING
+"""
+
+
+class RetagRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def last_entity_id(self) -> int:
+        """Highest entity id covered by a finished run, 0 before the first one"""
+        return self.db.query(func.coalesce(func.max(EntityRetagRun.last_entity_id), 0)).filter(
+            EntityRetagRun.finished_at.isnot(None)
+        ).scalar()
+
+    def max_entity_id(self) -> int:
+        return self.db.query(func.coalesce(func.max(Entity.id), 0)).scalar()
+
+    def entity_names_between(self, after_id: int, last_id: int) -> List[str]:
+        rows = self.db.query(Entity.name).filter(Entity.id > after_id, Entity.id <= last_id).all()
+        return [row.name for row in rows]
+
+    def paper_id_range(self) -> Tuple[int, int]:
+        low, high = self.db.query(func.min(Paper.id), func.max(Paper.id)).one()
+        return low or 0, high or 0
+
+    def iter_papers(self, first_id: int, last_id: int, batch_size: int = 2000) -> Iterator[Tuple[int, str, datetime]]:
+        """(id, abstract, published_at) of papers with first_id <= id <= last_id, streamed"""
+        query = (
+            self.db.query(Paper.id, Paper.abstract, func.coalesce(Paper.published_at, Paper.created_at))
+            .filter(Paper.id >= first_id, Paper.id <= last_id, Paper.abstract.isnot(None))
+            .order_by(Paper.id)
+            .yield_per(batch_size)
+        )
+        return iter(query)
+
+    def insert_links(self, rows: Sequence[Tuple[int, int, datetime, str, float]]) -> int:
+        """
+        COPYs (paper_id, entity_id, published_at, evidence, confidence) rows into
+        a staging table and merges them into paper_entities in one statement.
+        Returns the links added; existing links are left untouched.
+        """
+        if not rows:
+            return 0
+        buffer = CopyBuffer()
+        for row in rows:
+            buffer.add(row)
+        buffer.buffer.seek(0)
+        self.db.execute(text(STAGING_DDL))
+        cursor = self.db.connection().connection.cursor()
+        cursor.copy_expert(
+            "COPY paper_entities_retag (paper_id, entity_id, published_at, evidence, confidence) FROM STDIN WITH (FORMAT csv)",
+            buffer.buffer,
+        )
+        added = self.db.execute(text(MERGE_SQL)).rowcount
+        self.db.execute(text("TRUNCATE paper_entities_retag"))
+        return added
+
+    def start_run(self, after_entity_id: int, last_entity_id: int, entities: int) -> EntityRetagRun:
+        run = EntityRetagRun(after_entity_id=after_entity_id, last_entity_id=last_entity_id, entities=entities)
+        self.db.add(run)
+        self.db.flush()
+        return run
+
+    def finish_run(self, run: EntityRetagRun, papers_scanned: int, links_added: int):
+        run.papers_scanned = papers_scanned
+        run.links_added = links_added
+        run.finished_at = datetime.utcnow()
+        self.db.flush()
@@ -0,0 +1,136 @@
+from datetime import date, datetime, timedelta
+from typing import Optional, Set
+from sqlalchemy import Date, func, literal, select, text, type_coerce, union
+from sqlalchemy.orm import Session
+from backend.app.database import insert, is_sqlite
+from backend.app.models.models import (
+    PUBLISHED_WEEK_SQL, SQLITE_PUBLISHED_WEEK_SQL, DialectSQL, confidence_bucket,
+    Entity, EntityWeeklyCount, Paper, PaperEntity, PaperTag, RollupState,
+    TagEntityTypeWeeklyCount, TagWeeklyCount,
+)
+
+# Monday of papers.published_at, the week paper_entities.published_week holds for the same paper
+PAPER_WEEK = type_coerce(DialectSQL(PUBLISHED_WEEK_SQL, SQLITE_PUBLISHED_WEEK_SQL), Date)
+
+ROLLUP_TABLES = (EntityWeeklyCount, TagWeeklyCount, TagEntityTypeWeeklyCount)
+
+
+class RollupRepository:
+    """Watermarks and week-by-week recomputation of the trend rollup tables"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def lock(self, name: str):
+        """
+        Serializes refreshes of a rollup until the transaction ends. On SQLite
+        it takes the database write lock instead, so no other write is in
+        progress while the refresh reads.
+        """
+        if is_sqlite(self.db):
+            # A write statement, even one that changes nothing, begins the write transaction
+            self.db.execute(text("UPDATE rollup_states SET name = name WHERE 1 = 0"))
+        else:
+            self.db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": f"rollup:{name}"})
+
+    def get_watermark(self, name: str) -> Optional[datetime]:
+        return self.db.query(RollupState.watermark).filter(RollupState.name == name).scalar()
+
+    def set_watermark(self, name: str, watermark: datetime):
+        stmt = insert(RollupState).values(name=name, watermark=watermark, refreshed_at=datetime.utcnow())
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=["name"],
+            set_={"watermark": stmt.excluded.watermark, "refreshed_at": stmt.excluded.refreshed_at},
+        ))
+
+    def get_oldest_open_transaction(self) -> Optional[datetime]:
+        """
+        Start (UTC) of the oldest other transaction open on this database, or
+        None. Transactions of other roles are only visible to superusers and
+        pg_read_all_stats. On SQLite, lock() already waited for the only writer.
+        """
+        if is_sqlite(self.db):
+            return None
+        return self.db.execute(text("""
+            SELECT min(xact_start) AT TIME ZONE 'utc'
+            FROM pg_stat_activity
+            WHERE datname = current_database()
+              AND backend_type = 'client backend'
+              AND pid <> pg_backend_pid()
+        """)).scalar()
+
+    def get_weeks(self, since: Optional[datetime] = None) -> Set[date]:
+        """
+        Weeks whose rollups may be stale: weeks of papers tagged, and weeks
+        of entity links added, since `since` (ix_paper_tags_created_at,
+        ix_paper_entities_created_at). Without `since`, every week with a
+        tagged paper or an entity link.
+        """
+        tagged = select(PAPER_WEEK).select_from(PaperTag).join(Paper, Paper.id == PaperTag.paper_id).where(Paper.published_at.isnot(None))
+        linked = select(PaperEntity.published_week)
+        if since is not None:
+            tagged = tagged.where(PaperTag.created_at >= since)
+            linked = linked.where(PaperEntity.created_at >= since)
+        return set(self.db.execute(union(tagged, linked)).scalars())
+
+    def refresh_week(self, week: date) -> int:
+        """Recomputes one week of every rollup table; returns the rows written"""
+        begin = datetime.combine(week, datetime.min.time())
+        end = begin + timedelta(days=7)
+        for table in ROLLUP_TABLES:
+            self.db.query(table).filter(table.week == week).delete(synchronize_session=False)
+
+        # published_week uses ix_paper_entities_week_entity, the range prunes partitions
+        in_week = (
+            PaperEntity.published_week == week,
+            PaperEntity.published_at >= begin,
+            PaperEntity.published_at < end,
+        )
+        link_bucket = confidence_bucket(PaperEntity.confidence)
+        links = select(
+            literal(week, Date), PaperEntity.entity_id, link_bucket,
+            func.count(), func.sum(func.coalesce(PaperEntity.confidence, 1.0)),
+        ).where(*in_week).group_by(PaperEntity.entity_id, link_bucket)
+        written = self.db.execute(
+            insert(EntityWeeklyCount).from_select(["week", "entity_id", "confidence_bucket", "paper_count", "confidence_sum"], links)
+        ).rowcount
+
+        tag_bucket = confidence_bucket(PaperTag.confidence)
+        confidence = func.coalesce(PaperTag.confidence, 1.0)
+        volume = select(
+            literal(week, Date), PaperTag.tag, tag_bucket, func.count(), func.sum(confidence)
+        ).select_from(PaperTag).join(
+            Paper, Paper.id == PaperTag.paper_id
+        ).where(
+            Paper.published_at >= begin,
+            Paper.published_at < end,
+        ).group_by(PaperTag.tag, tag_bucket)
+        written += self.db.execute(
+            insert(TagWeeklyCount).from_select(["week", "tag", "confidence_bucket", "paper_count", "confidence_sum"], volume)
+        ).rowcount
+
+        # One row per paper and entity type first, so a paper counts once per type
+        mentions = select(
+            PaperEntity.paper_id, Entity.type.label("entity_type"), func.count().label("mentions")
+        ).join(
+            Entity, Entity.id == PaperEntity.entity_id
+        ).where(
+            *in_week,
+            Entity.type.isnot(None),
+        ).group_by(PaperEntity.paper_id, Entity.type).subquery()
+        by_type = select(
+            literal(week, Date), PaperTag.tag, tag_bucket, mentions.c.entity_type,
+            func.count(), func.sum(mentions.c.mentions), func.sum(confidence),
+        ).select_from(mentions).join(
+            PaperTag, PaperTag.paper_id == mentions.c.paper_id
+        ).group_by(PaperTag.tag, tag_bucket, mentions.c.entity_type)
+        written += self.db.execute(
+            insert(TagEntityTypeWeeklyCount).from_select(
+                ["week", "tag", "confidence_bucket", "entity_type", "paper_count", "mention_count", "confidence_sum"], by_type
+            )
+        ).rowcount
+        return written
+
+    def clear(self):
+        for table in ROLLUP_TABLES:
+            self.db.query(table).delete(synchronize_session=False)
@@ -0,0 +1,191 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import Integer, func, text, update
+from sqlalchemy.orm import Session
+from backend.app.models.models import EMBEDDING_DIM, Vector, Topic, PaperTopic, TopicWeeklyCount
+
+# Nearest centroid of `embedding` among the topics of one model; k is small,
+# so a sequential scan of topics per row is cheaper than any index
+NEAREST_TOPIC_SQL = """
+    SELECT c.id, c.centroid <=> {embedding} AS distance
+    FROM topics c
+    WHERE c.model = :model
+    ORDER BY 2
+    LIMIT 1
+"""
+
+
+class TopicRepository:
+    """
+    Topic centroids and paper assignments. Distances and centroid means are
+    computed by pgvector inside Postgres, so embeddings never leave the database.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def count_topics(self, model: str) -> int:
+        return self.db.query(func.count(Topic.id)).filter(Topic.model == model).scalar()
+
+    def get_centroids(self, model: str) -> Dict[int, Tuple[List[float], int]]:
+        """{topic_id: (centroid, size)}"""
+        rows = self.db.query(Topic.id, Topic.centroid, Topic.size).filter(Topic.model == model).all()
+        return {row.id: (row.centroid, row.size) for row in rows}
+
+    def clear(self):
+        """Drops every topic with its assignments and weekly counts"""
+        self.db.query(TopicWeeklyCount).delete(synchronize_session=False)
+        self.db.query(PaperTopic).delete(synchronize_session=False)
+        self.db.query(Topic).delete(synchronize_session=False)
+
+    def create_sample(self, model: str, size: int) -> int:
+        """Random sample of embeddings in a temp table, used to fit the centroids"""
+        self.db.execute(text("DROP TABLE IF EXISTS topic_sample"))
+        self.db.execute(text("""
+            CREATE TEMP TABLE topic_sample ON COMMIT DROP AS
+            SELECT paper_id, embedding
+            FROM paper_embeddings
+            WHERE model = :model
+            ORDER BY random()
+            LIMIT :size
+        """), {"model": model, "size": size})
+        return self.db.execute(text("SELECT count(*) FROM topic_sample")).scalar()
+
+    def add_topic_from_sample(self, model: str, paper_id: Optional[int] = None) -> int:
+        """New topic centred on a sample point, a random one if paper_id is None"""
+        now = datetime.utcnow()
+        return self.db.execute(text(f"""
+            INSERT INTO topics (centroid, model, size, created_at, updated_at)
+            SELECT embedding, :model, 0, :now, :now
+            FROM topic_sample
+            {"ORDER BY random()" if paper_id is None else "WHERE paper_id = :paper_id"}
+            LIMIT 1
+            RETURNING id
+        """), {"model": model, "now": now, "paper_id": paper_id}).scalar()
+
+    def sample_distances(self, topic_id: int) -> List[Tuple[int, float]]:
+        """(paper_id, cosine distance) from every sample point to a topic's centroid"""
+        return self.db.execute(text("""
+            SELECT s.paper_id, s.embedding <=> t.centroid
+            FROM topic_sample s, topics t
+            WHERE t.id = :topic_id
+        """), {"topic_id": topic_id}).all()
+
+    def lloyd_step(self, model: str) -> float:
+        """
+        One k-means iteration over the sample: assigns every point to its
+        nearest centroid and moves each centroid to the mean of its points.
+        Returns the summed distance of the points to the centroids before the move.
+        """
+        return self.db.execute(text(f"""
+            WITH assigned AS (
+                SELECT t.id AS topic_id, t.distance, s.embedding
+                FROM topic_sample s
+                CROSS JOIN LATERAL ({NEAREST_TOPIC_SQL.format(embedding="s.embedding")}) t
+            ), moved AS (
+                UPDATE topics c
+                SET centroid = m.centroid
+                FROM (SELECT topic_id, avg(embedding) AS centroid FROM assigned GROUP BY topic_id) m
+                WHERE c.id = m.topic_id
+            )
+            SELECT coalesce(sum(distance), 0) FROM assigned
+        """), {"model": model}).scalar()
+
+    def assign_page(self, model: str, after_id: int, limit: int):
+        """
+        Assigns the next `limit` unassigned embeddings after `after_id` to their
+        nearest topic and adds them to the weekly counts. Returns one row per
+        topic that received papers: (topic_id, papers, mean embedding, last paper_id).
+        """
+        stmt = text(f"""
+            WITH page AS (
+                SELECT e.paper_id, e.embedding
+                FROM paper_embeddings e
+                WHERE e.model = :model
+                  AND e.paper_id > :after_id
+                  AND NOT EXISTS (SELECT 1 FROM paper_topics pt WHERE pt.paper_id = e.paper_id)
+                ORDER BY e.paper_id
+                LIMIT :limit
+            ), nearest AS (
+                SELECT page.paper_id, page.embedding, t.id AS topic_id, t.distance
+                FROM page
+                CROSS JOIN LATERAL ({NEAREST_TOPIC_SQL.format(embedding="page.embedding")}) t
+            ), assigned AS (
+                INSERT INTO paper_topics (paper_id, topic_id, distance, assigned_at)
+                SELECT paper_id, topic_id, distance, :now FROM nearest
+                ON CONFLICT (paper_id) DO NOTHING
+                RETURNING paper_id, topic_id
+            ), weekly AS (
+                INSERT INTO topic_weekly_counts (topic_id, week, paper_count)
+                SELECT a.topic_id, date_trunc('week', coalesce(p.published_at, p.created_at))::date, count(*)
+                FROM assigned a
+                JOIN papers p ON p.id = a.paper_id
+                GROUP BY 1, 2
+                ON CONFLICT (topic_id, week)
+                DO UPDATE SET paper_count = topic_weekly_counts.paper_count + EXCLUDED.paper_count
+            )
+            SELECT topic_id, count(*) AS papers, avg(embedding) AS mean, max(paper_id) AS last_id
+            FROM nearest
+            GROUP BY topic_id
+        """).columns(topic_id=Integer, papers=Integer, mean=Vector(EMBEDDING_DIM), last_id=Integer)
+        return self.db.execute(stmt, {"model": model, "after_id": after_id, "limit": limit, "now": datetime.utcnow()}).all()
+
+    def update_centroids(self, rows: List[dict]):
+        """rows: {"id", "centroid", "size"} per topic"""
+        if rows:
+            now = datetime.utcnow()
+            self.db.execute(update(Topic), [{**row, "updated_at": now} for row in rows])
+
+    def recompute_centroids(self, model: str):
+        """Sets every centroid to the exact mean of its assigned papers and drops empty topics"""
+        self.db.execute(text("""
+            UPDATE topics c
+            SET centroid = m.centroid, size = m.papers, updated_at = :now
+            FROM (
+                SELECT pt.topic_id, avg(e.embedding) AS centroid, count(*) AS papers
+                FROM paper_topics pt
+                JOIN paper_embeddings e ON e.paper_id = pt.paper_id
+                GROUP BY pt.topic_id
+            ) m
+            WHERE c.id = m.topic_id AND c.model = :model
+        """), {"model": model, "now": datetime.utcnow()})
+        self.db.query(Topic).filter(Topic.model == model, Topic.size == 0).delete(synchronize_session=False)
+
+    def analyze(self):
+        """Refreshes planner statistics after a bulk (re)assignment"""
+        self.db.execute(text("ANALYZE paper_topics, topic_weekly_counts"))
+
+    def label_topics(self, terms: int = 5):
+        """
+        Labels every topic with its top entities by TF-IDF: how often an entity
+        occurs in the topic's papers, weighted down by how many papers mention
+        it overall.
+        """
+        self.db.execute(text("""
+            WITH tf AS (
+                SELECT pt.topic_id, pe.entity_id, count(*) AS tf
+                FROM paper_topics pt
+                JOIN paper_entities pe ON pe.paper_id = pt.paper_id
+                GROUP BY pt.topic_id, pe.entity_id
+            ), df AS (
+                SELECT entity_id, sum(tf) AS df FROM tf GROUP BY entity_id
+            ), ranked AS (
+                SELECT tf.topic_id, e.name,
+                       row_number() OVER (
+                           PARTITION BY tf.topic_id
+                           ORDER BY tf.tf * ln((SELECT count(*) FROM paper_topics)::float8 / df.df) DESC, e.name
+                       ) AS rank
+                FROM tf
+                JOIN df ON df.entity_id = tf.entity_id
+                JOIN entities e ON e.id = tf.entity_id
+            ), labels AS (
+                SELECT topic_id, array_agg(name ORDER BY rank) AS terms
+                FROM ranked
+                WHERE rank <= :terms
+                GROUP BY topic_id
+            )
+            UPDATE topics t
+            SET terms = labels.terms, label = array_to_string(labels.terms[1:3], ' / ')
+            FROM labels
+            WHERE t.id = labels.topic_id
+        """), {"terms": terms})
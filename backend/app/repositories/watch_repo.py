@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from backend.app.models.models import WatchQuery
+
+
+class WatchRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def list_queries(self) -> List[WatchQuery]:
+        return self.db.query(WatchQuery).order_by(WatchQuery.name).all()
+
+    def get_by_name(self, name: str) -> Optional[WatchQuery]:
+        return self.db.query(WatchQuery).filter(WatchQuery.name == name).first()
+
+    def save_query(self, name: str, query: str, max_results: Optional[int] = None, interval_minutes: Optional[int] = None) -> WatchQuery:
+        """Adds a saved query, or updates the one with this name; a changed query string restarts its watermark"""
+        watch = self.get_by_name(name)
+        if watch is None:
+            watch = WatchQuery(name=name, query=query)
+            self.db.add(watch)
+        elif watch.query != query:
+            watch.query = query
+            watch.watermark = None
+        if max_results is not None:
+            watch.max_results = max_results
+        if interval_minutes is not None:
+            watch.interval_minutes = interval_minutes
+        self.db.flush()
+        return watch
+
+    def remove_query(self, name: str) -> bool:
+        return self.db.query(WatchQuery).filter(WatchQuery.name == name).delete(synchronize_session=False) > 0
+
+    def due_queries(self, now: datetime) -> List[WatchQuery]:
+        """Queries never run, or whose interval has passed since their last run"""
+        return [
+            watch for watch in self.list_queries()
+            if watch.last_run_at is None or watch.last_run_at + timedelta(minutes=watch.interval_minutes) <= now
+        ]
+
+    def next_due_at(self) -> Optional[datetime]:
+        times = [
+            watch.last_run_at + timedelta(minutes=watch.interval_minutes) if watch.last_run_at else datetime.min
+            for watch in self.list_queries()
+        ]
+        return min(times) if times else None
+
+    def record_run(self, watch: WatchQuery, now: datetime, watermark: Optional[datetime], fetched: int, new: int):
+        if watermark is not None and (watch.watermark is None or watermark > watch.watermark):
+            watch.watermark = watermark
+        watch.last_run_at = now
+        watch.last_fetched = fetched
+        watch.last_new = new
+        self.db.flush()
@@ -148,6 +148,33 @@ class CanonicalMergeResponse(BaseModel):
     canonical_name: str
     aliases: List[str]
 
+class EntityTimelineResponse(BaseModel):
+    id: int
+    canonical_id: int = Field(description="Root of the entity's canonical group; counts cover it and all its aliases")
+    name: str
+    type: Optional[str]
+    aliases: List[int]
+    counts: List[int] = Field(description="Papers per week, aligned with `weeks`")
+    total: int
+
+class EntityTimelineWeeksResponse(EntityTimelineResponse):
+    weeks: List[date]
+
+class EntityTimelinesResponse(BaseModel):
+    weeks: List[date]
+    timelines: List[EntityTimelineResponse]
+
+# ============== Semantic Search Schemas ==============
+
+class SimilarPaperResponse(BaseModel):
+    id: int
+    arxiv_id: str
+    title: str
+    authors: List[str]
+    published_at: Optional[datetime]
+    url: Optional[str]
+    score: float = Field(description="Cosine similarity, 1.0 for identical embeddings")
+
 
 # ============== Step-A: LLM Extraction Schemas ==============
 class ExtractedEntity(BaseModel):
@@ -162,6 +189,16 @@ class PaperExtractionSchema(BaseModel):
     libraries: List[ExtractedEntity] = Field(description="Libraries or tools used (e.g., LangChain, TensorFlow)")
 
 # ============== LLM Step B: Paper Classification ==============
+TAXONOMY_TAGS = [
+    "Retrieval/RAG",
+    "Agents/Tool Use",
+    "Evaluation/Benchmarks",
+    "Alignment/Safety",
+    "Multimodal",
+    "Systems/Optimization",
+    "Other",
+]
+
 class PaperClassificationTag(BaseModel):
     tag: str = Field(description="Taxonomy tag for the paper")
     confidence: float = Field(description="Confidence score", ge=0.0, le=1.0)
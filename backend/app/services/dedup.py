@@ -0,0 +1,157 @@
+"""
+Cross-version and near-duplicate paper detection.
+
+arXiv entry ids carry a version suffix (http://arxiv.org/abs/2401.12345v2);
+papers.base_id drops it (see `split_arxiv_id` in models.py), so a new version
+maps onto the existing row.
+
+Near-duplicates (the same text under a different id) are found with MinHash
+over word 3-shingles of title + abstract. Signatures use one-permutation
+hashing: each shingle is hashed once and kept as the minimum of one of
+NUM_PERM bins, with empty bins filled from their right neighbour. The
+signature is split into BANDS bands of ROWS values; papers sharing any band
+bucket are candidates, and a candidate whose estimated Jaccard similarity
+reaches SIMILARITY_THRESHOLD is a duplicate. Bands live in
+paper_lsh_buckets, so a lookup is BANDS index probes however large the
+corpus is, and new papers are added without rebuilding anything.
+"""
+import hashlib
+import re
+import struct
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.app.models.models import Paper
+from backend.app.repositories.fingerprint_repo import FingerprintRepository
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+# Shorter texts (a bare title, an empty abstract) match too easily to be trusted
+MIN_SHINGLES = 10
+# With 16 bands of 8 rows a pair at 0.8 Jaccard shares a bucket with ~95% probability, at 0.9 with >99.9%
+SIMILARITY_THRESHOLD = 0.8
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+MAX_HASH = (1 << 57) - 1
+DENSIFY_OFFSET = 0x9E3779B97F4A7C15
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def shingles(text: str) -> set:
+    words = TOKEN_RE.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return set(words)
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(text: str) -> Optional[List[int]]:
+    """NUM_PERM-value signature of the text, or None if it is too short to compare"""
+    features = shingles(text)
+    if len(features) < MIN_SHINGLES:
+        return None
+    bins = [None] * NUM_PERM
+    for feature in features:
+        h = _hash64(feature)
+        index, value = h % NUM_PERM, h >> 7
+        if bins[index] is None or value < bins[index]:
+            bins[index] = value
+    # Densify: an empty bin takes the nearest filled bin to its right, offset by the distance
+    signature = []
+    for i in range(NUM_PERM):
+        distance = 0
+        while bins[(i + distance) % NUM_PERM] is None:
+            distance += 1
+        signature.append((bins[(i + distance) % NUM_PERM] + distance * DENSIFY_OFFSET) & MAX_HASH)
+    return signature
+
+
+def band_buckets(signature: List[int]) -> List[Tuple[int, int]]:
+    """(band, bucket) keys of a signature; bucket is a signed 64-bit hash of the band's values"""
+    keys = []
+    for band in range(BANDS):
+        chunk = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(struct.pack(f">{ROWS}Q", *chunk), digest_size=8).digest()
+        keys.append((band, int.from_bytes(digest, "big", signed=True)))
+    return keys
+
+
+def estimate_similarity(a: List[int], b: List[int]) -> float:
+    """Estimated Jaccard similarity: the share of equal signature positions"""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+
+def paper_signature(paper: Paper) -> Optional[List[int]]:
+    return minhash_signature(f"{paper.title or ''} {paper.abstract or ''}")
+
+
+class DedupService:
+    def __init__(self, fingerprint_repo: FingerprintRepository, threshold: float = SIMILARITY_THRESHOLD):
+        self.fingerprint_repo = fingerprint_repo
+        self.threshold = threshold
+
+    def register(self, papers: List[Paper]) -> Dict[int, Tuple[int, float]]:
+        """
+        Fingerprints papers that have no fingerprint yet and adds them to the
+        LSH index. Returns {paper_id: (duplicate_of_id, similarity)} for new
+        papers that match an earlier paper, including one earlier in `papers`.
+        """
+        known = self.fingerprint_repo.fingerprinted_ids([paper.id for paper in papers])
+        pending = []
+        for paper in papers:
+            if paper.id in known:
+                continue
+            known.add(paper.id)
+            signature = paper_signature(paper)
+            if signature is not None:
+                pending.append((paper, signature, band_buckets(signature)))
+        if not pending:
+            return {}
+
+        keys = {key for _, _, buckets in pending for key in buckets}
+        members, signatures = self.fingerprint_repo.bucket_members(keys)
+
+        matches = {}
+        rows = []
+        for paper, signature, buckets in pending:
+            candidates = set()
+            for key in buckets:
+                candidates.update(members.get(key, ()))
+            best = None
+            for candidate in candidates:
+                similarity = estimate_similarity(signature, signatures[candidate])
+                # Prefer the most similar paper, then the oldest one
+                if similarity >= self.threshold and (best is None or (similarity, -candidate) > (best[1], -best[0])):
+                    best = (candidate, similarity)
+            if best:
+                matches[paper.id] = best
+            rows.append((paper.id, signature, buckets, best))
+
+            signatures[paper.id] = signature
+            for key in buckets:
+                members.setdefault(key, []).append(paper.id)
+
+        self.fingerprint_repo.save_fingerprints(rows)
+        return matches
+
+    def backfill(self, batch_size: int = 2000, limit: Optional[int] = None, progress: Optional[Callable[[dict], None]] = None) -> dict:
+        """Fingerprints every paper without one, oldest id first, committing per batch"""
+        db = self.fingerprint_repo.db
+        stats = {"fingerprinted": 0, "duplicates": 0}
+        after_id = 0
+        while limit is None or stats["fingerprinted"] < limit:
+            size = batch_size if limit is None else min(batch_size, limit - stats["fingerprinted"])
+            papers = self.fingerprint_repo.get_papers_without_fingerprint(size, after_id=after_id)
+            if not papers:
+                break
+            stats["duplicates"] += len(self.register(papers))
+            stats["fingerprinted"] += len(papers)
+            db.commit()
+            after_id = papers[-1].id
+            if progress:
+                progress(stats)
+        return stats
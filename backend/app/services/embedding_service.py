@@ -0,0 +1,78 @@
+from typing import Callable, List, Optional
+from langchain_core.embeddings import Embeddings
+from backend.app import metrics
+from backend.app.llm.embeddings import embedding_model_name, get_embedding_model, paper_text
+from backend.app.models.models import Paper
+from backend.app.repositories.embedding_repo import EmbeddingRepository
+
+
+class EmbeddingService:
+    """
+    Computes paper embeddings with the configured model and answers
+    similarity queries from the pgvector HNSW index.
+    """
+
+    def __init__(self, embedding_repo: EmbeddingRepository, model: Optional[Embeddings] = None, model_name: Optional[str] = None):
+        self.embedding_repo = embedding_repo
+        self.model = model or get_embedding_model()
+        self.model_name = model_name or embedding_model_name()
+
+    async def embed_papers(self, papers: List[Paper]) -> int:
+        """Embeds the papers that have no embedding from this model yet. Returns how many were embedded."""
+        done = self.embedding_repo.embedded_ids([paper.id for paper in papers], self.model_name)
+        pending = [paper for paper in papers if paper.id not in done]
+        if not pending:
+            return 0
+        with metrics.INGEST_STAGE_SECONDS.time(stage="embedding"):
+            vectors = await self.model.aembed_documents([paper_text(p.title, p.abstract) for p in pending])
+        with metrics.INGEST_STAGE_SECONDS.time(stage="embedding_persist"):
+            self.embedding_repo.save_embeddings(
+                [(paper.id, vector) for paper, vector in zip(pending, vectors)], self.model_name
+            )
+        return len(pending)
+
+    async def backfill(self, batch_size: int = 256, limit: Optional[int] = None, progress: Optional[Callable[[int], None]] = None, rebuild_index: bool = False) -> int:
+        """
+        Embeds every paper that is missing an embedding, committing per batch.
+        With rebuild_index the HNSW index is dropped first and built once at
+        the end, which is much faster when the backlog is large.
+        """
+        db = self.embedding_repo.db
+        if rebuild_index:
+            self.embedding_repo.drop_index()
+            db.commit()
+        try:
+            return await self._backfill(batch_size, limit, progress)
+        finally:
+            if rebuild_index:
+                db.rollback()
+                self.embedding_repo.create_index()
+                db.commit()
+
+    async def _backfill(self, batch_size, limit, progress) -> int:
+        db = self.embedding_repo.db
+        total = 0
+        after_id = 0
+        while limit is None or total < limit:
+            size = batch_size if limit is None else min(batch_size, limit - total)
+            papers = self.embedding_repo.get_papers_without_embedding(self.model_name, size, after_id=after_id)
+            if not papers:
+                break
+            total += await self.embed_papers(papers)
+            db.commit()
+            after_id = papers[-1].id
+            if progress:
+                progress(total)
+        return total
+
+    def similar_papers(self, paper_id: int, limit: int = 10):
+        """Nearest neighbours of a stored paper, or None if it has no embedding"""
+        vector = self.embedding_repo.get_embedding(paper_id)
+        if vector is None:
+            return None
+        return self.embedding_repo.nearest(vector, limit=limit, exclude_paper_id=paper_id)
+
+    def search(self, query: str, limit: int = 10):
+        """Papers closest to a free-text query"""
+        vector = self.model.embed_query(query)
+        return self.embedding_repo.nearest(vector, limit=limit)
@@ -0,0 +1,290 @@
+"""
+Dictionary-based entity extraction from abstracts, ahead of the LLM.
+
+Every name in `entities` (aliases included) is compiled into an Aho-Corasick
+automaton over word tokens, so one left-to-right pass over an abstract finds
+every known name however large the dictionary is. Matches are resolved to
+the canonical entity through `canonical_id`; overlapping matches keep the
+longest, leftmost one ("Vision Transformer" over "Transformer").
+
+Each match gets a confidence: EXACT_CASE_CONFIDENCE when the text has the
+name's exact spelling, FOLDED_CASE_CONFIDENCE when only the case differs
+(names of SHORT_NAME characters or fewer must match exactly, so "rag" is not
+RAG), lowered by AMBIGUOUS_PENALTY when the name exists under several entity
+types. Entity-like terms in the abstract (acronyms, CamelCase, names with
+digits) that no match covers are reported as unknown.
+
+The policy (ENTITY_DICTIONARY) decides how ingestion uses the result:
+- off: the LLM extracts every paper, as before
+- assist (default): matches are saved, and the LLM still runs and adds what it finds
+- skip: matches are saved, and the LLM extraction call is skipped for papers
+  with at least ENTITY_DICTIONARY_MIN_MATCHES matches and no more than
+  1 - ENTITY_DICTIONARY_MIN_COVERAGE of their entity-like terms unknown
+
+skip is opt-in because coverage only sees entity-like terms: a new lowercase
+entity ("contrastive decoding") in a skipped paper is never extracted.
+"""
+import os
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from backend.app.models.models import Paper
+from backend.app.repositories.entity_repo import EntityRepository
+
+MODES = ("off", "assist", "skip")
+DICTIONARY_MODE = os.getenv("ENTITY_DICTIONARY", "assist")
+MIN_MATCHES = int(os.getenv("ENTITY_DICTIONARY_MIN_MATCHES", "2"))
+MIN_COVERAGE = float(os.getenv("ENTITY_DICTIONARY_MIN_COVERAGE", "1.0"))
+
+EXACT_CASE_CONFIDENCE = 0.95
+FOLDED_CASE_CONFIDENCE = 0.8
+AMBIGUOUS_PENALTY = 0.75
+SHORT_NAME = 3
+
+# Words and single punctuation marks; whitespace, hyphens and slashes only separate,
+# so "GPT-4", "GPT 4" and "gpt/4" tokenize alike while "C++" keeps its pluses
+TOKEN_RE = re.compile(r"[^\W_]+|[^\w\s\-/]")
+# Acronyms (BERT, GPT-4), CamelCase (ImageNet, PyTorch) and names with digits (ResNet-50, T5)
+ENTITY_LIKE_RE = re.compile(
+    r"\b(?:[A-Z]{2,}[A-Za-z0-9]*|[A-Z][a-z]+[A-Z][A-Za-z0-9]*|[A-Za-z]+\d+[A-Za-z0-9]*)(?:-[A-Za-z0-9]+)*\b"
+)
+EVIDENCE_CHARS = 40
+
+
+def tokenize(text: str) -> List[Tuple[str, int, int]]:
+    """(token, start, end) with character offsets into text"""
+    return [(m.group(0), m.start(), m.end()) for m in TOKEN_RE.finditer(text)]
+
+
+def _evidence(text: str, start: int, end: int) -> str:
+    """The match with up to EVIDENCE_CHARS of context on each side, without cut-off words"""
+    lo, hi = max(0, start - EVIDENCE_CHARS), min(len(text), end + EVIDENCE_CHARS)
+    words = text[lo:hi].split()
+    if lo > 0 and not text[lo - 1].isspace():
+        words = words[1:]
+    if hi < len(text) and not text[hi].isspace():
+        words = words[:-1]
+    return " ".join(words)
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton whose alphabet is lower-cased tokens"""
+
+    def __init__(self, patterns: Iterable[Tuple[Sequence[str], Hashable]]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        # (pattern length, value) for every pattern ending in a state, including via fail links
+        self.out: List[List[Tuple[int, Hashable]]] = [[]]
+        for tokens, value in patterns:
+            self._add(tokens, value)
+        self._link()
+
+    def _add(self, tokens: Sequence[str], value: Hashable):
+        state = 0
+        for token in tokens:
+            nxt = self.goto[state].get(token)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][token] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            state = nxt
+        self.out[state].append((len(tokens), value))
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and token not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(token, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def search(self, tokens: Sequence[str]) -> Iterator[Tuple[int, int, Hashable]]:
+        """(first token index, end token index, value) of every pattern occurrence"""
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for i, token in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for length, value in out[state]:
+                yield i + 1 - length, i + 1, value
+
+
+@dataclass
+class DictionaryMatch:
+    entity_id: int
+    name: str
+    type: str
+    evidence: str
+    confidence: float
+    start: int
+    end: int
+
+
+@dataclass
+class DictionaryExtraction:
+    matches: List[DictionaryMatch] = field(default_factory=list)
+    unknown_terms: List[str] = field(default_factory=list)
+    # Share of the abstract's entity-like terms covered by a match (1.0 when it has none)
+    coverage: float = 1.0
+
+
+class EntityDictionary:
+    """Known entity names compiled for matching; build with `from_rows` or `DictionaryExtractor.load`"""
+
+    def __init__(self, entries: Dict[Tuple[str, ...], List[Tuple[str, Tuple[str, ...], int, str]]]):
+        # lower-cased tokens -> [(name, its tokens, canonical entity id, canonical entity type)]
+        self.entries = entries
+        self.automaton = AhoCorasick((key, key) for key in entries)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[int, str, str, Optional[int]]]) -> "EntityDictionary":
+        """rows: (id, name, type, canonical_id) of every entity"""
+        rows = list(rows)
+        parent = {entity_id: canonical_id for entity_id, _, _, canonical_id in rows}
+        types = {entity_id: entity_type for entity_id, _, entity_type, _ in rows}
+
+        def canonical(entity_id):
+            seen = set()
+            while parent.get(entity_id) and entity_id not in seen:
+                seen.add(entity_id)
+                entity_id = parent[entity_id]
+            return entity_id
+
+        entries: Dict[Tuple[str, ...], List[Tuple[str, Tuple[str, ...], int, str]]] = {}
+        for entity_id, name, _, _ in rows:
+            name_tokens = tuple(token for token, _, _ in tokenize(name))
+            if not name_tokens:
+                continue
+            target = canonical(entity_id)
+            candidates = entries.setdefault(cls.key(name), [])
+            if all(existing[0] != name or existing[2] != target for existing in candidates):
+                candidates.append((name, name_tokens, target, types.get(target, types[entity_id])))
+        return cls(entries)
+
+    @staticmethod
+    def key(name: str) -> Tuple[str, ...]:
+        """The lower-cased tokens a name is matched by"""
+        return tuple(token.lower() for token, _, _ in tokenize(name))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def extract(self, text: str, only_keys: Optional[set] = None, with_unknown: bool = True) -> DictionaryExtraction:
+        """
+        Matches in text. With only_keys, overlaps are still resolved against
+        every name but only matches of those keys are returned, so a new
+        "Transformer" does not match inside a known "Vision Transformer".
+        """
+        if not text:
+            return DictionaryExtraction()
+        tokens = tokenize(text)
+        lowered = [token.lower() for token, _, _ in tokens]
+
+        # Leftmost-longest, non-overlapping
+        spans = sorted(self.automaton.search(lowered), key=lambda m: (m[0], m[0] - m[1]))
+        accepted = []
+        next_free = 0
+        for first, end, key in spans:
+            if first >= next_free:
+                accepted.append((first, end, key))
+                next_free = end
+
+        best: Dict[int, DictionaryMatch] = {}
+        covered = []
+        for first, end, key in accepted:
+            if only_keys is not None and key not in only_keys:
+                continue
+            start_char, end_char = tokens[first][1], tokens[end - 1][2]
+            surface = tuple(token for token, _, _ in tokens[first:end])
+            scored = []
+            for name, name_tokens, entity_id, entity_type in self.entries[key]:
+                exact = name_tokens == surface
+                if not exact and sum(len(token) for token in surface) <= SHORT_NAME:
+                    continue
+                scored.append((exact, name, entity_id, entity_type))
+            if any(exact for exact, _, _, _ in scored):
+                scored = [candidate for candidate in scored if candidate[0]]
+            if not scored:
+                continue
+            covered.append((start_char, end_char))
+            ambiguous = len({entity_type for _, _, _, entity_type in scored}) > 1
+            for exact, name, entity_id, entity_type in scored:
+                confidence = EXACT_CASE_CONFIDENCE if exact else FOLDED_CASE_CONFIDENCE
+                if ambiguous:
+                    confidence = round(confidence * AMBIGUOUS_PENALTY, 4)
+                if entity_id not in best or confidence > best[entity_id].confidence:
+                    best[entity_id] = DictionaryMatch(
+                        entity_id=entity_id,
+                        name=name,
+                        type=entity_type,
+                        evidence=_evidence(text, start_char, end_char),
+                        confidence=confidence,
+                        start=start_char,
+                        end=end_char,
+                    )
+
+        if not with_unknown:
+            return DictionaryExtraction(matches=list(best.values()))
+        terms = {}
+        for m in ENTITY_LIKE_RE.finditer(text):
+            inside = any(start <= m.start() and m.end() <= end for start, end in covered)
+            terms[m.group(0)] = terms.get(m.group(0), False) or inside
+        unknown = [term for term, known in terms.items() if not known]
+        coverage = 1 - len(unknown) / len(terms) if terms else 1.0
+        return DictionaryExtraction(matches=list(best.values()), unknown_terms=unknown, coverage=coverage)
+
+
+# Compiled dictionaries by database URL, reused while the entities table is unchanged
+_cache: Dict[str, Tuple[tuple, EntityDictionary]] = {}
+
+
+class DictionaryExtractor:
+    """Applies the entity dictionary to papers under the configured policy"""
+
+    def __init__(self, entity_repo: EntityRepository, mode: str = DICTIONARY_MODE, min_matches: int = MIN_MATCHES, min_coverage: float = MIN_COVERAGE):
+        if mode not in MODES:
+            raise ValueError(f"ENTITY_DICTIONARY must be one of {', '.join(MODES)}, got {mode!r}")
+        self.entity_repo = entity_repo
+        self.mode = mode
+        self.min_matches = min_matches
+        self.min_coverage = min_coverage
+        self._dictionary: Optional[EntityDictionary] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def load(self, refresh: bool = False) -> EntityDictionary:
+        """The dictionary for the current entities table, rebuilt only when the table changed"""
+        if self._dictionary is not None and not refresh:
+            return self._dictionary
+        url = str(self.entity_repo.db.get_bind().url)
+        version = self.entity_repo.dictionary_version()
+        cached = _cache.get(url)
+        if cached is None or cached[0] != version:
+            cached = (version, EntityDictionary.from_rows(self.entity_repo.get_dictionary_rows()))
+            _cache[url] = cached
+        self._dictionary = cached[1]
+        return self._dictionary
+
+    def extract_papers(self, papers: List[Paper]) -> Dict[int, DictionaryExtraction]:
+        dictionary = self.load()
+        return {paper.id: dictionary.extract(paper.abstract or "") for paper in papers}
+
+    def skips_llm(self, extraction: DictionaryExtraction) -> bool:
+        """Whether the matches stand in for the LLM extraction of this paper"""
+        return (
+            self.mode == "skip"
+            and len(extraction.matches) >= self.min_matches
+            and extraction.coverage >= self.min_coverage
+        )
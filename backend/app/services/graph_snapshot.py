@@ -0,0 +1,105 @@
+"""
+Compact binary snapshot of the entity graph, served by `/graph/snapshot`.
+
+The Entity Explorer needs every entity and every co-occurrence edge. As JSON
+(`/entities/` plus `/trends/cooccurrence`) every name is repeated on each edge
+it touches. The snapshot is one msgpack document, gzip-compressed:
+
+    {"format": 1, "version": "...", "generated_at": "...", "since": "...", "days": 30,
+     "strings": [...], "types": [...],
+     "entities": {"id": [...], "name": [...], "type": [...], "canonical_id": [...]},
+     "edges": {"a": [...], "b": [...], "count": [...]}}
+
+Columns are parallel lists. Entity names and types are indexes into
+`strings` and `types`, and edges refer to entity ids. Edges join entities
+of the same type that share a paper published since `since`: the start of
+the current UTC day, minus `days`.
+
+The version hashes the entities table (EntityRepository.dictionary_version),
+the paper_entities rows in the window, and the window itself. It is the
+ETag, so clients revalidate with If-None-Match. Snapshots are cached per
+database and window, and rebuilt only when the version changes.
+"""
+import gzip
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Tuple
+
+import msgpack
+
+from backend.app.repositories import analytics_repo
+from backend.app.repositories.entity_repo import EntityRepository
+
+SNAPSHOT_FORMAT = 1
+
+# (database URL, days) -> (version, gzipped msgpack)
+_cache: Dict[Tuple[str, int], Tuple[str, bytes]] = {}
+_lock = threading.Lock()
+
+
+def window_start(days: int, now: datetime = None) -> datetime:
+    """Start of the edge window, on a day boundary so the version holds for the whole day"""
+    today = (now or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=days)
+
+
+class GraphSnapshotService:
+    def __init__(self, entity_repo: EntityRepository):
+        self.entity_repo = entity_repo
+        self.db = entity_repo.db
+
+    def version(self, days: int) -> str:
+        since = window_start(days)
+        key = (SNAPSHOT_FORMAT, since.isoformat(), self.entity_repo.dictionary_version(),
+               analytics_repo.paper_entities_version(self.db, since))
+        return hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+
+    def get(self, days: int) -> Tuple[str, bytes]:
+        """(version, gzipped msgpack) of the current graph, built only if the version changed"""
+        cache_key = (str(self.db.get_bind().url), days)
+        version = self.version(days)
+        cached = _cache.get(cache_key)
+        if cached is not None and cached[0] == version:
+            return cached
+        # One build per version, however many requests arrive while it runs
+        with _lock:
+            cached = _cache.get(cache_key)
+            if cached is None or cached[0] != version:
+                cached = (version, gzip.compress(self.build(days, version), compresslevel=6))
+                _cache[cache_key] = cached
+        return cached
+
+    def build(self, days: int, version: str) -> bytes:
+        since = window_start(days)
+        strings, string_index = [], {}
+        types, type_index = [], {}
+        ids, names, type_ids, canonical_ids = [], [], [], []
+        for entity_id, name, entity_type, canonical_id in sorted(self.entity_repo.get_dictionary_rows()):
+            if name not in string_index:
+                string_index[name] = len(strings)
+                strings.append(name)
+            if entity_type not in type_index:
+                type_index[entity_type] = len(types)
+                types.append(entity_type)
+            ids.append(entity_id)
+            names.append(string_index[name])
+            type_ids.append(type_index[entity_type])
+            canonical_ids.append(canonical_id)
+
+        edges = analytics_repo.get_cooccurrence_id_edges(self.db, since)
+        return msgpack.packb({
+            "format": SNAPSHOT_FORMAT,
+            "version": version,
+            "generated_at": datetime.utcnow().isoformat(),
+            "since": since.isoformat(),
+            "days": days,
+            "strings": strings,
+            "types": types,
+            "entities": {"id": ids, "name": names, "type": type_ids, "canonical_id": canonical_ids},
+            "edges": {
+                "a": [edge[0] for edge in edges],
+                "b": [edge[1] for edge in edges],
+                "count": [edge[2] for edge in edges],
+            },
+        })
@@ -0,0 +1,189 @@
+"""
+Ingestion of many arXiv queries in parallel (`cli.py ingest-many`).
+
+A manifest lists the queries, as JSON or YAML:
+
+    {"defaults": {"limit": 100, "chunk_size": 25},
+     "queries": [{"query": "retrieval augmented generation"},
+                 {"category": "cs.CL", "limit": 200, "name": "computation and language"}]}
+
+Each entry is one task for a process pool, largest limit first. A worker
+has its own DB session and LLM clients and runs
+IngestionService.fetch_and_save for one query at a time. Workers share:
+- the database: papers and entities are inserted with ON CONFLICT DO NOTHING
+  in a fixed order, and each enrichment chunk claims its papers' ingest
+  state rows with FOR UPDATE SKIP LOCKED, so a paper returned by several
+  queries is saved once and sent to the LLM once
+- an LLM budget: a semaphore that caps the LLM calls in flight across all
+  workers (see providers.llm_slot), whatever each worker's chunk size
+- an arXiv lock: API requests from all workers are spaced
+  ARXIV_DELAY_SECONDS apart, as arXiv asks of every client
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+import arxiv
+
+from backend.app.database import SessionLocal, engine
+from backend.app.llm.embeddings import get_embedding_model
+from backend.app.llm.entity_extraction import LLMService
+from backend.app.llm.paper_classification import ClassificationService
+from backend.app.llm.providers import set_llm_budget
+from backend.app.repositories.embedding_repo import EmbeddingRepository
+from backend.app.repositories.entity_repo import EntityRepository
+from backend.app.repositories.paper_repo import PaperRepository
+from backend.app.services.embedding_service import EmbeddingService
+from backend.app.services.ingestion_services import IngestionService
+
+DEFAULT_LIMIT = 50
+DEFAULT_CHUNK_SIZE = 25
+DEFAULT_LLM_CONCURRENCY = 16
+ARXIV_DELAY_SECONDS = 3.0
+
+
+@dataclass
+class IngestJob:
+    query: str
+    limit: int = DEFAULT_LIMIT
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+    name: str = ""
+
+
+def load_manifest(path: str) -> List[IngestJob]:
+    """
+    Jobs from a manifest: {"defaults": {...}, "queries": [...]} or just the
+    list. An entry is a query string or an object with `query` or `category`
+    (a `cat:` query) and optional `limit`, `chunk_size` and `name`.
+    """
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError("YAML manifests need PyYAML: pip install pyyaml") from e
+            manifest = yaml.safe_load(f)
+        else:
+            manifest = json.load(f)
+    if isinstance(manifest, list):
+        manifest = {"queries": manifest}
+    defaults = manifest.get("defaults") or {}
+
+    jobs = []
+    seen = set()
+    for entry in manifest.get("queries") or []:
+        if isinstance(entry, str):
+            entry = {"query": entry}
+        entry = {**defaults, **entry}
+        query = entry.get("query") or (f"cat:{entry['category']}" if entry.get("category") else None)
+        if not query:
+            raise ValueError(f"Manifest entry needs a query or a category: {entry}")
+        if query in seen:
+            continue
+        seen.add(query)
+        jobs.append(IngestJob(
+            query=query,
+            limit=int(entry.get("limit", DEFAULT_LIMIT)),
+            chunk_size=int(entry.get("chunk_size", DEFAULT_CHUNK_SIZE)),
+            name=entry.get("name") or query,
+        ))
+    return jobs
+
+
+class PacedArxivClient:
+    """arxiv.Client whose searches run one at a time, ARXIV_DELAY_SECONDS apart, across all workers"""
+
+    def __init__(self, lock, last_request, delay: float = ARXIV_DELAY_SECONDS):
+        self.client = arxiv.Client(num_retries=5, delay_seconds=delay)
+        self.lock = lock
+        self.last_request = last_request
+        self.delay = delay
+
+    def results(self, search: arxiv.Search):
+        with self.lock:
+            wait = self.last_request.value + self.delay - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                return list(self.client.results(search))
+            finally:
+                self.last_request.value = time.time()
+
+
+# Set in each worker process by _init_worker
+_arxiv_client: Optional[PacedArxivClient] = None
+
+
+def _init_worker(llm_budget, arxiv_lock, last_request):
+    global _arxiv_client
+    # Pooled connections inherited through fork belong to the parent process
+    engine.dispose(close=False)
+    set_llm_budget(llm_budget)
+    _arxiv_client = PacedArxivClient(arxiv_lock, last_request)
+
+
+def _build_service(db) -> IngestionService:
+    api_key = os.getenv("OPENAI_API_KEY")
+    return IngestionService(
+        paper_repo=PaperRepository(db),
+        entity_repo=EntityRepository(db),
+        llm_service=LLMService(api_key=api_key),
+        classification_service=ClassificationService(api_key=api_key),
+        arxiv_client=_arxiv_client,
+        embedding_service=EmbeddingService(EmbeddingRepository(db), model=get_embedding_model(api_key)),
+    )
+
+
+async def _ingest(job: IngestJob) -> dict:
+    result = {"name": job.name, "query": job.query, "papers": 0, "error": None, "pid": os.getpid()}
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        service = _build_service(db)
+        result["papers"], _ = await service.fetch_and_save(job.query, max_results=job.limit, chunk_size=job.chunk_size)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        result["error"] = str(e)
+    finally:
+        db.close()
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def _run_job(job: IngestJob) -> dict:
+    return asyncio.run(_ingest(job))
+
+
+def run_jobs(jobs: List[IngestJob], processes: Optional[int] = None, llm_concurrency: Optional[int] = DEFAULT_LLM_CONCURRENCY,
+             progress: Optional[Callable[[dict], None]] = None) -> List[dict]:
+    """
+    Runs the jobs on a pool of worker processes and returns one result per
+    job ({"name", "query", "papers", "seconds", "error", "pid"}) in completion
+    order. A failed job is reported, not raised, so the others still run.
+    llm_concurrency=None leaves LLM calls unbounded.
+    """
+    if not jobs:
+        return []
+    processes = min(processes or os.cpu_count() or 1, len(jobs))
+    context = multiprocessing.get_context()
+    llm_budget = context.BoundedSemaphore(llm_concurrency) if llm_concurrency else None
+    arxiv_lock = context.Lock()
+    last_request = context.Value("d", 0.0, lock=False)
+
+    results = []
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context, initializer=_init_worker,
+                             initargs=(llm_budget, arxiv_lock, last_request)) as pool:
+        # Longest jobs first, so the pool does not end waiting on one big query
+        futures = [pool.submit(_run_job, job) for job in sorted(jobs, key=lambda job: -job.limit)]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if progress:
+                progress(result)
+    return results
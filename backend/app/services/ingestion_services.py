@@ -1,41 +1,78 @@
 import asyncio
 import arxiv
 from datetime import datetime
+from typing import List, Optional
+from backend.app import metrics
 from backend.app.repositories.paper_repo import PaperRepository
 from backend.app.repositories.entity_repo import EntityRepository
+from backend.app.repositories.ingest_state_repo import IngestStateRepository
+from backend.app.repositories.fingerprint_repo import FingerprintRepository
+from backend.app.repositories.author_repo import AuthorRepository
+from backend.app.services.dedup import DedupService
+from backend.app.services.entity_dictionary import DictionaryExtractor
+from backend.app.services.embedding_service import EmbeddingService
 from backend.app.llm.entity_extraction import LLMService
 from backend.app.llm.paper_classification import ClassificationService
-from backend.app.models.models import EntityType
+from backend.app.models.models import EntityType, IngestStatus, Paper, split_arxiv_id
 from backend.app.schemas.schemas import PaperExtractionSchema
 
 class IngestionService:
-    def __init__(self, paper_repo: PaperRepository, entity_repo: EntityRepository, llm_service: LLMService, classification_service: ClassificationService):
+    def __init__(self, paper_repo: PaperRepository, entity_repo: EntityRepository, llm_service: LLMService, classification_service: ClassificationService, arxiv_client: Optional[arxiv.Client] = None, state_repo: Optional[IngestStateRepository] = None, embedding_service: Optional[EmbeddingService] = None, dedup_service: Optional[DedupService] = None, dictionary_extractor: Optional[DictionaryExtractor] = None, author_repo: Optional[AuthorRepository] = None):
         self.paper_repo = paper_repo
         self.entity_repo = entity_repo
         self.llm_service = llm_service
         self.classification_service = classification_service
+        self.arxiv_client = arxiv_client
+        self.state_repo = state_repo or IngestStateRepository(paper_repo.db)
+        self.embedding_service = embedding_service
+        self.dedup_service = dedup_service or DedupService(FingerprintRepository(paper_repo.db))
+        self.dictionary_extractor = dictionary_extractor or DictionaryExtractor(entity_repo)
+        self.author_repo = author_repo or AuthorRepository(paper_repo.db)
 
-    async def fetch_and_save(self, query: str, max_results: int = 10):
+    async def fetch_and_save(self, query: str, max_results: int = 10, chunk_size: Optional[int] = None):
         """
         Fetches papers from arXiv, saves them to DB, extracts entities via LLM,
         and saves entity relationships. Returns (count, list of saved papers with title, published_at, arxiv_id).
         Papers are sorted newest first (by published_at desc).
+
+        Papers whose enrichment already finished are not sent to the LLM again;
+        that includes new versions of a stored paper and near-duplicates of
+        an enriched one, which get a copy of its entities and tags instead.
+        With chunk_size set, the fetched papers and every chunk of enriched
+        papers are committed as they complete, so an interrupted run can be
+        picked up with `resume`.
+        """
+        results = self.fetch_results(query, max_results)
+        return await self.save_results(results, chunk_size=chunk_size)
+
+    def fetch_results(self, query: str, max_results: int, submitted_after: Optional[datetime] = None) -> list:
         """
-        client = arxiv.Client(num_retries=5, delay_seconds=5.0)
+        Runs an arXiv search, newest first. With submitted_after, only papers
+        first submitted at or after that minute are requested, oldest first,
+        so that max_results caps a run without skipping any paper.
+        """
+        client = self.arxiv_client or arxiv.Client(num_retries=5, delay_seconds=5.0)
+        sort_order = arxiv.SortOrder.Descending
+        if submitted_after is not None:
+            query = f"({query}) AND submittedDate:[{submitted_after:%Y%m%d%H%M} TO 999912312359]"
+            sort_order = arxiv.SortOrder.Ascending
         search = arxiv.Search(
             query=query,
             max_results=max_results,
-            sort_by=arxiv.SortCriterion.SubmittedDate
+            sort_by=arxiv.SortCriterion.SubmittedDate,
+            sort_order=sort_order
         )
-        results = list(client.results(search))
+        with metrics.INGEST_STAGE_SECONDS.time(stage="arxiv_fetch"):
+            return list(client.results(search))
+
+    async def save_results(self, results: list, chunk_size: Optional[int] = None):
+        """Saves and enriches arXiv results; see fetch_and_save"""
         # En yeniden en eskiye: published_at azalan sıra
-        results.sort(key=lambda r: r.published or datetime.min, reverse=True)
+        results = sorted(results, key=lambda r: r.published or datetime.min, reverse=True)
 
         # Phase 1: Save all papers to DB first (sync, no LLM yet)
-        papers_data = []
-        paper_objects = []
-        for result in results:
-            paper_data = {
+        papers_data = [
+            {
                 "arxiv_id": result.entry_id,
                 "title": result.title,
                 "abstract": result.summary,
@@ -44,9 +81,30 @@ class IngestionService:
                 "categories": result.categories,
                 "url": result.links[0].href
             }
-            paper = self.paper_repo.upsert_paper(paper_data)
-            papers_data.append(paper_data)
-            paper_objects.append(paper)
+            for result in results
+        ]
+        # Inserted in base_id order, so workers saving overlapping results
+        # concurrently wait for each other instead of deadlocking
+        saved = {}
+        for paper_data in sorted(papers_data, key=lambda data: split_arxiv_id(data["arxiv_id"])):
+            with metrics.INGEST_STAGE_SECONDS.time(stage="paper_upsert"):
+                saved[paper_data["arxiv_id"]] = self.paper_repo.upsert_paper(paper_data)
+        paper_objects = []
+        seen_ids = set()
+        for paper_data in papers_data:
+            paper = saved[paper_data["arxiv_id"]]
+            # Two versions of one paper in the same result set share a row
+            if paper.id not in seen_ids:
+                seen_ids.add(paper.id)
+                paper_objects.append(paper)
+        self.state_repo.mark_fetched([paper.id for paper in paper_objects])
+        with metrics.INGEST_STAGE_SECONDS.time(stage="author_link"):
+            self.author_repo.link_papers(paper_objects)
+        with metrics.INGEST_STAGE_SECONDS.time(stage="dedup"):
+            duplicates = self.dedup_service.register(paper_objects)
+        await self._embed_papers(paper_objects)
+        if chunk_size:
+            self.state_repo.checkpoint()
 
         saved_papers = [
             {
@@ -57,66 +115,260 @@ class IngestionService:
             for pd in papers_data
         ]
 
-        # Phase 2: Run all LLM calls in parallel across papers
-        async def _llm_for_paper(paper_data, paper):
+        # Phase 2 + 3: LLM enrichment for every paper that is not done yet.
+        # Near-duplicates of a paper in this batch wait until it is enriched.
+        reused = self._reuse_enrichment(paper_objects, duplicates)
+        batch_ids = {paper.id for paper in paper_objects}
+        remaining = [paper for paper in paper_objects if paper.id not in reused]
+        await self.enrich_papers(
+            [paper for paper in remaining if duplicates.get(paper.id, (None,))[0] not in batch_ids],
+            chunk_size=chunk_size
+        )
+        waiting = [paper for paper in remaining if duplicates.get(paper.id, (None,))[0] in batch_ids]
+        if waiting:
+            reused |= self._reuse_enrichment(waiting, duplicates)
+            await self.enrich_papers([paper for paper in waiting if paper.id not in reused], chunk_size=chunk_size)
+
+        metrics.PAPERS_INGESTED.inc(len(results))
+        return len(results), saved_papers
+
+    def _reuse_enrichment(self, papers: List[Paper], duplicates: dict) -> set:
+        """
+        Copies entities and tags from the paper each near-duplicate matched,
+        when that paper is fully enriched, and marks the duplicate done.
+        Returns the ids of the papers that no longer need the LLM.
+        """
+        matched = [paper for paper in papers if paper.id in duplicates]
+        if not matched:
+            return set()
+        states = self.state_repo.get_states([paper.id for paper in matched])
+        source_states = self.state_repo.get_states([duplicates[paper.id][0] for paper in matched])
+
+        reused = set()
+        db = self.paper_repo.db
+        for paper in matched:
+            source_id, _ = duplicates[paper.id]
+            state = states.get(paper.id)
+            source_state = source_states.get(source_id)
+            if state is None or state.status == IngestStatus.done:
+                continue
+            if source_state is None or source_state.status != IngestStatus.done:
+                continue
+            try:
+                with metrics.INGEST_STAGE_SECONDS.time(stage="enrichment_reuse"), db.begin_nested():
+                    self.entity_repo.copy_paper_entities(source_id, paper.id, paper.published_at or paper.created_at)
+                    self.paper_repo.copy_paper_tags(source_id, paper.id)
+                    self.state_repo.mark_extracted(state)
+                    self.state_repo.mark_classified(state)
+                    self.state_repo.finish_attempt(state, [])
+            except Exception as e:
+                metrics.INGEST_ERRORS.inc(stage="enrichment_reuse")
+                print(f"⚠️  Copying enrichment from paper {source_id} to {paper.id} failed: {e}")
+                continue
+            metrics.ENRICHMENT_REUSED.inc()
+            reused.add(paper.id)
+        return reused
+
+    async def _embed_papers(self, papers: List[Paper]):
+        """Embeddings are best effort: papers missed here are picked up by `cli.py embed`"""
+        if not self.embedding_service or not papers:
+            return
+        try:
+            with self.paper_repo.db.begin_nested():
+                await self.embedding_service.embed_papers(papers)
+        except Exception as e:
+            metrics.INGEST_ERRORS.inc(stage="embedding")
+            print(f"⚠️  Embedding failed for {len(papers)} papers: {e}")
+
+    async def resume(self, statuses: List[IngestStatus], chunk_size: Optional[int] = None, max_attempts: Optional[int] = None, limit: Optional[int] = None):
+        """
+        Re-runs LLM enrichment for papers already in the DB whose state is in
+        `statuses`, without fetching from arXiv. Only the steps that have not
+        been saved yet are retried. Returns the per-status counts of this run.
+        """
+        papers = self.state_repo.get_unfinished_papers(statuses, max_attempts=max_attempts, limit=limit)
+        return await self.enrich_papers(papers, chunk_size=chunk_size)
+
+    async def enrich_papers(self, papers: List[Paper], chunk_size: Optional[int] = None):
+        """
+        Runs extraction and classification for the given papers and records the
+        outcome in paper_ingest_state. Returns {"done": n, "failed": n, "skipped": n}.
+        """
+        summary = {"done": 0, "failed": 0, "skipped": 0}
+        states = self.state_repo.get_states([paper.id for paper in papers])
+        pending = []
+        for paper in papers:
+            state = states.get(paper.id)
+            if state is None:
+                self.state_repo.mark_fetched([paper.id])
+                state = self.state_repo.get_states([paper.id])[paper.id]
+            if state.status == IngestStatus.done:
+                summary["skipped"] += 1
+                continue
+            pending.append((paper, state))
+
+        step = chunk_size or len(pending) or 1
+        for i in range(0, len(pending), step):
+            # Papers another worker is enriching, or has finished meanwhile, are skipped
+            claimed = self.state_repo.claim([paper.id for paper, _ in pending[i:i + step]])
+            chunk = [(paper, claimed[paper.id]) for paper, _ in pending[i:i + step] if paper.id in claimed]
+            summary["skipped"] += min(step, len(pending) - i) - len(chunk)
+            for status in (await self._enrich_chunk(chunk) if chunk else []):
+                summary[status.value] += 1
+            if chunk_size:
+                self.state_repo.checkpoint()
+        return summary
+
+    async def _enrich_chunk(self, chunk):
+        for _, state in chunk:
+            self.state_repo.start_attempt(state)
+
+        # Known entities from the dictionary first; papers it covers skip the LLM extraction call
+        self._dictionary_extract(chunk)
+
+        # Phase 2: Run all LLM calls in parallel across papers, skipping steps already saved
+        async def _skip():
+            return None
+
+        async def _llm_for_paper(paper, state):
+            # Snapshot and bulk-loaded papers may have no abstract; the prompt then gets an empty one, not "None"
+            abstract = paper.abstract or ""
             llm_results = await asyncio.gather(
-                self.llm_service.extract_entities(paper_data["abstract"]),
-                self.classification_service.classify_paper(paper_data["abstract"]),
+                self.llm_service.extract_entities(abstract) if state.extracted_at is None else _skip(),
+                self.classification_service.classify_paper(abstract) if state.classified_at is None else _skip(),
                 return_exceptions=True
             )
             extraction = llm_results[0] if not isinstance(llm_results[0], Exception) else None
             classification = llm_results[1] if not isinstance(llm_results[1], Exception) else None
+            errors = []
             if isinstance(llm_results[0], Exception):
+                metrics.INGEST_ERRORS.inc(stage="llm_extract")
+                errors.append(f"extract: {llm_results[0]}")
                 print(f"⚠️  Entity extraction failed for paper {paper.id}: {llm_results[0]}")
             if isinstance(llm_results[1], Exception):
+                metrics.INGEST_ERRORS.inc(stage="llm_classify")
+                errors.append(f"classify: {llm_results[1]}")
                 print(f"⚠️  Classification failed for paper {paper.id}: {llm_results[1]}")
-            return paper, extraction, classification
+            return extraction, classification, errors
 
-        llm_results = await asyncio.gather(
-            *[_llm_for_paper(pd, po) for pd, po in zip(papers_data, paper_objects)],
-            return_exceptions=True
-        )
+        with metrics.INGEST_STAGE_SECONDS.time(stage="llm_enrichment"):
+            llm_results = await asyncio.gather(
+                *[_llm_for_paper(paper, state) for paper, state in chunk],
+                return_exceptions=True
+            )
 
-        # Phase 3: Save all LLM results to DB (sync, no concurrent session access)
-        for res in llm_results:
+        # Phase 3: Save LLM results to DB (sync, no concurrent session access).
+        # Each step runs in a savepoint so a failed save only loses that step.
+        db = self.paper_repo.db
+        self._create_entities(llm_results)
+        statuses = []
+        for (paper, state), res in zip(chunk, llm_results):
             if isinstance(res, Exception):
+                metrics.INGEST_ERRORS.inc(stage="llm")
                 print(f"⚠️  Unexpected LLM error: {res}")
-                continue
-            paper, extraction, classification = res
+                extraction, classification, errors = None, None, [f"llm: {res}"]
+            else:
+                extraction, classification, errors = res
             if extraction:
                 try:
-                    self._save_extracted_entities(paper.id, extraction)
+                    with metrics.INGEST_STAGE_SECONDS.time(stage="entity_persist"), db.begin_nested():
+                        self._save_extracted_entities(paper, extraction)
+                        self.state_repo.mark_extracted(state)
                 except Exception as e:
+                    metrics.INGEST_ERRORS.inc(stage="entity_persist")
+                    errors.append(f"entity_persist: {e}")
                     print(f"⚠️  Entity save failed for paper {paper.id}: {e}")
             if classification:
                 try:
-                    for tag_item in classification.tags:
-                        self.paper_repo.add_paper_tag(paper.id, tag_item.tag, tag_item.confidence)
+                    with metrics.INGEST_STAGE_SECONDS.time(stage="tag_persist"), db.begin_nested():
+                        for tag_item in classification.tags:
+                            self.paper_repo.add_paper_tag(paper.id, tag_item.tag, tag_item.confidence)
+                        self.state_repo.mark_classified(state)
                 except Exception as e:
+                    metrics.INGEST_ERRORS.inc(stage="tag_persist")
+                    errors.append(f"tag_persist: {e}")
                     print(f"⚠️  Tag save failed for paper {paper.id}: {e}")
+            self.state_repo.finish_attempt(state, errors)
+            statuses.append(state.status)
+        return statuses
 
-        return len(results), saved_papers
+    def _dictionary_extract(self, chunk):
+        """
+        Saves dictionary matches for papers not extracted yet and, under the
+        skip policy, marks the ones it covers confidently as extracted, so
+        _llm_for_paper leaves them out. On failure the LLM extracts them all.
+        """
+        if not self.dictionary_extractor.enabled:
+            return
+        pending = [(paper, state) for paper, state in chunk if state.extracted_at is None]
+        if not pending:
+            return
+        db = self.paper_repo.db
+        try:
+            with metrics.INGEST_STAGE_SECONDS.time(stage="dictionary_extract"):
+                extractions = self.dictionary_extractor.extract_papers([paper for paper, _ in pending])
+            with metrics.INGEST_STAGE_SECONDS.time(stage="dictionary_persist"), db.begin_nested():
+                self.entity_repo.add_paper_entities([
+                    (paper.id, match.entity_id, paper.published_at or paper.created_at, match.evidence, match.confidence)
+                    for paper, _ in pending
+                    for match in extractions[paper.id].matches
+                ])
+                skipped = [state for paper, state in pending if self.dictionary_extractor.skips_llm(extractions[paper.id])]
+                for state in skipped:
+                    self.state_repo.mark_extracted(state)
+        except Exception as e:
+            metrics.INGEST_ERRORS.inc(stage="dictionary")
+            print(f"⚠️  Dictionary extraction failed for {len(pending)} papers: {e}")
+            return
+        matched = sum(1 for paper, _ in pending if extractions[paper.id].matches)
+        metrics.DICTIONARY_EXTRACTIONS.inc(len(skipped), outcome="llm_skipped")
+        metrics.DICTIONARY_EXTRACTIONS.inc(matched - len(skipped), outcome="assisted")
+
+    def _create_entities(self, llm_results):
+        """
+        Creates the chunk's new entities in one sorted statement up front; the
+        per-paper saves then only look them up. On failure they create their own.
+        """
+        names = [
+            (item.name, entity_type)
+            for res in llm_results if not isinstance(res, Exception) and res[0]
+            for entity_type, items in (
+                (EntityType.task, res[0].tasks),
+                (EntityType.dataset, res[0].datasets),
+                (EntityType.method, res[0].methods),
+                (EntityType.library, res[0].libraries),
+            )
+            for item in items
+        ]
+        try:
+            with metrics.INGEST_STAGE_SECONDS.time(stage="entity_create"), self.paper_repo.db.begin_nested():
+                self.entity_repo.ensure_entities(names)
+        except Exception as e:
+            metrics.INGEST_ERRORS.inc(stage="entity_create")
+            print(f"⚠️  Creating {len(names)} entities failed: {e}")
 
-    def _save_extracted_entities(self, paper_id: int, extraction: PaperExtractionSchema):
+    def _save_extracted_entities(self, paper: Paper, extraction: PaperExtractionSchema):
         """
         Saves entities from LLM into entities and paper_entities tables.
         """
+        paper_id = paper.id
+        published_at = paper.published_at or paper.created_at
         # Tasks
         for item in extraction.tasks:
             entity = self.entity_repo.upsert_entities(item.name, EntityType.task)
-            self.entity_repo.upsert_paper_entity(paper_id, entity.id, item.evidence, item.confidence)
+            self.entity_repo.upsert_paper_entity(paper_id, entity.id, item.evidence, item.confidence, published_at)
         
         # Datasets
         for item in extraction.datasets:
             entity = self.entity_repo.upsert_entities(item.name, EntityType.dataset)
-            self.entity_repo.upsert_paper_entity(paper_id, entity.id, item.evidence, item.confidence)
+            self.entity_repo.upsert_paper_entity(paper_id, entity.id, item.evidence, item.confidence, published_at)
         
         # Methods
         for item in extraction.methods:
             entity = self.entity_repo.upsert_entities(item.name, EntityType.method)
-            self.entity_repo.upsert_paper_entity(paper_id, entity.id, item.evidence, item.confidence)
+            self.entity_repo.upsert_paper_entity(paper_id, entity.id, item.evidence, item.confidence, published_at)
         
         # Libraries
         for item in extraction.libraries:
             entity = self.entity_repo.upsert_entities(item.name, EntityType.library)
-            self.entity_repo.upsert_paper_entity(paper_id, entity.id, item.evidence, item.confidence)
\ No newline at end of file
+            self.entity_repo.upsert_paper_entity(paper_id, entity.id, item.evidence, item.confidence, published_at)
\ No newline at end of file
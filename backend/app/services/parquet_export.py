@@ -0,0 +1,171 @@
+"""
+Parquet export of the corpus for offline analytics (`cli.py export`).
+
+papers, paper_entities and paper_tags are written as Hive-style month
+partitions (papers/month=2026-01/part-0000.parquet); entities, which have
+no month, as one file. Rows are streamed from the database in month order
+through a server-side cursor, and each batch is appended to the open month's
+file as one row group. Only one file is open at a time, so memory stays at
+about one batch whatever the size of the corpus.
+
+Every table is written to a temporary directory and swapped in when it is
+complete, so an interrupted export leaves the previous one readable.
+_export.json records the rows per table and when each was exported; the
+DuckDB queries in repositories/parquet_analytics_repo.py measure "this
+week" from that time.
+"""
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import ARRAY, BigInteger, Column, Date, DateTime, Enum, Float, Integer, SmallInteger, String, Text
+
+from backend.app.repositories.export_repo import ExportRepository
+from backend.app.repositories.parquet_analytics_repo import EXPORT_MANIFEST, EXPORT_TABLES
+
+DEFAULT_BATCH_SIZE = 20000
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def arrow_type(column_type):
+    """Arrow type of a column; arrays become lists and enums their string values"""
+    pa = _pyarrow()
+    # Enum is a String and BigInteger an Integer, so the subclasses go first
+    if isinstance(column_type, Enum):
+        return pa.string()
+    if isinstance(column_type, ARRAY):
+        return pa.list_(arrow_type(column_type.item_type))
+    if isinstance(column_type, BigInteger):
+        return pa.int64()
+    if isinstance(column_type, SmallInteger):
+        return pa.int16()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column_type, Date):
+        return pa.date32()
+    if isinstance(column_type, (String, Text)):
+        return pa.string()
+    raise TypeError(f"No Parquet type for {column_type!r}")
+
+
+class MonthlyParquetWriter:
+    """
+    Appends row groups to month=YYYY-MM/part-NNNN.parquet under `root`, or
+    to root/part-NNNN.parquet for rows without a month. A month that comes
+    back after another one gets a new part file.
+    """
+
+    def __init__(self, root: str, columns: List[Column], compression: str = "zstd"):
+        pa = _pyarrow()
+        self.root = root
+        self.names = [column.name for column in columns]
+        self.enums = {column.name for column in columns if isinstance(column.type, Enum)}
+        self.schema = pa.schema([pa.field(column.name, arrow_type(column.type)) for column in columns])
+        self.compression = compression
+        self.parts: Dict[Optional[str], int] = {}
+        self.month: Optional[str] = None
+        self.writer = None
+
+    def write(self, month: Optional[str], rows: List[dict]):
+        pa = _pyarrow()
+        if self.writer is None or month != self.month:
+            self._open(month)
+        data = {}
+        for name in self.names:
+            values = [row[name] for row in rows]
+            if name in self.enums:
+                values = [value.value if value is not None else None for value in values]
+            data[name] = values
+        self.writer.write_table(pa.Table.from_pydict(data, schema=self.schema))
+
+    def _open(self, month: Optional[str]):
+        pa = _pyarrow()
+        self.close()
+        part = self.parts.get(month, 0)
+        self.parts[month] = part + 1
+        directory = os.path.join(self.root, f"month={month}") if month else self.root
+        os.makedirs(directory, exist_ok=True)
+        self.writer = pa.parquet.ParquetWriter(
+            os.path.join(directory, f"part-{part:04d}.parquet"), self.schema, compression=self.compression
+        )
+        self.month = month
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+class ParquetExporter:
+    def __init__(self, export_repo: ExportRepository):
+        self.export_repo = export_repo
+
+    def export(self, out_dir: str, tables: Iterable[str] = EXPORT_TABLES, batch_size: int = DEFAULT_BATCH_SIZE,
+               progress: Optional[Callable[[str, int], None]] = None) -> Dict[str, int]:
+        """Writes the tables under out_dir and returns the rows written per table"""
+        _pyarrow()
+        os.makedirs(out_dir, exist_ok=True)
+        manifest_path = os.path.join(out_dir, EXPORT_MANIFEST)
+        manifest = {"tables": {}}
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+
+        counts = {}
+        for table in tables:
+            exported_at = datetime.utcnow()
+            counts[table] = self._export_table(table, out_dir, batch_size, progress)
+            manifest["tables"][table] = {"rows": counts[table], "exported_at": exported_at.isoformat()}
+            with open(manifest_path, "w") as f:
+                json.dump(manifest, f, indent=2)
+        return counts
+
+    def _export_table(self, table: str, out_dir: str, batch_size: int, progress) -> int:
+        target = os.path.join(out_dir, table)
+        staging = os.path.join(out_dir, f".{table}.tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+
+        writer = MonthlyParquetWriter(staging, self.export_repo.columns(table))
+        rows_written = 0
+        try:
+            for batch in self.export_repo.iter_batches(table, batch_size):
+                # Rows arrive in month order, so each month is one contiguous run
+                run, run_month = [], None
+                for row in batch:
+                    month = row.month_at.strftime("%Y-%m") if row.month_at else None
+                    if run and month != run_month:
+                        writer.write(run_month, run)
+                        run = []
+                    run.append(row._mapping)
+                    run_month = month
+                if run:
+                    writer.write(run_month, run)
+                rows_written += len(batch)
+                if progress:
+                    progress(table, rows_written)
+        finally:
+            writer.close()
+
+        if rows_written == 0:
+            os.makedirs(staging, exist_ok=True)
+        previous = os.path.join(out_dir, f".{table}.old")
+        shutil.rmtree(previous, ignore_errors=True)
+        if os.path.exists(target):
+            os.rename(target, previous)
+        os.rename(staging, target)
+        shutil.rmtree(previous, ignore_errors=True)
+        return rows_written
@@ -0,0 +1,116 @@
+"""
+Retroactive entity re-tagging.
+
+Extraction runs once per paper at ingest, so an entity first seen this week is
+never linked to older papers that mention it, and its history starts with a
+jump. The re-tag job matches the names of entities created since its last
+run (see entity_retag_runs) against every stored abstract with the
+Aho-Corasick dictionary from services/entity_dictionary.py, and bulk-inserts
+the paper_entities links that are missing. No LLM calls are made.
+
+The papers table is split into id ranges that worker processes scan in
+parallel. Each worker compiles the dictionary once, streams its range,
+collects the matches and writes them with one COPY and one
+INSERT ... SELECT ... ON CONFLICT DO NOTHING per range, committing per range.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, List, Optional, Tuple
+
+from backend.app.database import SessionLocal, engine
+from backend.app.repositories.entity_repo import EntityRepository
+from backend.app.repositories.retag_repo import RetagRepository
+from backend.app.services.entity_dictionary import EntityDictionary
+
+DEFAULT_CHUNK_SIZE = 10000
+
+# Set in each worker process by _init_worker
+_dictionary: Optional[EntityDictionary] = None
+_keys: Optional[set] = None
+
+
+def _init_worker(entity_rows, names):
+    global _dictionary, _keys
+    # Pooled connections inherited through fork belong to the parent process
+    engine.dispose(close=False)
+    _dictionary = EntityDictionary.from_rows(entity_rows)
+    _keys = {EntityDictionary.key(name) for name in names} if names is not None else None
+
+
+def retag_range(repo: RetagRepository, dictionary: EntityDictionary, keys: Optional[set], first_id: int, last_id: int) -> dict:
+    """Links papers with ids in [first_id, last_id] to the matched entities; the caller commits"""
+    links = []
+    papers = 0
+    for paper_id, abstract, published_at in repo.iter_papers(first_id, last_id):
+        papers += 1
+        for match in dictionary.extract(abstract, only_keys=keys, with_unknown=False).matches:
+            links.append((paper_id, match.entity_id, published_at, match.evidence, match.confidence))
+    return {"papers": papers, "matches": len(links), "links_added": repo.insert_links(links)}
+
+
+def _retag_range_worker(bounds: Tuple[int, int]) -> dict:
+    db = SessionLocal()
+    try:
+        stats = retag_range(RetagRepository(db), _dictionary, _keys, *bounds)
+        db.commit()
+        return stats
+    finally:
+        db.close()
+
+
+class RetagService:
+    def __init__(self, retag_repo: RetagRepository, entity_repo: EntityRepository):
+        self.retag_repo = retag_repo
+        self.entity_repo = entity_repo
+
+    def run(self, processes: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE, all_entities: bool = False,
+            after_entity_id: Optional[int] = None, progress: Optional[Callable[[dict], None]] = None) -> dict:
+        """
+        Matches entities created after the last run (after_entity_id to
+        override, all_entities for the whole dictionary) against every
+        abstract. Returns the run's totals.
+        """
+        db = self.retag_repo.db
+        processes = processes or os.cpu_count() or 1
+        after_id = 0 if all_entities else (after_entity_id if after_entity_id is not None else self.retag_repo.last_entity_id())
+        last_id = self.retag_repo.max_entity_id()
+        names = self.retag_repo.entity_names_between(after_id, last_id)
+        stats = {"entities": len(names), "after_entity_id": after_id, "last_entity_id": last_id,
+                 "ranges": 0, "papers": 0, "matches": 0, "links_added": 0}
+        if not names:
+            return stats
+
+        run = self.retag_repo.start_run(after_id, last_id, len(names))
+        db.commit()
+
+        entity_rows = self.entity_repo.get_dictionary_rows()
+        # Against an empty watermark every name is new, so no key filter is needed
+        pattern_names = None if after_id == 0 else names
+        low, high = self.retag_repo.paper_id_range()
+        ranges = [(first, min(first + chunk_size - 1, high)) for first in range(low, high + 1, chunk_size)] if high else []
+
+        for result in self._scan(ranges, entity_rows, pattern_names, processes):
+            stats["ranges"] += 1
+            for key in ("papers", "matches", "links_added"):
+                stats[key] += result[key]
+            if progress:
+                progress(stats)
+
+        self.retag_repo.finish_run(run, stats["papers"], stats["links_added"])
+        db.commit()
+        return stats
+
+    def _scan(self, ranges: List[Tuple[int, int]], entity_rows, names, processes: int):
+        if processes <= 1 or len(ranges) <= 1:
+            dictionary = EntityDictionary.from_rows(entity_rows)
+            keys = {EntityDictionary.key(name) for name in names} if names is not None else None
+            for first, last in ranges:
+                result = retag_range(self.retag_repo, dictionary, keys, first, last)
+                self.retag_repo.db.commit()
+                yield result
+            return
+
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(entity_rows, names)) as pool:
+            futures = [pool.submit(_retag_range_worker, bounds) for bounds in ranges]
+            for future in as_completed(futures):
+                yield future.result()
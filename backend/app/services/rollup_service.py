@@ -0,0 +1,73 @@
+"""
+Trend rollups that are recomputed rather than incremented (`cli.py rollups`).
+
+Tags, entity links and confidences reach the database through many paths:
+ingestion, retagging, snapshot bulk loads and alias merges. Instead of
+adjusting counters in each of them, a refresh looks up which calendar weeks
+received new rows since its watermark and recomputes just those weeks. A
+week is read through week-bounded indexes, so the cost follows the weeks
+touched and not the size of the tables.
+
+A row's created_at is set when it is written, not when its transaction
+commits, so a refresh cannot see rows of transactions still open while it
+runs, however long ago they were written. The watermark is therefore the
+start of the last refresh, or on PostgreSQL of the oldest transaction that
+was open when it started: a long ingest or bulk-load holds it back until it
+commits. On SQLite the refresh starts once it holds the write lock, after
+the only writer has committed. Rows are looked up from WATERMARK_OVERLAP
+before the watermark, which covers clock skew between the application hosts
+and the database; recomputing a week twice is harmless. The first refresh,
+or one with rebuild=True, recomputes every week.
+
+Counts are kept per confidence bucket (tenths, see models.confidence_bucket)
+next to confidence sums. A confidence threshold on a bucket boundary, or
+confidence weighting, is then answered by summing rollup rows instead of
+rescanning the links.
+"""
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from backend.app.repositories.rollup_repo import RollupRepository
+
+# How far before the watermark a refresh still looks for new rows (clock skew)
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+TRENDS = "trends"
+
+
+class RollupService:
+    def __init__(self, rollup_repo: RollupRepository):
+        self.rollup_repo = rollup_repo
+
+    def refresh(self, rebuild: bool = False, progress: Optional[Callable[[dict], None]] = None) -> dict:
+        """
+        Brings entity_weekly_counts, tag_weekly_counts and
+        tag_entity_type_weekly_counts up to date, committing per week.
+        Returns the weeks recomputed and rows written.
+        """
+        repo = self.rollup_repo
+        repo.lock(TRENDS)
+        started = datetime.utcnow()
+        # Rows of transactions open now are not visible yet; the next refresh looks for them
+        open_since = repo.get_oldest_open_transaction()
+        next_watermark = min(started, open_since) if open_since else started
+        watermark = None if rebuild else repo.get_watermark(TRENDS)
+        if watermark is None:
+            repo.clear()
+            weeks = repo.get_weeks()
+        else:
+            weeks = repo.get_weeks(since=watermark - WATERMARK_OVERLAP)
+
+        stats = {"weeks": 0, "rows": 0}
+        for week in sorted(weeks):
+            repo.lock(TRENDS)
+            stats["rows"] += repo.refresh_week(week)
+            stats["weeks"] += 1
+            repo.db.commit()
+            if progress:
+                progress(stats)
+
+        repo.lock(TRENDS)
+        repo.set_watermark(TRENDS, next_watermark)
+        repo.db.commit()
+        return stats
@@ -0,0 +1,202 @@
+"""
+Historical backfill from the arXiv metadata snapshot.
+
+Reads the JSON-lines dump published on Kaggle (arxiv-metadata-oai-snapshot.json,
+one OAI record per line, optionally gzipped) without loading it into memory,
+keeps the records that match a category/date filter and bulk-loads them into
+`papers` with COPY. Loaded papers start in the 'fetched' ingest state, so LLM
+enrichment runs afterwards as a separate pass (`cli.py ingest --resume`).
+
+`load_jsonl` loads this repo's own pre-enriched export format (one paper per
+line with optional "entities" and "tags" lists) through the same COPY path.
+"""
+import fnmatch
+import gzip
+import json
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+from backend.app.repositories.bulk_loader import BulkLoader
+
+ABS_URL = "http://arxiv.org/abs/"
+
+
+def iter_snapshot_lines(path: str) -> Iterator[str]:
+    """Yields the non-empty lines of a snapshot file, one JSON record each"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def _parse_version_date(value: str) -> Optional[datetime]:
+    """'Mon, 2 Apr 2007 19:18:42 GMT' -> naive UTC datetime"""
+    try:
+        return parsedate_to_datetime(value).replace(tzinfo=None)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_update_date(value: str) -> Optional[datetime]:
+    """'2007-04-02' -> datetime"""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_snapshot_record(record: dict) -> dict:
+    """
+    Maps a snapshot record to the paper dict `fetch_and_save` builds from an
+    `arxiv.Result`: entry id with the latest version, v1 date as published_at.
+    A record without a usable date or abstract keeps None for them, and is
+    loaded with NULLs.
+    """
+    versions = record.get("versions") or []
+    latest = versions[-1]["version"] if versions else "v1"
+    entry_id = f"{ABS_URL}{record['id']}{latest}"
+
+    published_at = _parse_version_date(versions[0].get("created")) if versions else None
+    if published_at is None:
+        published_at = _parse_update_date(record.get("update_date"))
+
+    if record.get("authors_parsed"):
+        # [last, first, suffix]
+        authors = [
+            " ".join(part for part in (first, last, *suffix) if part)
+            for last, first, *suffix in record["authors_parsed"]
+        ]
+    else:
+        authors = [a.strip() for a in (record.get("authors") or "").split(",") if a.strip()]
+
+    return {
+        "arxiv_id": entry_id,
+        "title": " ".join((record.get("title") or "").split()),
+        "abstract": " ".join((record.get("abstract") or "").split()) or None,
+        "authors": authors,
+        "published_at": published_at,
+        "categories": (record.get("categories") or "").split(),
+        "url": entry_id,
+    }
+
+
+class SnapshotFilter:
+    """Category globs (e.g. 'cs.*', 'stat.ML') and a published_at window"""
+
+    def __init__(self, categories: Optional[List[str]] = None, since: Optional[datetime] = None, until: Optional[datetime] = None):
+        self.categories = categories or []
+        self.since = since
+        self.until = until
+
+    def matches_categories(self, record: dict) -> bool:
+        if not self.categories:
+            return True
+        record_categories = (record.get("categories") or "").split()
+        return any(
+            fnmatch.fnmatchcase(category, pattern)
+            for category in record_categories
+            for pattern in self.categories
+        )
+
+    def matches_date(self, paper: dict) -> bool:
+        published_at = paper["published_at"]
+        if published_at is None:
+            return self.since is None and self.until is None
+        if self.since and published_at < self.since:
+            return False
+        if self.until and published_at >= self.until:
+            return False
+        return True
+
+
+class SnapshotImporter:
+    def __init__(self, db: Session, batch_size: int = 5000):
+        self.db = db
+        self.batch_size = batch_size
+        self.loader = BulkLoader(db)
+
+    def _flush(self, batch: List[dict]) -> int:
+        counts = self.loader.load(batch)
+        self.db.commit()
+        return counts["papers"]
+
+    def run(self, path: str, snapshot_filter: SnapshotFilter, limit: Optional[int] = None, progress: Optional[Callable[[dict], None]] = None) -> dict:
+        """
+        Streams the snapshot, loading matching papers in committed batches.
+        Returns counts: scanned, matched, inserted, invalid, seconds.
+        """
+        stats = {"scanned": 0, "matched": 0, "inserted": 0, "invalid": 0, "seconds": 0.0}
+        started = time.perf_counter()
+        batch = []
+        for line in iter_snapshot_lines(path):
+            stats["scanned"] += 1
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                stats["invalid"] += 1
+                continue
+            # Category check first: it is cheap and rejects most of the snapshot
+            if not snapshot_filter.matches_categories(record):
+                continue
+            try:
+                paper = parse_snapshot_record(record)
+            except (KeyError, IndexError, ValueError):
+                stats["invalid"] += 1
+                continue
+            if not paper["title"] or not snapshot_filter.matches_date(paper):
+                continue
+
+            batch.append(paper)
+            stats["matched"] += 1
+            if len(batch) >= self.batch_size:
+                stats["inserted"] += self._flush(batch)
+                batch = []
+                if progress:
+                    progress(stats)
+            if limit and stats["matched"] >= limit:
+                break
+
+        if batch:
+            stats["inserted"] += self._flush(batch)
+        stats["seconds"] = time.perf_counter() - started
+        return stats
+
+
+def load_jsonl(db: Session, path: str, batch_size: int = 20000, progress: Optional[Callable[[dict], None]] = None) -> dict:
+    """
+    Bulk-loads a JSON-lines file of paper dicts (published_at as ISO string),
+    committing every batch. Returns the new-row counts per table plus
+    papers read and seconds.
+    """
+    loader = BulkLoader(db)
+    stats = {"read": 0, "staged_rows": 0, "papers": 0, "entities": 0, "paper_entities": 0, "paper_tags": 0, "authors": 0, "paper_authors": 0, "seconds": 0.0}
+    started = time.perf_counter()
+
+    def flush(batch):
+        counts = loader.load(batch)
+        db.commit()
+        for key in ("staged_rows", "papers", "entities", "paper_entities", "paper_tags", "authors", "paper_authors"):
+            stats[key] += counts[key]
+        if progress:
+            progress(stats)
+
+    batch = []
+    for line in iter_snapshot_lines(path):
+        paper = json.loads(line)
+        if paper.get("published_at"):
+            paper["published_at"] = datetime.fromisoformat(paper["published_at"])
+        batch.append(paper)
+        stats["read"] += 1
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+    stats["seconds"] = time.perf_counter() - started
+    return stats
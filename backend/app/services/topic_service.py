@@ -0,0 +1,133 @@
+"""
+Data-driven topics: k-means over paper embeddings (see EmbeddingService).
+
+A fit draws a random sample of embeddings, seeds k centroids with
+k-means++ and runs Lloyd iterations on the sample until the summed distance
+stops improving. It then assigns every embedded paper to its nearest centroid
+in keyset pages and sets each centroid to the exact mean of its papers.
+
+Later runs are incremental mini-batch k-means: each page of new papers is
+assigned to the nearest centroid, and every centroid moves towards the mean
+of the papers it received, weighted by how many papers it already holds.
+Assignment, distances and means run in Postgres through pgvector, so a run
+streams over the embeddings without loading them into Python.
+
+Topics are labelled with their top entities by TF-IDF, and per-week paper
+counts are kept in topic_weekly_counts for /trends/topics.
+"""
+import random
+from typing import Callable, Optional
+
+from backend.app.llm.embeddings import embedding_model_name
+from backend.app.repositories.topic_repo import TopicRepository
+
+DEFAULT_TOPICS = 50
+SAMPLE_SIZE = 20000
+MAX_ITERATIONS = 20
+# Stop once an iteration improves the summed distance by less than this fraction
+TOLERANCE = 1e-3
+
+
+class TopicService:
+    def __init__(self, topic_repo: TopicRepository, model_name: Optional[str] = None):
+        self.topic_repo = topic_repo
+        self.model_name = model_name or embedding_model_name()
+
+    def run(self, k: int = DEFAULT_TOPICS, refit: bool = False, batch_size: int = 5000, progress: Optional[Callable[[dict], None]] = None) -> dict:
+        """Fits topics when there are none yet (or on refit), otherwise assigns new papers"""
+        if refit or not self.topic_repo.count_topics(self.model_name):
+            return self.fit(k, batch_size=batch_size, progress=progress)
+        return self.update(batch_size=batch_size, progress=progress)
+
+    def fit(self, k: int = DEFAULT_TOPICS, sample_size: int = SAMPLE_SIZE, max_iterations: int = MAX_ITERATIONS,
+            batch_size: int = 5000, progress: Optional[Callable[[dict], None]] = None) -> dict:
+        """Replaces all topics with k new ones and assigns every embedded paper"""
+        db = self.topic_repo.db
+        stats = {"mode": "fit", "topics": 0, "sample": 0, "iterations": 0, "assigned": 0}
+
+        self.topic_repo.clear()
+        stats["sample"] = self.topic_repo.create_sample(self.model_name, sample_size)
+        if not stats["sample"]:
+            db.commit()
+            return stats
+        self._seed(k)
+
+        previous = None
+        for _ in range(max_iterations):
+            inertia = self.topic_repo.lloyd_step(self.model_name)
+            stats["iterations"] += 1
+            stats["inertia"] = inertia
+            if previous is not None and previous - inertia <= TOLERANCE * previous:
+                break
+            previous = inertia
+        db.commit()
+
+        stats["assigned"] = self._assign(batch_size, stats, progress, update_centroids=False)
+        self.topic_repo.analyze()
+        self.topic_repo.recompute_centroids(self.model_name)
+        self.topic_repo.label_topics()
+        db.commit()
+        stats["topics"] = self.topic_repo.count_topics(self.model_name)
+        return stats
+
+    def _seed(self, k: int):
+        """
+        k-means++: the first centroid is a random sample point, and each next
+        one is drawn with probability proportional to the squared distance of
+        a point from its nearest centroid so far.
+        """
+        rng = random.Random()
+        nearest = {}
+        topic_id = self.topic_repo.add_topic_from_sample(self.model_name)
+        for _ in range(k - 1):
+            for paper_id, distance in self.topic_repo.sample_distances(topic_id):
+                nearest[paper_id] = min(distance, nearest.get(paper_id, distance))
+            weights = [distance * distance for distance in nearest.values()]
+            if not any(weights):
+                break
+            paper_id = rng.choices(list(nearest), weights)[0]
+            topic_id = self.topic_repo.add_topic_from_sample(self.model_name, paper_id)
+
+    def update(self, batch_size: int = 5000, progress: Optional[Callable[[dict], None]] = None) -> dict:
+        """Assigns papers embedded since the last run, moving centroids mini-batch style"""
+        stats = {"mode": "update", "assigned": 0}
+        stats["assigned"] = self._assign(batch_size, stats, progress, update_centroids=True)
+        if stats["assigned"]:
+            self.topic_repo.label_topics()
+            self.topic_repo.db.commit()
+        stats["topics"] = self.topic_repo.count_topics(self.model_name)
+        return stats
+
+    def _assign(self, batch_size, stats, progress, update_centroids: bool) -> int:
+        db = self.topic_repo.db
+        centroids = self.topic_repo.get_centroids(self.model_name) if update_centroids else {}
+        assigned = 0
+        after_id = 0
+        while True:
+            rows = self.topic_repo.assign_page(self.model_name, after_id, batch_size)
+            if not rows:
+                break
+            if update_centroids:
+                self.topic_repo.update_centroids(self._move_centroids(centroids, rows))
+            db.commit()
+            assigned += sum(row.papers for row in rows)
+            after_id = max(row.last_id for row in rows)
+            if progress:
+                progress({**stats, "assigned": assigned})
+        return assigned
+
+    @staticmethod
+    def _move_centroids(centroids, rows):
+        """
+        Mini-batch k-means update: a centroid holding `size` papers that
+        receives n papers with mean m moves to (size * c + n * m) / (size + n),
+        the running mean of everything assigned to it.
+        """
+        updates = []
+        for row in rows:
+            centroid, size = centroids[row.topic_id]
+            total = size + row.papers
+            moved = [(size * c + row.papers * m) / total for c, m in zip(centroid, row.mean)]
+            centroids[row.topic_id] = (moved, total)
+            updates.append({"id": row.topic_id, "centroid": moved, "size": total})
+        return updates
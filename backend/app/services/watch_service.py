@@ -0,0 +1,120 @@
+"""
+Saved-query watcher (`cli.py watch`).
+
+Each saved query in watch_queries keeps a watermark: the latest first-version
+date among the papers it has seen. A run asks arXiv only for papers
+submitted since the watermark, oldest first and at most max_results of them,
+so a backlog is worked off over several runs without gaps. The newest
+max_results papers are not re-read every time, and steady-state cost
+follows the number of new papers.
+
+The queries due in a tick are coalesced. Identical query strings share one
+search, and the results of all searches are merged by base_id before
+anything is saved, so a paper matched by several queries is saved, embedded
+and sent to the LLM once. Papers already enriched in the same or a later
+version are dropped before the ingestion pipeline. After a tick that saved
+papers, refresh_rollups brings the derived tables up to date.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from backend.app.models.models import WatchQuery, split_arxiv_id
+from backend.app.repositories.watch_repo import WatchRepository
+from backend.app.services.ingestion_services import IngestionService
+from backend.app.services.rollup_service import RollupService
+from backend.app.services.topic_service import TopicService
+
+# How far back the first run of a new query looks
+INITIAL_LOOKBACK_DAYS = 7
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class WatchService:
+    def __init__(self, watch_repo: WatchRepository, ingestion_service: IngestionService, topic_service: Optional[TopicService] = None, rollup_service: Optional[RollupService] = None):
+        self.watch_repo = watch_repo
+        self.ingestion_service = ingestion_service
+        self.topic_service = topic_service
+        self.rollup_service = rollup_service
+
+    async def tick(self, now: Optional[datetime] = None, chunk_size: int = 25) -> dict:
+        """Runs every due query once and returns the tick's totals"""
+        now = now or datetime.utcnow()
+        db = self.watch_repo.db
+        due = self.watch_repo.due_queries(now)
+        stats = {"queries": len(due), "searches": 0, "fetched": 0, "new": 0, "ingested": 0, "rollups": {}}
+        if not due:
+            return stats
+
+        searches: Dict[str, List[WatchQuery]] = {}
+        for watch in due:
+            searches.setdefault(" ".join(watch.query.split()), []).append(watch)
+
+        # base_id -> (version, result), across all searches
+        merged: Dict[str, Tuple[int, object]] = {}
+        # watch id -> (base_ids its search returned, latest published_at among them)
+        seen: Dict[int, Tuple[List[str], Optional[datetime]]] = {}
+        for query, watches in searches.items():
+            since = min(watch.watermark or now - timedelta(days=INITIAL_LOOKBACK_DAYS) for watch in watches)
+            since = since.replace(second=0, microsecond=0)
+            results = self.ingestion_service.fetch_results(
+                query, max(watch.max_results for watch in watches), submitted_after=since
+            )
+            stats["searches"] += 1
+            base_ids = []
+            latest = None
+            for result in results:
+                published = _naive_utc(result.published)
+                if published < since:
+                    continue
+                latest = max(latest, published) if latest else published
+                base_id, version = split_arxiv_id(result.entry_id)
+                base_ids.append(base_id)
+                if base_id not in merged or version > merged[base_id][0]:
+                    merged[base_id] = (version, result)
+            for watch in watches:
+                seen[watch.id] = (base_ids, latest)
+        stats["fetched"] = len(merged)
+
+        finished = self.ingestion_service.paper_repo.get_finished_versions(merged)
+        new_ids = {base_id for base_id, (version, _) in merged.items() if version > finished.get(base_id, 0)}
+        stats["new"] = len(new_ids)
+        if new_ids:
+            stats["ingested"], _ = await self.ingestion_service.save_results(
+                [merged[base_id][1] for base_id in new_ids], chunk_size=chunk_size
+            )
+
+        # Watermarks only move once the papers they cover are saved
+        for watch in due:
+            base_ids, latest = seen[watch.id]
+            self.watch_repo.record_run(watch, now, latest, len(base_ids), sum(1 for base_id in base_ids if base_id in new_ids))
+        db.commit()
+
+        if new_ids:
+            stats["rollups"] = self.refresh_rollups()
+        return stats
+
+    def refresh_rollups(self) -> dict:
+        """
+        Updates the tables derived from papers: new papers are assigned to
+        the existing topics, which also moves topic_weekly_counts, and the
+        weeks of the trend rollups that received papers are recomputed. Topics
+        are never fitted here; that stays with `cli.py topics`.
+        """
+        refreshed = {}
+        if self.topic_service and self.topic_service.topic_repo.count_topics(self.topic_service.model_name):
+            refreshed["topics"] = self.topic_service.update()["assigned"]
+        if self.rollup_service:
+            refreshed["trend weeks"] = self.rollup_service.refresh()["weeks"]
+        return refreshed
+
+    def seconds_until_due(self, now: Optional[datetime] = None) -> Optional[float]:
+        """Seconds until the next query is due (0 if one is due now), None without saved queries"""
+        next_due = self.watch_repo.next_due_at()
+        if next_due is None:
+            return None
+        return max((next_due - (now or datetime.utcnow())).total_seconds(), 0.0)
@@ -25,6 +25,14 @@ if config.config_file_name is not None:
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    # Monthly paper_entities partitions are created by `cli.py partitions`, not by models
+    if type_ == "table" and reflected and compare_to is None and name.startswith("paper_entities_"):
+        return False
+    return True
+
 db_url = os.getenv("POSTGRES_URL")
 config.set_main_option("sqlalchemy.url", db_url)
 
@@ -48,6 +56,7 @@ def run_migrations_offline() -> None:
     """
     context.configure(
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -71,7 +80,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,57 @@
+"""add tag rollups
+
+Revision ID: 018a3bdd3107
+Revises: 319c1c447b14
+Create Date: 2026-10-19 05:31:12.548431
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '018a3bdd3107'
+down_revision: Union[str, Sequence[str], None] = '319c1c447b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The rollups are filled by the first `cli.py rollups` (or any refresh after an ingest)
+    op.create_table('rollup_states',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('watermark', sa.DateTime(), nullable=True),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table('tag_entity_type_weekly_counts',
+    sa.Column('week', sa.Date(), nullable=False),
+    sa.Column('tag', sa.String(), nullable=False),
+    sa.Column('entity_type', postgresql.ENUM('dataset', 'method', 'task', 'library', name='entitytype', create_type=False), nullable=False),
+    sa.Column('paper_count', sa.Integer(), nullable=False),
+    sa.Column('mention_count', sa.Integer(), nullable=False),
+    sa.Column('confidence_sum', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('week', 'tag', 'entity_type')
+    )
+    op.create_table('tag_weekly_counts',
+    sa.Column('week', sa.Date(), nullable=False),
+    sa.Column('tag', sa.String(), nullable=False),
+    sa.Column('paper_count', sa.Integer(), nullable=False),
+    sa.Column('confidence_sum', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('week', 'tag')
+    )
+    op.create_index('ix_paper_entities_created_at', 'paper_entities', ['created_at'], unique=False, postgresql_include=['published_week'])
+    op.create_index('ix_paper_tags_created_at', 'paper_tags', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_paper_tags_created_at', table_name='paper_tags')
+    op.drop_index('ix_paper_entities_created_at', table_name='paper_entities')
+    op.drop_table('tag_weekly_counts')
+    op.drop_table('tag_entity_type_weekly_counts')
+    op.drop_table('rollup_states')
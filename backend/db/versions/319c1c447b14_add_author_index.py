@@ -0,0 +1,61 @@
+"""add_author_index
+
+Revision ID: 319c1c447b14
+Revises: 1f6492234d5d
+Create Date: 2026-10-19 05:07:07.995522
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '319c1c447b14'
+down_revision: Union[str, Sequence[str], None] = '1f6492234d5d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Papers stored before this revision are linked by `cli.py authors`
+    op.create_table('authors',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('name_key', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name_key')
+    )
+    op.create_table('author_weekly_counts',
+    sa.Column('author_id', sa.Integer(), nullable=False),
+    sa.Column('week', sa.Date(), nullable=False),
+    sa.Column('paper_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['author_id'], ['authors.id'], ),
+    sa.PrimaryKeyConstraint('author_id', 'week')
+    )
+    op.create_index('ix_author_weekly_counts_week_author', 'author_weekly_counts', ['week', 'author_id'], unique=False, postgresql_include=['paper_count'])
+    op.create_table('paper_authors',
+    sa.Column('paper_id', sa.Integer(), nullable=False),
+    sa.Column('author_id', sa.Integer(), nullable=False),
+    sa.Column('position', sa.SmallInteger(), nullable=False),
+    sa.Column('published_at', sa.DateTime(), nullable=False),
+    sa.Column('published_week', sa.Date(), sa.Computed("(date_trunc('week', published_at))::date", persisted=True), nullable=True),
+    sa.ForeignKeyConstraint(['author_id'], ['authors.id'], ),
+    sa.ForeignKeyConstraint(['paper_id'], ['papers.id'], ),
+    sa.PrimaryKeyConstraint('paper_id', 'author_id')
+    )
+    op.create_index('ix_paper_authors_author_published', 'paper_authors', ['author_id', 'published_at'], unique=False, postgresql_include=['paper_id'])
+    op.create_index('ix_paper_authors_week_author', 'paper_authors', ['published_week', 'author_id'], unique=False, postgresql_include=['paper_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_paper_authors_week_author', table_name='paper_authors')
+    op.drop_index('ix_paper_authors_author_published', table_name='paper_authors')
+    op.drop_table('paper_authors')
+    op.drop_index('ix_author_weekly_counts_week_author', table_name='author_weekly_counts')
+    op.drop_table('author_weekly_counts')
+    op.drop_table('authors')
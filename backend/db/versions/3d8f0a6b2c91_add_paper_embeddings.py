@@ -0,0 +1,40 @@
+"""add_paper_embeddings
+
+Revision ID: 3d8f0a6b2c91
+Revises: e2a91b7c5f38
+Create Date: 2026-10-19 17:25:13.084411
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from backend.app.models.models import Vector
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d8f0a6b2c91'
+down_revision: Union[str, Sequence[str], None] = 'e2a91b7c5f38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.create_table('paper_embeddings',
+    sa.Column('paper_id', sa.Integer(), nullable=False),
+    sa.Column('embedding', Vector(384), nullable=False),
+    sa.Column('model', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['paper_id'], ['papers.id'], ),
+    sa.PrimaryKeyConstraint('paper_id')
+    )
+    op.create_index('ix_paper_embeddings_hnsw', 'paper_embeddings', ['embedding'], unique=False, postgresql_using='hnsw', postgresql_with={'m': 16, 'ef_construction': 64}, postgresql_ops={'embedding': 'vector_cosine_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_paper_embeddings_hnsw', table_name='paper_embeddings', postgresql_using='hnsw', postgresql_with={'m': 16, 'ef_construction': 64}, postgresql_ops={'embedding': 'vector_cosine_ops'})
+    op.drop_table('paper_embeddings')
@@ -0,0 +1,56 @@
+"""add_paper_ingest_state
+
+Revision ID: 5b7e2c1d9a04
+Revises: 094d6ca5e338
+Create Date: 2026-10-19 10:12:41.532107
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e2c1d9a04'
+down_revision: Union[str, Sequence[str], None] = '094d6ca5e338'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('paper_ingest_state',
+    sa.Column('paper_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('fetched', 'done', 'failed', name='ingeststatus'), nullable=False),
+    sa.Column('extracted_at', sa.DateTime(), nullable=True),
+    sa.Column('classified_at', sa.DateTime(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['paper_id'], ['papers.id'], ),
+    sa.PrimaryKeyConstraint('paper_id')
+    )
+    op.create_index(op.f('ix_paper_ingest_state_status'), 'paper_ingest_state', ['status'], unique=False)
+
+    # Papers ingested before state tracking: a step counts as finished if its rows exist
+    op.execute("""
+        INSERT INTO paper_ingest_state (paper_id, status, extracted_at, classified_at, attempts, updated_at)
+        SELECT p.id,
+               CASE WHEN e.paper_id IS NOT NULL AND t.paper_id IS NOT NULL
+                    THEN 'done' ELSE 'fetched' END::ingeststatus,
+               CASE WHEN e.paper_id IS NOT NULL THEN p.created_at END,
+               CASE WHEN t.paper_id IS NOT NULL THEN p.created_at END,
+               1,
+               now()
+        FROM papers p
+        LEFT JOIN (SELECT DISTINCT paper_id FROM paper_entities) e ON e.paper_id = p.id
+        LEFT JOIN (SELECT DISTINCT paper_id FROM paper_tags) t ON t.paper_id = p.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_paper_ingest_state_status'), table_name='paper_ingest_state')
+    op.drop_table('paper_ingest_state')
+    op.execute("DROP TYPE IF EXISTS ingeststatus")
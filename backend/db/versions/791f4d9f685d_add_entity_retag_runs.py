@@ -0,0 +1,38 @@
+"""add_entity_retag_runs
+
+Revision ID: 791f4d9f685d
+Revises: 7a5d2e8c4f60
+Create Date: 2026-10-19 04:08:22.282591
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '791f4d9f685d'
+down_revision: Union[str, Sequence[str], None] = '7a5d2e8c4f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('entity_retag_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('after_entity_id', sa.Integer(), nullable=False),
+    sa.Column('last_entity_id', sa.Integer(), nullable=False),
+    sa.Column('entities', sa.Integer(), nullable=False),
+    sa.Column('papers_scanned', sa.Integer(), nullable=False),
+    sa.Column('links_added', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('entity_retag_runs')
@@ -0,0 +1,60 @@
+"""add_topics
+
+Revision ID: 7a5d2e8c4f60
+Revises: 9e4b6c3a7d15
+Create Date: 2026-10-19 21:02:37.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from backend.app.models.models import Vector
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a5d2e8c4f60'
+down_revision: Union[str, Sequence[str], None] = '9e4b6c3a7d15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('topics',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('centroid', Vector(384), nullable=False),
+    sa.Column('model', sa.String(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('label', sa.String(), nullable=True),
+    sa.Column('terms', sa.ARRAY(sa.String()), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('paper_topics',
+    sa.Column('paper_id', sa.Integer(), nullable=False),
+    sa.Column('topic_id', sa.Integer(), nullable=False),
+    sa.Column('distance', sa.Float(), nullable=True),
+    sa.Column('assigned_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['paper_id'], ['papers.id'], ),
+    sa.ForeignKeyConstraint(['topic_id'], ['topics.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('paper_id')
+    )
+    op.create_index(op.f('ix_paper_topics_topic_id'), 'paper_topics', ['topic_id'], unique=False)
+    op.create_table('topic_weekly_counts',
+    sa.Column('topic_id', sa.Integer(), nullable=False),
+    sa.Column('week', sa.Date(), nullable=False),
+    sa.Column('paper_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['topic_id'], ['topics.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('topic_id', 'week')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('topic_weekly_counts')
+    op.drop_index(op.f('ix_paper_topics_topic_id'), table_name='paper_topics')
+    op.drop_table('paper_topics')
+    op.drop_table('topics')
@@ -0,0 +1,45 @@
+"""unique_entity_type_name
+
+Revision ID: 8c3f6d2e4b17
+Revises: 5b7e2c1d9a04
+Create Date: 2026-10-19 11:40:05.218339
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c3f6d2e4b17'
+down_revision: Union[str, Sequence[str], None] = '5b7e2c1d9a04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Merge (type, name) duplicates into the oldest row before adding the constraint
+    op.execute("""
+        CREATE TEMP TABLE entity_dupes ON COMMIT DROP AS
+        SELECT id, keep_id FROM (
+            SELECT id, min(id) OVER (PARTITION BY type, name) AS keep_id FROM entities
+        ) d
+        WHERE id <> keep_id
+    """)
+    op.execute("""
+        INSERT INTO paper_entities (paper_id, entity_id, evidence, confidence, created_at)
+        SELECT pe.paper_id, d.keep_id, pe.evidence, pe.confidence, pe.created_at
+        FROM paper_entities pe JOIN entity_dupes d ON d.id = pe.entity_id
+        ON CONFLICT (paper_id, entity_id) DO NOTHING
+    """)
+    op.execute("DELETE FROM paper_entities pe USING entity_dupes d WHERE pe.entity_id = d.id")
+    op.execute("UPDATE entities e SET canonical_id = d.keep_id FROM entity_dupes d WHERE e.canonical_id = d.id")
+    op.execute("UPDATE entities e SET canonical_id = NULL WHERE e.canonical_id = e.id")
+    op.execute("DELETE FROM entities e USING entity_dupes d WHERE e.id = d.id")
+    op.create_unique_constraint('uq_entity_type_name', 'entities', ['type', 'name'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_entity_type_name', 'entities', type_='unique')
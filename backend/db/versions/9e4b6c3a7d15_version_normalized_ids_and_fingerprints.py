@@ -0,0 +1,98 @@
+"""version_normalized_ids_and_fingerprints
+
+Revision ID: 9e4b6c3a7d15
+Revises: 3d8f0a6b2c91
+Create Date: 2026-10-19 19:08:52.637120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from backend.app.models.models import ARXIV_BASE_ID_SQL, ARXIV_VERSION_SQL
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4b6c3a7d15'
+down_revision: Union[str, Sequence[str], None] = '3d8f0a6b2c91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('papers', sa.Column('base_id', sa.String(), sa.Computed(ARXIV_BASE_ID_SQL, persisted=True), nullable=True))
+    op.add_column('papers', sa.Column('version', sa.Integer(), sa.Computed(ARXIV_VERSION_SQL, persisted=True), nullable=True))
+
+    # Merge rows that are versions of the same paper into the oldest row, keeping
+    # the enrichment of every version and the entry id of the latest one
+    op.execute("""
+        CREATE TEMP TABLE paper_version_dupes ON COMMIT DROP AS
+        SELECT id, keep_id, arxiv_id, url, version FROM (
+            SELECT id, arxiv_id, url, version, min(id) OVER (PARTITION BY base_id) AS keep_id FROM papers
+        ) d
+        WHERE id <> keep_id
+    """)
+    op.execute("""
+        INSERT INTO paper_entities (paper_id, entity_id, published_at, evidence, confidence, created_at)
+        SELECT d.keep_id, pe.entity_id, coalesce(k.published_at, k.created_at), pe.evidence, pe.confidence, pe.created_at
+        FROM paper_entities pe
+        JOIN paper_version_dupes d ON d.id = pe.paper_id
+        JOIN papers k ON k.id = d.keep_id
+        ON CONFLICT DO NOTHING
+    """)
+    op.execute("""
+        INSERT INTO paper_tags (paper_id, tag, confidence, created_at)
+        SELECT d.keep_id, pt.tag, pt.confidence, pt.created_at
+        FROM paper_tags pt JOIN paper_version_dupes d ON d.id = pt.paper_id
+        ON CONFLICT DO NOTHING
+    """)
+    for table in ('paper_entities', 'paper_tags', 'paper_ingest_state', 'paper_embeddings'):
+        op.execute(f"DELETE FROM {table} t USING paper_version_dupes d WHERE t.paper_id = d.id")
+    op.execute("DELETE FROM papers p USING paper_version_dupes d WHERE p.id = d.id")
+    op.execute("""
+        UPDATE papers p SET arxiv_id = l.arxiv_id, url = l.url
+        FROM (
+            SELECT DISTINCT ON (keep_id) keep_id, arxiv_id, url, version
+            FROM paper_version_dupes ORDER BY keep_id, version DESC
+        ) l
+        WHERE p.id = l.keep_id AND l.version > p.version
+    """)
+    op.execute("""
+        UPDATE paper_ingest_state s SET
+            extracted_at = coalesce(s.extracted_at, now() AT TIME ZONE 'utc'),
+            classified_at = coalesce(s.classified_at, now() AT TIME ZONE 'utc'),
+            status = 'done'
+        WHERE s.paper_id IN (SELECT keep_id FROM paper_version_dupes)
+          AND EXISTS (SELECT 1 FROM paper_entities pe WHERE pe.paper_id = s.paper_id)
+          AND EXISTS (SELECT 1 FROM paper_tags pt WHERE pt.paper_id = s.paper_id)
+    """)
+    op.create_index(op.f('ix_papers_base_id'), 'papers', ['base_id'], unique=True)
+
+    op.create_table('paper_fingerprints',
+    sa.Column('paper_id', sa.Integer(), nullable=False),
+    sa.Column('signature', sa.ARRAY(sa.BigInteger()), nullable=False),
+    sa.Column('duplicate_of_id', sa.Integer(), nullable=True),
+    sa.Column('similarity', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['duplicate_of_id'], ['papers.id'], ),
+    sa.ForeignKeyConstraint(['paper_id'], ['papers.id'], ),
+    sa.PrimaryKeyConstraint('paper_id')
+    )
+    op.create_table('paper_lsh_buckets',
+    sa.Column('band', sa.SmallInteger(), nullable=False),
+    sa.Column('bucket', sa.BigInteger(), nullable=False),
+    sa.Column('paper_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['paper_id'], ['papers.id'], ),
+    sa.PrimaryKeyConstraint('band', 'bucket', 'paper_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('paper_lsh_buckets')
+    op.drop_table('paper_fingerprints')
+    op.drop_index(op.f('ix_papers_base_id'), table_name='papers')
+    op.drop_column('papers', 'version')
+    op.drop_column('papers', 'base_id')
@@ -0,0 +1,116 @@
+"""partition_paper_entities_by_month
+
+Revision ID: c41a7e9f0d52
+Revises: 8c3f6d2e4b17
+Create Date: 2026-10-19 14:03:27.904116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41a7e9f0d52'
+down_revision: Union[str, Sequence[str], None] = '8c3f6d2e4b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitions for future months are created by `cli.py partitions`
+MONTHS_AHEAD = 3
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Move the old heap table out of the way, freeing its index names
+    op.drop_index('ix_paper_entities_paper_id', table_name='paper_entities')
+    op.drop_index('ix_paper_entities_entity_id', table_name='paper_entities')
+    op.execute("ALTER TABLE paper_entities RENAME TO paper_entities_old")
+    # The unique constraint on (paper_id, entity_id) was folded into the primary key
+    op.execute("ALTER TABLE paper_entities_old RENAME CONSTRAINT uq_paper_entity TO paper_entities_old_pkey")
+
+    # The partition key has to be part of the primary key
+    op.execute("""
+        CREATE TABLE paper_entities (
+            paper_id integer NOT NULL REFERENCES papers (id),
+            entity_id integer NOT NULL REFERENCES entities (id),
+            published_at timestamp without time zone NOT NULL,
+            evidence text,
+            confidence double precision,
+            created_at timestamp without time zone,
+            CONSTRAINT paper_entities_pkey PRIMARY KEY (paper_id, entity_id, published_at)
+        ) PARTITION BY RANGE (published_at)
+    """)
+    op.execute("CREATE TABLE paper_entities_default PARTITION OF paper_entities DEFAULT")
+
+    # One partition per month from the oldest paper with entities up to a few months ahead
+    op.execute(f"""
+        DO $$
+        DECLARE
+            first_month date;
+            month date;
+        BEGIN
+            SELECT date_trunc('month', min(coalesce(p.published_at, p.created_at)))::date INTO first_month
+            FROM paper_entities_old pe JOIN papers p ON p.id = pe.paper_id;
+            first_month := coalesce(first_month, date_trunc('month', now() AT TIME ZONE 'utc')::date);
+
+            FOR month IN
+                SELECT generate_series(
+                    first_month,
+                    date_trunc('month', now() AT TIME ZONE 'utc')::date + interval '{MONTHS_AHEAD} months',
+                    interval '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF paper_entities FOR VALUES FROM (%L) TO (%L)',
+                    'paper_entities_y' || to_char(month, 'YYYY') || 'm' || to_char(month, 'MM'),
+                    month,
+                    (month + interval '1 month')::date
+                );
+            END LOOP;
+        END $$
+    """)
+
+    op.execute("""
+        INSERT INTO paper_entities (paper_id, entity_id, published_at, evidence, confidence, created_at)
+        SELECT pe.paper_id, pe.entity_id,
+               coalesce(p.published_at, p.created_at, pe.created_at, now() AT TIME ZONE 'utc'),
+               pe.evidence, pe.confidence, pe.created_at
+        FROM paper_entities_old pe
+        JOIN papers p ON p.id = pe.paper_id
+    """)
+    op.execute("DROP TABLE paper_entities_old")
+
+    op.create_index('ix_paper_entities_paper_id', 'paper_entities', ['paper_id'], unique=False)
+    op.create_index('ix_paper_entities_entity_id', 'paper_entities', ['entity_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE paper_entities RENAME TO paper_entities_partitioned")
+    op.execute("ALTER INDEX paper_entities_pkey RENAME TO paper_entities_partitioned_pkey")
+    op.drop_index('ix_paper_entities_paper_id', table_name='paper_entities_partitioned')
+    op.drop_index('ix_paper_entities_entity_id', table_name='paper_entities_partitioned')
+
+    op.create_table('paper_entities',
+    sa.Column('paper_id', sa.Integer(), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('evidence', sa.Text(), nullable=True),
+    sa.Column('confidence', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['entity_id'], ['entities.id'], ),
+    sa.ForeignKeyConstraint(['paper_id'], ['papers.id'], ),
+    sa.PrimaryKeyConstraint('paper_id', 'entity_id'),
+    sa.UniqueConstraint('paper_id', 'entity_id', name='uq_paper_entity')
+    )
+    op.execute("""
+        INSERT INTO paper_entities (paper_id, entity_id, evidence, confidence, created_at)
+        SELECT paper_id, entity_id, evidence, confidence, created_at
+        FROM paper_entities_partitioned
+        ON CONFLICT (paper_id, entity_id) DO NOTHING
+    """)
+    # Dropping the parent drops every partition with it
+    op.execute("DROP TABLE paper_entities_partitioned")
+    op.create_index('ix_paper_entities_entity_id', 'paper_entities', ['entity_id'], unique=False)
+    op.create_index('ix_paper_entities_paper_id', 'paper_entities', ['paper_id'], unique=False)
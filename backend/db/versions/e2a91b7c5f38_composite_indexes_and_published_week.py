@@ -0,0 +1,54 @@
+"""composite_indexes_and_published_week
+
+Revision ID: e2a91b7c5f38
+Revises: c41a7e9f0d52
+Create Date: 2026-10-19 16:02:47.551203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a91b7c5f38'
+down_revision: Union[str, Sequence[str], None] = 'c41a7e9f0d52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Generated stored column; adding it rewrites every partition once
+    op.add_column('paper_entities', sa.Column(
+        'published_week', sa.Date(),
+        sa.Computed("(date_trunc('week', published_at))::date", persisted=True),
+        nullable=True,
+    ))
+    # paper_id lookups are served by the primary key (paper_id, entity_id, published_at)
+    op.drop_index('ix_paper_entities_paper_id', table_name='paper_entities')
+    op.drop_index('ix_paper_entities_entity_id', table_name='paper_entities')
+    op.create_index('ix_paper_entities_entity_paper', 'paper_entities', ['entity_id', 'paper_id'], unique=False, postgresql_include=['published_week'])
+    op.create_index('ix_paper_entities_week_entity', 'paper_entities', ['published_week', 'entity_id'], unique=False, postgresql_include=['paper_id', 'published_at'])
+    op.create_index('ix_paper_entities_published_entity', 'paper_entities', ['published_at', 'entity_id'], unique=False, postgresql_include=['paper_id'])
+
+    op.create_index(op.f('ix_entities_name'), 'entities', ['name'], unique=False)
+
+    op.drop_index(op.f('ix_papers_published_at'), table_name='papers')
+    op.create_index('ix_papers_published_at_id', 'papers', ['published_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_papers_published_at_id', table_name='papers')
+    op.create_index(op.f('ix_papers_published_at'), 'papers', ['published_at'], unique=False)
+
+    op.drop_index(op.f('ix_entities_name'), table_name='entities')
+
+    op.drop_index('ix_paper_entities_published_entity', table_name='paper_entities')
+    op.drop_index('ix_paper_entities_week_entity', table_name='paper_entities')
+    op.drop_index('ix_paper_entities_entity_paper', table_name='paper_entities')
+    op.create_index('ix_paper_entities_entity_id', 'paper_entities', ['entity_id'], unique=False)
+    op.create_index('ix_paper_entities_paper_id', 'paper_entities', ['paper_id'], unique=False)
+    op.drop_column('paper_entities', 'published_week')
@@ -0,0 +1,64 @@
+"""add confidence buckets to trend rollups
+
+Revision ID: f642c7dbc28f
+Revises: 018a3bdd3107
+Create Date: 2026-10-19 05:38:03.178001
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f642c7dbc28f'
+down_revision: Union[str, Sequence[str], None] = '018a3bdd3107'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('entity_weekly_counts',
+    sa.Column('week', sa.Date(), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('confidence_bucket', sa.SmallInteger(), nullable=False),
+    sa.Column('paper_count', sa.Integer(), nullable=False),
+    sa.Column('confidence_sum', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['entity_id'], ['entities.id'], ),
+    sa.PrimaryKeyConstraint('week', 'entity_id', 'confidence_bucket')
+    )
+    # The tag rollups are derived data: empty them, and drop the watermark so the next refresh rebuilds every week
+    op.execute("DELETE FROM tag_weekly_counts")
+    op.execute("DELETE FROM tag_entity_type_weekly_counts")
+    op.execute("DELETE FROM rollup_states WHERE name = 'tags'")
+    op.add_column('tag_weekly_counts', sa.Column('confidence_bucket', sa.SmallInteger(), nullable=False))
+    op.drop_constraint('tag_weekly_counts_pkey', 'tag_weekly_counts', type_='primary')
+    op.create_primary_key('tag_weekly_counts_pkey', 'tag_weekly_counts', ['week', 'tag', 'confidence_bucket'])
+    op.add_column('tag_entity_type_weekly_counts', sa.Column('confidence_bucket', sa.SmallInteger(), nullable=False))
+    op.drop_constraint('tag_entity_type_weekly_counts_pkey', 'tag_entity_type_weekly_counts', type_='primary')
+    op.create_primary_key('tag_entity_type_weekly_counts_pkey', 'tag_entity_type_weekly_counts', ['week', 'tag', 'confidence_bucket', 'entity_type'])
+    # confidence in the covering indexes keeps threshold and weighted trend queries index-only
+    op.drop_index('ix_paper_entities_week_entity', table_name='paper_entities')
+    op.create_index('ix_paper_entities_week_entity', 'paper_entities', ['published_week', 'entity_id'], unique=False, postgresql_include=['paper_id', 'published_at', 'confidence'])
+    op.drop_index('ix_paper_entities_published_entity', table_name='paper_entities')
+    op.create_index('ix_paper_entities_published_entity', 'paper_entities', ['published_at', 'entity_id'], unique=False, postgresql_include=['paper_id', 'confidence'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_paper_entities_published_entity', table_name='paper_entities')
+    op.create_index('ix_paper_entities_published_entity', 'paper_entities', ['published_at', 'entity_id'], unique=False, postgresql_include=['paper_id'])
+    op.drop_index('ix_paper_entities_week_entity', table_name='paper_entities')
+    op.create_index('ix_paper_entities_week_entity', 'paper_entities', ['published_week', 'entity_id'], unique=False, postgresql_include=['paper_id', 'published_at'])
+    op.execute("DELETE FROM tag_weekly_counts")
+    op.execute("DELETE FROM tag_entity_type_weekly_counts")
+    op.execute("DELETE FROM rollup_states WHERE name = 'trends'")
+    op.drop_constraint('tag_entity_type_weekly_counts_pkey', 'tag_entity_type_weekly_counts', type_='primary')
+    op.drop_column('tag_entity_type_weekly_counts', 'confidence_bucket')
+    op.create_primary_key('tag_entity_type_weekly_counts_pkey', 'tag_entity_type_weekly_counts', ['week', 'tag', 'entity_type'])
+    op.drop_constraint('tag_weekly_counts_pkey', 'tag_weekly_counts', type_='primary')
+    op.drop_column('tag_weekly_counts', 'confidence_bucket')
+    op.create_primary_key('tag_weekly_counts_pkey', 'tag_weekly_counts', ['week', 'tag'])
+    op.drop_table('entity_weekly_counts')
@@ -0,0 +1,137 @@
+"""
+Analytics benchmark: PostgreSQL against the embedded SQLite backend.
+
+Copies papers, entities, paper_entities and paper_tags from the database in
+POSTGRES_URL into a SQLite file (its generated columns are computed by
+SQLite), then times every `analytics_repo` query on both databases with the
+same arguments. Copying is not timed.
+
+Usage:
+    python -m benchmarks.bench_bulk_load --papers 200000 --reset
+    python -m benchmarks.bench_backends --sqlite /tmp/radar_bench.db --out backends.json
+
+200k synthetic papers give about 1M paper_entities rows. --skip-copy reruns
+the queries against an existing SQLite file.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.database import Base, create_sqlite_engine, engine, require_postgres
+from backend.app.models import models
+from benchmarks.bench_ingestion import analytics_queries, git_commit
+
+# Parents before children, so the copied foreign keys resolve
+TABLES = [models.Paper.__table__, models.Entity.__table__, models.PaperEntity.__table__, models.PaperTag.__table__]
+
+
+def copy_to_sqlite(source, target, batch_size: int) -> dict:
+    """Recreates the SQLite schema and copies TABLES into it; returns rows per table"""
+    Base.metadata.drop_all(bind=target)
+    Base.metadata.create_all(bind=target)
+    counts = {}
+    with source.connect() as source_conn, target.begin() as target_conn:
+        # entities.canonical_id may point at a later row
+        target_conn.exec_driver_sql("PRAGMA defer_foreign_keys = ON")
+        for table in TABLES:
+            columns = [column for column in table.columns if column.computed is None]
+            result = source_conn.execution_options(stream_results=True, yield_per=batch_size).execute(
+                select(*columns).order_by(*table.primary_key.columns)
+            )
+            counts[table.name] = 0
+            for rows in result.mappings().partitions():
+                target_conn.execute(table.insert(), [dict(row) for row in rows])
+                counts[table.name] += len(rows)
+                print(f"   {table.name}: {counts[table.name]:,} rows", file=sys.stderr)
+    with target.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    return counts
+
+
+def time_queries(session_factory, repeats: int) -> dict:
+    """Median and best wall time of each analytics query over `repeats` runs, after one warm-up"""
+    report = {}
+    db = session_factory()
+    try:
+        for name, query in analytics_queries().items():
+            rows = len(query(db))
+            seconds = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                query(db)
+                seconds.append(time.perf_counter() - started)
+            report[name] = {
+                "rows": rows,
+                "p50_ms": round(statistics.median(seconds) * 1000, 3),
+                "min_ms": round(min(seconds) * 1000, 3),
+            }
+            print(f"   {name}: {report[name]['p50_ms']:.1f} ms", file=sys.stderr)
+    finally:
+        db.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analytics on PostgreSQL vs SQLite", prog="bench_backends")
+    parser.add_argument("--sqlite", type=str, default="radar_bench.db", help="SQLite file to copy into (default: radar_bench.db)")
+    parser.add_argument("--batch-size", type=int, default=20000, help="Rows per copy batch (default: 20000)")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per query (default: 5)")
+    parser.add_argument("--skip-copy", action="store_true", help="Reuse the existing SQLite file")
+    parser.add_argument("--out", type=str, default=None, help="Write JSON report to this path (default: stdout)")
+    args = parser.parse_args()
+
+    require_postgres("bench_backends (the copy source)")
+    sqlite_engine = create_sqlite_engine(f"sqlite:///{args.sqlite}")
+
+    copied = None
+    if not args.skip_copy:
+        started = time.perf_counter()
+        copied = copy_to_sqlite(engine, sqlite_engine, args.batch_size)
+        print(f"   copied in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+        postgres_bytes = conn.execute(text("SELECT pg_database_size(current_database())")).scalar()
+
+    print("PostgreSQL", file=sys.stderr)
+    postgres = time_queries(sessionmaker(bind=engine), args.repeats)
+    print("SQLite", file=sys.stderr)
+    sqlite = time_queries(sessionmaker(bind=sqlite_engine), args.repeats)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "params": vars(args),
+            "copied_rows": copied,
+            "postgres_mb": round(postgres_bytes / 2**20, 1),
+            "sqlite_mb": round(os.path.getsize(args.sqlite) / 2**20, 1),
+        },
+        "queries": {
+            name: {
+                "postgres": postgres[name],
+                "sqlite": sqlite[name],
+                "sqlite_vs_postgres": round(sqlite[name]["p50_ms"] / postgres[name]["p50_ms"], 2) if postgres[name]["p50_ms"] else None,
+            }
+            for name in postgres
+        },
+    }
+
+    output = json.dumps(report, indent=2, default=str)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+        print(f"✅ Benchmark report written to {args.out}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
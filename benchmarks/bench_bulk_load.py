@@ -0,0 +1,71 @@
+"""
+COPY bulk-load benchmark.
+
+Generates pre-enriched synthetic papers (entities and tags included) and
+loads them through `BulkLoader` against the database in POSTGRES_URL,
+reporting staged rows per second. Record generation is not timed.
+
+Usage:
+    python -m benchmarks.bench_bulk_load --papers 200000 --batch-size 20000 --reset
+"""
+import argparse
+import json
+import sys
+import time
+
+from backend.app.database import SessionLocal, engine, Base
+from backend.app.models import models  # noqa: F401  (registers tables on Base)
+from backend.app.repositories.bulk_loader import BulkLoader
+from benchmarks.synthetic import SyntheticCorpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="COPY bulk-load benchmark", prog="bench_bulk_load")
+    parser.add_argument("--papers", type=int, default=100000, help="Number of synthetic papers (default: 100000)")
+    parser.add_argument("--batch-size", type=int, default=20000, help="Papers per COPY batch (default: 20000)")
+    parser.add_argument("--fanout", type=float, default=6.0, help="Mean entities per paper (default: 6)")
+    parser.add_argument("--vocab-size", type=int, default=50000, help="Distinct entity names (default: 50000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--offset", type=int, default=0, help="First corpus index, to load fresh papers into a non-empty DB")
+    parser.add_argument("--missing-rate", type=float, default=0.01, help="Share of papers without abstract, date, url and confidences (default: 0.01)")
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables first")
+    args = parser.parse_args()
+
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    corpus = SyntheticCorpus(seed=args.seed, fanout=args.fanout, vocab_size=args.vocab_size, missing_rate=args.missing_rate)
+    totals = {"staged_rows": 0, "papers": 0, "entities": 0, "paper_entities": 0, "paper_tags": 0}
+    load_seconds = 0.0
+
+    db = SessionLocal()
+    try:
+        loader = BulkLoader(db)
+        for start in range(args.offset, args.offset + args.papers, args.batch_size):
+            count = min(args.batch_size, args.offset + args.papers - start)
+            batch = list(corpus.records(start, count))
+
+            started = time.perf_counter()
+            counts = loader.load(batch)
+            db.commit()
+            load_seconds += time.perf_counter() - started
+
+            for key in totals:
+                totals[key] += counts[key]
+            print(f"   {start + count - args.offset}/{args.papers} papers", file=sys.stderr)
+    finally:
+        db.close()
+
+    report = {
+        "params": vars(args),
+        "seconds": round(load_seconds, 3),
+        "rows_per_sec": round(totals["staged_rows"] / load_seconds) if load_seconds else None,
+        "papers_per_sec": round(args.papers / load_seconds) if load_seconds else None,
+        **totals,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
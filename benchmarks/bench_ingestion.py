@@ -0,0 +1,245 @@
+"""
+End-to-end ingestion benchmark.
+
+Drives `IngestionService.fetch_and_save` with a synthetic arXiv corpus and the
+stub LLM backend against the database in POSTGRES_URL, then times every
+`analytics_repo` query. Results are written as JSON so runs can be compared
+across commits with `benchmarks/compare.py`.
+
+Usage:
+    python -m benchmarks.bench_ingestion --papers 1000 --out bench.json
+    python -m benchmarks.bench_ingestion --papers 100000 --batch-size 500 --reset
+
+Point POSTGRES_URL at a dedicated benchmark database: the run inserts
+synthetic papers, and --reset drops and recreates every table.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from backend.app import metrics
+from backend.app.database import SessionLocal, engine, Base
+from backend.app.models import models  # noqa: F401  (registers tables on Base)
+from backend.app.repositories import analytics_repo
+from backend.app.repositories.paper_repo import PaperRepository
+from backend.app.repositories.entity_repo import EntityRepository
+from backend.app.repositories.embedding_repo import EmbeddingRepository
+from backend.app.repositories.rollup_repo import RollupRepository
+from backend.app.services.ingestion_services import IngestionService
+from backend.app.services.embedding_service import EmbeddingService
+from backend.app.services.rollup_service import RollupService
+from backend.app.services.entity_dictionary import DictionaryExtractor, DICTIONARY_MODE, MODES
+from backend.app.llm.entity_extraction import LLMService
+from backend.app.llm.paper_classification import ClassificationService
+from backend.app.llm.stub import StubChatModel
+from backend.app.llm.embeddings import HashingEmbeddings
+from benchmarks.synthetic import SyntheticCorpus, SyntheticArxivClient
+
+
+BENCH_SECONDS = metrics.Histogram("bench_seconds", "Benchmark-only timings", ["stage"])
+
+
+def summarize(rows):
+    """Key histogram summary rows by their label value, in milliseconds"""
+    report = {}
+    for row in rows:
+        label = ",".join(row["labels"].values())
+        report[label] = {
+            "count": row["count"],
+            "total_s": round(row["total_s"], 6),
+            "p50_ms": round(row["p50_s"] * 1000, 3) if row["p50_s"] is not None else None,
+            "p95_ms": round(row["p95_s"] * 1000, 3) if row["p95_s"] is not None else None,
+        }
+    return report
+
+
+class StatementCounter:
+    def __init__(self, bind):
+        self.count = 0
+        event.listen(bind, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+async def run_ingestion(args, counter: StatementCounter):
+    corpus = SyntheticCorpus(
+        seed=args.seed,
+        days=args.days,
+        fanout=args.fanout,
+        vocab_size=args.vocab_size,
+    )
+    arxiv_client = SyntheticArxivClient(corpus)
+    stub = StubChatModel(
+        latency_ms=args.llm_latency_ms,
+        error_rate=args.llm_error_rate,
+        rate_limit_rate=args.llm_rate_limit_rate,
+        seed=args.seed,
+    )
+
+    ingested = 0
+    statements_before = counter.count
+    started = time.perf_counter()
+    while ingested < args.papers:
+        batch = min(args.batch_size, args.papers - ingested)
+        db = SessionLocal()
+        try:
+            paper_repo = PaperRepository(db)
+            entity_repo = EntityRepository(db)
+            llm_service = LLMService(api_key=None, llm=stub)
+            classification_service = ClassificationService(api_key=None, llm=stub)
+            service = IngestionService(
+                paper_repo=paper_repo,
+                entity_repo=entity_repo,
+                llm_service=llm_service,
+                classification_service=classification_service,
+                arxiv_client=arxiv_client,
+                embedding_service=EmbeddingService(EmbeddingRepository(db), model=HashingEmbeddings(), model_name="stub-hashing-v1") if args.embed else None,
+                dictionary_extractor=DictionaryExtractor(entity_repo, mode=args.dictionary),
+            )
+
+            with BENCH_SECONDS.time(stage="batch_total"):
+                count, _ = await service.fetch_and_save(query="synthetic", max_results=batch)
+                with BENCH_SECONDS.time(stage="commit"):
+                    db.commit()
+        finally:
+            db.close()
+        if count == 0:
+            break
+        ingested += count
+        print(f"   {ingested}/{args.papers} papers", file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    statements = counter.count - statements_before
+    return {
+        "papers": ingested,
+        "seconds": round(elapsed, 3),
+        "papers_per_sec": round(ingested / elapsed, 2) if elapsed else None,
+        "statements": statements,
+        "statements_per_paper": round(statements / ingested, 2) if ingested else None,
+    }
+
+
+def analytics_queries():
+    """Every analytics_repo query with the arguments the benchmarks run it with, by name"""
+    now = datetime.utcnow()
+    week_start = datetime.combine((now - timedelta(days=now.weekday() + 7)).date(), datetime.min.time())
+    entity_type = "method"
+    return {
+        "get_top_entities_by_week": lambda db: analytics_repo.get_top_entities_by_week(db, week_start, entity_type),
+        "get_fastest_growing_entities": lambda db: analytics_repo.get_fastest_growing_entities(db, entity_type),
+        "get_entity_cooccurence_edges": lambda db: analytics_repo.get_entity_cooccurence_edges(db, entity_type, days=30),
+        "get_papers_for_an_entity": lambda db: analytics_repo.get_papers_for_an_entity(db, 1),
+        "category_distribution_over_time": lambda db: analytics_repo.category_distribution_over_time(db),
+        "get_canonical_merges_report": lambda db: analytics_repo.get_canonical_merges_report(db),
+        "get_top_authors": lambda db: analytics_repo.get_top_authors(db, week_start.date(), week_start.date()),
+        "get_rising_authors": lambda db: analytics_repo.get_rising_authors(
+            db, week_start.date() - timedelta(weeks=7), week_start.date() - timedelta(weeks=3), week_start.date()
+        ),
+        "get_tag_weekly_counts": lambda db: analytics_repo.get_tag_weekly_counts(
+            db, week_start.date() - timedelta(weeks=7), week_start.date()
+        ),
+        "get_tag_entity_type_counts": lambda db: analytics_repo.get_tag_entity_type_counts(
+            db, week_start.date() - timedelta(weeks=7), week_start.date()
+        ),
+    }
+
+
+def run_analytics(args, counter: StatementCounter):
+    queries = analytics_queries()
+
+    metrics.ANALYTICS_QUERY_SECONDS.reset()
+    extra = {}
+    db = SessionLocal()
+    try:
+        # What `cli.py ingest` does after saving papers, so the rollup queries have rows to read
+        RollupService(RollupRepository(db)).refresh()
+        for name, query in queries.items():
+            rows = 0
+            statements_before = counter.count
+            for _ in range(args.analytics_repeats):
+                rows = len(query(db))
+            extra[name] = {"rows": rows, "statements": counter.count - statements_before}
+    finally:
+        db.close()
+
+    report = summarize(metrics.ANALYTICS_QUERY_SECONDS.summary())
+    for name, values in extra.items():
+        report.setdefault(name, {}).update(values)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end ingestion benchmark", prog="bench_ingestion")
+    parser.add_argument("--papers", type=int, default=1000, help="Number of synthetic papers to ingest (default: 1000)")
+    parser.add_argument("--batch-size", type=int, default=100, help="Papers per fetch_and_save call (default: 100)")
+    parser.add_argument("--days", type=int, default=365, help="Spread publication dates over this many days (default: 365)")
+    parser.add_argument("--fanout", type=float, default=6.0, help="Mean entities mentioned per abstract (default: 6)")
+    parser.add_argument("--vocab-size", type=int, default=5000, help="Distinct entity names in the corpus (default: 5000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated LLM latency per call")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Fraction of LLM calls that fail")
+    parser.add_argument("--llm-rate-limit-rate", type=float, default=0.0, help="Fraction of LLM calls that return 429")
+    parser.add_argument("--embed", action="store_true", help="Also embed papers during ingestion (hashing stub model)")
+    parser.add_argument("--dictionary", choices=MODES, default=DICTIONARY_MODE, help=f"Entity dictionary policy (default: {DICTIONARY_MODE})")
+    parser.add_argument("--analytics-repeats", type=int, default=5, help="Runs per analytics query (default: 5)")
+    parser.add_argument("--skip-ingest", action="store_true", help="Only benchmark analytics on existing data")
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables first")
+    parser.add_argument("--out", type=str, default=None, help="Write JSON report to this path (default: stdout)")
+    args = parser.parse_args()
+
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    counter = StatementCounter(engine)
+
+    ingestion = None
+    if not args.skip_ingest:
+        ingestion = asyncio.run(run_ingestion(args, counter))
+    analytics = run_analytics(args, counter)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "params": vars(args),
+        },
+        "ingestion": ingestion,
+        "stages": {
+            **summarize(metrics.INGEST_STAGE_SECONDS.summary()),
+            **{f"llm:{k}": v for k, v in summarize(metrics.LLM_CALL_SECONDS.summary()).items()},
+            **summarize(BENCH_SECONDS.summary()),
+        },
+        "analytics": analytics,
+        # ru_maxrss is reported in kilobytes on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+    output = json.dumps(report, indent=2, default=str)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+        print(f"✅ Benchmark report written to {args.out}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
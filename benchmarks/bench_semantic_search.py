@@ -0,0 +1,94 @@
+"""
+Semantic search benchmark.
+
+Times `/papers/{id}/similar`-style lookups through the HNSW index on the
+database in POSTGRES_URL and measures recall@k against an exact
+(sequential scan) ranking, for each hnsw.ef_search value given. Papers need
+embeddings first: `python cli.py embed --rebuild-index`.
+
+Usage:
+    python -m benchmarks.bench_semantic_search --queries 200 --k 10 --ef-search 40 100
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+
+from sqlalchemy import func, select
+
+from backend.app.database import SessionLocal
+from backend.app.models.models import PaperEmbedding
+from backend.app.repositories.embedding_repo import EmbeddingRepository
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def exact_neighbours(db, vector, k, exclude_paper_id):
+    """Ground truth: the same ORDER BY with index scans disabled"""
+    db.execute(select(func.set_config("enable_indexscan", "off", True)))
+    distance = PaperEmbedding.embedding.cosine_distance(vector)
+    rows = db.execute(
+        select(PaperEmbedding.paper_id)
+        .where(PaperEmbedding.paper_id != exclude_paper_id)
+        .order_by(distance)
+        .limit(k)
+    ).all()
+    db.execute(select(func.set_config("enable_indexscan", "on", True)))
+    return {row.paper_id for row in rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Semantic search benchmark", prog="bench_semantic_search")
+    parser.add_argument("--queries", type=int, default=200, help="Sampled query papers (default: 200)")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query (default: 10)")
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[40, 100], help="hnsw.ef_search values to compare")
+    parser.add_argument("--no-recall", action="store_true", help="Skip the exact scans used for recall")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        repo = EmbeddingRepository(db)
+        ids = [row[0] for row in db.query(PaperEmbedding.paper_id).all()]
+        if not ids:
+            sys.exit("No embeddings found; run `python cli.py embed` first")
+        sample = random.Random(args.seed).sample(ids, min(args.queries, len(ids)))
+        vectors = {paper_id: repo.get_embedding(paper_id) for paper_id in sample}
+
+        truth = {}
+        if not args.no_recall:
+            for paper_id in sample:
+                truth[paper_id] = exact_neighbours(db, vectors[paper_id], args.k, paper_id)
+            db.rollback()
+
+        results = {}
+        for ef in args.ef_search:
+            latencies, recalls = [], []
+            for paper_id in sample:
+                started = time.perf_counter()
+                rows = repo.nearest(vectors[paper_id], limit=args.k, exclude_paper_id=paper_id, ef_search=ef)
+                latencies.append((time.perf_counter() - started) * 1000)
+                if truth:
+                    found = {paper.id for paper, _ in rows}
+                    recalls.append(len(found & truth[paper_id]) / max(1, len(truth[paper_id])))
+                db.rollback()
+            results[f"ef_search={ef}"] = {
+                "p50_ms": round(percentile(latencies, 0.50), 3),
+                "p95_ms": round(percentile(latencies, 0.95), 3),
+                "recall_at_k": round(statistics.mean(recalls), 4) if recalls else None,
+            }
+            print(f"   ef_search={ef} done", file=sys.stderr)
+    finally:
+        db.close()
+
+    report = {"params": vars(args), "embeddings": len(ids), "results": results}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
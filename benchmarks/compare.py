@@ -0,0 +1,52 @@
+"""
+Compare two benchmark reports.
+
+Usage:
+    python -m benchmarks.compare base.json head.json
+"""
+import argparse
+import json
+
+
+def flatten(report, prefix=""):
+    """Yield (dotted.key, value) for every numeric leaf"""
+    for key, value in report.items():
+        path = f"{prefix}{key}"
+        if key == "meta":
+            continue
+        if isinstance(value, dict):
+            yield from flatten(value, path + ".")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield path, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff two benchmark JSON reports", prog="compare")
+    parser.add_argument("base", help="Baseline report")
+    parser.add_argument("head", help="Report to compare against the baseline")
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+
+    base_values = dict(flatten(base))
+    head_values = dict(flatten(head))
+
+    print(f"base: {base.get('meta', {}).get('commit')}")
+    print(f"head: {head.get('meta', {}).get('commit')}\n")
+    print(f"{'metric':<55} {'base':>12} {'head':>12} {'change':>9}")
+    print("-" * 91)
+    for key in sorted(set(base_values) | set(head_values)):
+        b = base_values.get(key)
+        h = head_values.get(key)
+        if b is not None and h is not None and b != 0:
+            change = f"{(h - b) / b * 100:+.1f}%"
+        else:
+            change = ""
+        print(f"{key:<55} {b if b is not None else '-':>12} {h if h is not None else '-':>12} {change:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,58 +2,133 @@
 ArXiv Trend Radar - CLI Tool
 Usage:
     python cli.py ingest --query "retrieval augmented generation" --days 7 --limit 50
+    python cli.py ingest --resume
+    python cli.py ingest-many queries.yaml --processes 4 --llm-concurrency 16
+    python cli.py retry-failed --max-attempts 3
+    python cli.py watch add rag --query "retrieval augmented generation" --interval 60
+    python cli.py watch run
+    python cli.py import-snapshot arxiv-metadata-oai-snapshot.json --categories "cs.*" --since 2024-01-01
+    python cli.py bulk-load papers.jsonl --batch-size 20000
+    python cli.py embed --batch-size 256
+    python cli.py dedup-index --batch-size 2000
+    python cli.py authors --batch-size 1000
+    python cli.py rollups
+    python cli.py topics --k 50
+    python cli.py retag --processes 4
     python cli.py canonicalize
     python cli.py digest --week-start 2026-01-01
+    python cli.py partitions --months-ahead 3
+    python cli.py profile-queries --slow-ms 50
+    python cli.py export --format parquet --out exports
+    python cli.py offline top-entities --data exports --entity-type method
 """
 import argparse
 import asyncio
+import logging
 import os
+import time
 from dotenv import load_dotenv
 
-from backend.app.database import SessionLocal
-from backend.app.repositories.paper_repo import PaperRepository
-from backend.app.repositories.entity_repo import EntityRepository
-from backend.app.services.ingestion_services import IngestionService
-from backend.app.llm.entity_extraction import LLMService
-from backend.app.llm.paper_classification import ClassificationService
-from backend.app.llm.canonicalization import CanonicalizationService
+from backend.app import metrics
+from backend.app.llm.providers import requires_api_key
+from backend.app.repositories.parquet_analytics_repo import EXPORT_TABLES
 
 load_dotenv()
 
+# Modules that need the database settings (backend.app.database, the models and
+# repositories) are imported by the commands that use them, so `offline` and
+# `--help` run without POSTGRES_URL or DATABASE_URL
+
+
+def _build_ingestion_service(db):
+    """Wire repositories and LLM services, or None if the API key is missing"""
+    from backend.app.database import IS_SQLITE
+    from backend.app.repositories.paper_repo import PaperRepository
+    from backend.app.repositories.entity_repo import EntityRepository
+    from backend.app.repositories.embedding_repo import EmbeddingRepository
+    from backend.app.services.ingestion_services import IngestionService
+    from backend.app.services.embedding_service import EmbeddingService
+    from backend.app.llm.entity_extraction import LLMService
+    from backend.app.llm.paper_classification import ClassificationService
+    from backend.app.llm.embeddings import get_embedding_model
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key and requires_api_key():
+        print("❌ Error: OPENAI_API_KEY not found in environment variables.")
+        print("   Please add it to your .env file (use your OpenRouter API key).")
+        return None
+
+    return IngestionService(
+        paper_repo=PaperRepository(db),
+        entity_repo=EntityRepository(db),
+        llm_service=LLMService(api_key=api_key),
+        classification_service=ClassificationService(api_key=api_key),
+        # Embeddings are pgvector columns; SQLite deployments run without them
+        embedding_service=None if IS_SQLITE else EmbeddingService(EmbeddingRepository(db), model=get_embedding_model(api_key))
+    )
+
+
+def _postgres_only(feature: str) -> bool:
+    """False, after printing why, when DATABASE_URL points at SQLite"""
+    from backend.app.database import require_postgres
+
+    try:
+        require_postgres(feature)
+    except RuntimeError as e:
+        print(f"❌ Error: {e}")
+        return False
+    return True
+
+
+def _refresh_rollups(db):
+    """Recomputes the weeks of the trend rollups that changed since their last refresh"""
+    from backend.app.repositories.rollup_repo import RollupRepository
+    from backend.app.services.rollup_service import RollupService
+
+    stats = RollupService(RollupRepository(db)).refresh()
+    print(f"📈 Trend rollups: {stats['weeks']} weeks refreshed")
+
+
+def _print_ingest_state(state_repo):
+    from backend.app.models.models import IngestStatus
+
+    counts = state_repo.count_by_status()
+    print("📋 Ingest state: " + ", ".join(
+        f"{status.value}={counts.get(status.value, 0)}" for status in IngestStatus
+    ))
+
 
 async def ingest_command_async(args):
     """Ingest papers from arXiv API with entity extraction"""
+    from backend.app.database import SessionLocal
+    from backend.app.models.models import IngestStatus
+
+    if args.resume:
+        await resume_command_async(args, [IngestStatus.fetched])
+        return
+    if not args.query:
+        print("❌ Error: --query is required unless --resume is given.")
+        return
+
     db = SessionLocal()
     try:
-        # Initialize repositories
-        paper_repo = PaperRepository(db)
-        entity_repo = EntityRepository(db)
-        
-        # Initialize LLM service
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            print("❌ Error: OPENAI_API_KEY not found in environment variables.")
-            print("   Please add it to your .env file (use your OpenRouter API key).")
+        service = _build_ingestion_service(db)
+        if service is None:
             return
         
-        llm_service = LLMService(api_key=api_key)
-        classification_service = ClassificationService(api_key=api_key)
-        
-        # Initialize ingestion service with all dependencies
-        service = IngestionService(
-            paper_repo=paper_repo,
-            entity_repo=entity_repo,
-            llm_service=llm_service,
-            classification_service=classification_service
-        )
-        
         print(f"\n📥 Ingesting papers...")
         print(f"   Query: {args.query}")
         print(f"   Days: {args.days}")
-        print(f"   Limit: {args.limit}")
+        limit = args.limit or 50
+        print(f"   Limit: {limit}")
+        print(f"   Chunk size: {args.chunk_size}")
         print("-" * 50)
         
-        count, saved_papers = await service.fetch_and_save(query=args.query, max_results=args.limit)
+        count, saved_papers = await service.fetch_and_save(
+            query=args.query,
+            max_results=limit,
+            chunk_size=args.chunk_size
+        )
         
         db.commit()  # Commit all changes
         
@@ -70,6 +145,188 @@ async def ingest_command_async(args):
                 title_short = (p["title"][:72] + "…") if len(p["title"]) > 72 else p["title"]
                 print(f"   • {p['arxiv_id']}  {title_short}")
             print()
+
+        _print_ingest_state(service.state_repo)
+        _refresh_rollups(db)
+        print()
+        print("⏱️  Where the time went:\n")
+        print(metrics.format_summary_table())
+        print()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error: {e}")
+        raise
+    finally:
+        db.close()
+
+
+def ingest_many_command(args):
+    """Ingest every query of a manifest on a pool of worker processes"""
+    if not _postgres_only("ingest-many"):
+        return
+    from backend.app.database import SessionLocal
+    from backend.app.repositories.ingest_state_repo import IngestStateRepository
+    from backend.app.services.ingest_pool import load_manifest, run_jobs
+
+    if not os.getenv("OPENAI_API_KEY") and requires_api_key():
+        print("❌ Error: OPENAI_API_KEY not found in environment variables.")
+        print("   Please add it to your .env file (use your OpenRouter API key).")
+        return
+
+    jobs = load_manifest(args.manifest)
+    processes = min(args.processes or os.cpu_count() or 1, len(jobs)) if jobs else 0
+    print(f"\n📥 Ingesting {len(jobs)} queries from {args.manifest}")
+    print(f"   Processes: {processes}")
+    print(f"   LLM concurrency: {args.llm_concurrency or 'unlimited'} (shared)")
+    print("-" * 50)
+
+    def progress(result):
+        if result["error"]:
+            print(f"❌ {result['name']}: {result['error']}")
+        else:
+            print(f"✅ {result['name']}: {result['papers']} papers in {result['seconds']:.1f}s (worker {result['pid']})")
+
+    started = time.perf_counter()
+    results = run_jobs(jobs, processes=processes, llm_concurrency=args.llm_concurrency, progress=progress)
+    seconds = time.perf_counter() - started
+
+    failed = [result for result in results if result["error"]]
+    print("-" * 50)
+    print(f"{'⚠️ ' if failed else '✅'} {len(results) - len(failed)}/{len(results)} queries ingested, "
+          f"{sum(result['papers'] for result in results)} papers in {seconds:.1f}s\n")
+    db = SessionLocal()
+    try:
+        _print_ingest_state(IngestStateRepository(db))
+        _refresh_rollups(db)
+    finally:
+        db.close()
+    if failed:
+        print("   Papers left unfinished are picked up by `cli.py ingest --resume`")
+    print()
+
+
+async def watch_command_async(args):
+    """Manage saved queries, or poll them for new papers until interrupted"""
+    from backend.app.database import SessionLocal
+    from backend.app.repositories.watch_repo import WatchRepository
+
+    db = SessionLocal()
+    try:
+        watch_repo = WatchRepository(db)
+        if args.action == "add":
+            watch = watch_repo.save_query(args.name, args.query, max_results=args.limit, interval_minutes=args.interval)
+            db.commit()
+            print(f"✅ Saved query '{watch.name}': {watch.query} (every {watch.interval_minutes} min, up to {watch.max_results} papers)")
+        elif args.action == "import":
+            from backend.app.services.ingest_pool import load_manifest
+            jobs = load_manifest(args.manifest)
+            for job in jobs:
+                watch_repo.save_query(job.name, job.query, max_results=job.limit, interval_minutes=args.interval)
+            db.commit()
+            print(f"✅ Saved {len(jobs)} queries from {args.manifest}")
+        elif args.action == "remove":
+            removed = watch_repo.remove_query(args.name)
+            db.commit()
+            print(f"✅ Removed query '{args.name}'" if removed else f"❌ No saved query named '{args.name}'")
+        elif args.action == "list":
+            watches = watch_repo.list_queries()
+            if not watches:
+                print("No saved queries. Add one with `cli.py watch add NAME --query ...`")
+            for watch in watches:
+                watermark = f"{watch.watermark:%Y-%m-%d %H:%M}" if watch.watermark else "never run"
+                print(f"📌 {watch.name}: {watch.query}")
+                print(f"   every {watch.interval_minutes} min, up to {watch.max_results} papers, "
+                      f"watermark {watermark}, last run {watch.last_new}/{watch.last_fetched} new")
+        else:
+            await _watch_loop(args, db, watch_repo)
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error: {e}")
+        raise
+    finally:
+        db.close()
+
+
+async def _watch_loop(args, db, watch_repo):
+    from backend.app.database import IS_SQLITE
+    from backend.app.repositories.rollup_repo import RollupRepository
+    from backend.app.repositories.topic_repo import TopicRepository
+    from backend.app.services.rollup_service import RollupService
+    from backend.app.services.topic_service import TopicService
+    from backend.app.services.watch_service import WatchService
+
+    ingestion_service = _build_ingestion_service(db)
+    if ingestion_service is None:
+        return
+    service = WatchService(
+        watch_repo,
+        ingestion_service,
+        None if IS_SQLITE else TopicService(TopicRepository(db)),
+        RollupService(RollupRepository(db)),
+    )
+
+    print(f"\n👀 Watching {len(watch_repo.list_queries())} saved queries" + (" (one tick)" if args.once else ""))
+    print(f"   Chunk size: {args.chunk_size}")
+    print("-" * 50)
+    while True:
+        started = time.perf_counter()
+        try:
+            stats = await service.tick(chunk_size=args.chunk_size)
+        except Exception as e:
+            # A failed tick leaves the watermarks where they were; the next one retries
+            db.rollback()
+            if args.once:
+                raise
+            print(f"⚠️  Tick failed: {e}")
+        else:
+            if stats["queries"]:
+                rollups = ", ".join(f"{name}: {count:,}" for name, count in stats["rollups"].items())
+                print(f"🕒 {time.strftime('%Y-%m-%d %H:%M:%S')}  {stats['queries']} queries in {stats['searches']} searches, "
+                      f"{stats['fetched']} papers fetched, {stats['new']} new, {time.perf_counter() - started:.1f}s"
+                      + (f" (rollups refreshed: {rollups})" if rollups else ""))
+        if args.once:
+            break
+        wait = service.seconds_until_due()
+        await asyncio.sleep(min(wait if wait is not None else args.poll_seconds, args.poll_seconds) or 1)
+
+
+def watch_command(args):
+    """Wrapper to run async watch command"""
+    try:
+        asyncio.run(watch_command_async(args))
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+
+
+async def resume_command_async(args, statuses, max_attempts=None):
+    """Finish LLM enrichment for papers already in the DB, chunk by chunk"""
+    from backend.app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        service = _build_ingestion_service(db)
+        if service is None:
+            return
+
+        print(f"\n🔁 Resuming enrichment for papers in state: {', '.join(s.value for s in statuses)}")
+        if max_attempts is not None:
+            print(f"   Max attempts: {max_attempts}")
+        print(f"   Chunk size: {args.chunk_size}")
+        print("-" * 50)
+
+        summary = await service.resume(
+            statuses,
+            chunk_size=args.chunk_size,
+            max_attempts=max_attempts,
+            limit=args.limit
+        )
+        db.commit()
+
+        print("-" * 50)
+        print(f"✅ Enriched {summary['done']} papers, {summary['failed']} failed.\n")
+        _print_ingest_state(service.state_repo)
+        _refresh_rollups(db)
+        print()
     except Exception as e:
         db.rollback()
         print(f"❌ Error: {e}")
@@ -85,13 +342,17 @@ def ingest_command(args):
 
 async def canonicalize_command_async():
     """Find and merge duplicate entities"""
+    from backend.app.database import SessionLocal
+    from backend.app.repositories.entity_repo import EntityRepository
+    from backend.app.llm.canonicalization import CanonicalizationService
+
     db = SessionLocal()
     try:
         entity_repo = EntityRepository(db)
         
         # Get API key
         api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
+        if not api_key and requires_api_key():
             print("❌ Error: OPENAI_API_KEY not found.")
             return
 
@@ -141,6 +402,326 @@ async def canonicalize_command_async():
         db.close()
 
 
+def retry_failed_command(args):
+    """Wrapper to run async retry of failed papers"""
+    from backend.app.models.models import IngestStatus
+
+    asyncio.run(resume_command_async(args, [IngestStatus.failed], max_attempts=args.max_attempts))
+
+
+def import_snapshot_command(args):
+    """Bulk-load papers from a local arXiv metadata snapshot (no LLM calls)"""
+    if not _postgres_only("import-snapshot"):
+        return
+    from datetime import datetime
+    from backend.app.database import SessionLocal
+    from backend.app.services.snapshot_importer import SnapshotImporter, SnapshotFilter
+
+    snapshot_filter = SnapshotFilter(
+        categories=args.categories,
+        since=datetime.strptime(args.since, "%Y-%m-%d") if args.since else None,
+        until=datetime.strptime(args.until, "%Y-%m-%d") if args.until else None,
+    )
+
+    print(f"\n📦 Importing arXiv snapshot: {args.path}")
+    print(f"   Categories: {', '.join(args.categories) if args.categories else 'all'}")
+    print(f"   Published: {args.since or '-'} → {args.until or '-'}")
+    print(f"   Batch size: {args.batch_size}")
+    print("-" * 50)
+
+    def progress(stats):
+        print(f"   scanned {stats['scanned']:,}  matched {stats['matched']:,}  inserted {stats['inserted']:,}")
+
+    db = SessionLocal()
+    try:
+        importer = SnapshotImporter(db, batch_size=args.batch_size)
+        stats = importer.run(args.path, snapshot_filter, limit=args.limit, progress=progress)
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error: {e}")
+        raise
+    finally:
+        db.close()
+
+    rate = stats["matched"] / stats["seconds"] if stats["seconds"] else 0
+    print("-" * 50)
+    print(f"✅ Inserted {stats['inserted']:,} new papers "
+          f"({stats['matched']:,} matched, {stats['scanned']:,} scanned, {stats['invalid']:,} invalid) "
+          f"in {stats['seconds']:.1f}s, {rate:,.0f} papers/s")
+    print("   Run `python cli.py ingest --resume` to extract entities and tags.\n")
+
+
+def bulk_load_command(args):
+    """COPY-load pre-enriched papers (with entities and tags) from JSON lines"""
+    if not _postgres_only("bulk-load"):
+        return
+    from backend.app.database import SessionLocal
+    from backend.app.repositories.rollup_repo import RollupRepository
+    from backend.app.services.rollup_service import RollupService
+    from backend.app.services.snapshot_importer import load_jsonl
+
+    print(f"\n🚚 Bulk loading: {args.path}")
+    print(f"   Batch size: {args.batch_size}")
+    print("-" * 50)
+
+    def progress(stats):
+        print(f"   read {stats['read']:,} papers, staged {stats['staged_rows']:,} rows")
+
+    db = SessionLocal()
+    try:
+        stats = load_jsonl(db, args.path, batch_size=args.batch_size, progress=progress)
+        rollup_stats = RollupService(RollupRepository(db)).refresh()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error: {e}")
+        raise
+    finally:
+        db.close()
+
+    rate = stats["staged_rows"] / stats["seconds"] if stats["seconds"] else 0
+    print("-" * 50)
+    print(f"✅ Loaded {stats['staged_rows']:,} rows in {stats['seconds']:.1f}s ({rate:,.0f} rows/s)")
+    print(f"   New papers: {stats['papers']:,}  entities: {stats['entities']:,}  "
+          f"paper_entities: {stats['paper_entities']:,}  paper_tags: {stats['paper_tags']:,}")
+    print(f"   New authors: {stats['authors']:,}  paper_authors: {stats['paper_authors']:,}")
+    print(f"📈 Trend rollups: {rollup_stats['weeks']} weeks refreshed\n")
+
+
+async def embed_command_async(args):
+    """Compute embeddings for papers that do not have one from the configured model"""
+    if not _postgres_only("embed"):
+        return
+    from backend.app.database import SessionLocal
+    from backend.app.repositories.embedding_repo import EmbeddingRepository
+    from backend.app.services.embedding_service import EmbeddingService
+    from backend.app.llm.embeddings import get_embedding_model, EMBEDDING_PROVIDER
+
+    db = SessionLocal()
+    try:
+        service = EmbeddingService(EmbeddingRepository(db), model=get_embedding_model(os.getenv("OPENAI_API_KEY")))
+        print(f"\n🧭 Embedding papers with {EMBEDDING_PROVIDER}:{service.model_name}")
+        print(f"   Batch size: {args.batch_size}")
+        print(f"   Limit: {args.limit or 'all'}")
+        if args.rebuild_index:
+            print("   HNSW index: dropped now, rebuilt at the end")
+        print("-" * 50)
+
+        def progress(total):
+            print(f"   embedded {total:,} papers")
+
+        started = time.perf_counter()
+        total = await service.backfill(batch_size=args.batch_size, limit=args.limit, progress=progress, rebuild_index=args.rebuild_index)
+        seconds = time.perf_counter() - started
+        rate = total / seconds if seconds else 0
+        print("-" * 50)
+        print(f"✅ Embedded {total:,} papers in {seconds:.1f}s ({rate:,.0f} papers/s)")
+        print(f"   Papers with embeddings: {service.embedding_repo.count():,}\n")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error: {e}")
+        raise
+    finally:
+        db.close()
+
+
+def embed_command(args):
+    """Wrapper to run async embedding backfill"""
+    asyncio.run(embed_command_async(args))
+
+
+def dedup_index_command(args):
+    """Fingerprint papers that are not in the near-duplicate index yet"""
+    from backend.app.database import SessionLocal
+    from backend.app.repositories.fingerprint_repo import FingerprintRepository
+    from backend.app.services.dedup import DedupService
+
+    print("\n🔎 Building near-duplicate index (MinHash/LSH)")
+    print(f"   Batch size: {args.batch_size}")
+    print(f"   Limit: {args.limit or 'all'}")
+    print("-" * 50)
+
+    def progress(stats):
+        print(f"   fingerprinted {stats['fingerprinted']:,} papers, {stats['duplicates']:,} duplicates")
+
+    db = SessionLocal()
+    try:
+        service = DedupService(FingerprintRepository(db))
+        started = time.perf_counter()
+        stats = service.backfill(batch_size=args.batch_size, limit=args.limit, progress=progress)
+        seconds = time.perf_counter() - started
+        total_duplicates = service.fingerprint_repo.count_duplicates()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error: {e}")
+        raise
+    finally:
+        db.close()
+
+    rate = stats["fingerprinted"] / seconds if seconds else 0
+    print("-" * 50)
+    print(f"✅ Fingerprinted {stats['fingerprinted']:,} papers in {seconds:.1f}s ({rate:,.0f} papers/s)")
+    print(f"   Near-duplicates found: {stats['duplicates']:,} (total in index: {total_duplicates:,})\n")
+
+
+def authors_command(args):
+    """Link papers stored before the author index to their authors"""
+    from backend.app.database import SessionLocal
+    from backend.app.repositories.author_repo import AuthorRepository
+
+    print("\n👥 Building the author index")
+    print(f"   Batch size: {args.batch_size}")
+    print(f"   Limit: {args.limit or 'all'}")
+    print("-" * 50)
+
+    def progress(stats):
+        print(f"   linked {stats['papers']:,} papers, {stats['links']:,} paper_authors rows")
+
+    db = SessionLocal()
+    try:
+        author_repo = AuthorRepository(db)
+        started = time.perf_counter()
+        stats = author_repo.backfill(batch_size=args.batch_size, limit=args.limit, progress=progress)
+        if args.rebuild_rollup:
+            stats["weeks"] = author_repo.rebuild_weekly_counts()
+            db.commit()
+        author_repo.analyze()
+        db.commit()
+        seconds = time.perf_counter() - started
+        total_authors = author_repo.count_authors()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error: {e}")
+        raise
+    finally:
+        db.close()
+
+    rate = stats["papers"] / seconds if seconds else 0
+    print("-" * 50)
+    print(f"✅ Linked {stats['papers']:,} papers in {seconds:.1f}s ({rate:,.0f} papers/s)")
+    print(f"   New paper_authors rows: {stats['links']:,} (authors in index: {total_authors:,})")
+    if args.rebuild_rollup:
+        print(f"   author_weekly_counts rebuilt: {stats['weeks']:,} rows")
+    print()
+
+
+def rollups_command(args):
+    """Bring the trend rollups up to date, or recompute them from scratch"""
+    from backend.app.database import SessionLocal
+    from backend.app.repositories.rollup_repo import RollupRepository
+    from backend.app.services.rollup_service import RollupService
+
+    print(f"\n📈 {'Rebuilding' if args.rebuild else 'Refreshing'} trend rollups")
+    print("-" * 50)
+
+    def progress(stats):
+        if stats["weeks"] % 50 == 0:
+            print(f"   {stats['weeks']:,} weeks, {stats['rows']:,} rows")
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        stats = RollupService(RollupRepository(db)).refresh(rebuild=args.rebuild, progress=progress)
+        seconds = time.perf_counter() - started
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error: {e}")
+        raise
+    finally:
+        db.close()
+
+    print("-" * 50)
+    print(f"✅ Recomputed {stats['weeks']:,} weeks ({stats['rows']:,} rows) in {seconds:.1f}s\n")
+
+
+def topics_command(args):
+    """Cluster embedded papers into topics, or assign new papers to the existing ones"""
+    if not _postgres_only("topics"):
+        return
+    from backend.app.database import SessionLocal
+    from backend.app.repositories.topic_repo import TopicRepository
+    from backend.app.services.topic_service import TopicService
+
+    db = SessionLocal()
+    try:
+        service = TopicService(TopicRepository(db))
+        fitting = args.refit or not service.topic_repo.count_topics(service.model_name)
+        if fitting:
+            print(f"\n🗂️  Fitting {args.k} topics over {service.model_name} embeddings")
+        else:
+            print(f"\n🗂️  Assigning new papers to existing topics ({service.model_name})")
+        print(f"   Batch size: {args.batch_size}")
+        print("-" * 50)
+
+        def progress(stats):
+            print(f"   assigned {stats['assigned']:,} papers")
+
+        started = time.perf_counter()
+        stats = service.run(k=args.k, refit=args.refit, batch_size=args.batch_size, progress=progress)
+        seconds = time.perf_counter() - started
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error: {e}")
+        raise
+    finally:
+        db.close()
+
+    print("-" * 50)
+    if stats["mode"] == "fit":
+        print(f"   k-means on a {stats['sample']:,}-paper sample: {stats['iterations']} iterations")
+    rate = stats["assigned"] / seconds if seconds else 0
+    print(f"✅ Assigned {stats['assigned']:,} papers to {stats['topics']} topics in {seconds:.1f}s ({rate:,.0f} papers/s)\n")
+
+
+def retag_command(args):
+    """Link stored papers to entities created since the last re-tag run"""
+    if not _postgres_only("retag"):
+        return
+    from backend.app.database import SessionLocal
+    from backend.app.repositories.entity_repo import EntityRepository
+    from backend.app.repositories.retag_repo import RetagRepository
+    from backend.app.repositories.rollup_repo import RollupRepository
+    from backend.app.services.retag_service import RetagService
+    from backend.app.services.rollup_service import RollupService
+
+    db = SessionLocal()
+    try:
+        service = RetagService(RetagRepository(db), EntityRepository(db))
+        processes = args.processes or os.cpu_count() or 1
+        print(f"\n🏷️  Re-tagging stored papers with {'all' if args.all else 'new'} entities")
+        print(f"   Processes: {processes}")
+        print(f"   Chunk size: {args.chunk_size:,} paper ids")
+        print("-" * 50)
+
+        def progress(stats):
+            print(f"   {stats['ranges']} ranges, {stats['papers']:,} papers scanned, {stats['links_added']:,} links added")
+
+        started = time.perf_counter()
+        stats = service.run(
+            processes=processes,
+            chunk_size=args.chunk_size,
+            all_entities=args.all,
+            after_entity_id=args.after_entity_id,
+            progress=progress,
+        )
+        seconds = time.perf_counter() - started
+        rollup_stats = RollupService(RollupRepository(db)).refresh()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error: {e}")
+        raise
+    finally:
+        db.close()
+
+    print("-" * 50)
+    if not stats["entities"]:
+        print(f"✅ No entities created since id {stats['after_entity_id']}, nothing to do\n")
+        return
+    rate = stats["papers"] / seconds if seconds else 0
+    print(f"✅ Matched {stats['entities']:,} entities (ids {stats['after_entity_id'] + 1}-{stats['last_entity_id']}) against {stats['papers']:,} papers in {seconds:.1f}s ({rate:,.0f} papers/s)")
+    print(f"   Matches: {stats['matches']:,}, new paper_entities links: {stats['links_added']:,}")
+    print(f"📈 Trend rollups: {rollup_stats['weeks']} weeks refreshed\n")
+
+
 def canonicalize_command(args):
     """Wrapper to run async canonicalize command"""
     asyncio.run(canonicalize_command_async())
@@ -149,6 +730,7 @@ def canonicalize_command(args):
 async def digest_command_async(args):
     """Generate weekly digest from database facts"""
     from datetime import datetime, timedelta
+    from backend.app.database import SessionLocal
     from backend.app.llm.digest_generator import DigestService
     from backend.app.repositories import analytics_repo
     from backend.app.models.models import Digest
@@ -156,7 +738,7 @@ async def digest_command_async(args):
     db = SessionLocal()
     try:
         api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
+        if not api_key and requires_api_key():
             print("❌ Error: OPENAI_API_KEY not found.")
             return
 
@@ -223,6 +805,213 @@ def digest_command(args):
     asyncio.run(digest_command_async(args))
 
 
+def partitions_command(args):
+    """Create upcoming monthly partitions of paper_entities and split the default partition"""
+    if not _postgres_only("partitions"):
+        return
+    from backend.app.database import SessionLocal
+    from backend.app.repositories.partition_repo import PartitionRepository
+
+    db = SessionLocal()
+    try:
+        repo = PartitionRepository(db)
+        if not args.list:
+            created = repo.ensure_partitions(months_ahead=args.months_ahead)
+            db.commit()
+            if created:
+                print(f"\n🧱 Created {len(created)} partitions:")
+                for name in created:
+                    print(f"   • {name}")
+            else:
+                print("\n✅ All partitions already exist.")
+
+        print("\n📦 paper_entities partitions:\n")
+        for partition in repo.list_partitions():
+            print(f"   {partition['name']:<30} {partition['rows']:>10,} rows  {partition['bounds']}")
+        print()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error: {e}")
+        raise
+    finally:
+        db.close()
+
+
+def profile_queries_command(args):
+    """Run every analytics query against the current DB and rank statements by time"""
+    from datetime import datetime, timedelta
+    from backend.app.database import SessionLocal, engine
+    from backend.app.models.models import Entity, EntityType, PaperTag
+    from backend.app.query_profiler import QueryProfiler
+    from backend.app.repositories import analytics_repo
+
+    if args.week_start:
+        week_start = datetime.strptime(args.week_start, "%Y-%m-%d")
+    else:
+        today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+        week_start = today - timedelta(days=today.weekday() + 7)
+
+    # The report below prints slow statements with their plans, so skip the per-query log lines
+    logging.getLogger("backend.app.query_profiler").setLevel(logging.ERROR)
+    profiler = QueryProfiler(slow_ms=args.slow_ms, explain=not args.no_explain)
+    db = SessionLocal()
+    try:
+        sample_entity = db.query(Entity.id).order_by(Entity.id).first()
+        sample_tag = db.query(PaperTag.tag).limit(1).scalar()
+        queries = [
+            ("category_distribution_over_time", lambda: analytics_repo.category_distribution_over_time(db)),
+            ("get_canonical_merges_report", lambda: analytics_repo.get_canonical_merges_report(db)),
+            ("get_topic_weekly_counts", lambda: analytics_repo.get_topic_weekly_counts(db, week_start)),
+        ]
+        # Top authors of the week, and rising authors over the last four weeks against the four before
+        monday = week_start.date() - timedelta(days=week_start.weekday())
+        author_windows = (monday - timedelta(weeks=7), monday - timedelta(weeks=3), monday)
+        queries += [
+            ("get_top_authors", lambda: analytics_repo.get_top_authors(db, monday, monday)),
+            ("get_rising_authors", lambda: analytics_repo.get_rising_authors(db, *author_windows)),
+            ("get_tag_weekly_counts", lambda: analytics_repo.get_tag_weekly_counts(db, monday - timedelta(weeks=7), monday)),
+            ("get_tag_entity_type_counts", lambda: analytics_repo.get_tag_entity_type_counts(db, monday - timedelta(weeks=7), monday)),
+        ]
+        # A threshold on a bucket boundary reads entity_weekly_counts; weighting sums confidences
+        queries += [
+            ("get_top_entities_by_week[min_confidence]", lambda: analytics_repo.get_top_entities_by_week(db, week_start, "method", min_confidence=0.8)),
+            ("get_top_entities_by_week[weighted]", lambda: analytics_repo.get_top_entities_by_week(db, week_start, "method", weighted=True)),
+            ("get_fastest_growing_entities[min_confidence]", lambda: analytics_repo.get_fastest_growing_entities(db, "method", min_confidence=0.8)),
+            ("get_entity_cooccurence_edges[min_confidence]", lambda: analytics_repo.get_entity_cooccurence_edges(db, "method", days=args.days, min_confidence=0.8)),
+        ]
+        if sample_tag:
+            queries += [
+                ("get_top_entities_by_week[tag]", lambda: analytics_repo.get_top_entities_by_week(db, week_start, "method", tag=sample_tag)),
+                ("get_entity_cooccurence_edges[tag]", lambda: analytics_repo.get_entity_cooccurence_edges(db, "method", days=args.days, tag=sample_tag)),
+            ]
+        if sample_entity:
+            queries += [
+                ("get_papers_for_an_entity", lambda: analytics_repo.get_papers_for_an_entity(db, sample_entity.id)),
+                ("get_top_authors[entity]", lambda: analytics_repo.get_top_authors(db, monday, monday, [sample_entity.id])),
+                ("get_rising_authors[entity]", lambda: analytics_repo.get_rising_authors(db, *author_windows, [sample_entity.id])),
+            ]
+        for entity_type in EntityType:
+            t = entity_type.value
+            queries += [
+                (f"get_top_entities_by_week[{t}]", lambda t=t: analytics_repo.get_top_entities_by_week(db, week_start, t)),
+                (f"get_fastest_growing_entities[{t}]", lambda t=t: analytics_repo.get_fastest_growing_entities(db, t)),
+                (f"get_entity_cooccurence_edges[{t}]", lambda t=t: analytics_repo.get_entity_cooccurence_edges(db, t, days=args.days)),
+            ]
+
+        print(f"\n🔬 Profiling {len(queries)} analytics queries x{args.repeat} (week of {week_start.date()})")
+        print("-" * 50)
+        profiler.attach(engine)
+        try:
+            for label, run in queries:
+                for _ in range(args.repeat):
+                    rows = run()
+                print(f"   {label}: {len(rows)} rows")
+        finally:
+            profiler.detach(engine)
+            db.rollback()
+    finally:
+        db.close()
+
+    print("\n📊 Statements ranked by total time:\n")
+    header = f"{'#':>3} {'calls':>6} {'total ms':>10} {'mean ms':>9} {'max ms':>9}  statement"
+    print(header)
+    print("-" * len(header))
+    for rank, stats in enumerate(profiler.report()[:args.top], start=1):
+        statement = stats.statement if len(stats.statement) <= 110 else stats.statement[:110] + "…"
+        print(
+            f"{rank:>3} {stats.calls:>6} {stats.total_s * 1000:>10.1f} "
+            f"{stats.mean_s * 1000:>9.2f} {stats.max_s * 1000:>9.2f}  {statement}"
+        )
+
+    if profiler.slow_queries:
+        print(f"\n🐢 {len(profiler.slow_queries)} statements over {args.slow_ms:g} ms:")
+        for slow in sorted(profiler.slow_queries, key=lambda q: q.elapsed_ms, reverse=True):
+            print(f"\n--- {slow.elapsed_ms:.1f} ms ---")
+            print(slow.statement.strip())
+            if slow.plan:
+                print(slow.plan)
+    print()
+
+
+def export_command(args):
+    """Stream papers, entities, paper_entities and paper_tags to month-partitioned Parquet files"""
+    from backend.app.database import SessionLocal
+    from backend.app.repositories.export_repo import ExportRepository
+    from backend.app.services.parquet_export import ParquetExporter
+
+    print(f"\n📦 Exporting to {args.out} ({args.format})")
+    print(f"   Tables: {', '.join(args.tables)}")
+    print(f"   Batch size: {args.batch_size}")
+    print("-" * 50)
+
+    def progress(table, rows):
+        print(f"   {table}: {rows:,} rows")
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        counts = ParquetExporter(ExportRepository(db)).export(args.out, tables=args.tables, batch_size=args.batch_size, progress=progress)
+        seconds = time.perf_counter() - started
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        raise
+    finally:
+        db.close()
+
+    print("-" * 50)
+    print(f"✅ Exported {sum(counts.values()):,} rows in {seconds:.1f}s")
+    for table, rows in counts.items():
+        print(f"   {table}: {rows:,}")
+    print()
+
+
+def offline_command(args):
+    """Run an analytics query over a Parquet export with DuckDB"""
+    from datetime import datetime, timedelta
+    from backend.app.repositories import parquet_analytics_repo as offline
+
+    con = offline.connect(args.data)
+    now = datetime.strptime(args.now, "%Y-%m-%d") if args.now else offline.exported_at(args.data) or datetime.utcnow()
+    if args.week_start:
+        week_start = datetime.strptime(args.week_start, "%Y-%m-%d")
+    else:
+        today = datetime.combine(now.date(), datetime.min.time())
+        week_start = today - timedelta(days=today.weekday() + 7)
+
+    queries = {
+        "top-entities": (["entity", "count"], lambda: offline.get_top_entities_by_week(con, week_start, args.entity_type, limit=args.limit)),
+        "fastest-growing": (["entity", "growth"], lambda: offline.get_fastest_growing_entities(con, args.entity_type, now=now)),
+        "cooccurrence": (["entity_a", "entity_b", "count"], lambda: offline.get_entity_cooccurence_edges(con, args.entity_type, days=args.days, now=now)),
+        "entity-papers": (["id", "title", "authors", "published_at", "evidence", "confidence"], lambda: offline.get_papers_for_an_entity(con, args.entity_id)),
+        "categories": (["week", "category", "count"], lambda: offline.category_distribution_over_time(con)),
+        "canonical-merges": (["canonical_name", "aliases"], lambda: offline.get_canonical_merges_report(con)),
+        "sql": (None, lambda: offline.query(con, args.sql)),
+    }
+    if args.query == "entity-papers" and args.entity_id is None:
+        print("❌ Error: entity-papers needs --entity-id.")
+        return
+    if args.query == "sql" and not args.sql:
+        print("❌ Error: sql needs --sql \"SELECT ...\".")
+        return
+
+    print(f"\n🦆 {args.query} over {args.data} (as of {now:%Y-%m-%d %H:%M})")
+    print("-" * 50)
+    columns, run = queries[args.query]
+    started = time.perf_counter()
+    rows = run()
+    if columns is None:
+        columns, rows = rows
+    seconds = time.perf_counter() - started
+
+    print("   " + " | ".join(columns))
+    for row in rows[:args.limit]:
+        print("   " + " | ".join(str(value) for value in row))
+    if len(rows) > args.limit:
+        print(f"   ... {len(rows) - args.limit:,} more")
+    print("-" * 50)
+    print(f"✅ {len(rows):,} rows in {seconds:.2f}s\n")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="ArXiv Trend Radar CLI",
@@ -235,8 +1024,8 @@ def main():
     ingest_parser.add_argument(
         "--query", "-q",
         type=str,
-        required=True,
-        help="Search query for arXiv"
+        default=None,
+        help="Search query for arXiv (required unless --resume)"
     )
     ingest_parser.add_argument(
         "--days", "-d",
@@ -247,8 +1036,79 @@ def main():
     ingest_parser.add_argument(
         "--limit", "-l",
         type=int,
-        default=50,
-        help="Maximum number of papers to fetch (default: 50)"
+        default=None,
+        help="Maximum number of papers to fetch (default: 50; with --resume: all pending)"
+    )
+    ingest_parser.add_argument(
+        "--chunk-size", "-c",
+        type=int,
+        default=25,
+        help="Papers enriched and committed per chunk (default: 25)"
+    )
+    ingest_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip arXiv and finish papers left in 'fetched' state by an interrupted run"
+    )
+
+    # Ingest-many command
+    ingest_many_parser = subparsers.add_parser("ingest-many", help="Ingest the queries of a JSON/YAML manifest in parallel")
+    ingest_many_parser.add_argument(
+        "manifest",
+        type=str,
+        help="Manifest with a 'queries' list (query or category, optional limit, chunk_size, name)"
+    )
+    ingest_many_parser.add_argument(
+        "--processes", "-p",
+        type=int,
+        default=None,
+        help="Worker processes (default: one per CPU, at most one per query)"
+    )
+    ingest_many_parser.add_argument(
+        "--llm-concurrency",
+        type=int,
+        default=16,
+        help="LLM calls in flight across all workers; 0 for no limit (default: 16)"
+    )
+
+    # Watch command
+    watch_parser = subparsers.add_parser("watch", help="Poll saved queries for new papers since their watermark")
+    watch_actions = watch_parser.add_subparsers(dest="action", required=True)
+    watch_add = watch_actions.add_parser("add", help="Save a query (or update the one with this name)")
+    watch_add.add_argument("name", type=str, help="Unique name of the saved query")
+    watch_add.add_argument("--query", "-q", type=str, required=True, help="arXiv search query, e.g. 'cat:cs.CL' or free text")
+    watch_add.add_argument("--limit", "-l", type=int, default=None, help="Most papers fetched per run (default: 200)")
+    watch_add.add_argument("--interval", "-i", type=int, default=None, help="Minutes between runs of this query (default: 60)")
+    watch_import = watch_actions.add_parser("import", help="Save every query of an ingest-many manifest")
+    watch_import.add_argument("manifest", type=str, help="JSON/YAML manifest, as for ingest-many")
+    watch_import.add_argument("--interval", "-i", type=int, default=None, help="Minutes between runs of each query (default: 60)")
+    watch_remove = watch_actions.add_parser("remove", help="Delete a saved query")
+    watch_remove.add_argument("name", type=str, help="Name of the saved query")
+    watch_actions.add_parser("list", help="Show saved queries with their watermarks")
+    watch_run = watch_actions.add_parser("run", help="Run due queries every time one is due, until interrupted")
+    watch_run.add_argument("--once", action="store_true", help="Run the due queries once and exit (for cron)")
+    watch_run.add_argument("--poll-seconds", type=int, default=60, help="Longest sleep between checks for due queries (default: 60)")
+    watch_run.add_argument("--chunk-size", "-c", type=int, default=25, help="Papers enriched and committed per chunk (default: 25)")
+
+    # Retry failed command
+    retry_parser = subparsers.add_parser("retry-failed", help="Retry LLM enrichment for failed papers")
+    retry_parser.add_argument(
+        "--max-attempts", "-m",
+        type=int,
+        default=3,
+        help="Skip papers that already failed this many times (default: 3)"
+    )
+    retry_parser.add_argument(
+        "--limit", "-l",
+        type=int,
+        default=None,
+        help="Maximum number of papers to retry (default: all)"
+    )
+    retry_parser.add_argument(
+        "--chunk-size", "-c",
+        type=int,
+        default=25,
+        help="Papers enriched and committed per chunk (default: 25)"
     )
     
     # Canonicalize command
@@ -263,16 +1123,354 @@ def main():
         help="Start date of the week (YYYY-MM-DD)"
     )
     
+    # Import snapshot command
+    snapshot_parser = subparsers.add_parser("import-snapshot", help="Bulk-load papers from an arXiv metadata snapshot")
+    snapshot_parser.add_argument(
+        "path",
+        type=str,
+        help="JSON-lines snapshot file (Kaggle arxiv-metadata-oai-snapshot.json, optionally .gz)"
+    )
+    snapshot_parser.add_argument(
+        "--categories",
+        nargs="+",
+        default=None,
+        help="Category globs to keep, e.g. 'cs.*' stat.ML (default: all)"
+    )
+    snapshot_parser.add_argument(
+        "--since",
+        type=str,
+        default=None,
+        help="Keep papers first published on or after this date (YYYY-MM-DD)"
+    )
+    snapshot_parser.add_argument(
+        "--until",
+        type=str,
+        default=None,
+        help="Keep papers first published before this date (YYYY-MM-DD)"
+    )
+    snapshot_parser.add_argument(
+        "--batch-size", "-b",
+        type=int,
+        default=5000,
+        help="Papers per COPY batch and commit (default: 5000)"
+    )
+    snapshot_parser.add_argument(
+        "--limit", "-l",
+        type=int,
+        default=None,
+        help="Stop after this many matching papers"
+    )
+
+    # Bulk load command
+    bulk_parser = subparsers.add_parser("bulk-load", help="COPY-load papers with entities and tags from JSON lines")
+    bulk_parser.add_argument(
+        "path",
+        type=str,
+        help="JSON-lines file, one paper per line with optional entities/tags lists"
+    )
+    bulk_parser.add_argument(
+        "--batch-size", "-b",
+        type=int,
+        default=20000,
+        help="Papers per COPY batch and commit (default: 20000)"
+    )
+
+    # Embed command
+    embed_parser = subparsers.add_parser("embed", help="Backfill paper embeddings for semantic search")
+    embed_parser.add_argument(
+        "--batch-size", "-b",
+        type=int,
+        default=256,
+        help="Papers per embedding call and commit (default: 256)"
+    )
+    embed_parser.add_argument(
+        "--limit", "-l",
+        type=int,
+        default=None,
+        help="Stop after this many papers"
+    )
+    embed_parser.add_argument(
+        "--rebuild-index",
+        action="store_true",
+        help="Drop the HNSW index during the backfill and build it once at the end (for large backlogs)"
+    )
+
+    # Dedup index command
+    dedup_parser = subparsers.add_parser("dedup-index", help="Fingerprint papers for near-duplicate detection")
+    dedup_parser.add_argument(
+        "--batch-size", "-b",
+        type=int,
+        default=2000,
+        help="Papers per batch and commit (default: 2000)"
+    )
+    dedup_parser.add_argument(
+        "--limit", "-l",
+        type=int,
+        default=None,
+        help="Stop after this many papers"
+    )
+
+    # Authors command
+    authors_parser = subparsers.add_parser("authors", help="Backfill the author index from stored papers")
+    authors_parser.add_argument(
+        "--batch-size", "-b",
+        type=int,
+        default=1000,
+        help="Papers per batch and commit (default: 1000)"
+    )
+    authors_parser.add_argument(
+        "--limit", "-l",
+        type=int,
+        default=None,
+        help="Stop after this many papers"
+    )
+    authors_parser.add_argument(
+        "--rebuild-rollup",
+        action="store_true",
+        help="Recompute author_weekly_counts from paper_authors afterwards"
+    )
+
+    # Rollups command
+    rollups_parser = subparsers.add_parser("rollups", help="Refresh the trend rollups (entity and tag counts per week and confidence)")
+    rollups_parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Recompute every week instead of the weeks changed since the last refresh"
+    )
+
+    # Topics command
+    topics_parser = subparsers.add_parser("topics", help="Cluster papers into topics from their embeddings")
+    topics_parser.add_argument(
+        "--k",
+        type=int,
+        default=50,
+        help="Number of topics when fitting (default: 50)"
+    )
+    topics_parser.add_argument(
+        "--refit",
+        action="store_true",
+        help="Fit new topics from scratch instead of assigning new papers to the existing ones"
+    )
+    topics_parser.add_argument(
+        "--batch-size", "-b",
+        type=int,
+        default=5000,
+        help="Papers per assignment batch and commit (default: 5000)"
+    )
+
+    # Retag command
+    retag_parser = subparsers.add_parser("retag", help="Link older papers to newly created entities without LLM calls")
+    retag_parser.add_argument(
+        "--processes", "-p",
+        type=int,
+        default=None,
+        help="Worker processes (default: one per CPU)"
+    )
+    retag_parser.add_argument(
+        "--chunk-size", "-c",
+        type=int,
+        default=10000,
+        help="Paper ids per worker task and commit (default: 10000)"
+    )
+    retag_parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Match every entity, not only those created since the last run"
+    )
+    retag_parser.add_argument(
+        "--after-entity-id",
+        type=int,
+        default=None,
+        help="Match entities with a higher id, instead of those created since the last run"
+    )
+
+    # Partitions command
+    partitions_parser = subparsers.add_parser("partitions", help="Create monthly paper_entities partitions ahead of time")
+    partitions_parser.add_argument(
+        "--months-ahead", "-m",
+        type=int,
+        default=3,
+        help="Months after the current one to create partitions for (default: 3)"
+    )
+    partitions_parser.add_argument(
+        "--list",
+        action="store_true",
+        help="Only list existing partitions"
+    )
+
+    # Profile queries command
+    profile_parser = subparsers.add_parser("profile-queries", help="Profile analytics queries with EXPLAIN output")
+    profile_parser.add_argument(
+        "--week-start", "-w",
+        type=str,
+        default=None,
+        help="Week to analyze (YYYY-MM-DD, default: last week's Monday)"
+    )
+    profile_parser.add_argument(
+        "--days", "-d",
+        type=int,
+        default=30,
+        help="Co-occurrence window in days (default: 30)"
+    )
+    profile_parser.add_argument(
+        "--repeat", "-r",
+        type=int,
+        default=3,
+        help="Runs per query (default: 3)"
+    )
+    profile_parser.add_argument(
+        "--slow-ms",
+        type=float,
+        default=50.0,
+        help="Capture EXPLAIN for statements slower than this (default: 50)"
+    )
+    profile_parser.add_argument(
+        "--top",
+        type=int,
+        default=20,
+        help="Statements to show in the ranking (default: 20)"
+    )
+    profile_parser.add_argument(
+        "--no-explain",
+        action="store_true",
+        help="Skip EXPLAIN (ANALYZE, BUFFERS) for slow statements"
+    )
+
+    # Export command
+    export_parser = subparsers.add_parser("export", help="Export the corpus to month-partitioned Parquet files")
+    export_parser.add_argument(
+        "--format", "-f",
+        choices=["parquet"],
+        default="parquet",
+        help="Output format (default: parquet)"
+    )
+    export_parser.add_argument(
+        "--out", "-o",
+        type=str,
+        default="exports",
+        help="Output directory; each table is replaced once its new files are complete (default: exports)"
+    )
+    export_parser.add_argument(
+        "--tables",
+        nargs="+",
+        choices=list(EXPORT_TABLES),
+        default=list(EXPORT_TABLES),
+        help="Tables to export (default: all)"
+    )
+    export_parser.add_argument(
+        "--batch-size", "-b",
+        type=int,
+        default=20000,
+        help="Rows per fetch and Parquet row group; memory use follows it (default: 20000)"
+    )
+
+    # Offline analytics command
+    offline_parser = subparsers.add_parser("offline", help="Run analytics over a Parquet export with DuckDB")
+    offline_parser.add_argument(
+        "query",
+        choices=["top-entities", "fastest-growing", "cooccurrence", "entity-papers", "categories", "canonical-merges", "sql"],
+        help="Analytics query to run, or sql for an ad-hoc query over the papers, entities, paper_entities and paper_tags views"
+    )
+    offline_parser.add_argument(
+        "--data", "-d",
+        type=str,
+        default="exports",
+        help="Export directory written by `export` (default: exports)"
+    )
+    offline_parser.add_argument(
+        "--sql",
+        type=str,
+        default=None,
+        help="Query for `sql`"
+    )
+    offline_parser.add_argument(
+        "--entity-type", "-t",
+        type=str,
+        default="method",
+        help="Entity type (default: method)"
+    )
+    offline_parser.add_argument(
+        "--entity-id",
+        type=int,
+        default=None,
+        help="Entity for entity-papers"
+    )
+    offline_parser.add_argument(
+        "--week-start", "-w",
+        type=str,
+        default=None,
+        help="Week for top-entities (YYYY-MM-DD, default: the week before --now)"
+    )
+    offline_parser.add_argument(
+        "--days",
+        type=int,
+        default=30,
+        help="Co-occurrence window in days (default: 30)"
+    )
+    offline_parser.add_argument(
+        "--now",
+        type=str,
+        default=None,
+        help="Reference date for the weekly windows (YYYY-MM-DD, default: when the export was taken)"
+    )
+    offline_parser.add_argument(
+        "--limit", "-l",
+        type=int,
+        default=20,
+        help="Rows to print, and entities for top-entities (default: 20)"
+    )
+
     args = parser.parse_args()
+
+    # Neither needs the database settings
+    if args.command == "offline":
+        offline_command(args)
+        return
+    if args.command is None:
+        parser.print_help()
+        return
+
+    from backend.app.database import IS_SQLITE
+    if IS_SQLITE:
+        # The Alembic migrations are PostgreSQL DDL; a SQLite file gets its schema from the models
+        from backend.app.database import Base, engine
+        from backend.app.models import models  # noqa: F401
+        Base.metadata.create_all(bind=engine)
     
     if args.command == "ingest":
         ingest_command(args)
+    elif args.command == "ingest-many":
+        ingest_many_command(args)
+    elif args.command == "watch":
+        watch_command(args)
+    elif args.command == "retry-failed":
+        retry_failed_command(args)
+    elif args.command == "import-snapshot":
+        import_snapshot_command(args)
+    elif args.command == "bulk-load":
+        bulk_load_command(args)
+    elif args.command == "embed":
+        embed_command(args)
+    elif args.command == "dedup-index":
+        dedup_index_command(args)
+    elif args.command == "authors":
+        authors_command(args)
+    elif args.command == "rollups":
+        rollups_command(args)
+    elif args.command == "topics":
+        topics_command(args)
+    elif args.command == "retag":
+        retag_command(args)
     elif args.command == "canonicalize":
         canonicalize_command(args)
     elif args.command == "digest":
         digest_command(args)
-    else:
-        parser.print_help()
+    elif args.command == "partitions":
+        partitions_command(args)
+    elif args.command == "profile-queries":
+        profile_queries_command(args)
+    elif args.command == "export":
+        export_command(args)
 
 
 if __name__ == "__main__":
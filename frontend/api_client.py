@@ -0,0 +1,158 @@
+"""
+HTTP client shared by the Streamlit pages.
+
+All requests go through one pooled requests.Session, which keeps connections
+to the API alive across reruns, pages and browser sessions. Read endpoints
+have fetchers cached with st.cache_data and keyed on their arguments. A rerun
+that changes nothing therefore does not reach the API until CACHE_TTL runs
+out. Pages call invalidate() after actions that change the data (ingest,
+digest generation), and fetch_parallel() when they need several endpoints.
+Fetchers raise requests exceptions; failed responses are never cached.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+API_URL = os.environ.get("API_URL", "http://localhost:8000")
+# Seconds a response is reused; papers added outside this app (CLI, watch) show up after at most this long
+CACHE_TTL = int(os.environ.get("API_CACHE_TTL", "60"))
+# Connections kept open to the API, the most requests in flight at once
+POOL_SIZE = 8
+
+
+@st.cache_resource
+def session() -> requests.Session:
+    """Keep-alive session shared by every page and browser session"""
+    http = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+    http.mount("http://", adapter)
+    http.mount("https://", adapter)
+    return http
+
+
+def get(path: str, params: Optional[dict] = None, timeout=30, **kwargs) -> requests.Response:
+    return session().get(f"{API_URL}{path}", params=params, timeout=timeout, **kwargs)
+
+
+def post(path: str, params: Optional[dict] = None, timeout=30, **kwargs) -> requests.Response:
+    return session().post(f"{API_URL}{path}", params=params, timeout=timeout, **kwargs)
+
+
+def safe_json(response: requests.Response):
+    """Parse JSON safely; avoids 'Expecting value: line 1 column 1' on an empty or non-JSON body."""
+    if not response.text or not response.text.strip():
+        return None
+    try:
+        return response.json()
+    except json.JSONDecodeError:
+        return None
+
+
+def error_detail(error: requests.exceptions.HTTPError) -> str:
+    """The API's `detail` message of a failed request"""
+    body = safe_json(error.response) if error.response is not None else None
+    if isinstance(body, dict) and body.get("detail"):
+        return str(body["detail"])
+    return str(error)
+
+
+def _get_json(path: str, params: Optional[dict] = None, timeout=30):
+    response = get(path, params=params, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def get_stats() -> dict:
+    """Paper count, entity count and entities per type"""
+    return _get_json("/stats", timeout=10)
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def get_papers(limit: int = 50, skip: int = 0) -> list:
+    """Most recently ingested papers first"""
+    return _get_json("/papers/", params={"limit": limit, "skip": skip})
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def get_weekly_trends(week_start: str, entity_type: str, tag: Optional[str] = None, min_confidence: Optional[float] = None, weighted: bool = False) -> dict:
+    return _get_json("/trends/week", params={
+        "week_start": week_start, "entity_type": entity_type, "tag": tag,
+        "min_confidence": min_confidence, "weighted": weighted,
+    })
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def get_cooccurrence(entity_type: str, days: int, tag: Optional[str] = None, min_confidence: Optional[float] = None, weighted: bool = False) -> list:
+    return _get_json("/trends/cooccurrence", params={
+        "entity_type": entity_type, "days": days, "tag": tag,
+        "min_confidence": min_confidence, "weighted": weighted,
+    })
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def get_tag_trends(week_start: str, weeks: int = 8, min_confidence: Optional[float] = None) -> dict:
+    """Tagged papers per week and the entity types per tag, busiest tags first"""
+    return _get_json("/trends/tags", params={"week_start": week_start, "weeks": weeks, "min_confidence": min_confidence})
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def get_entity_papers(entity_id: int, skip: int = 0, limit: int = 50) -> dict:
+    """One page of an entity's papers, newest first: {"papers": [...], "total": all papers}"""
+    response = get(f"/entities/{entity_id}/papers", params={"skip": skip, "limit": limit})
+    response.raise_for_status()
+    papers = response.json()
+    return {"papers": papers, "total": int(response.headers.get("X-Total-Count", len(papers)))}
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def get_entity_timeline(entity_id: int, weeks: int = 26) -> dict:
+    """Papers per week of the entity and its canonical aliases"""
+    return _get_json(f"/entities/{entity_id}/timeline", params={"weeks": weeks})
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def get_latest_digest() -> Optional[dict]:
+    """The newest digest, or None before the first one"""
+    response = get("/digest/latest")
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return safe_json(response)
+
+
+# Everything an ingest can change
+PAPER_FETCHERS = (get_stats, get_papers, get_weekly_trends, get_cooccurrence, get_tag_trends, get_entity_papers, get_entity_timeline)
+
+
+def invalidate(*fetchers):
+    """Drops the cached responses of `fetchers`, by default of every fetcher that depends on papers"""
+    for fetcher in fetchers or PAPER_FETCHERS:
+        fetcher.clear()
+
+
+def fetch_parallel(*calls: Callable[[], object], return_exceptions: bool = False) -> list:
+    """
+    Runs the calls (fetchers bound with functools.partial) on threads of
+    this script run and returns their results in order. As with
+    asyncio.gather, the first exception is raised, or with
+    return_exceptions=True returned in place of the failed call's result.
+    """
+    ctx = get_script_run_ctx()
+
+    def run(call):
+        # st.cache_data looks up the script run of the calling thread
+        add_script_run_ctx(ctx=ctx)
+        return call()
+
+    with ThreadPoolExecutor(max_workers=min(len(calls), POOL_SIZE)) as pool:
+        futures = [pool.submit(run, call) for call in calls]
+    if not return_exceptions:
+        return [future.result() for future in futures]
+    return [future.exception() or future.result() for future in futures]
@@ -0,0 +1,73 @@
+"""
+Client side of `/graph/snapshot`: the entity graph as DataFrames, cached by version.
+
+The decoded snapshot is kept for the whole Streamlit server. Each rerun sends
+its ETag back in If-None-Match, so while the data is unchanged the API
+answers 304 with no body and nothing is decoded again.
+"""
+from dataclasses import dataclass
+
+import msgpack
+import pandas as pd
+import streamlit as st
+
+import api_client
+
+
+@dataclass
+class GraphSnapshot:
+    etag: str
+    version: str
+    since: str
+    # id, name, type, canonical_id
+    entities: pd.DataFrame
+    # a, b (entity ids, a < b), count
+    edges: pd.DataFrame
+
+    def neighbors(self, entity_id: int) -> pd.DataFrame:
+        """Entities co-occurring with entity_id: id, name, type, co_occurrences; most frequent first"""
+        edges = self.edges
+        as_a = edges.loc[edges["a"] == entity_id, ["b", "count"]].rename(columns={"b": "id"})
+        as_b = edges.loc[edges["b"] == entity_id, ["a", "count"]].rename(columns={"a": "id"})
+        found = pd.concat([as_a, as_b]).rename(columns={"count": "co_occurrences"})
+        found = found.merge(self.entities[["id", "name", "type"]], on="id")
+        return found.sort_values("co_occurrences", ascending=False)[["id", "name", "type", "co_occurrences"]]
+
+
+@st.cache_resource
+def _snapshots() -> dict:
+    """days -> GraphSnapshot, shared by all sessions"""
+    return {}
+
+
+def decode(payload: bytes, etag: str) -> GraphSnapshot:
+    snapshot = msgpack.unpackb(payload)
+    entities = snapshot["entities"]
+    strings = pd.Series(snapshot["strings"], dtype="object")
+    types = pd.Series(snapshot["types"], dtype="object")
+    return GraphSnapshot(
+        etag=etag,
+        version=snapshot["version"],
+        since=snapshot["since"],
+        entities=pd.DataFrame({
+            "id": entities["id"],
+            "name": strings.take(entities["name"]).to_numpy(),
+            "type": types.take(entities["type"]).to_numpy(),
+            "canonical_id": pd.array(entities["canonical_id"], dtype="Int64"),
+        }),
+        edges=pd.DataFrame(snapshot["edges"], columns=["a", "b", "count"]),
+    )
+
+
+def load_graph_snapshot(days: int = 30) -> GraphSnapshot:
+    """The current snapshot, downloaded only when its version changed"""
+    cache = _snapshots()
+    cached = cache.get(days)
+    headers = {"If-None-Match": cached.etag} if cached else {}
+    response = api_client.get("/graph/snapshot", params={"days": days}, headers=headers, timeout=60)
+    if response.status_code == 304 and cached:
+        return cached
+    response.raise_for_status()
+    snapshot = decode(response.content, response.headers.get("ETag", ""))
+    cache[days] = snapshot
+    return snapshot
@@ -3,18 +3,8 @@ Ingest Page - Fetch papers from arXiv
 """
 import streamlit as st
 import requests
-import json
-
-
-def _safe_json(response):
-    """Parse JSON response safely; return None or dict. Avoids 'Expecting value: line 1 column 1' on empty/non-JSON."""
-    if not response.text or not response.text.strip():
-        return None
-    try:
-        return response.json()
-    except json.JSONDecodeError:
-        return None
 
+import api_client
 
 st.set_page_config(page_title="Ingest Papers", page_icon="📥", layout="wide")
 
@@ -37,9 +27,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-import os
-API_URL = os.environ.get("API_URL", "http://localhost:8000")
-
 st.title("📥 Ingest Papers")
 st.markdown("Fetch papers from arXiv and extract entities using LLM.")
 
@@ -82,14 +69,16 @@ if submitted:
     else:
         with st.spinner(f"Fetching papers for '{query}'... This may take a while due to LLM processing."):
             try:
-                response = requests.post(
-                    f"{API_URL}/ingest",
+                response = api_client.post(
+                    "/ingest",
                     params={"query": query, "days": days, "limit": limit},
                     timeout=300  # 5 minutes timeout for LLM processing
                 )
                 
                 if response.status_code == 200:
-                    result = _safe_json(response)
+                    # New papers move the counts, trends and paper lists of every page
+                    api_client.invalidate()
+                    result = api_client.safe_json(response)
                     if result is None:
                         st.error("❌ Invalid response from server.")
                     else:
@@ -115,7 +104,7 @@ if submitted:
                                 st.info(f"📄 **{title}**{'…' if len(p.get('title','')) > 100 else ''}  \n`{arxiv_id}` · Published {pub}")
                         st.success("💡 Visit the **Trends** page to see the extracted entities!")
                 else:
-                    err_detail = _safe_json(response)
+                    err_detail = api_client.safe_json(response)
                     st.error(f"❌ Error: {(err_detail or {}).get('detail', response.text or 'Unknown error')}")
             except requests.exceptions.Timeout:
                 st.error("❌ Request timed out. The ingestion might still be running on the server.")
@@ -130,43 +119,40 @@ st.divider()
 st.markdown("### 📄 Recent Papers")
 
 try:
-    response = requests.get(f"{API_URL}/papers/", params={"limit": 10}, timeout=10)
+    papers = api_client.get_papers(limit=10)
     
-    if response.status_code == 200:
-        papers = response.json()
-        
-        if papers:
-            from collections import OrderedDict
-            from datetime import datetime as _dt
-
-            groups: OrderedDict = OrderedDict()
-            for paper in papers:
-                # Group by ingest date-time (minute precision)
-                raw = paper.get("created_at") or ""
-                try:
-                    dt = _dt.fromisoformat(raw.replace("Z", "+00:00"))
-                    group_key = dt.strftime("%b %d, %Y  %H:%M")
-                except Exception:
-                    group_key = raw[:16] if raw else "Unknown"
-                groups.setdefault(group_key, []).append(paper)
-
-            for group_label, group_papers in groups.items():
-                st.markdown(f"**📅 Ingested: {group_label}** — {len(group_papers)} paper{'s' if len(group_papers) != 1 else ''}")
-                for paper in group_papers:
-                    title_short = paper['title'][:90] + ('…' if len(paper['title']) > 90 else '')
-                    with st.expander(f"📄 {title_short}", expanded=False):
-                        st.markdown(f"**ArXiv ID:** `{paper['arxiv_id']}`")
-                        st.markdown(f"**Authors:** {', '.join(paper['authors'][:3])}{'...' if len(paper['authors']) > 3 else ''}")
-                        st.markdown(f"**Published:** {paper['published_at'][:10]}")
-                        st.markdown(f"**Categories:** {', '.join(paper['categories'])}")
-                        st.markdown("**Abstract:**")
-                        st.caption(paper['abstract'][:500] + "..." if len(paper['abstract']) > 500 else paper['abstract'])
-                        st.markdown(f"[View on arXiv]({paper['url']})")
-                st.caption("")
-        else:
-            st.info("No papers found. Start by ingesting some papers above!")
+    if papers:
+        from collections import OrderedDict
+        from datetime import datetime as _dt
+
+        groups: OrderedDict = OrderedDict()
+        for paper in papers:
+            # Group by ingest date-time (minute precision)
+            raw = paper.get("created_at") or ""
+            try:
+                dt = _dt.fromisoformat(raw.replace("Z", "+00:00"))
+                group_key = dt.strftime("%b %d, %Y  %H:%M")
+            except Exception:
+                group_key = raw[:16] if raw else "Unknown"
+            groups.setdefault(group_key, []).append(paper)
+
+        for group_label, group_papers in groups.items():
+            st.markdown(f"**📅 Ingested: {group_label}** — {len(group_papers)} paper{'s' if len(group_papers) != 1 else ''}")
+            for paper in group_papers:
+                title_short = paper['title'][:90] + ('…' if len(paper['title']) > 90 else '')
+                with st.expander(f"📄 {title_short}", expanded=False):
+                    st.markdown(f"**ArXiv ID:** `{paper['arxiv_id']}`")
+                    st.markdown(f"**Authors:** {', '.join(paper['authors'][:3])}{'...' if len(paper['authors']) > 3 else ''}")
+                    st.markdown(f"**Published:** {paper['published_at'][:10]}")
+                    st.markdown(f"**Categories:** {', '.join(paper['categories'])}")
+                    st.markdown("**Abstract:**")
+                    st.caption(paper['abstract'][:500] + "..." if len(paper['abstract']) > 500 else paper['abstract'])
+                    st.markdown(f"[View on arXiv]({paper['url']})")
+            st.caption("")
     else:
-        st.warning("Could not fetch papers from API.")
+        st.info("No papers found. Start by ingesting some papers above!")
+except requests.exceptions.HTTPError:
+    st.warning("Could not fetch papers from API.")
 except requests.exceptions.ConnectionError:
     st.info("ℹ️ Start the FastAPI server to see recent papers")
 except Exception as e:
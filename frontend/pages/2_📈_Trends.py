@@ -5,11 +5,11 @@ import streamlit as st
 import requests
 import pandas as pd
 from datetime import datetime, timedelta
+from functools import partial
 
-st.set_page_config(page_title="Trends", page_icon="📈", layout="wide")
+import api_client
 
-import os
-API_URL = os.environ.get("API_URL", "http://localhost:8000")
+st.set_page_config(page_title="Trends", page_icon="📈", layout="wide")
 
 st.title("📈 Trend Analytics")
 st.markdown("Explore top entities and fastest-growing trends in AI/ML research.")
@@ -17,7 +17,7 @@ st.markdown("Explore top entities and fastest-growing trends in AI/ML research."
 st.divider()
 
 # Filters
-col1, col2 = st.columns(2)
+col1, col2, col3 = st.columns(3)
 
 with col1:
     entity_type = st.selectbox(
@@ -38,21 +38,104 @@ with col2:
         help="Start of the week to analyze"
     )
 
-st.divider()
+col4, col5 = st.columns([2, 1])
 
-# Fetch trends data
+with col4:
+    # Multiples of 0.1 are answered from the confidence buckets of the rollups
+    confidence_choice = st.select_slider(
+        "Min Confidence",
+        options=[round(i / 10, 1) for i in range(11)],
+        value=0.0,
+        help="Ignore entity mentions and tags the LLM was less sure about"
+    )
+    min_confidence = confidence_choice or None
+
+with col5:
+    weighted = st.toggle(
+        "Weight by confidence",
+        value=False,
+        help="Score by the sum of confidences instead of the number of papers"
+    )
+
+# The tags come with their weekly volumes, which the tag section below shows
 try:
-    response = requests.get(
-        f"{API_URL}/trends/week",
-        params={
-            "week_start": week_start.isoformat(),
-            "entity_type": entity_type
-        },
-        timeout=30
+    tag_trends = api_client.get_tag_trends(week_start.isoformat(), min_confidence=min_confidence)
+except requests.exceptions.RequestException as e:
+    tag_trends = e
+
+with col3:
+    tag_names = [t["tag"] for t in tag_trends["tags"]] if isinstance(tag_trends, dict) else []
+    tag_choice = st.selectbox(
+        "Tag",
+        options=["All papers"] + tag_names,
+        index=0,
+        help="Only count papers with this taxonomy tag"
     )
-    
-    if response.status_code == 200:
-        data = response.json()
+    tag = None if tag_choice == "All papers" else tag_choice
+
+st.divider()
+
+# Filled once both sections' data has been fetched
+trends_area = st.container()
+
+st.divider()
+
+# Co-occurrence section
+st.markdown("### 🔗 Entity Co-occurrence")
+st.caption("Entities that frequently appear together in papers")
+
+col1, col2 = st.columns([1, 3])
+
+with col1:
+    cooc_type = st.selectbox(
+        "Co-occurrence Type",
+        options=["method", "dataset", "task", "library"],
+        key="cooc_type"
+    )
+    cooc_days = st.slider("Days", 7, 90, 30)
+
+score_format = "%.2f" if weighted else "%d"
+
+# Both sections' endpoints are fetched at once; reruns with unchanged filters are served from the cache
+weekly, cooc = api_client.fetch_parallel(
+    partial(api_client.get_weekly_trends, week_start.isoformat(), entity_type, tag, min_confidence, weighted),
+    partial(api_client.get_cooccurrence, cooc_type, cooc_days, tag, min_confidence, weighted),
+    return_exceptions=True
+)
+
+with col2:
+    try:
+        if isinstance(cooc, Exception):
+            raise cooc
+        cooc_data = cooc
+        
+        if cooc_data:
+            df_cooc = pd.DataFrame(cooc_data)
+            
+            st.dataframe(
+                df_cooc,
+                column_config={
+                    "entity_a": st.column_config.TextColumn("Entity A"),
+                    "entity_b": st.column_config.TextColumn("Entity B"),
+                    "cooccurrence_count": st.column_config.NumberColumn("Co-occurrences", format=score_format)
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+        else:
+            st.info("No co-occurrence data available.")
+    except requests.exceptions.HTTPError as e:
+        st.error(f"API Error: {api_client.error_detail(e)}")
+    except requests.exceptions.ConnectionError:
+        st.info("Connect to API to see co-occurrence data")
+    except Exception as e:
+        st.error(f"Error: {str(e)}")
+
+with trends_area:
+    try:
+        if isinstance(weekly, Exception):
+            raise weekly
+        data = weekly
         
         col1, col2 = st.columns(2)
         
@@ -75,7 +158,7 @@ try:
                     column_config={
                         "rank": st.column_config.TextColumn("Rank", width="small"),
                         "name": st.column_config.TextColumn("Entity", width="medium"),
-                        "count": st.column_config.NumberColumn("Papers", format="%d")
+                        "count": st.column_config.NumberColumn("Score" if weighted else "Papers", format=score_format)
                     },
                     hide_index=True,
                     use_container_width=True
@@ -104,7 +187,7 @@ try:
                     df_growing,
                     column_config={
                         "name": st.column_config.TextColumn("Entity", width="medium"),
-                        "growth": st.column_config.NumberColumn("Growth", format="+%d"),
+                        "growth": st.column_config.NumberColumn("Growth", format="+" + score_format),
                         "trend": st.column_config.TextColumn("", width="small")
                     },
                     hide_index=True,
@@ -115,60 +198,48 @@ try:
                 st.bar_chart(df_growing.set_index('name')['growth'], color="#10b981")
             else:
                 st.info("No growth data available. Need at least 2 weeks of data.")
-    else:
-        st.error(f"API Error: {response.json().get('detail', 'Unknown error')}")
-        
-except requests.exceptions.ConnectionError:
-    st.error("❌ Could not connect to the API. Make sure FastAPI is running.")
-except Exception as e:
-    st.error(f"Error: {str(e)}")
+    except requests.exceptions.HTTPError as e:
+        st.error(f"API Error: {api_client.error_detail(e)}")
+    except requests.exceptions.ConnectionError:
+        st.error("❌ Could not connect to the API. Make sure FastAPI is running.")
+    except Exception as e:
+        st.error(f"Error: {str(e)}")
 
 st.divider()
 
-# Co-occurrence section
-st.markdown("### 🔗 Entity Co-occurrence")
-st.caption("Entities that frequently appear together in papers")
+# Tag section
+st.markdown("### 🏷️ Tag Volume")
+st.caption("Tagged papers per week over the 8 weeks ending with the selected one")
 
-col1, col2 = st.columns([1, 3])
+try:
+    if isinstance(tag_trends, Exception):
+        raise tag_trends
 
-with col1:
-    cooc_type = st.selectbox(
-        "Co-occurrence Type",
-        options=["method", "dataset", "task", "library"],
-        key="cooc_type"
-    )
-    cooc_days = st.slider("Days", 7, 90, 30)
+    if tag_trends["tags"]:
+        weeks = pd.to_datetime(tag_trends["weeks"])
+        series = "weighted" if weighted else "counts"
+        df_tags = pd.DataFrame({t["tag"]: t[series] for t in tag_trends["tags"]}, index=weeks)
+        st.line_chart(df_tags)
 
-with col2:
-    try:
-        response = requests.get(
-            f"{API_URL}/trends/cooccurrence",
-            params={"entity_type": cooc_type, "days": cooc_days},
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            cooc_data = response.json()
-            
-            if cooc_data:
-                df_cooc = pd.DataFrame(cooc_data)
-                
-                st.dataframe(
-                    df_cooc,
-                    column_config={
-                        "entity_a": st.column_config.TextColumn("Entity A"),
-                        "entity_b": st.column_config.TextColumn("Entity B"),
-                        "cooccurrence_count": st.column_config.NumberColumn("Co-occurrences", format="%d")
-                    },
-                    hide_index=True,
-                    use_container_width=True
-                )
-            else:
-                st.info("No co-occurrence data available.")
-    except requests.exceptions.ConnectionError:
-        st.info("Connect to API to see co-occurrence data")
-    except Exception as e:
-        st.error(f"Error: {str(e)}")
+        df_types = pd.DataFrame([
+            {"tag": t["tag"], "entity_type": entity_type, **counts}
+            for t in tag_trends["tags"]
+            for entity_type, counts in t["entity_types"].items()
+        ])
+        if not df_types.empty:
+            st.markdown("**Entity types per tag** (papers mentioning at least one)")
+            st.dataframe(
+                df_types.pivot(index="tag", columns="entity_type", values="papers").fillna(0).astype(int),
+                use_container_width=True
+            )
+    else:
+        st.info("No tagged papers in these weeks yet. Tag volumes are refreshed after each ingest, or with `python cli.py rollups`.")
+except requests.exceptions.HTTPError as e:
+    st.error(f"API Error: {api_client.error_detail(e)}")
+except requests.exceptions.ConnectionError:
+    st.info("Connect to API to see tag volumes")
+except Exception as e:
+    st.error(f"Error: {str(e)}")
 
 # Sidebar info
 with st.sidebar:
@@ -179,6 +250,10 @@ with st.sidebar:
     **Fastest Growing** compares the current week to the previous week to find emerging trends.
     
     **Co-occurrence** shows which entities appear together in the same papers, revealing research patterns.
+
+    **Tag** narrows all of the above to papers with one taxonomy tag; **Tag Volume** compares the tags week by week.
+
+    **Min Confidence** drops entity mentions and tags below the threshold, and **Weight by confidence** scores by summed confidences, so uncertain extractions count less.
     """)
     
     st.divider()
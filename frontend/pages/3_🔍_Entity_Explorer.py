@@ -5,10 +5,12 @@ import streamlit as st
 import requests
 import pandas as pd
 
+import api_client
+from graph_snapshot import load_graph_snapshot
+
 st.set_page_config(page_title="Entity Explorer", page_icon="🔍", layout="wide")
 
-import os
-API_URL = os.environ.get("API_URL", "http://localhost:8000")
+PAPERS_PER_PAGE = 20
 
 st.title("🔍 Entity Explorer")
 st.markdown("Explore entities and discover related papers.")
@@ -32,106 +34,119 @@ with col2:
         help="Search entities by name"
     )
 
-# Fetch entities
+# Entities and co-occurrence edges come from the graph snapshot, downloaded
+# only when the data changed; filtering happens here instead of in the API
+selected_entity = None
 try:
-    params = {}
+    snapshot = load_graph_snapshot(days=30)
+    df = snapshot.entities
     if entity_type != "All":
-        params["entity_type"] = entity_type
+        df = df[df['type'] == entity_type]
     if search_term:
-        params["search"] = search_term
+        df = df[df['name'].str.contains(search_term, case=False, regex=False)]
+
+    with col3:
+        st.metric("Total Entities", len(df))
     
-    response = requests.get(f"{API_URL}/entities/", params=params, timeout=30)
+    st.divider()
     
-    if response.status_code == 200:
-        entities = response.json()
-        
-        with col3:
-            st.metric("Total Entities", len(entities))
+    if len(df):
+        # Entity selection
+        col1, col2 = st.columns([1, 2])
         
-        st.divider()
-        
-        if entities:
-            # Entity selection
-            col1, col2 = st.columns([1, 2])
+        with col1:
+            st.markdown("### 📋 Entities")
             
-            with col1:
-                st.markdown("### 📋 Entities")
-                
-                # Group by type for better organization
-                df = pd.DataFrame(entities)
-                
-                # Create a display name with type badge
-                df['display'] = df.apply(
-                    lambda x: f"{x['name']} [{x['type']}]", axis=1
-                )
-                
-                # Entity selector
-                selected_entity = st.selectbox(
-                    "Select an entity",
-                    options=entities,
-                    format_func=lambda x: f"{x['name']} ({x['type']})",
-                    help="Select an entity to see related papers"
-                )
-                
-                if selected_entity:
-                    st.markdown("#### Entity Details")
-                    st.markdown(f"**Name:** {selected_entity['name']}")
-                    st.markdown(f"**Type:** `{selected_entity['type']}`")
-                    st.markdown(f"**ID:** {selected_entity['id']}")
-                    
-                    if selected_entity.get('canonical_id'):
-                        st.markdown(f"**Canonical ID:** {selected_entity['canonical_id']}")
-                        st.caption("This entity is an alias")
-                
-                # Entity type breakdown
-                st.markdown("#### Type Distribution")
-                type_counts = df['type'].value_counts()
-                for t, c in type_counts.items():
-                    emoji = {"method": "🔧", "dataset": "📊", "task": "🎯", "library": "📚"}.get(t, "📌")
-                    st.caption(f"{emoji} {t}: {c}")
+            names = dict(zip(df['id'], df['name'] + " (" + df['type'] + ")"))
+            
+            # Entity selector
+            selected_id = st.selectbox(
+                "Select an entity",
+                options=df['id'].tolist(),
+                format_func=lambda entity_id: names[entity_id],
+                help="Select an entity to see related papers"
+            )
+            selected_entity = df[df['id'] == selected_id].iloc[0].to_dict() if selected_id is not None else None
             
-            with col2:
-                st.markdown("### 📄 Related Papers")
+            if selected_entity:
+                st.markdown("#### Entity Details")
+                st.markdown(f"**Name:** {selected_entity['name']}")
+                st.markdown(f"**Type:** `{selected_entity['type']}`")
+                st.markdown(f"**ID:** {selected_entity['id']}")
                 
-                if selected_entity:
-                    try:
-                        papers_resp = requests.get(
-                            f"{API_URL}/entities/{selected_entity['id']}/papers",
-                            timeout=30
+                if pd.notna(selected_entity.get('canonical_id')):
+                    st.markdown(f"**Canonical ID:** {selected_entity['canonical_id']}")
+                    st.caption("This entity is an alias")
+            
+            # Entity type breakdown
+            st.markdown("#### Type Distribution")
+            type_counts = df['type'].value_counts()
+            for t, c in type_counts.items():
+                emoji = {"method": "🔧", "dataset": "📊", "task": "🎯", "library": "📚"}.get(t, "📌")
+                st.caption(f"{emoji} {t}: {c}")
+        
+        with col2:
+            if selected_entity:
+                st.markdown("### 📈 Papers per Week")
+                try:
+                    timeline = api_client.get_entity_timeline(int(selected_entity['id']), weeks=26)
+                    st.line_chart(
+                        pd.DataFrame({"papers": timeline['counts']}, index=pd.to_datetime(timeline['weeks'])),
+                        color="#667eea"
+                    )
+                    if timeline['aliases']:
+                        st.caption(f"Includes {len(timeline['aliases'])} canonical alias(es) of **{timeline['name']}**")
+                except requests.exceptions.RequestException as e:
+                    st.caption(f"Could not load the timeline: {e}")
+            
+            st.markdown("### 📄 Related Papers")
+            
+            if selected_entity:
+                try:
+                    first_page = api_client.get_entity_papers(int(selected_entity['id']), limit=PAPERS_PER_PAGE)
+                    total = first_page['total']
+                    page = 1
+                    if total > PAPERS_PER_PAGE:
+                        page = st.number_input(
+                            "Page",
+                            min_value=1,
+                            max_value=(total - 1) // PAPERS_PER_PAGE + 1,
+                            value=1,
+                            key=f"papers_page_{selected_entity['id']}"
                         )
+                    papers = first_page['papers'] if page == 1 else api_client.get_entity_papers(
+                        int(selected_entity['id']), skip=(page - 1) * PAPERS_PER_PAGE, limit=PAPERS_PER_PAGE
+                    )['papers']
+                    
+                    if papers:
+                        st.caption(f"Found {total} papers mentioning **{selected_entity['name']}**")
                         
-                        if papers_resp.status_code == 200:
-                            papers = papers_resp.json()
-                            
-                            if papers:
-                                st.caption(f"Found {len(papers)} papers mentioning **{selected_entity['name']}**")
+                        for paper in papers:
+                            with st.expander(f"📄 {paper['title'][:70]}...", expanded=False):
+                                st.markdown(f"**Authors:** {', '.join(paper['authors'][:3])}...")
+                                st.markdown(f"**Published:** {paper['published_at'][:10]}")
                                 
-                                for paper in papers:
-                                    with st.expander(f"📄 {paper['title'][:70]}...", expanded=False):
-                                        st.markdown(f"**Authors:** {', '.join(paper['authors'][:3])}...")
-                                        st.markdown(f"**Published:** {paper['published_at'][:10]}")
-                                        
-                                        # Evidence and confidence
-                                        if paper.get('evidence'):
-                                            st.markdown("**Evidence from abstract:**")
-                                            st.info(f'"{paper["evidence"]}"')
-                                        
-                                        if paper.get('confidence'):
-                                            confidence_pct = int(paper['confidence'] * 100)
-                                            st.progress(paper['confidence'], text=f"Confidence: {confidence_pct}%")
-                            else:
-                                st.info("No papers found for this entity.")
-                        else:
-                            st.warning("Could not fetch papers for this entity.")
-                    except Exception as e:
-                        st.error(f"Error fetching papers: {e}")
-                else:
-                    st.info("👈 Select an entity from the left to see related papers")
-        else:
-            st.info("No entities found. Try adjusting your filters or ingest some papers first!")
+                                # Evidence and confidence
+                                if paper.get('evidence'):
+                                    st.markdown("**Evidence from abstract:**")
+                                    st.info(f'"{paper["evidence"]}"')
+                                
+                                if paper.get('confidence'):
+                                    confidence_pct = int(paper['confidence'] * 100)
+                                    st.progress(paper['confidence'], text=f"Confidence: {confidence_pct}%")
+                    else:
+                        st.info("No papers found for this entity.")
+                except requests.exceptions.HTTPError:
+                    st.warning("Could not fetch papers for this entity.")
+                except Exception as e:
+                    st.error(f"Error fetching papers: {e}")
+            else:
+                st.info("👈 Select an entity from the left to see related papers")
     else:
-        st.error(f"API Error: {response.json().get('detail', 'Unknown error')}")
+        st.info("No entities found. Try adjusting your filters or ingest some papers first!")
 
+except requests.exceptions.HTTPError as e:
+    st.error(f"API Error: {api_client.error_detail(e)}")
 except requests.exceptions.ConnectionError:
     st.error("❌ Could not connect to the API. Make sure FastAPI is running.")
     st.code("uvicorn backend.app.main:app --reload", language="bash")
@@ -143,47 +158,23 @@ st.divider()
 st.markdown("### 🔗 Co-occurrence Network")
 st.caption("See which entities frequently appear together")
 
-if 'selected_entity' in dir() and selected_entity:
+if selected_entity:
     try:
-        cooc_resp = requests.get(
-            f"{API_URL}/trends/cooccurrence",
-            params={"entity_type": selected_entity['type'], "days": 30},
-            timeout=30
-        )
+        df_neighbors = snapshot.neighbors(selected_entity['id'])
         
-        if cooc_resp.status_code == 200:
-            cooc_data = cooc_resp.json()
-            
-            # Filter to show only neighbors of selected entity
-            neighbors = []
-            for edge in cooc_data:
-                if edge['entity_a'] == selected_entity['name']:
-                    neighbors.append({
-                        "neighbor": edge['entity_b'],
-                        "co_occurrences": edge['cooccurrence_count']
-                    })
-                elif edge['entity_b'] == selected_entity['name']:
-                    neighbors.append({
-                        "neighbor": edge['entity_a'],
-                        "co_occurrences": edge['cooccurrence_count']
-                    })
-            
-            if neighbors:
-                st.markdown(f"**Entities that co-occur with {selected_entity['name']}:**")
-                df_neighbors = pd.DataFrame(neighbors).drop_duplicates()
-                df_neighbors = df_neighbors.sort_values('co_occurrences', ascending=False)
-                
-                st.dataframe(
-                    df_neighbors,
-                    column_config={
-                        "neighbor": st.column_config.TextColumn("Entity"),
-                        "co_occurrences": st.column_config.NumberColumn("Co-occurrences", format="%d")
-                    },
-                    hide_index=True,
-                    use_container_width=True
-                )
-            else:
-                st.info(f"No co-occurrence data found for {selected_entity['name']}")
+        if len(df_neighbors):
+            st.markdown(f"**Entities that co-occur with {selected_entity['name']}:**")
+            st.dataframe(
+                df_neighbors[['name', 'co_occurrences']],
+                column_config={
+                    "name": st.column_config.TextColumn("Entity"),
+                    "co_occurrences": st.column_config.NumberColumn("Co-occurrences", format="%d")
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+        else:
+            st.info(f"No co-occurrence data found for {selected_entity['name']}")
     except Exception as e:
         st.caption(f"Could not load co-occurrence data: {e}")
 
@@ -6,20 +6,25 @@ import requests
 import json
 from datetime import datetime, timedelta
 
-st.set_page_config(page_title="Weekly Digest", page_icon="📝", layout="wide")
+import api_client
 
-import os
-API_URL = os.environ.get("API_URL", "http://localhost:8000")
+st.set_page_config(page_title="Weekly Digest", page_icon="📝", layout="wide")
 
 
-def _safe_json(response):
-    """Parse JSON safely; avoids 'Expecting value: line 1 column 1' on empty or non-JSON body."""
-    if not response.text or not response.text.strip():
-        return None
-    try:
-        return response.json()
-    except json.JSONDecodeError:
-        return None
+def _iter_sse(response):
+    """Yield (event, data) pairs from a streaming Server-Sent Events response."""
+    event, data_lines = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if line == "":
+            if data_lines:
+                yield event, json.loads("\n".join(data_lines))
+            event, data_lines = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:"):].strip())
 
 st.title("📝 Weekly Digest")
 st.markdown("Generate LLM-powered weekly trend reports based on database analytics.")
@@ -48,30 +53,48 @@ with col1:
         generate_btn = st.form_submit_button("🚀 Generate Digest", use_container_width=True)
     
     if generate_btn:
-        with st.spinner("Generating digest... This may take 30-60 seconds."):
-            try:
-                response = requests.post(
-                    f"{API_URL}/digest/generate",
-                    params={"week_start": week_start.isoformat()},
-                    timeout=120
-                )
-                result = _safe_json(response)
-                if response.status_code == 200 and result:
-                    st.success("✅ Digest generated successfully!")
-                    st.session_state['generated_digest'] = result.get('content', '')
+        # Render into the right-hand column as tokens arrive
+        with col2:
+            stream_box = st.empty()
+        status = st.empty()
+        status.info("Generating digest...")
+        try:
+            response = api_client.post(
+                "/digest/generate/stream",
+                params={"week_start": week_start.isoformat()},
+                stream=True,
+                timeout=(10, 120)
+            )
+            if response.status_code != 200:
+                result = api_client.safe_json(response)
+                error_detail = (result or {}).get('detail', response.text or 'Unknown error')
+                status.error(f"❌ Error: {error_detail}")
+            else:
+                text = ""
+                final = None
+                for event, data in _iter_sse(response):
+                    if event == "error":
+                        status.error(f"❌ Error: {data.get('detail', 'Unknown error')}")
+                        break
+                    if event == "done":
+                        final = data
+                        break
+                    text += data.get("token", "")
+                    stream_box.markdown(text + " ▌")
+                if final is not None:
+                    api_client.invalidate(api_client.get_latest_digest)
+                    status.success("✅ Digest generated successfully!")
+                    st.session_state['generated_digest'] = final.get('content', text)
                     st.session_state['digest_week'] = str(week_start)
                     st.rerun()
-                elif response.status_code == 200:
-                    st.error("❌ Server returned empty or invalid response. Check backend logs.")
-                else:
-                    error_detail = (result or {}).get('detail', response.text or 'Unknown error')
-                    st.error(f"❌ Error: {error_detail}")
-            except requests.exceptions.Timeout:
-                st.error("❌ Request timed out. Try again.")
-            except requests.exceptions.ConnectionError:
-                st.error("❌ Could not connect to API. Make sure FastAPI is running.")
-            except Exception as e:
-                st.error(f"❌ Error: {str(e)}")
+                elif text:
+                    stream_box.markdown(text)
+        except requests.exceptions.Timeout:
+            status.error("❌ Request timed out. Try again.")
+        except requests.exceptions.ConnectionError:
+            status.error("❌ Could not connect to API. Make sure FastAPI is running.")
+        except Exception as e:
+            status.error(f"❌ Error: {str(e)}")
     
     st.divider()
     
@@ -105,9 +128,8 @@ with col2:
     else:
         # Try to fetch latest from API
         try:
-            response = requests.get(f"{API_URL}/digest/latest", timeout=30)
-            digest = _safe_json(response)
-            if response.status_code == 200 and digest:
+            digest = api_client.get_latest_digest()
+            if digest:
                 week_start_str = digest.get('week_start') or ''
                 week_end_str = digest.get('week_end') or ''
                 if isinstance(week_start_str, str) and len(week_start_str) >= 10:
@@ -122,7 +144,7 @@ with col2:
                     file_name=f"digest_{week_start_str}.md",
                     mime="text/markdown"
                 )
-            elif response.status_code == 404:
+            else:
                 st.info("No digests found. Generate your first one! 👈")
                 
                 # Show placeholder
@@ -147,8 +169,8 @@ with col2:
                 - Area 1: ...
                 ```
                 """)
-            else:
-                st.warning("Could not fetch latest digest.")
+        except requests.exceptions.HTTPError:
+            st.warning("Could not fetch latest digest.")
         except requests.exceptions.ConnectionError:
             st.warning("Connect to API to see the latest digest.")
             st.info("Start the FastAPI server:")
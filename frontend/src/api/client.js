@@ -1,7 +1,9 @@
 import axios from 'axios'
 
+const baseURL = import.meta.env.VITE_API_URL || 'http://localhost:8000'
+
 const api = axios.create({
-  baseURL: import.meta.env.VITE_API_URL || 'http://localhost:8000',
+  baseURL,
   timeout: 15000,
 })
 
@@ -16,8 +18,12 @@ export const getEntities = (entity_type, search) =>
     },
   })
 
-export const getEntityPapers = (id) =>
-  api.get(`/entities/${id}/papers`)
+// One page, newest first; the X-Total-Count header holds the number of papers
+export const getEntityPapers = (id, skip = 0, limit = 50) =>
+  api.get(`/entities/${id}/papers`, { params: { skip, limit } })
+
+export const getEntityTimeline = (id, weeks = 26) =>
+  api.get(`/entities/${id}/timeline`, { params: { weeks } })
 
 export const getWeeklyTrends = (week_start, entity_type) =>
   api.get('/trends/week', { params: { week_start, entity_type } })
@@ -37,5 +43,43 @@ export const generateDigest = (week_start) =>
     timeout: 120000,
   })
 
+// Streams the digest over Server-Sent Events. Calls onToken(text) per chunk
+// and resolves with the final { week_start, content } payload.
+export const streamDigest = async (week_start, { onToken, signal } = {}) => {
+  const url = `${baseURL}/digest/generate/stream?${new URLSearchParams({ week_start })}`
+  const response = await fetch(url, { method: 'POST', signal })
+  if (!response.ok) {
+    const body = await response.json().catch(() => ({}))
+    throw new Error(body.detail || 'Digest generation failed.')
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  for (;;) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+
+    let sep
+    while ((sep = buffer.indexOf('\n\n')) !== -1) {
+      const frame = buffer.slice(0, sep)
+      buffer = buffer.slice(sep + 2)
+      let event = 'message'
+      const dataLines = []
+      for (const line of frame.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim()
+        else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim())
+      }
+      if (!dataLines.length) continue
+      const data = JSON.parse(dataLines.join('\n'))
+      if (event === 'error') throw new Error(data.detail || 'Digest generation failed.')
+      if (event === 'done') return data
+      onToken?.(data.token || '')
+    }
+  }
+  throw new Error('Digest stream ended unexpectedly.')
+}
+
 export const getLatestDigest = () =>
   api.get('/digest/latest')
@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react'
-import { generateDigest, getLatestDigest } from '../api/client.js'
+import { streamDigest, getLatestDigest } from '../api/client.js'
 import ReactMarkdown from 'react-markdown'
 import { Sparkles, Loader2, FileText, AlertCircle } from 'lucide-react'
 
@@ -25,13 +25,14 @@ export default function Digest() {
   }, [])
 
   const handleGenerate = async () => {
-    setLoading(true); setError(null)
+    setLoading(true); setError(null); setContent(''); setWeekLabel(weekStart)
     try {
-      const { data } = await generateDigest(weekStart)
+      const data = await streamDigest(weekStart, {
+        onToken: token => setContent(prev => (prev || '') + token),
+      })
       setContent(data.content)
-      setWeekLabel(weekStart)
     } catch (err) {
-      setError(err.response?.data?.detail || 'Digest generation failed.')
+      setError(err.message || 'Digest generation failed.')
     } finally {
       setLoading(false)
     }
@@ -72,7 +73,7 @@ export default function Digest() {
         </div>
       )}
 
-      {loading && (
+      {loading && !content && (
         <div className="bg-slate-900 border border-slate-800 rounded-xl p-12 text-center">
           <div className="inline-flex items-center justify-center w-12 h-12 rounded-full bg-violet-900/30 mb-4">
             <Loader2 className="w-6 h-6 text-violet-400 animate-spin" />
@@ -82,7 +83,7 @@ export default function Digest() {
         </div>
       )}
 
-      {content && !loading && (
+      {content && (
         <div className="bg-slate-900 border border-slate-800 rounded-xl p-6">
           {weekLabel && (
             <div className="flex items-center gap-2 mb-6 pb-4 border-b border-slate-800">
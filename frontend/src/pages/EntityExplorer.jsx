@@ -17,6 +17,7 @@ export default function EntityExplorer() {
   const [tab,           setTab]           = useState('all')
   const [selected,      setSelected]      = useState(null)
   const [papers,        setPapers]        = useState([])
+  const [papersTotal,   setPapersTotal]   = useState(0)
   const [loading,       setLoading]       = useState(true)
   const [papersLoading, setPapersLoading] = useState(false)
 
@@ -32,9 +33,10 @@ export default function EntityExplorer() {
     setSelected(entity)
     setPapersLoading(true)
     try {
-      const { data } = await getEntityPapers(entity.id)
+      const { data, headers } = await getEntityPapers(entity.id)
       setPapers(data)
-    } catch { setPapers([]) }
+      setPapersTotal(Number(headers['x-total-count'] ?? data.length))
+    } catch { setPapers([]); setPapersTotal(0) }
     finally { setPapersLoading(false) }
   }
 
@@ -131,7 +133,8 @@ export default function EntityExplorer() {
             </div>
 
             <p className="text-xs text-slate-500 mb-3 font-medium">
-              {papersLoading ? 'Loading…' : `${papers.length} paper${papers.length !== 1 ? 's' : ''}`}
+              {papersLoading ? 'Loading…' : `${papersTotal} paper${papersTotal !== 1 ? 's' : ''}`}
+              {!papersLoading && papersTotal > papers.length && ` · latest ${papers.length} shown`}
             </p>
 
             {papersLoading ? (
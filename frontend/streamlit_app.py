@@ -3,6 +3,9 @@ ArXiv Trend Radar - Streamlit Dashboard
 Main entry point for the Streamlit application.
 """
 import streamlit as st
+import requests
+
+import api_client
 
 # Page configuration
 st.set_page_config(
@@ -103,32 +106,17 @@ with col2:
     st.markdown("### ⚡ Quick Stats")
     
     # Try to fetch stats from API
-    import requests
-    import os
-    
-    API_URL = os.environ.get("API_URL", "http://localhost:8000")
-    
     try:
-        papers_resp = requests.get(f"{API_URL}/papers/", params={"limit": 1000}, timeout=5)
-        entities_resp = requests.get(f"{API_URL}/entities/", timeout=5)
+        stats = api_client.get_stats()
+        
+        st.metric("📄 Papers", stats["papers"])
+        st.metric("🏷️ Entities", stats["entities"])
         
-        if papers_resp.status_code == 200 and entities_resp.status_code == 200:
-            papers = papers_resp.json()
-            entities = entities_resp.json()
-            
-            st.metric("📄 Papers", len(papers))
-            st.metric("🏷️ Entities", len(entities))
-            
-            # Count by entity type
-            type_counts = {}
-            for e in entities:
-                t = e.get("type", "unknown")
-                type_counts[t] = type_counts.get(t, 0) + 1
-            
-            for etype, count in sorted(type_counts.items()):
-                st.caption(f"  • {etype}: {count}")
-        else:
-            st.warning("⚠️ Could not fetch stats")
+        # Count by entity type
+        for etype, count in sorted(stats["entity_types"].items()):
+            st.caption(f"  • {etype}: {count}")
+    except requests.exceptions.HTTPError:
+        st.warning("⚠️ Could not fetch stats")
     except requests.exceptions.RequestException:
         st.info("ℹ️ Start the FastAPI server to see stats")
         st.code("uvicorn backend.app.main:app --reload", language="bash")
@@ -0,0 +1,33 @@
+"""
+Most tests need no database. The `postgres_url` fixture creates an empty
+database on the server in TEST_POSTGRES_URL (any database URL on it, e.g.
+postgresql://postgres@localhost:5433/postgres), drops it afterwards, and
+skips the test when the variable is not set.
+"""
+import os
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+# backend.app.database needs a URL at import, and picks its dialect helpers (insert) by it;
+# the tests build their own engines
+os.environ.setdefault("DATABASE_URL", os.getenv("TEST_POSTGRES_URL") or "sqlite://")
+
+
+@pytest.fixture
+def postgres_url():
+    server_url = os.getenv("TEST_POSTGRES_URL")
+    if not server_url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    name = f"radar_test_{uuid.uuid4().hex[:12]}"
+    admin = create_engine(server_url, isolation_level="AUTOCOMMIT")
+    with admin.connect() as connection:
+        connection.execute(text(f'CREATE DATABASE "{name}"'))
+    try:
+        yield make_url(server_url).set(database=name)
+    finally:
+        with admin.connect() as connection:
+            connection.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+        admin.dispose()
@@ -0,0 +1,57 @@
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.database import Base
+from backend.app.models.models import Paper, PaperEntity, PaperTag
+from backend.app.repositories.bulk_loader import BulkLoader, CopyBuffer
+
+
+def test_copy_buffer_writes_none_as_unquoted_empty_field():
+    rows = CopyBuffer()
+    rows.add(("2401.00001v1", None, "", 'say "hi"', 0.5, True))
+    assert rows.buffer.getvalue() == '"2401.00001v1",,"","say ""hi""","0.5","True"\n'
+
+
+def test_load_stores_missing_fields_as_null(postgres_url):
+    engine = create_engine(postgres_url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        counts = BulkLoader(db).load([
+            {
+                "arxiv_id": "2401.00001v1",
+                "title": "A paper without abstract, date or url",
+                "abstract": None,
+                "authors": ["Ada Lovelace"],
+                "published_at": None,
+                "categories": ["cs.CL"],
+                "url": None,
+                "entities": [{"name": "BERT", "type": "method", "evidence": None, "confidence": None}],
+                "tags": [{"tag": "nlp", "confidence": None}],
+            },
+            {
+                "arxiv_id": "2401.00002v1",
+                "title": "A paper with an empty abstract",
+                "abstract": "",
+                "authors": [],
+                "published_at": datetime(2024, 1, 2),
+                "categories": [],
+                "url": "",
+            },
+        ])
+        db.commit()
+        assert counts["papers"] == 2
+
+        missing = db.query(Paper).filter(Paper.arxiv_id == "2401.00001v1").one()
+        assert (missing.abstract, missing.published_at, missing.url) == (None, None, None)
+        link = db.query(PaperEntity).filter(PaperEntity.paper_id == missing.id).one()
+        assert (link.evidence, link.confidence) == (None, None)
+        assert db.query(PaperTag.confidence).filter(PaperTag.paper_id == missing.id).scalar() is None
+
+        empty = db.query(Paper).filter(Paper.arxiv_id == "2401.00002v1").one()
+        assert (empty.abstract, empty.url) == ("", "")
+    finally:
+        db.close()
+        engine.dispose()
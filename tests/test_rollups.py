@@ -0,0 +1,38 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.database import Base
+from backend.app.models.models import Paper, PaperTag, TagWeeklyCount
+from backend.app.repositories.rollup_repo import RollupRepository
+from backend.app.services import rollup_service
+from backend.app.services.rollup_service import RollupService
+
+
+def test_refresh_picks_up_transactions_open_during_the_previous_refresh(postgres_url, monkeypatch):
+    # Without the overlap, only the watermark decides what the second refresh looks at
+    monkeypatch.setattr(rollup_service, "WATERMARK_OVERLAP", timedelta(0))
+    engine = create_engine(postgres_url)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    writer, refresher = Session(), Session()
+    try:
+        # A long ingest: rows written (created_at set) but not committed yet
+        paper = Paper(arxiv_id="2401.00001v1", title="A paper", published_at=datetime(2024, 1, 3))
+        writer.add(paper)
+        writer.flush()
+        writer.add(PaperTag(paper_id=paper.id, tag="nlp", confidence=0.9))
+        writer.flush()
+
+        service = RollupService(RollupRepository(refresher))
+        assert service.refresh()["weeks"] == 0
+        writer.commit()
+
+        service.refresh()
+        counts = refresher.query(TagWeeklyCount.week, TagWeeklyCount.paper_count).filter(TagWeeklyCount.tag == "nlp").all()
+        assert counts == [(date(2024, 1, 1), 1)]
+    finally:
+        writer.close()
+        refresher.close()
+        engine.dispose()
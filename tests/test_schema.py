@@ -0,0 +1,19 @@
+from sqlalchemy import create_engine, inspect
+
+from backend.app.database import Base
+from backend.app.models import models  # noqa: F401
+
+
+def test_create_all_on_empty_postgres(postgres_url):
+    """main.py and the benchmarks build the schema with create_all; pgvector must come first"""
+    engine = create_engine(postgres_url)
+    try:
+        Base.metadata.create_all(bind=engine)
+        tables = set(inspect(engine).get_table_names())
+        assert {"topics", "paper_embeddings", "paper_entities"} <= tables
+
+        # --reset in the benchmarks drops and recreates every table
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+    finally:
+        engine.dispose()
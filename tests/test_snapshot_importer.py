@@ -0,0 +1,79 @@
+import json
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.database import Base
+from backend.app.models.models import Paper
+from backend.app.services.snapshot_importer import SnapshotFilter, SnapshotImporter, load_jsonl, parse_snapshot_record
+
+COMPLETE = {
+    "id": "0704.0001",
+    "title": "Calculation of prompt diphoton production",
+    "abstract": "  A fully differential calculation\n in perturbative QCD. ",
+    "authors_parsed": [["Balazs", "C.", ""], ["Berger", "E. L.", "Jr"]],
+    "categories": "hep-ph cs.LG",
+    "versions": [{"version": "v1", "created": "Mon, 2 Apr 2007 19:18:42 GMT"}, {"version": "v2", "created": "Tue, 24 Jul 2007 20:10:27 GMT"}],
+    "update_date": "2008-11-13",
+}
+# No usable version date, an empty update_date and an empty abstract
+INCOMPLETE = {
+    "id": "0704.0002",
+    "title": "Sparsity-certifying graph decompositions",
+    "abstract": "",
+    "authors": "Ileana Streinu, Louis Theran",
+    "categories": "cs.LG",
+    "versions": [{"version": "v1", "created": "not a date"}],
+    "update_date": "",
+}
+
+
+def test_parse_snapshot_record():
+    paper = parse_snapshot_record(COMPLETE)
+    assert paper["arxiv_id"] == "http://arxiv.org/abs/0704.0001v2"
+    assert paper["abstract"] == "A fully differential calculation in perturbative QCD."
+    assert paper["authors"] == ["C. Balazs", "E. L. Berger Jr"]
+    assert paper["published_at"] == datetime(2007, 4, 2, 19, 18, 42)
+
+
+def test_parse_snapshot_record_without_date_or_abstract():
+    paper = parse_snapshot_record(INCOMPLETE)
+    assert paper["published_at"] is None
+    assert paper["abstract"] is None
+    assert paper["authors"] == ["Ileana Streinu", "Louis Theran"]
+
+    malformed = parse_snapshot_record({**INCOMPLETE, "versions": [], "update_date": "13/11/2008"})
+    assert malformed["published_at"] is None
+
+
+def test_import_and_bulk_load_records_without_date_or_abstract(postgres_url, tmp_path):
+    snapshot = tmp_path / "snapshot.json"
+    snapshot.write_text("\n".join(json.dumps(record) for record in (COMPLETE, INCOMPLETE)) + "\n")
+    enriched = tmp_path / "papers.jsonl"
+    enriched.write_text(json.dumps({
+        "arxiv_id": "2401.00003v1",
+        "title": "An enriched paper without date or abstract",
+        "abstract": None,
+        "published_at": "",
+        "entities": [{"name": "BERT", "type": "method"}],
+        "tags": [{"tag": "nlp"}],
+    }) + "\n")
+
+    engine = create_engine(postgres_url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        stats = SnapshotImporter(db).run(str(snapshot), SnapshotFilter(categories=["cs.*"]))
+        assert (stats["matched"], stats["inserted"], stats["invalid"]) == (2, 2, 0)
+        stats = load_jsonl(db, str(enriched))
+        assert (stats["papers"], stats["paper_entities"], stats["paper_tags"]) == (1, 1, 1)
+
+        rows = dict(db.query(Paper.arxiv_id, Paper.published_at).all())
+        assert rows["http://arxiv.org/abs/0704.0001v2"] == datetime(2007, 4, 2, 19, 18, 42)
+        assert rows["http://arxiv.org/abs/0704.0002v1"] is None
+        assert rows["2401.00003v1"] is None
+        assert db.query(Paper).filter(Paper.abstract.is_(None)).count() == 2
+    finally:
+        db.close()
+        engine.dispose()
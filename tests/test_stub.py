@@ -0,0 +1,56 @@
+import enum
+from typing import Dict, List, Literal, Optional
+
+import pytest
+from pydantic import BaseModel, Field
+
+from backend.app.llm.stub import StubChatModel
+from backend.app.schemas.schemas import PaperClassificationSchema, TAXONOMY_TAGS
+
+ABSTRACT = "We fine-tune BERT on SQuAD with PyTorch for question answering."
+
+
+class Level(str, enum.Enum):
+    low = "low"
+    high = "high"
+
+
+class Reference(BaseModel):
+    title: str
+    year: Optional[int]
+
+
+class SummarySchema(BaseModel):
+    """A schema the stub has no fixture for"""
+    summary: str
+    score: float
+    novel: bool
+    level: Level
+    kind: Literal["survey", "method"]
+    keywords: List[str]
+    counts: Dict[str, int]
+    reference: Reference
+    note: Optional[str] = "none"
+    rank: int = Field(default=3)
+
+
+def test_known_schema_payload_comes_from_the_prompt():
+    result = StubChatModel().with_structured_output(PaperClassificationSchema).invoke(ABSTRACT)
+    assert result.tags and all(tag.tag in TAXONOMY_TAGS for tag in result.tags)
+
+
+def test_other_schema_gets_a_valid_default_payload():
+    model = StubChatModel().with_structured_output(SummarySchema)
+    result = model.invoke(ABSTRACT)
+    assert result == SummarySchema(
+        summary="", score=0.0, novel=False, level=Level.low, kind="survey",
+        keywords=[], counts={}, reference=Reference(title="", year=None),
+    )
+    assert (result.note, result.rank) == ("none", 3)
+    assert model.invoke(ABSTRACT) == result
+
+
+def test_non_pydantic_schema_is_rejected():
+    model = StubChatModel(payload_schema={"type": "object"})
+    with pytest.raises(ValueError, match="pydantic schemas only"):
+        model.invoke(ABSTRACT)